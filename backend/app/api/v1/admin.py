@@ -0,0 +1,85 @@
+"""
+管理相关API端点
+"""
+from fastapi import APIRouter
+from app.schemas.common import APIResponse
+from app.config import get_config_snapshot, reload_config_snapshot
+from app.services.llm_cache import get_llm_cache
+from app.services.selection_policy import get_selection_policy
+from app.utils.metrics import get_metrics
+from app.utils.singleflight import get_singleflight_stats
+
+router = APIRouter()
+
+
+@router.get("/config", summary="查看当前配置快照信息")
+async def get_config_info():
+    """
+    查看当前生效的配置快照版本及已加载的配置概况
+    """
+    snapshot = get_config_snapshot()
+    return APIResponse(
+        success=True,
+        data={
+            "version": snapshot.version,
+            "promptSections": list(snapshot.prompts.keys()),
+            "workflowTemplates": list(snapshot.workflows.keys())
+        },
+        message="获取配置信息成功"
+    )
+
+
+@router.post("/reload-config", summary="重新加载配置")
+async def reload_config():
+    """
+    立即重新加载 .env、llm_prompts.yaml 和 dify_workflows.yaml，
+    并原子替换当前配置快照。各服务在下一次请求时自动使用新配置
+    """
+    snapshot = reload_config_snapshot()
+    return APIResponse(
+        success=True,
+        data={"version": snapshot.version},
+        message="配置已重新加载"
+    )
+
+
+@router.get("/metrics", summary="查看运行指标")
+async def get_runtime_metrics():
+    """
+    查看进程内运行指标：计数器、推测执行命中率、请求合并和LLM缓存统计
+    """
+    metrics = get_metrics()
+    cache = get_llm_cache()
+    return APIResponse(
+        success=True,
+        data={
+            "counters": metrics.snapshot(),
+            "speculation": {
+                "hitRate": metrics.ratio("speculation.hit", "speculation.started")
+            },
+            "fastPath": {
+                "successRate": metrics.ratio("fast.success", "fast.attempt")
+            },
+            "singleflight": get_singleflight_stats(),
+            "llmCache": cache.stats if cache else None
+        },
+        message="获取运行指标成功"
+    )
+
+
+@router.get("/selection-policy", summary="查看模板选择策略决策记录")
+async def get_selection_policy_decisions(limit: int = 50):
+    """
+    查看模板选择策略的跳过率、LLM选择与本地排序第一名的一致率，以及最近的决策记录
+    
+    - **limit**: 返回的最近决策条数
+    """
+    policy = get_selection_policy()
+    return APIResponse(
+        success=True,
+        data={
+            "summary": policy.summary(),
+            "recent": policy.recent_decisions(limit)
+        },
+        message="获取模板选择策略信息成功"
+    )
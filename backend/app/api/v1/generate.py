@@ -4,13 +4,17 @@
 1. 智能生成模式（三阶段：类型识别、模板选择、数据提取）
 2. 传统模式（直接指定模板ID进行数据提取）
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 from app.schemas.common import APIResponse
 from app.schemas.infographic import DataExtractRequest, DataExtractResponse
+from app.config import get_settings
 from app.services.generate_service import get_generate_service
+from app.services.generation_stream import get_generation_stream_registry, GenerationStream
 from app.services.workflow_mapper import get_workflow_mapper
+from app.utils.sse import format_sse, SSE_HEADERS
 
 router = APIRouter()
 
@@ -22,6 +26,11 @@ class SmartGenerateRequest(BaseModel):
         default=False,
         description="是否返回所有模板列表（带相似度排序）"
     )
+    mode: Literal["standard", "speculative", "fast"] = Field(
+        default="standard",
+        description="执行模式：standard（三阶段依次执行）、speculative（类型识别与模板选择推测并行）"
+                    "或 fast（类型识别与模板选择合并为一次LLM调用）"
+    )
 
 
 class SmartGenerateResponse(BaseModel):
@@ -43,6 +52,8 @@ async def smart_generate(request: SmartGenerateRequest):
     3. 数据提取：根据模板的数据结构提取关键信息
     
     - **text**: 用户输入的文本内容
+    - **mode**: standard、speculative（推测执行，返回中附带speculation信息）
+      或 fast（合并识别与选择，返回中fastPath表示是否走了合并调用）
     
     返回：
     - **config**: 可直接用于渲染的AntV Infographic配置
@@ -54,7 +65,8 @@ async def smart_generate(request: SmartGenerateRequest):
         generate_service = get_generate_service()
         result = await generate_service.generate_smart(
             user_text=request.text,
-            include_all_templates=request.includeAllTemplates
+            include_all_templates=request.includeAllTemplates,
+            mode=request.mode
         )
         
         return APIResponse(
@@ -66,6 +78,77 @@ async def smart_generate(request: SmartGenerateRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _stream_response(stream: GenerationStream, last_event_id: int = 0) -> StreamingResponse:
+    """将事件流转换为SSE响应（空闲时发送心跳注释）"""
+    heartbeat = get_settings().SMART_STREAM_HEARTBEAT or None
+    
+    async def event_stream():
+        async for event in stream.subscribe(last_event_id, heartbeat=heartbeat):
+            if event is None:
+                yield ": ping\n\n"
+            else:
+                yield format_sse(event["event"], event["data"], event_id=str(event["id"]))
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={**SSE_HEADERS, "X-Stream-Id": stream.stream_id}
+    )
+
+
+@router.post("/smart/stream", summary="智能生成信息图（SSE阶段事件）")
+async def smart_generate_stream(request: SmartGenerateRequest):
+    """
+    智能生成流程，每个阶段完成时通过Server-Sent Events推送事件
+    
+    事件（每个事件带递增id，数据中time为该阶段耗时）：
+    - **start**: 事件流已创建（streamId，用于断线重连）
+    - **classification**: 类型识别结果（type, confidence, reason, time）
+    - **selection**: 模板选择结果（templateId, templateName, confidence, reason, time）
+    - **extraction**: 数据提取结果（config, generation_method, time）
+    - **done**: 完整结果（与 /smart 接口的data相同）
+    - **error**: 生成失败（message）
+    
+    生成在后台执行，客户端断开不会中断生成；可通过 GET /smart/stream/{streamId} 重连
+    """
+    generate_service = get_generate_service()
+    
+    async def run(emit):
+        result = await generate_service.generate_smart(
+            user_text=request.text,
+            include_all_templates=request.includeAllTemplates,
+            on_event=emit,
+            mode=request.mode
+        )
+        await emit("done", result)
+    
+    stream = get_generation_stream_registry().start(run)
+    return _stream_response(stream)
+
+
+@router.get("/smart/stream/{stream_id}", summary="重连智能生成事件流")
+async def smart_generate_stream_resume(
+    stream_id: str,
+    last_event_id: Optional[int] = Header(default=None, alias="Last-Event-ID"),
+    lastEventId: Optional[int] = None
+):
+    """
+    重连智能生成事件流，重放Last-Event-ID之后的事件并继续接收新事件
+    
+    - **stream_id**: start事件中返回的streamId
+    - **Last-Event-ID**: 请求头，已收到的最后一个事件id（EventSource重连时自动携带）
+    - **lastEventId**: 同上，以查询参数传递（请求头优先）
+    
+    事件流在生成结束后保留一段时间（SMART_STREAM_RETENTION），过期后返回404
+    """
+    stream = get_generation_stream_registry().get(stream_id)
+    if stream is None:
+        raise HTTPException(status_code=404, detail=f"事件流不存在或已过期: {stream_id}")
+    
+    resume_from = last_event_id if last_event_id is not None else (lastEventId or 0)
+    return _stream_response(stream, resume_from)
+
+
 @router.post("/extract", summary="提取结构化数据（传统模式）")
 async def extract_data(request: DataExtractRequest):
     """
@@ -95,6 +178,35 @@ async def extract_data(request: DataExtractRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/extract/stream", summary="流式提取结构化数据（SSE）")
+async def extract_data_stream(request: DataExtractRequest):
+    """
+    使用系统LLM流式提取结构化数据，以Server-Sent Events推送
+    
+    - **text**: 用户输入的文本内容
+    - **templateId**: 使用的模板ID
+    
+    事件：
+    - **item**: data.items 中的一个元素已生成（index, item），可立即渲染
+    - **done**: 提取完成（config, generation_method, extractionTime, timeToFirstItem）
+    - **error**: 提取失败（message）
+    """
+    generate_service = get_generate_service()
+    
+    async def event_stream():
+        async for event in generate_service.extract_data_stream(
+            user_text=request.text,
+            template_id=request.templateId
+        ):
+            yield format_sse(event["event"], event["data"])
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
 @router.get("/debug/workflow-mapper", summary="查看WorkflowMapper调试信息")
 async def debug_workflow_mapper():
     """调试端点：查看WorkflowMapper的状态"""
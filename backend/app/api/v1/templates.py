@@ -1,8 +1,10 @@
 """
 模板相关API端点
+模板列表、分类、详情的响应按模板目录版本缓存为序列化后的字节，并支持ETag条件请求（304）
 """
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.common import APIResponse
 from app.schemas.template import (
     TemplateRecommendRequest,
@@ -10,37 +12,58 @@ from app.schemas.template import (
 )
 from app.services.template_service import get_template_service
 from app.services.generate_service import get_generate_service
+from app.utils.db import get_async_session
+from app.utils.response_cache import cached_json_response
 
 router = APIRouter()
 
 
 @router.get("", summary="获取模板列表")
 async def get_templates(
+    request: Request,
     category: Optional[str] = Query(None, description="按分类筛选"),
     keyword: Optional[str] = Query(None, description="搜索关键词"),
     page: int = Query(1, description="页码", ge=1),
-    pageSize: int = Query(20, description="每页数量", ge=1, le=100)
+    pageSize: int = Query(20, description="每页数量", ge=1, le=100),
+    fields: Optional[str] = Query(None, description="返回的模板字段（逗号分隔）"),
+    view: Optional[str] = Query(None, description="视图：summary（摘要）或 full（默认）"),
+    db: AsyncSession = Depends(get_async_session)
 ):
     """
     获取可用的信息图模板列表(分页)
     
     - **category**: 模板分类（可选）
-    - **keyword**: 搜索关键词（可选）
+    - **keyword**: 搜索关键词（可选，匹配名称、描述、适用场景、关键词、标签；3个字符及以上时按相关度排序，
+      模板附带 relevance 和高亮摘要 snippet）
     - **page**: 页码（默认1）
     - **pageSize**: 每页数量（默认20）
+    - **fields**: 返回的模板字段，逗号分隔（可选，如 id,name,tags；优先于view）
+    - **view**: summary 只返回 id、name、category、description、useCases、tags、previewUrl，
+      不含体积较大的 dataSchema 和 designConfig（可选）
     """
     template_service = get_template_service()
-    result = template_service.get_all_templates(
-        category=category,
-        keyword=keyword,
-        page=page,
-        page_size=pageSize
-    )
-    return APIResponse(success=True, data=result, message="获取模板列表成功")
+    try:
+        projection = template_service.resolve_fields(fields, view)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def build():
+        result = await template_service.get_all_templates_async(
+            db,
+            category=category,
+            keyword=keyword,
+            page=page,
+            page_size=pageSize,
+            fields=projection
+        )
+        return APIResponse(success=True, data=result, message="获取模板列表成功").model_dump()
+    
+    key = ("templates", category, keyword, page, pageSize, projection)
+    return await cached_json_response(request, template_service.catalog_tag(), key, build)
 
 
 @router.get("/categories", summary="获取模板分类列表")
-async def get_categories():
+async def get_categories(request: Request):
     """
     获取所有模板分类及每个分类的模板数量统计
     
@@ -54,12 +77,16 @@ async def get_categories():
     - 顺序型: 时间线流程
     """
     template_service = get_template_service()
-    categories = template_service.get_categories()
-    return APIResponse(success=True, data=categories, message="获取分类列表成功")
+    
+    def build():
+        categories = template_service.get_categories()
+        return APIResponse(success=True, data=categories, message="获取分类列表成功").model_dump()
+    
+    return await cached_json_response(request, template_service.catalog_tag(), ("categories",), build)
 
 
 @router.get("/{template_id}", summary="获取模板详情")
-async def get_template_detail(template_id: str):
+async def get_template_detail(template_id: str, request: Request):
     """
     获取指定模板的详细信息
     
@@ -71,7 +98,10 @@ async def get_template_detail(template_id: str):
     if not template:
         raise HTTPException(status_code=404, detail=f"模板不存在: {template_id}")
     
-    return APIResponse(success=True, data=template, message="获取模板详情成功")
+    def build():
+        return APIResponse(success=True, data=template, message="获取模板详情成功").model_dump()
+    
+    return await cached_json_response(request, template_service.catalog_tag(), ("template", template_id), build)
 
 
 @router.post("/recommend", summary="AI推荐模板")
@@ -1,128 +1,263 @@
 """
 作品管理API端点
+数据库会话通过 Depends(get_async_session) 注入，查询使用异步驱动，不阻塞事件循环
+
+保存和获取作品时Infographic配置不经过Pydantic和字典转换：请求体由orjson解析，只校验配置以外的字段，
+配置序列化为JSON字节后直接存储；获取时只解压，JSON字节原样嵌入orjson序列化的响应
 """
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+import orjson
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.common import APIResponse
-from app.schemas.work import WorkCreateRequest, WorkResponse
-from app.utils.db import get_db_session
-from app.repositories.work_repo import WorkRepository
+from app.schemas.work import WorkCreateRequest, WorkEnvelope, WorkResponse
+from app.utils.db import get_async_session
+from app.repositories.work_repo import AsyncWorkRepository, decode_cursor, encode_cursor
 from app.models.work import UserWork
+from app.services.work_write_queue import get_work_write_queue
+from app.config import get_settings
 
 router = APIRouter()
 
 
-@router.post("", summary="保存作品")
-async def create_work(request: WorkCreateRequest):
+def _json_response(data: Any, message: str) -> Response:
+    """统一响应格式，由orjson直接序列化（data中可以包含 orjson.Fragment）"""
+    return Response(
+        content=orjson.dumps({"success": True, "data": data, "message": message}),
+        media_type="application/json"
+    )
+
+
+async def _read_work_request(request: Request) -> Tuple[WorkEnvelope, bytes]:
+    """
+    解析保存作品的请求体：只用Pydantic校验配置以外的字段，Infographic配置只检查是否为对象
+    
+    Returns:
+        (请求字段, 配置JSON字节)
+    
+    Raises:
+        RequestValidationError: 请求体无效（与Pydantic校验失败相同的422响应）
+    """
+    body = await request.body()
+    try:
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        raise RequestValidationError([{
+            "type": "json_invalid", "loc": ("body", e.pos), "msg": "JSON decode error",
+            "input": {}, "ctx": {"error": e.msg}
+        }])
+    if not isinstance(payload, dict):
+        raise RequestValidationError([{
+            "type": "model_attributes_type", "loc": ("body",),
+            "msg": "Input should be a valid dictionary or object to extract fields from", "input": payload
+        }])
+    
+    config = payload.pop("infographicConfig", None)
+    errors = []
+    if not isinstance(config, dict):
+        errors.append({"type": "missing", "loc": ("body", "infographicConfig"), "msg": "Field required", "input": payload}
+                      if config is None else
+                      {"type": "dict_type", "loc": ("body", "infographicConfig"),
+                       "msg": "Input should be a valid dictionary", "input": config})
+    try:
+        envelope = WorkEnvelope.model_validate(payload)
+    except ValidationError as e:
+        errors.extend({**error, "loc": ("body", *error["loc"])} for error in e.errors())
+    if errors:
+        raise RequestValidationError(errors)
+    return envelope, orjson.dumps(config)
+
+
+def _merge_pending(
+    works: List[UserWork],
+    next_cursor: Optional[str],
+    pending: List[UserWork],
+    cursor: Optional[str],
+    page_size: int
+) -> Tuple[List[UserWork], Optional[str]]:
+    """
+    把写入队列中尚未写入的作品合并到一页作品列表中
+    
+    Args:
+        works: 数据库中的一页作品
+        next_cursor: 数据库查询返回的下一页游标
+        pending: 队列中的作品（已按用户筛选）
+        cursor: 本页的游标
+        page_size: 每页数量
+    
+    Returns:
+        (作品列表, 下一页游标)
+    """
+    if cursor:
+        created_at, work_id = decode_cursor(cursor)
+        # 队列中的作品都有创建时间，游标已进入创建时间为空的部分时不再合并
+        pending = [] if created_at is None else [
+            work for work in pending if (work.created_at, work.id) < (created_at, work_id)
+        ]
+    if not pending:
+        return works, next_cursor
+    
+    merged = sorted(
+        works + pending,
+        key=lambda work: (work.created_at is not None, work.created_at or datetime.min, work.id),
+        reverse=True
+    )
+    if len(merged) <= page_size and next_cursor is None:
+        return merged, None
+    merged = merged[:page_size]
+    return merged, encode_cursor(merged[-1])
+
+
+@router.post(
+    "",
+    summary="保存作品",
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": WorkCreateRequest.model_json_schema()}}
+    }}
+)
+async def create_work(request: Request, db: AsyncSession = Depends(get_async_session)):
     """
     保存用户创建的信息图作品
     
     - **title**: 作品标题(可选)
     - **templateId**: 使用的模板ID
     - **inputText**: 用户输入的原始文本
-    - **infographicConfig**: 完整的Infographic配置
+    - **infographicConfig**: 完整的Infographic配置（只检查是否为JSON对象，原样存储）
     """
-    db = get_db_session()
+    envelope, config = await _read_work_request(request)
     try:
-        repo = WorkRepository(db)
+        repo = AsyncWorkRepository(db)
         
-        # 创建作品对象
+        # 创建作品对象（配置以JSON字节写入，不再序列化）
         work = UserWork(
-            title=request.title,
-            template_id=request.templateId,
-            input_text=request.inputText,
-            infographic_config=request.infographicConfig,
-            user_id=request.userId  # 可选,后期扩展
+            title=envelope.title,
+            template_id=envelope.templateId,
+            input_text=envelope.inputText,
+            infographic_config=orjson.Fragment(config),
+            user_id=envelope.userId  # 可选,后期扩展
         )
         
-        # 保存到数据库
-        created_work = repo.create(work)
+        if get_settings().WORK_WRITE_BEHIND_ENABLED:
+            # 写入队列：立即分配ID返回，稍后批量写入
+            created_work = await get_work_write_queue().enqueue(work, config)
+        else:
+            # 保存到数据库（ID和时间在写入时已确定，无需重新读取）
+            created_work = await repo.create(work, refresh=False)
         
-        return APIResponse(
-            success=True,
-            data=created_work.to_dict(),
-            message="作品保存成功"
-        )
+        return _json_response(created_work.to_dict(raw_config=config), "作品保存成功")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"保存作品失败: {str(e)}")
-    finally:
-        db.close()
 
 
 @router.get("", summary="获取作品列表")
 async def get_works(
     userId: Optional[str] = Query(None, description="用户ID筛选"),
     page: int = Query(1, description="页码", ge=1),
-    pageSize: int = Query(20, description="每页数量", ge=1, le=100)
+    pageSize: int = Query(20, description="每页数量", ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的nextCursor）"),
+    includeTotal: bool = Query(True, description="是否返回总数"),
+    db: AsyncSession = Depends(get_async_session)
 ):
     """
-    获取作品列表(分页)
+    获取作品列表(分页，按创建时间倒序)
+    
+    列表只返回摘要（标题、模板ID、文本摘录excerpt、缩略图、时间），
+    原始文本全文和Infographic配置通过 GET /works/{work_id} 获取
     
     - **userId**: 用户ID(可选,用于筛选特定用户的作品)
-    - **page**: 页码(默认1)
+    - **page**: 页码(默认1，传cursor时忽略)
     - **pageSize**: 每页数量(默认20)
+    - **cursor**: 游标分页：传入上一页返回的 nextCursor 获取下一页，翻页深度不影响查询速度；
+      没有下一页时 nextCursor 为 null
+    - **includeTotal**: 是否返回总数(默认true，false时 total 为 null)
+    
+    启用写入队列（WORK_WRITE_BEHIND_ENABLED）时，已保存但尚未写入数据库的作品同样出现在列表和总数中
     """
-    db = get_db_session()
     try:
-        repo = WorkRepository(db)
-        works, total = repo.get_all(user_id=userId, page=page, page_size=pageSize)
+        repo = AsyncWorkRepository(db)
+        queue = get_work_write_queue() if get_settings().WORK_WRITE_BEHIND_ENABLED else None
+        if cursor or page == 1:
+            # 暂停队列写入，数据库和队列中的作品不会重复或遗漏
+            async with queue.paused() if queue is not None else nullcontext():
+                works, next_cursor = await repo.get_page(user_id=userId, cursor=cursor, page_size=pageSize)
+                total = await repo.count(userId) if includeTotal else None
+                pending = queue.list_pending(userId) if queue is not None else []
+            if pending:
+                works, next_cursor = _merge_pending(works, next_cursor, pending, cursor, pageSize)
+                total = total + len(pending) if total is not None else None
+        else:
+            if queue is not None and queue.pending_count:
+                # 按页码跳页无法合并队列中的作品，先写入队列
+                await queue.flush()
+            # 按页码跳页（OFFSET），不返回游标
+            works, total = await repo.get_all(user_id=userId, page=page, page_size=pageSize)
+            next_cursor = None
+            total = total if includeTotal else None
         
         return APIResponse(
             success=True,
             data={
-                "works": [w.to_dict() for w in works],
+                "works": [w.to_summary_dict() for w in works],
                 "total": total,
                 "page": page,
-                "pageSize": pageSize
+                "pageSize": pageSize,
+                "nextCursor": next_cursor
             },
             message="获取作品列表成功"
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取作品列表失败: {str(e)}")
-    finally:
-        db.close()
 
 
 @router.get("/{work_id}", summary="获取作品详情")
-async def get_work_detail(work_id: int):
+async def get_work_detail(work_id: int, db: AsyncSession = Depends(get_async_session)):
     """
-    获取指定作品的详细信息
+    获取指定作品的详细信息（Infographic配置原样返回）
     
     - **work_id**: 作品ID
     """
-    db = get_db_session()
     try:
-        repo = WorkRepository(db)
-        work = repo.get_by_id(work_id)
+        repo = AsyncWorkRepository(db)
+        # 写入队列中尚未写入的作品
+        result = get_work_write_queue().get_pending(work_id) if get_settings().WORK_WRITE_BEHIND_ENABLED else None
+        if result is None:
+            result = await repo.get_with_raw_config(work_id)
         
-        if not work:
+        if not result:
             raise HTTPException(status_code=404, detail=f"作品不存在: {work_id}")
         
-        return APIResponse(
-            success=True,
-            data=work.to_dict(),
-            message="获取作品详情成功"
-        )
+        # 配置的JSON字节原样返回，不解析为字典
+        work, config = result
+        return _json_response(work.to_dict(raw_config=config), "获取作品详情成功")
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取作品详情失败: {str(e)}")
-    finally:
-        db.close()
 
 
 @router.delete("/{work_id}", summary="删除作品")
-async def delete_work(work_id: int):
+async def delete_work(work_id: int, db: AsyncSession = Depends(get_async_session)):
     """
     删除指定的作品
     
     - **work_id**: 作品ID
     """
-    db = get_db_session()
     try:
-        repo = WorkRepository(db)
-        success = repo.delete(work_id)
+        queue = get_work_write_queue() if get_settings().WORK_WRITE_BEHIND_ENABLED else None
+        if queue is not None and queue.get_pending(work_id) is not None:
+            # 作品还在写入队列中，先写入再删除
+            await queue.flush()
+        
+        repo = AsyncWorkRepository(db)
+        success = await repo.delete(work_id)
         
         if not success:
             raise HTTPException(status_code=404, detail=f"作品不存在: {work_id}")
@@ -135,7 +270,5 @@ async def delete_work(work_id: int):
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"删除作品失败: {str(e)}")
-    finally:
-        db.close()
@@ -1,9 +1,24 @@
 """
 配置管理模块
+配置以不可变快照的形式加载一次，当 .env、llm_prompts.yaml、dify_workflows.yaml
+发生变化时（mtime检测或管理端点触发）整体原子替换
 """
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import yaml
 from pydantic_settings import BaseSettings
-from functools import lru_cache
-from typing import List
+
+logger = logging.getLogger(__name__)
+
+# 配置文件路径
+ENV_FILE = ".env"
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), "config")
+PROMPTS_FILE = os.path.join(CONFIG_DIR, "llm_prompts.yaml")
+WORKFLOWS_FILE = os.path.join(CONFIG_DIR, "dify_workflows.yaml")
 
 
 class Settings(BaseSettings):
@@ -16,6 +31,16 @@ class Settings(BaseSettings):
     AIHUBMIX_MODEL_EXTRACT: str = "gpt-4o-mini"
     AIHUBMIX_TIMEOUT: int = 30
     AIHUBMIX_MAX_RETRIES: int = 3
+    AIHUBMIX_MAX_CONNECTIONS: int = 20
+    AIHUBMIX_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    AIHUBMIX_KEEPALIVE_EXPIRY: float = 60.0
+    
+    # LLM响应缓存配置
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "./llm_cache.db"
+    LLM_CACHE_TTL: int = 86400
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+    LLM_CACHE_MEMORY_ENTRIES: int = 256
     
     # 应用配置
     APP_NAME: str = "AI信息图生成系统"
@@ -33,9 +58,64 @@ class Settings(BaseSettings):
     DIFY_API_KEY: str = ""
     DIFY_API_TIMEOUT: int = 30
     DIFY_RESPONSE_MODE: str = "blocking"
+    DIFY_MAX_CONNECTIONS: int = 20
+    
+    # 智能生成事件流：结束后保留时间（秒，供断线重连重放）、心跳间隔（秒）
+    SMART_STREAM_RETENTION: float = 120.0
+    SMART_STREAM_HEARTBEAT: float = 15.0
+    
+    # 本地内容类型分类器（scripts/train_local_classifier.py训练生成），置信度达到阈值时跳过LLM类型识别
+    LOCAL_CLASSIFIER_ENABLED: bool = True
+    LOCAL_CLASSIFIER_PATH: str = "./local_classifier.json"
+    LOCAL_CLASSIFIER_THRESHOLD: float = 0.85
+    
+    # 模板选择策略：分类只有一个模板、或本地排序第一名领先第二名达到阈值时跳过LLM模板选择
+    SELECTION_POLICY_ENABLED: bool = True
+    SELECTION_SKIP_MARGIN: float = 0.15
+    SELECTION_DECISION_HISTORY: int = 200
+    
+    # 数据库：同步连接URL（脚本和后台加载使用），异步连接URL为空时由同步URL推导（aiosqlite/asyncpg）
+    DATABASE_URL: str = "sqlite:///./infographic.db"
+    ASYNC_DATABASE_URL: str = ""
+    
+    # SQLite生产模式（仅文件数据库）：WAL日志、读连接池、单连接串行写入
+    # cache_size为负数时单位为KiB，mmap_size单位为字节，busy_timeout单位为毫秒
+    SQLITE_TUNED: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE: int = -65536
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_BUSY_TIMEOUT: int = 5000
+    SQLITE_READ_POOL_SIZE: int = 8
+    
+    # 模板目录：检查目录版本号的最小间隔（秒），0表示每次都检查
+    CATALOG_VERSION_CHECK_INTERVAL: float = 2.0
+    
+    # 模板语义相似度：n-gram IDF文件（scripts/build_semantic_idf.py生成，不存在时按模板目录统计）、用户文本向量缓存条目数
+    SEMANTIC_IDF_PATH: str = "./semantic_idf.json"
+    SEMANTIC_VECTOR_CACHE_SIZE: int = 512
+    
+    # 作品内容压缩存储：是否压缩新写入的内容、zlib压缩级别、不压缩的最大字节数
+    # （预置字典由 scripts/compress_user_works.py 训练，保存在数据库的 work_zdicts 表）
+    WORK_COMPRESSION_ENABLED: bool = True
+    WORK_COMPRESSION_LEVEL: int = 6
+    WORK_COMPRESSION_MIN_BYTES: int = 64
+    
+    # 作品写入队列（write-behind）：保存作品时立即返回，按间隔（毫秒）或批量大小批量写入，ID按段预分配
+    # 进程异常退出时会丢失最近一个间隔内保存的作品，默认关闭
+    WORK_WRITE_BEHIND_ENABLED: bool = False
+    WORK_WRITE_BEHIND_INTERVAL_MS: int = 50
+    WORK_WRITE_BEHIND_BATCH_SIZE: int = 200
+    WORK_ID_BLOCK_SIZE: int = 100
+    
+    # 推测执行模式下是否连同数据提取一起推测（命中率低时会浪费一次提取调用）
+    SMART_SPECULATIVE_EXTRACTION: bool = False
+    
+    # 配置热更新：检查配置文件mtime的最小间隔（秒），0表示每次都检查
+    CONFIG_WATCH_INTERVAL: float = 2.0
     
     class Config:
-        env_file = ".env"
+        env_file = ENV_FILE
         env_file_encoding = "utf-8"
         case_sensitive = True
     
@@ -45,6 +125,113 @@ class Settings(BaseSettings):
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
 
 
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """配置快照（不可变），包含应用配置、提示词配置和Dify工作流映射"""
+    version: int
+    settings: Settings
+    prompts: Dict[str, Any] = field(default_factory=dict)
+    workflows: Dict[str, Any] = field(default_factory=dict)
+    mtimes: Tuple[Optional[float], ...] = ()
+
+
+_snapshot: Optional[ConfigSnapshot] = None
+_snapshot_lock = threading.Lock()
+_last_check: float = 0.0
+
+
+def _watched_files() -> Tuple[str, ...]:
+    """需要监听变化的配置文件"""
+    return (ENV_FILE, PROMPTS_FILE, WORKFLOWS_FILE)
+
+
+def _file_mtimes() -> Tuple[Optional[float], ...]:
+    """获取配置文件的修改时间，文件不存在时为None"""
+    mtimes = []
+    for path in _watched_files():
+        try:
+            mtimes.append(os.stat(path).st_mtime)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def _load_yaml(path: str, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    加载YAML配置文件
+    
+    解析失败时保留上一个快照中的内容，避免编辑过程中的半成品文件导致配置丢失
+    """
+    if not os.path.exists(path):
+        logger.warning(f"[Config] 配置文件不存在: {path}")
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f) or {}
+    except Exception as e:
+        logger.error(f"[Config] 加载配置文件失败: {path}, {e}")
+        return previous if previous is not None else {}
+
+
+def _load_settings(previous: Optional[Settings]) -> Settings:
+    """
+    加载应用配置
+    
+    校验失败时（例如 .env 中的值类型错误）保留上一个快照中的配置；首次加载失败时直接抛出
+    """
+    try:
+        return Settings(_env_file=ENV_FILE)
+    except Exception as e:
+        if previous is None:
+            raise
+        logger.error(f"[Config] 加载应用配置失败，保留当前配置: {ENV_FILE}, {e}")
+        return previous
+
+
+def _build_snapshot(previous: Optional[ConfigSnapshot]) -> ConfigSnapshot:
+    """读取所有配置文件构建新快照"""
+    mtimes = _file_mtimes()
+    return ConfigSnapshot(
+        version=previous.version + 1 if previous else 1,
+        settings=_load_settings(previous.settings if previous else None),
+        prompts=_load_yaml(PROMPTS_FILE, previous.prompts if previous else None),
+        workflows=_load_yaml(WORKFLOWS_FILE, previous.workflows if previous else None),
+        mtimes=mtimes
+    )
+
+
+def reload_config_snapshot() -> ConfigSnapshot:
+    """强制重新加载配置并原子替换当前快照"""
+    global _snapshot, _last_check
+    with _snapshot_lock:
+        _snapshot = _build_snapshot(_snapshot)
+        _last_check = time.monotonic()
+        logger.info(f"[Config] 配置快照已加载 - version: {_snapshot.version}")
+        return _snapshot
+
+
+def get_config_snapshot() -> ConfigSnapshot:
+    """
+    获取当前配置快照
+    
+    按CONFIG_WATCH_INTERVAL节流检查配置文件mtime，发生变化时重新加载
+    """
+    global _last_check
+    snapshot = _snapshot
+    if snapshot is None:
+        return reload_config_snapshot()
+    
+    now = time.monotonic()
+    if now - _last_check < snapshot.settings.CONFIG_WATCH_INTERVAL:
+        return snapshot
+    
+    _last_check = now
+    if _file_mtimes() != snapshot.mtimes:
+        logger.info("[Config] 检测到配置文件变化，重新加载")
+        return reload_config_snapshot()
+    return snapshot
+
+
 def get_settings() -> Settings:
-    """获取配置单例 - 每次重新加载以支持热更新"""
-    return Settings()
+    """获取当前配置 - 来自配置快照，配置文件变化时自动热更新"""
+    return get_config_snapshot().settings
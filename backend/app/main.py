@@ -2,11 +2,19 @@
 FastAPI应用主入口
 """
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.config import get_settings
-from app.api.v1 import templates, generate, works, export
+from app.api.v1 import templates, generate, works, export, admin
+from app.utils.http_client import close_async_http_clients
+from app.utils.db import dispose_async_engine, get_db
+from app.repositories.work_repo import ensure_binary_columns, ensure_excerpt_column
+from app.services.generation_stream import get_generation_stream_registry
+from app.services.template_catalog import ensure_catalog_version, start_catalog_refresh, stop_catalog_refresh
+from app.services.work_write_queue import shutdown_work_write_queue
+from app.utils.compression import get_zdict_store
 
 # 配置日志
 logging.basicConfig(
@@ -18,11 +26,31 @@ logger = logging.getLogger(__name__)
 # 获取配置
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动时补建新增的数据库列（PostgreSQL上转换压缩存储列的类型），预先加载压缩字典（请求中不再同步读取），
+    创建模板目录版本表并启动后台版本检查；关闭时停止版本检查，取消进行中的生成任务、写入队列中的作品，并释放共享连接池和数据库连接池"""
+    with get_db() as db:
+        ensure_excerpt_column(db)
+        ensure_binary_columns(db)
+        ensure_catalog_version(db)
+    get_zdict_store().current()
+    await start_catalog_refresh()
+    yield
+    await stop_catalog_refresh()
+    await get_generation_stream_registry().shutdown()
+    await shutdown_work_write_queue()
+    await close_async_http_clients()
+    await dispose_async_engine()
+
+
 # 创建FastAPI应用
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="基于AntV Infographic的AI信息图生成系统后端API"
+    description="基于AntV Infographic的AI信息图生成系统后端API",
+    lifespan=lifespan
 )
 
 # 配置CORS
@@ -79,6 +107,12 @@ app.include_router(
     tags=["导出"]
 )
 
+app.include_router(
+    admin.router,
+    prefix="/api/v1/admin",
+    tags=["系统管理"]
+)
+
 
 # 根路径
 @app.get("/")
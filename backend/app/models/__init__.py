@@ -3,5 +3,7 @@
 """
 from .template import Template
 from .work import UserWork
+from .catalog_version import CatalogVersion
+from .work_zdict import WorkZdict
 
-__all__ = ["Template", "UserWork"]
+__all__ = ["Template", "UserWork", "CatalogVersion", "WorkZdict"]
@@ -0,0 +1,16 @@
+"""
+模板目录版本数据库模型
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, DateTime
+from app.models.base import Base
+
+
+class CatalogVersion(Base):
+    """模板目录版本表（单行，模板数据变更时版本号递增，用于失效进程内的模板目录）"""
+    __tablename__ = "catalog_version"
+    
+    # 字段定义
+    id = Column(Integer, primary_key=True, default=1, comment="固定为1")
+    version = Column(Integer, nullable=False, default=0, comment="目录版本号")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
@@ -0,0 +1,57 @@
+"""
+自定义列类型
+CompressedText、CompressedJSON 以压缩字节存储文本和JSON（格式见 app/utils/compression.py），
+读写对模型透明（写入 orjson.Fragment 时直接存储其中的JSON字节，预置字典按引擎的方言查找存储）；压缩前以TEXT/JSON存储的历史数据可以直接读取，执行 scripts/compress_user_works.py 后改为压缩存储。
+"""
+import orjson
+from sqlalchemy.types import LargeBinary, TypeDecorator
+from app.utils.compression import compress, decompress, get_zdict_store
+
+
+class _PassthroughBinary(LargeBinary):
+    """不转换查询结果的二进制类型（SQLite中的历史数据为str，交给解压函数处理）"""
+    
+    def result_processor(self, dialect, coltype):
+        return None
+
+
+class CompressedText(TypeDecorator):
+    """压缩存储的文本（zlib）"""
+    impl = _PassthroughBinary
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress(value.encode("utf-8"))
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decompress(value).decode("utf-8")
+
+
+class CompressedJSON(TypeDecorator):
+    """压缩存储的JSON（orjson序列化，zlib + 预置字典）"""
+    impl = _PassthroughBinary
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress(orjson.dumps(value), use_dict=True, store=get_zdict_store(dialect))
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return orjson.loads(decompress(value, store=get_zdict_store(dialect)))
+
+
+class CompressedJSONBytes(CompressedJSON):
+    """读取为解压后的JSON字节（不解析），用于原样返回 CompressedJSON 列的内容"""
+    cache_ok = True
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decompress(value, store=get_zdict_store(dialect))
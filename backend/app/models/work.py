@@ -2,8 +2,15 @@
 用户作品数据库模型
 """
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Integer, DateTime, JSON, ForeignKey, Index
+from typing import Optional
+import orjson
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.orm import validates
 from app.models.base import Base
+from app.models.types import CompressedJSON, CompressedText
+
+# 摘要视图中原始文本的摘录长度（字符）
+EXCERPT_LENGTH = 100
 
 
 class UserWork(Base):
@@ -15,21 +22,57 @@ class UserWork(Base):
     user_id = Column(String(100), index=True, nullable=True, comment="用户标识")
     title = Column(String(200), nullable=True, comment="作品标题")
     template_id = Column(String(100), ForeignKey('templates.id'), nullable=False, comment="使用的模板ID")
-    input_text = Column(Text, nullable=False, comment="用户输入的原始文本")
-    infographic_config = Column(JSON, nullable=False, comment="完整的Infographic配置")
+    input_text = Column(CompressedText, nullable=False, comment="用户输入的原始文本（压缩存储）")
+    infographic_config = Column(CompressedJSON, nullable=False, comment="完整的Infographic配置（压缩存储）")
     thumbnail_url = Column(String(500), nullable=True, comment="缩略图URL")
     created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
+    # 原始文本已压缩存储，数据库无法截取，摘录在写入时保存（多存一个字符用于判断是否截断）
+    input_excerpt = Column(String(EXCERPT_LENGTH + 1), nullable=True, comment="原始文本摘录")
+    
+    # 复合索引：作品列表按 (created_at, id) 降序游标分页
+    __table_args__ = (
+        Index('idx_user_works_user_created', 'user_id', 'created_at', 'id'),
+        Index('idx_user_works_created', 'created_at', 'id'),
+    )
     
-    def to_dict(self):
-        """转换为字典"""
+    def to_dict(self, raw_config: Optional[bytes] = None):
+        """
+        转换为字典
+        
+        Args:
+            raw_config: Infographic配置的JSON字节（传入时以 orjson.Fragment 原样嵌入，不访问 infographic_config 属性，
+                        只能由orjson序列化）
+        """
         return {
             "id": self.id,
             "userId": self.user_id,
             "title": self.title,
             "templateId": self.template_id,
             "inputText": self.input_text,
-            "infographicConfig": self.infographic_config,
+            "infographicConfig": orjson.Fragment(raw_config) if raw_config is not None else self.infographic_config,
+            "thumbnailUrl": self.thumbnail_url,
+            "createdAt": self.created_at.isoformat() if self.created_at else None,
+            "updatedAt": self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    @validates("input_text")
+    def _sync_excerpt(self, key, value):
+        """设置原始文本时同步更新摘录"""
+        self.input_excerpt = value[:EXCERPT_LENGTH + 1] if value is not None else None
+        return value
+    
+    def to_summary_dict(self):
+        """转换为摘要字典（作品列表使用，不含原始文本全文和Infographic配置）"""
+        excerpt = self.input_excerpt or ""
+        if len(excerpt) > EXCERPT_LENGTH:
+            excerpt = excerpt[:EXCERPT_LENGTH] + "..."
+        return {
+            "id": self.id,
+            "userId": self.user_id,
+            "title": self.title,
+            "templateId": self.template_id,
+            "excerpt": excerpt,
             "thumbnailUrl": self.thumbnail_url,
             "createdAt": self.created_at.isoformat() if self.created_at else None,
             "updatedAt": self.updated_at.isoformat() if self.updated_at else None
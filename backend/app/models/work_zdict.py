@@ -0,0 +1,17 @@
+"""
+作品配置压缩字典数据库模型
+"""
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, Boolean, DateTime, LargeBinary
+from app.models.base import Base
+
+
+class WorkZdict(Base):
+    """作品配置压缩字典表（已压缩的配置依赖对应的字典解压，只增不删）"""
+    __tablename__ = "work_zdicts"
+    
+    # 字段定义
+    id = Column(BigInteger, primary_key=True, autoincrement=False, comment="字典ID（内容的CRC32）")
+    content = Column(LargeBinary, nullable=False, comment="字典内容")
+    is_current = Column(Boolean, nullable=False, default=False, comment="是否为新写入使用的字典")
+    created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
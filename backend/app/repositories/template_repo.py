@@ -3,12 +3,146 @@
 """
 import logging
 from typing import List, Optional, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy import or_, func, select, text
 from app.models.template import Template
 
 logger = logging.getLogger(__name__)
 
+# 7大模板分类
+TEMPLATE_CATEGORIES = {
+    "chart": {"name": "图表型", "description": "数值展示,柱状图等可视化图表"},
+    "comparison": {"name": "对比型", "description": "优劣对比、SWOT分析"},
+    "hierarchy": {"name": "层级型", "description": "组织结构、分类信息"},
+    "list": {"name": "列表型", "description": "步骤说明、清单、简单信息罗列"},
+    "quadrant": {"name": "四象限型", "description": "市场定位、风险评估"},
+    "relation": {"name": "关系型", "description": "关系网络、关联分析"},
+    "sequence": {"name": "顺序型", "description": "时间线、流程图、递进关系"}
+}
+
+# 全文检索：SQLite FTS5虚拟表（trigram分词，按子串匹配，关键词至少3个字符）
+SEARCH_MIN_KEYWORD_LENGTH = 3
+# 索引字段及BM25权重（名称命中最重要）
+SEARCH_COLUMN_WEIGHTS = {
+    "name": 10.0,
+    "description": 4.0,
+    "use_cases": 2.0,
+    "keywords": 6.0,
+    "tags": 6.0
+}
+# 标签在templates表中为JSON数组（中文被转义），写入索引前展开为空格分隔的文本
+_TAGS_TEXT = "CASE WHEN json_valid({row}.tags) THEN (SELECT group_concat(value, ' ') FROM json_each({row}.tags)) ELSE {row}.tags END"
+_SEARCH_COLUMNS = ", ".join(SEARCH_COLUMN_WEIGHTS)
+
+
+def _search_values(row: str) -> str:
+    """索引字段取值表达式"""
+    return f"{row}.rowid, {row}.name, {row}.description, {row}.use_cases, {row}.keywords, {_TAGS_TEXT.format(row=row)}"
+
+
+_SEARCH_TRIGGERS = {
+    "trg_templates_fts_insert": f"AFTER INSERT ON templates BEGIN "
+                                f"INSERT INTO templates_fts (rowid, {_SEARCH_COLUMNS}) SELECT {_search_values('new')}; END",
+    "trg_templates_fts_update": f"AFTER UPDATE ON templates BEGIN "
+                                f"DELETE FROM templates_fts WHERE rowid = old.rowid; "
+                                f"INSERT INTO templates_fts (rowid, {_SEARCH_COLUMNS}) SELECT {_search_values('new')}; END",
+    "trg_templates_fts_delete": "AFTER DELETE ON templates BEGIN "
+                                "DELETE FROM templates_fts WHERE rowid = old.rowid; END",
+}
+
+# 全文检索是否可用（None表示尚未检查）
+_search_index_ready: Optional[bool] = None
+
+
+def ensure_search_index(db: Session) -> bool:
+    """
+    确保全文检索表及同步触发器存在（仅SQLite，首次创建时为已有模板建立索引）
+    
+    templates表的插入、更新、删除由触发器同步到索引，导入和修复模板的脚本无需额外处理
+    
+    Returns:
+        bool: 全文检索是否可用
+    """
+    global _search_index_ready
+    if _search_index_ready is not None:
+        return _search_index_ready
+    
+    if db.get_bind().dialect.name != "sqlite":
+        _search_index_ready = False
+        return False
+    
+    try:
+        exists = db.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'templates_fts'")).first()
+        if exists is None:
+            db.execute(text(f"CREATE VIRTUAL TABLE templates_fts USING fts5({_SEARCH_COLUMNS}, tokenize = 'trigram')"))
+        for name, body in _SEARCH_TRIGGERS.items():
+            db.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {body}"))
+        if exists is None:
+            rebuild_search_index(db)
+        db.commit()
+        _search_index_ready = True
+        logger.info("[TemplateRepository] 全文检索索引已就绪")
+    except Exception as e:
+        # SQLite未编译FTS5/trigram分词器，或templates表尚未创建
+        db.rollback()
+        _search_index_ready = False
+        logger.warning(f"[TemplateRepository] 全文检索不可用，使用子串匹配: {e}")
+    return _search_index_ready
+
+
+def rebuild_search_index(db: Session):
+    """按templates表重建全文检索索引（调用方负责提交）"""
+    db.execute(text("DELETE FROM templates_fts"))
+    db.execute(text(f"INSERT INTO templates_fts (rowid, {_SEARCH_COLUMNS}) SELECT {_search_values('templates')} FROM templates"))
+
+
+def build_match_query(keyword: str) -> Optional[str]:
+    """
+    将搜索关键词转换为FTS5查询（按空白拆分，各片段作为短语同时匹配）
+    
+    Returns:
+        Optional[str]: 任一片段少于 SEARCH_MIN_KEYWORD_LENGTH 个字符时返回None（trigram分词无法匹配）
+    """
+    terms = keyword.split()
+    if not terms or any(len(term) < SEARCH_MIN_KEYWORD_LENGTH for term in terms):
+        return None
+    return " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _search_statements(
+    match: str,
+    category: Optional[str],
+    offset: int,
+    limit: int
+) -> tuple[str, str, Dict[str, Any]]:
+    """全文检索的查询语句、超出最后一页时的计数语句及参数（同步和异步Repository共用）"""
+    weights = ", ".join(str(w) for w in SEARCH_COLUMN_WEIGHTS.values())
+    filters = "templates_fts MATCH :match AND t.is_active = 1" + (" AND t.category = :category" if category else "")
+    # FTS5辅助函数不能与窗口函数出现在同一层查询中，相关度和摘要在子查询中计算
+    sql = (
+        f"SELECT id, rank, snippet, COUNT(*) OVER () AS total FROM ("
+        f"SELECT t.id AS id, t.sort_order AS sort_order, t.created_at AS created_at, "
+        f"bm25(templates_fts, {weights}) AS rank, "
+        f"snippet(templates_fts, -1, '<mark>', '</mark>', '…', 16) AS snippet "
+        f"FROM templates_fts JOIN templates t ON t.rowid = templates_fts.rowid "
+        f"WHERE {filters}"
+        f") ORDER BY rank, sort_order DESC, created_at DESC LIMIT :limit OFFSET :offset"
+    )
+    count_sql = f"SELECT COUNT(*) FROM templates_fts JOIN templates t ON t.rowid = templates_fts.rowid WHERE {filters}"
+    params = {"match": match, "limit": limit, "offset": offset}
+    if category:
+        params["category"] = category
+    return sql, count_sql, params
+
+
+def _search_hits(rows) -> List[Dict[str, Any]]:
+    """检索结果行转换为 {id, relevance, snippet}"""
+    return [
+        {"id": row.id, "relevance": round(-row.rank, 4), "snippet": row.snippet}
+        for row in rows
+    ]
+
 
 class TemplateRepository:
     """模板数据访问类"""
@@ -53,24 +187,58 @@ class TemplateRepository:
             query = query.filter(Template.category == category)
         
         if keyword:
-            # 搜索名称、描述、适用场景
+            # 搜索名称、描述、适用场景、关键词
             search_filter = or_(
                 Template.name.contains(keyword),
                 Template.description.contains(keyword),
-                Template.use_cases.contains(keyword)
+                Template.use_cases.contains(keyword),
+                Template.keywords.contains(keyword)
             )
             query = query.filter(search_filter)
         
-        # 总数
-        total = query.count()
-        
-        # 排序和分页
-        templates = query.order_by(
+        # 排序和分页，总数由窗口函数随结果一并返回
+        rows = query.add_columns(func.count().over().label("total")).order_by(
             Template.sort_order.desc(),
             Template.created_at.desc()
         ).offset((page - 1) * page_size).limit(page_size).all()
         
-        return templates, total
+        if rows:
+            return [row[0] for row in rows], rows[0].total
+        # 超出最后一页时没有结果行，单独统计总数
+        return [], query.count() if page > 1 else 0
+    
+    def search(
+        self,
+        keyword: str,
+        category: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Optional[tuple[List[Dict[str, Any]], int]]:
+        """
+        全文检索模板（BM25相关度排序，附带高亮摘要）
+        
+        匹配结果与总数由一条查询返回
+        
+        Args:
+            keyword: 搜索关键词
+            category: 分类筛选
+            offset: 跳过的结果数
+            limit: 返回的结果数
+        
+        Returns:
+            Optional[tuple]: ([{id, relevance, snippet}], 总数)；全文检索不可用或关键词过短时返回None
+        """
+        match = build_match_query(keyword)
+        if match is None or not ensure_search_index(self.db):
+            return None
+        
+        sql, count_sql, params = _search_statements(match, category, offset, limit)
+        rows = self.db.execute(text(sql), params).all()
+        total = rows[0].total if rows else 0
+        if not rows and offset > 0:
+            # 超出最后一页时没有结果行，单独统计总数
+            total = self.db.execute(text(count_sql), params).scalar()
+        return _search_hits(rows), total
     
     def get_by_id(self, template_id: str) -> Optional[Template]:
         """
@@ -109,17 +277,6 @@ class TemplateRepository:
         Returns:
             分类列表,包含名称和数量
         """
-        # 定义7大分类
-        categories = {
-            "chart": {"name": "图表型", "description": "数值展示,柱状图等可视化图表"},
-            "comparison": {"name": "对比型", "description": "优劣对比、SWOT分析"},
-            "hierarchy": {"name": "层级型", "description": "组织结构、分类信息"},
-            "list": {"name": "列表型", "description": "步骤说明、清单、简单信息罗列"},
-            "quadrant": {"name": "四象限型", "description": "市场定位、风险评估"},
-            "relation": {"name": "关系型", "description": "关系网络、关联分析"},
-            "sequence": {"name": "顺序型", "description": "时间线、流程图、递进关系"}
-        }
-        
         # 统计每个分类的模板数量
         result = self.db.query(
             Template.category,
@@ -132,7 +289,7 @@ class TemplateRepository:
         category_list = []
         count_map = {item.category: item.count for item in result}
         
-        for code, info in categories.items():
+        for code, info in TEMPLATE_CATEGORIES.items():
             category_list.append({
                 "code": code,
                 "name": info["name"],
@@ -141,3 +298,75 @@ class TemplateRepository:
             })
         
         return category_list
+
+
+class AsyncTemplateRepository:
+    """模板数据访问类（异步会话，供API请求处理使用）"""
+    
+    def __init__(self, db: AsyncSession):
+        """
+        初始化Repository
+        
+        Args:
+            db: 异步数据库会话
+        """
+        self.db = db
+    
+    async def search(
+        self,
+        keyword: str,
+        category: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Optional[tuple[List[Dict[str, Any]], int]]:
+        """
+        全文检索模板（与 TemplateRepository.search 相同）
+        
+        Returns:
+            Optional[tuple]: ([{id, relevance, snippet}], 总数)；全文检索不可用或关键词过短时返回None
+        """
+        match = build_match_query(keyword)
+        if match is None:
+            return None
+        if _search_index_ready is None:
+            await self.db.run_sync(ensure_search_index)
+        if not _search_index_ready:
+            return None
+        
+        sql, count_sql, params = _search_statements(match, category, offset, limit)
+        rows = (await self.db.execute(text(sql), params)).all()
+        total = rows[0].total if rows else 0
+        if not rows and offset > 0:
+            total = await self.db.scalar(text(count_sql), params)
+        return _search_hits(rows), total
+    
+    async def get_by_id(self, template_id: str) -> Optional[Template]:
+        """
+        根据ID获取模板
+        
+        Args:
+            template_id: 模板ID
+        
+        Returns:
+            模板对象或None
+        """
+        return await self.db.scalar(select(Template).where(
+            Template.id == template_id,
+            Template.is_active == True
+        ))
+    
+    async def get_by_category(self, category: str) -> List[Template]:
+        """
+        根据分类获取模板
+        
+        Args:
+            category: 分类
+        
+        Returns:
+            模板列表
+        """
+        templates = await self.db.scalars(select(Template).where(
+            Template.category == category,
+            Template.is_active == True
+        ).order_by(Template.sort_order.desc()))
+        return list(templates)
@@ -1,13 +1,278 @@
 """
 作品Repository
+
+作品列表支持游标分页：按 (created_at, id) 降序排列，下一页从上一页最后一条之后开始，
+由 (user_id, created_at, id) 复合索引直接定位，不随页码增大而变慢。
+总数由 user_work_counts 表提供，SQLite下由 user_works 表上的触发器增量维护，无需每页COUNT扫描。
+列表查询只加载摘要列（标题、模板、文本摘录、缩略图、时间），原始文本全文和Infographic配置只在按ID获取时加载。
 """
+import base64
 import logging
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from app.models.work import UserWork
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import LargeBinary, func, inspect, select, text, tuple_, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer, load_only
+from app.config import get_settings
+from app.models.types import CompressedJSONBytes
+from app.models.work import EXCERPT_LENGTH, UserWork
 
 logger = logging.getLogger(__name__)
 
+# 作品计数表：user_key为 "*"（全部作品）或 "u:" + user_id
+_COUNT_ALL = "*"
+_COUNT_TABLE = "CREATE TABLE IF NOT EXISTS user_work_counts (user_key VARCHAR(110) PRIMARY KEY, count INTEGER NOT NULL DEFAULT 0)"
+
+
+def _count_increment(user_id: str) -> str:
+    """计数加一（不存在时插入）"""
+    return (f"INSERT INTO user_work_counts (user_key, count) SELECT 'u:' || {user_id}, 1 WHERE {user_id} IS NOT NULL "
+            f"ON CONFLICT(user_key) DO UPDATE SET count = count + 1;")
+
+
+def _count_decrement(user_id: str) -> str:
+    """计数减一"""
+    return f"UPDATE user_work_counts SET count = count - 1 WHERE user_key = 'u:' || {user_id};"
+
+
+_COUNT_TRIGGERS = {
+    "trg_user_works_count_insert": "AFTER INSERT ON user_works BEGIN "
+                                   "INSERT INTO user_work_counts (user_key, count) VALUES ('*', 1) "
+                                   "ON CONFLICT(user_key) DO UPDATE SET count = count + 1; "
+                                   f"{_count_increment('new.user_id')} END",
+    "trg_user_works_count_delete": "AFTER DELETE ON user_works BEGIN "
+                                   "UPDATE user_work_counts SET count = count - 1 WHERE user_key = '*'; "
+                                   f"{_count_decrement('old.user_id')} END",
+    "trg_user_works_count_update": "AFTER UPDATE OF user_id ON user_works WHEN old.user_id IS NOT new.user_id BEGIN "
+                                   f"{_count_decrement('old.user_id')} {_count_increment('new.user_id')} END",
+}
+
+# 作品计数是否可用（None表示尚未检查）
+_work_counts_ready: Optional[bool] = None
+
+
+def ensure_work_counts(db: Session) -> bool:
+    """
+    确保作品计数表及维护触发器存在（仅SQLite，首次创建时按现有作品统计）
+    
+    Returns:
+        bool: 计数表是否可用（不可用时总数使用COUNT查询）
+    """
+    global _work_counts_ready
+    if _work_counts_ready is not None:
+        return _work_counts_ready
+    
+    if db.get_bind().dialect.name != "sqlite":
+        _work_counts_ready = False
+        return False
+    
+    try:
+        exists = db.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_work_counts'")).first()
+        db.execute(text(_COUNT_TABLE))
+        for name, body in _COUNT_TRIGGERS.items():
+            db.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {body}"))
+        if exists is None:
+            rebuild_work_counts(db)
+        db.commit()
+        _work_counts_ready = True
+        logger.info("[WorkRepository] 作品计数表已就绪")
+    except Exception as e:
+        # user_works表尚未创建，或SQLite版本不支持UPSERT
+        db.rollback()
+        _work_counts_ready = False
+        logger.warning(f"[WorkRepository] 作品计数表不可用，总数使用COUNT查询: {e}")
+    return _work_counts_ready
+
+
+def rebuild_work_counts(db: Session):
+    """按user_works表重新统计作品数（调用方负责提交）"""
+    db.execute(text("DELETE FROM user_work_counts"))
+    db.execute(text("INSERT INTO user_work_counts (user_key, count) SELECT '*', COUNT(*) FROM user_works"))
+    db.execute(text(
+        "INSERT INTO user_work_counts (user_key, count) "
+        "SELECT 'u:' || user_id, COUNT(*) FROM user_works WHERE user_id IS NOT NULL GROUP BY user_id"
+    ))
+
+
+def ensure_excerpt_column(db: Session):
+    """
+    已有的 user_works 表补建原始文本摘录列，并由未压缩的原始文本回填
+    
+    摘录列随压缩存储加入：原始文本压缩后数据库无法截取，摘录在写入时保存
+    """
+    inspector = inspect(db.get_bind())
+    if not inspector.has_table("user_works"):
+        # 新数据库，由init_db建表
+        return
+    columns = {column["name"] for column in inspector.get_columns("user_works")}
+    if "input_excerpt" in columns:
+        return
+    db.execute(text(f"ALTER TABLE user_works ADD COLUMN input_excerpt VARCHAR({EXCERPT_LENGTH + 1})"))
+    db.execute(text(f"UPDATE user_works SET input_excerpt = substr(input_text, 1, {EXCERPT_LENGTH + 1})"))
+    db.commit()
+    logger.info("[WorkRepository] 已补建原始文本摘录列")
+
+
+def ensure_binary_columns(db: Session):
+    """
+    PostgreSQL上把压缩存储前的 input_text（TEXT）、infographic_config（JSON）列转换为BYTEA
+    
+    已有内容加上未压缩格式标记（0x00）原样保留，之后由 scripts/compress_user_works.py 压缩。
+    SQLite列类型不限制存储的值，无需转换
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    inspector = inspect(bind)
+    if not inspector.has_table("user_works"):
+        return
+    columns = {column["name"]: column["type"] for column in inspector.get_columns("user_works")}
+    for name in ("input_text", "infographic_config"):
+        if isinstance(columns.get(name), LargeBinary):
+            continue
+        db.execute(text(
+            f"ALTER TABLE user_works ALTER COLUMN {name} TYPE BYTEA "
+            f"USING '\\x00'::bytea || convert_to({name}::text, 'UTF8')"
+        ))
+        logger.info(f"[WorkRepository] 已将 {name} 列转换为BYTEA")
+    db.commit()
+
+
+# 作品ID序列表（写入队列预分配ID），next_id为下一个可分配的ID
+_ID_SEQUENCE_TABLE = "CREATE TABLE IF NOT EXISTS work_id_sequence (name VARCHAR(50) PRIMARY KEY, next_id INTEGER NOT NULL)"
+
+
+def allocate_work_ids(db: Session, count: int) -> int:
+    """
+    预分配一段连续的作品ID并提交（作品写入队列使用）
+    
+    多个进程各自分配互不重叠的ID段；分配时跳过表中已有的最大ID（启用写入队列之前写入的作品）。
+    启用写入队列时直接写入的作品也从这里分配ID（见 _uses_id_sequence），不会占用已分配给队列的ID
+    
+    Args:
+        count: 分配的ID数量
+    
+    Returns:
+        int: 第一个ID，本次分配的ID为 [返回值, 返回值 + count)
+    """
+    db.execute(text(_ID_SEQUENCE_TABLE))
+    db.execute(text(
+        "INSERT INTO work_id_sequence (name, next_id) SELECT 'user_works', 1 "
+        "WHERE NOT EXISTS (SELECT 1 FROM work_id_sequence WHERE name = 'user_works')"
+    ))
+    db.execute(text(
+        "UPDATE work_id_sequence SET next_id = CASE "
+        "WHEN next_id > (SELECT COALESCE(MAX(id), 0) FROM user_works) THEN next_id "
+        "ELSE (SELECT COALESCE(MAX(id), 0) FROM user_works) + 1 END + :count "
+        "WHERE name = 'user_works'"
+    ), {"count": count})
+    next_id = db.execute(text("SELECT next_id FROM work_id_sequence WHERE name = 'user_works'")).scalar()
+    db.commit()
+    return next_id - count
+
+
+def _uses_id_sequence(work: UserWork) -> bool:
+    """
+    直接写入的作品是否从ID序列分配ID
+    
+    启用写入队列时，数据库自增ID可能落在队列已预分配但尚未写入的ID段内，
+    因此直接写入的作品也从 work_id_sequence 分配ID
+    """
+    return work.id is None and get_settings().WORK_WRITE_BEHIND_ENABLED
+
+
+def encode_cursor(work: UserWork) -> str:
+    """由一页最后一条作品生成下一页的游标"""
+    created_at = work.created_at.isoformat() if work.created_at else ""
+    return base64.urlsafe_b64encode(f"{created_at}|{work.id}".encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """
+    解析游标
+    
+    Returns:
+        Tuple: (created_at, id)，created_at为None表示上一页停在创建时间为空的作品
+    
+    Raises:
+        ValueError: 游标无效
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, work_id = raw.rsplit("|", 1)
+        return (datetime.fromisoformat(created_at) if created_at else None), int(work_id)
+    except Exception:
+        raise ValueError(f"无效的分页游标: {cursor}")
+
+
+# 作品列表（摘要视图）加载的列；其余列在列表对象上访问时直接报错，避免逐条懒加载
+_SUMMARY_COLUMNS = (
+    UserWork.id, UserWork.user_id, UserWork.title, UserWork.template_id, UserWork.input_excerpt,
+    UserWork.thumbnail_url, UserWork.created_at, UserWork.updated_at,
+)
+
+
+def _summary_select() -> Any:
+    """只加载摘要列的作品查询"""
+    return select(UserWork).options(load_only(*_SUMMARY_COLUMNS, raiseload=True))
+
+
+def _raw_config_select(work_id: int) -> Any:
+    """按ID查询作品及其Infographic配置的JSON字节（配置只解压不解析，作品对象上不加载配置）"""
+    return (
+        select(UserWork, type_coerce(UserWork.infographic_config, CompressedJSONBytes))
+        .options(defer(UserWork.infographic_config, raiseload=True))
+        .where(UserWork.id == work_id)
+    )
+
+
+def _filtered(query: Any, user_id: Optional[str]) -> Any:
+    """按用户筛选"""
+    return query.where(UserWork.user_id == user_id) if user_id else query
+
+
+def _keyset_query(user_id: Optional[str], cursor: Optional[str], limit: int) -> Tuple[Any, bool]:
+    """
+    游标分页查询（多取一条用于判断是否还有下一页）
+    
+    游标条件为 (created_at, id) < (游标时间, 游标ID)，可直接按复合索引范围查找。
+    创建时间为空的作品（历史数据）排在最后，由 _null_tail_query 单独查询
+    
+    Returns:
+        Tuple: (查询, 是否已进入创建时间为空的部分)
+    """
+    query = _filtered(_summary_select(), user_id)
+    if cursor:
+        created_at, work_id = decode_cursor(cursor)
+        if created_at is None:
+            return _null_tail_query(user_id, limit, before_id=work_id), True
+        query = query.where(tuple_(UserWork.created_at, UserWork.id) < tuple_(created_at, work_id))
+    else:
+        query = query.where(UserWork.created_at.is_not(None))
+    return query.order_by(UserWork.created_at.desc(), UserWork.id.desc()).limit(limit + 1), False
+
+
+def _null_tail_query(user_id: Optional[str], limit: int, before_id: Optional[int] = None) -> Any:
+    """创建时间为空的作品（按ID降序，多取一条）"""
+    query = _filtered(_summary_select(), user_id).where(UserWork.created_at.is_(None))
+    if before_id is not None:
+        query = query.where(UserWork.id < before_id)
+    return query.order_by(UserWork.id.desc()).limit(limit + 1)
+
+
+def _page_result(works: List[UserWork], limit: int) -> Tuple[List[UserWork], Optional[str]]:
+    """截取一页并生成下一页游标（没有下一页时为None）"""
+    if len(works) <= limit:
+        return works, None
+    works = works[:limit]
+    return works, encode_cursor(works[-1])
+
+
+def _count_query(user_id: Optional[str]) -> Any:
+    """从计数表读取作品数"""
+    key = f"u:{user_id}" if user_id else _COUNT_ALL
+    return text("SELECT count FROM user_work_counts WHERE user_key = :key").bindparams(key=key)
+
 
 class WorkRepository:
     """作品数据访问类"""
@@ -31,6 +296,8 @@ class WorkRepository:
         Returns:
             创建的作品
         """
+        if _uses_id_sequence(work):
+            work.id = allocate_work_ids(self.db, 1)
         self.db.add(work)
         self.db.commit()
         self.db.refresh(work)
@@ -48,6 +315,16 @@ class WorkRepository:
         """
         return self.db.query(UserWork).filter(UserWork.id == work_id).first()
     
+    def get_with_raw_config(self, work_id: int) -> Optional[Tuple[UserWork, bytes]]:
+        """
+        根据ID获取作品，Infographic配置以JSON字节返回（不解析为字典）
+        
+        Returns:
+            (作品对象, 配置JSON字节)，作品不存在时为None；作品对象上不能访问 infographic_config
+        """
+        row = self.db.execute(_raw_config_select(work_id)).first()
+        return tuple(row) if row is not None else None
+    
     def get_all(
         self,
         user_id: Optional[str] = None,
@@ -55,7 +332,7 @@ class WorkRepository:
         page_size: int = 20
     ) -> tuple[List[UserWork], int]:
         """
-        获取作品列表(分页)
+        获取作品列表(分页，只加载摘要列)
         
         Args:
             user_id: 用户ID筛选(可选)
@@ -65,21 +342,60 @@ class WorkRepository:
         Returns:
             (作品列表, 总数)
         """
-        query = self.db.query(UserWork)
+        query = self.db.query(UserWork).options(load_only(*_SUMMARY_COLUMNS, raiseload=True))
         
         if user_id:
             query = query.filter(UserWork.user_id == user_id)
         
         # 总数
-        total = query.count()
+        total = self.count(user_id)
         
         # 排序和分页
         works = query.order_by(
-            UserWork.created_at.desc()
+            UserWork.created_at.desc(),
+            UserWork.id.desc()
         ).offset((page - 1) * page_size).limit(page_size).all()
         
         return works, total
     
+    def get_page(
+        self,
+        user_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        page_size: int = 20
+    ) -> Tuple[List[UserWork], Optional[str]]:
+        """
+        游标分页获取作品列表（只加载摘要列）
+        
+        Args:
+            user_id: 用户ID筛选(可选)
+            cursor: 上一页返回的游标（None表示第一页）
+            page_size: 每页数量
+        
+        Returns:
+            (作品列表, 下一页游标)，没有下一页时游标为None
+        
+        Raises:
+            ValueError: 游标无效
+        """
+        query, in_tail = _keyset_query(user_id, cursor, page_size)
+        works = list(self.db.scalars(query))
+        if not in_tail and len(works) <= page_size:
+            # 创建时间非空的作品已取完，接着取创建时间为空的作品
+            works += self.db.scalars(_null_tail_query(user_id, page_size - len(works))).all()
+        return _page_result(works, page_size)
+    
+    def count(self, user_id: Optional[str] = None) -> int:
+        """
+        作品数（SQLite下读取增量维护的计数表，否则使用COUNT查询）
+        
+        Args:
+            user_id: 用户ID筛选(可选)
+        """
+        if ensure_work_counts(self.db):
+            return self.db.execute(_count_query(user_id)).scalar() or 0
+        return self.db.scalar(_filtered(select(func.count()).select_from(UserWork), user_id))
+    
     def delete(self, work_id: int) -> bool:
         """
         删除作品
@@ -90,10 +406,137 @@ class WorkRepository:
         Returns:
             是否删除成功
         """
-        work = self.get_by_id(work_id)
+        # 删除只需主键，不加载原始文本和配置
+        work = self.db.get(UserWork, work_id, options=[load_only(UserWork.id)])
         if not work:
             return False
         
         self.db.delete(work)
         self.db.commit()
         return True
+
+
+class AsyncWorkRepository:
+    """作品数据访问类（异步会话，供API请求处理使用）"""
+    
+    def __init__(self, db: AsyncSession):
+        """
+        初始化Repository
+        
+        Args:
+            db: 异步数据库会话
+        """
+        self.db = db
+    
+    async def create(self, work: UserWork, refresh: bool = True) -> UserWork:
+        """
+        创建作品
+        
+        Args:
+            work: 作品对象
+            refresh: 提交后是否重新读取作品（ID和时间在写入时已确定，会话 expire_on_commit=False 时可以跳过）
+        
+        Returns:
+            创建的作品
+        """
+        if _uses_id_sequence(work):
+            work.id = await self.db.run_sync(allocate_work_ids, 1)
+        self.db.add(work)
+        await self.db.commit()
+        if refresh:
+            await self.db.refresh(work)
+        return work
+    
+    async def get_by_id(self, work_id: int) -> Optional[UserWork]:
+        """
+        根据ID获取作品
+        
+        Args:
+            work_id: 作品ID
+        
+        Returns:
+            作品对象或None
+        """
+        return await self.db.get(UserWork, work_id)
+    
+    async def get_with_raw_config(self, work_id: int) -> Optional[Tuple[UserWork, bytes]]:
+        """
+        根据ID获取作品，Infographic配置以JSON字节返回（与 WorkRepository.get_with_raw_config 相同）
+        """
+        row = (await self.db.execute(_raw_config_select(work_id))).first()
+        return tuple(row) if row is not None else None
+    
+    async def get_all(
+        self,
+        user_id: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 20
+    ) -> tuple[List[UserWork], int]:
+        """
+        获取作品列表(分页，只加载摘要列)
+        
+        Args:
+            user_id: 用户ID筛选(可选)
+            page: 页码(从1开始)
+            page_size: 每页数量
+        
+        Returns:
+            (作品列表, 总数)
+        """
+        total = await self.count(user_id)
+        works = await self.db.scalars(
+            _filtered(_summary_select(), user_id)
+            .order_by(UserWork.created_at.desc(), UserWork.id.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+        return list(works), total
+    
+    async def get_page(
+        self,
+        user_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        page_size: int = 20
+    ) -> Tuple[List[UserWork], Optional[str]]:
+        """
+        游标分页获取作品列表（与 WorkRepository.get_page 相同）
+        
+        Returns:
+            (作品列表, 下一页游标)，没有下一页时游标为None
+        
+        Raises:
+            ValueError: 游标无效
+        """
+        query, in_tail = _keyset_query(user_id, cursor, page_size)
+        works = list(await self.db.scalars(query))
+        if not in_tail and len(works) <= page_size:
+            # 创建时间非空的作品已取完，接着取创建时间为空的作品
+            works += (await self.db.scalars(_null_tail_query(user_id, page_size - len(works)))).all()
+        return _page_result(works, page_size)
+    
+    async def count(self, user_id: Optional[str] = None) -> int:
+        """作品数（SQLite下读取增量维护的计数表，否则使用COUNT查询）"""
+        if _work_counts_ready is None:
+            await self.db.run_sync(ensure_work_counts)
+        if _work_counts_ready:
+            return await self.db.scalar(_count_query(user_id)) or 0
+        return await self.db.scalar(_filtered(select(func.count()).select_from(UserWork), user_id))
+    
+    async def delete(self, work_id: int) -> bool:
+        """
+        删除作品
+        
+        Args:
+            work_id: 作品ID
+        
+        Returns:
+            是否删除成功
+        """
+        # 删除只需主键，不加载原始文本和配置
+        work = await self.db.get(UserWork, work_id, options=[load_only(UserWork.id)])
+        if not work:
+            return False
+        
+        await self.db.delete(work)
+        await self.db.commit()
+        return True
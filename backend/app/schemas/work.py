@@ -5,15 +5,19 @@ from pydantic import BaseModel, Field
 from typing import Any, Dict, Optional
 
 
-class WorkCreateRequest(BaseModel):
-    """作品创建请求"""
+class WorkEnvelope(BaseModel):
+    """作品创建请求中Infographic配置以外的字段（保存作品时只校验这部分，配置原样存储）"""
     title: Optional[str] = Field(None, description="作品标题")
     templateId: str = Field(..., description="使用的模板ID")
     inputText: str = Field(..., description="用户输入的原始文本", min_length=1)
-    infographicConfig: Dict[str, Any] = Field(..., description="完整的Infographic配置")
     userId: Optional[str] = Field(None, description="用户ID(可选)")
 
 
+class WorkCreateRequest(WorkEnvelope):
+    """作品创建请求"""
+    infographicConfig: Dict[str, Any] = Field(..., description="完整的Infographic配置")
+
+
 class WorkResponse(BaseModel):
     """作品响应"""
     id: int
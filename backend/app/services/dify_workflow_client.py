@@ -2,32 +2,50 @@
 Dify工作流客户端
 封装Dify API调用逻辑，支持阻塞和流式两种模式
 """
+import copy
+import hashlib
 import logging
 import time
 import json
 from typing import Dict, Any, Optional
 import httpx
 from app.config import get_settings
+from app.utils.http_client import get_async_http_client
+from app.utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# 相同输入的并发工作流调用合并（进程级）
+_workflow_flight = SingleFlight("dify")
+
 
 class DifyWorkflowClient:
     """Dify工作流API客户端"""
     
     def __init__(self):
         """初始化客户端"""
-        settings = get_settings()
-        self.base_url = settings.DIFY_API_BASE_URL
-        self.api_key = settings.DIFY_API_KEY
-        self.timeout = settings.DIFY_API_TIMEOUT
-        self.response_mode = settings.DIFY_RESPONSE_MODE
-        
         logger.info(f"[DifyWorkflowClient.__init__] 初始化 - base_url: {self.base_url}, api_key: {self.api_key[:20] if self.api_key else 'None'}...")
         
         if not self.api_key:
             logger.warning("[DifyWorkflowClient] DIFY_API_KEY未配置")
     
+    # 以下配置项每次从当前配置快照读取，配置热更新后无需重建客户端
+    @property
+    def base_url(self) -> str:
+        return get_settings().DIFY_API_BASE_URL
+    
+    @property
+    def api_key(self) -> str:
+        return get_settings().DIFY_API_KEY
+    
+    @property
+    def timeout(self) -> int:
+        return get_settings().DIFY_API_TIMEOUT
+    
+    @property
+    def response_mode(self) -> str:
+        return get_settings().DIFY_RESPONSE_MODE
+    
     async def call_workflow(
         self,
         user_text: str,
@@ -75,16 +93,27 @@ class DifyWorkflowClient:
         }
         
         url = f"{self.base_url}/workflows/run"
-        
-        # 重试逻辑
-        last_error = None
-        for attempt in range(1, max_retries + 1):
-            try:
-                logger.info(f"[DifyWorkflowClient] 调用工作流 (尝试 {attempt}/{max_retries}) - "
-                          f"模板: {template_id}, 文本长度: {len(user_text)}")
-                
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    response = await client.post(url, json=payload, headers=headers)
+        response_mode = payload["response_mode"]
+        timeout = self.timeout
+        client = get_async_http_client(
+            "dify",
+            max_connections=get_settings().DIFY_MAX_CONNECTIONS
+        )
+        
+        # 相同请求的并发调用合并为一次上游调用
+        flight_key = hashlib.sha256(
+            json.dumps({"url": url, "payload": payload}, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+        
+        async def call_upstream() -> Dict[str, Any]:
+            # 重试逻辑
+            last_error = None
+            for attempt in range(1, max_retries + 1):
+                try:
+                    logger.info(f"[DifyWorkflowClient] 调用工作流 (尝试 {attempt}/{max_retries}) - "
+                              f"模板: {template_id}, 文本长度: {len(user_text)}")
+                    
+                    response = await client.post(url, json=payload, headers=headers, timeout=timeout)
                     
                     logger.info(f"[DifyWorkflowClient] HTTP状态码: {response.status_code}")
                     logger.info(f"[DifyWorkflowClient] 响应内容: {response.text[:500]}")
@@ -97,7 +126,7 @@ class DifyWorkflowClient:
                     result = response.json()
                     
                     # 解析响应
-                    if self.response_mode == 'blocking':
+                    if response_mode == 'blocking':
                         parsed_result = self._parse_blocking_response(result)
                     else:
                         # 流式模式暂不实现，后续扩展
@@ -111,25 +140,29 @@ class DifyWorkflowClient:
                               f"耗时: {response_time}s")
                     
                     return parsed_result
-                    
-            except httpx.TimeoutException as e:
-                last_error = f"请求超时: {str(e)}"
-                logger.warning(f"[DifyWorkflowClient] {last_error} (尝试 {attempt}/{max_retries})")
-            except httpx.RequestError as e:
-                last_error = f"网络请求失败: {str(e)}"
-                logger.warning(f"[DifyWorkflowClient] {last_error} (尝试 {attempt}/{max_retries})")
-            except Exception as e:
-                last_error = str(e)
-                logger.warning(f"[DifyWorkflowClient] 调用失败: {last_error} (尝试 {attempt}/{max_retries})")
+                        
+                except httpx.TimeoutException as e:
+                    last_error = f"请求超时: {str(e)}"
+                    logger.warning(f"[DifyWorkflowClient] {last_error} (尝试 {attempt}/{max_retries})")
+                except httpx.RequestError as e:
+                    last_error = f"网络请求失败: {str(e)}"
+                    logger.warning(f"[DifyWorkflowClient] {last_error} (尝试 {attempt}/{max_retries})")
+                except Exception as e:
+                    last_error = str(e)
+                    logger.warning(f"[DifyWorkflowClient] 调用失败: {last_error} (尝试 {attempt}/{max_retries})")
+                
+                # 如果还有重试次数，等待后重试
+                if attempt < max_retries:
+                    await self._async_sleep(1)
             
-            # 如果还有重试次数，等待后重试
-            if attempt < max_retries:
-                await self._async_sleep(1)
-        
-        # 所有重试都失败
-        error_msg = f"Dify工作流调用失败（已重试{max_retries}次）: {last_error}"
-        logger.error(f"[DifyWorkflowClient] {error_msg}")
-        raise Exception(error_msg)
+            # 所有重试都失败
+            error_msg = f"Dify工作流调用失败（已重试{max_retries}次）: {last_error}"
+            logger.error(f"[DifyWorkflowClient] {error_msg}")
+            raise Exception(error_msg)
+        
+        result = await _workflow_flight.do(flight_key, call_upstream)
+        # 每个调用方拿到独立副本，避免后续数据转换相互影响
+        return copy.deepcopy(result)
     
     def _parse_blocking_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
         """
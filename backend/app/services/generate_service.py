@@ -3,10 +3,12 @@
 处理信息图生成相关逻辑（三阶段流程）
 支持Dify工作流和系统LLM两种数据生成方式
 """
+import asyncio
 import logging
 import time
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
+from app.config import get_settings
 from app.services.llm_client import get_llm_client
 from app.services.template_service import get_template_service
 from app.services.type_classification_service import get_type_classification_service
@@ -16,6 +18,12 @@ from app.services.workflow_mapper import get_workflow_mapper
 from app.services.data_validator import get_data_validator
 from app.services.config_assembler import get_config_assembler
 from app.services.similarity_service import get_similarity_service
+from app.services.selection_policy import get_selection_policy, SelectionDecision, SelectionPolicy
+from app.services.text_profile import TextProfile, get_text_profile
+from app.services.llm_cache import start_request_stats
+from app.services.generation_stream import EventEmitter
+from app.utils.incremental_json import IncrementalArrayParser
+from app.utils.metrics import get_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +43,6 @@ class GenerateService:
     
     def __init__(self):
         """初始化生成服务"""
-        self.llm_client = get_llm_client()
         self.template_service = get_template_service()
         self.type_classification_service = get_type_classification_service()
         self.template_selection_service = get_template_selection_service()
@@ -44,11 +51,19 @@ class GenerateService:
         self.data_validator = get_data_validator()
         self.config_assembler = get_config_assembler()
         self.similarity_service = get_similarity_service()
+        self.selection_policy = get_selection_policy()
+    
+    @property
+    def llm_client(self):
+        """当前配置快照对应的LLM客户端（配置热更新后自动切换）"""
+        return get_llm_client()
     
     async def generate_smart(
         self,
         user_text: str,
-        include_all_templates: bool = False
+        include_all_templates: bool = False,
+        on_event: Optional[EventEmitter] = None,
+        mode: str = "standard"
     ) -> Dict[str, Any]:
         """
         智能生成流程（三阶段）
@@ -59,34 +74,85 @@ class GenerateService:
         Args:
             user_text: 用户输入的文本
             include_all_templates: 是否返回所有模板列表（带相似度排序）
+            on_event: 阶段事件回调，每个阶段完成时调用
+                （classification、selection、extraction，事件数据中带该阶段耗时）
+            mode: 执行模式
+                - standard: 三阶段依次执行
+                - speculative: 按本地预测的类型，在类型识别进行的同时提前开始模板选择
+                  （可选地连同数据提取），LLM识别结果一致则采用，否则取消并按识别结果重新选择
+                - fast: 类型识别与模板选择合并为一次LLM调用，结果校验不通过时回退到两阶段流程
         
         Returns:
             Dict: 包含配置对象、分类信息、模板信息、时间统计和allTemplates（可选）
         """
         start_time = time.time()
+        cache_stats = start_request_stats()
+        speculation = None
         
         try:
-            logger.info(f"[SmartGenerate] 开始智能生成流程 - 文本长度: {len(user_text)}")
+            logger.info(f"[SmartGenerate] 开始智能生成流程 - 文本长度: {len(user_text)}, 模式: {mode}")
+            # 文本只分析一次，各阶段共享
+            profile = get_text_profile(user_text)
             
-            # 阶段1: 类型识别
+            if mode == "speculative":
+                speculation = self._start_speculation(user_text, profile)
+            
+            # 阶段1: 类型识别（fast模式下与模板选择合并为一次LLM调用）
             phase1_start = time.time()
-            classification_result = await self.type_classification_service.classify(user_text)
+            fused = await self._classify_and_select_fused(user_text, profile) if mode == "fast" else None
+            if fused:
+                classification_result = fused['classification']
+            else:
+                classification_result = await self.type_classification_service.classify(user_text, profile=profile)
             content_type = classification_result['type']
             phase1_time = round(time.time() - phase1_start, 2)
             logger.info(f"[SmartGenerate] 阶段1完成 - 类型: {content_type}, 耗时: {phase1_time}s")
+            if on_event:
+                await on_event("classification", {
+                    "type": content_type,
+                    "confidence": classification_result['confidence'],
+                    "reason": classification_result['reason'],
+                    "time": phase1_time
+                })
+            
+            # 推测执行：预测类型与识别结果一致则采用推测分支，否则取消
+            speculation_hit = speculation is not None and speculation.commit(content_type)
             
             # 阶段2: 模板选择
             phase2_start = time.time()
-            selection_result = await self.template_selection_service.select(user_text, content_type)
+            if fused:
+                selection_result = fused['selection']
+            elif speculation_hit:
+                selection_result = await speculation.selection
+                speculation.record_decisions(self.selection_policy)
+            else:
+                selection_result = await self._select_template(user_text, content_type, profile)
             template_id = selection_result['templateId']
             phase2_time = round(time.time() - phase2_start, 2)
             logger.info(f"[SmartGenerate] 阶段2完成 - 模板: {template_id}, 耗时: {phase2_time}s")
+            if on_event:
+                await on_event("selection", {
+                    "templateId": template_id,
+                    "templateName": selection_result['templateName'],
+                    "confidence": selection_result['confidence'],
+                    "reason": selection_result['reason'],
+                    "time": phase2_time
+                })
             
             # 阶段3: 数据提取（尝试使用Dify工作流，失败则回退到系统LLM）
             phase3_start = time.time()
-            extraction_result = await self.extract_data(user_text, template_id)
+            if speculation_hit and speculation.extraction is not None:
+                extraction_result = await speculation.extraction
+            else:
+                extraction_result = await self.extract_data(user_text, template_id)
             phase3_time = round(time.time() - phase3_start, 2)
             logger.info(f"[SmartGenerate] 阶段3完成 - 耗时: {phase3_time}s")
+            if on_event:
+                await on_event("extraction", {
+                    "config": extraction_result['config'],
+                    "generation_method": extraction_result.get('generation_method', 'system_llm'),
+                    "time": phase3_time
+                })
             
             total_time = round(time.time() - start_time, 2)
             
@@ -108,11 +174,17 @@ class GenerateService:
                     "phase1_classification": phase1_time,
                     "phase2_selection": phase2_time,
                     "phase3_extraction": phase3_time,
-                    "total": total_time
+                    "total": total_time,
+                    "llm_cache": cache_stats
                 },
                 "generation_method": extraction_result.get('generation_method', 'system_llm')
             }
             
+            if speculation is not None:
+                result['speculation'] = speculation.summary()
+            if mode == "fast":
+                result['fastPath'] = fused is not None
+            
             # 如果使用了Dify工作流，添加工作流信息
             if 'workflow_info' in extraction_result:
                 result['workflow_info'] = extraction_result['workflow_info']
@@ -128,16 +200,138 @@ class GenerateService:
                     user_text=user_text,
                     templates=all_templates,
                     content_type=content_type,
-                    selected_template_id=template_id
+                    selected_template_id=template_id,
+                    profile=profile
                 )
                 
                 result['allTemplates'] = templates_with_similarity
             
             return result
-            
+        
         except Exception as e:
             logger.error(f"[SmartGenerate] 智能生成失败: {e}")
             raise
+        finally:
+            if speculation is not None:
+                speculation.cancel()
+    
+    async def _select_template(
+        self,
+        user_text: str,
+        content_type: str,
+        profile: Optional[TextProfile] = None,
+        decisions: Optional[List[SelectionDecision]] = None
+    ) -> Dict[str, Any]:
+        """
+        模板选择：先由选择策略判断能否在本地确定模板，否则调用LLM选择
+        
+        Args:
+            user_text: 用户输入的文本
+            content_type: 内容类型
+            profile: 用户文本画像（可选）
+            decisions: 推测分支的待记录决策列表；传入时决策不立即记录，而是追加到该列表，
+                由推测分支被采用后再记录
+        
+        Returns:
+            Dict: 选择结果 {"templateId", "templateName", "confidence", "reason"}
+        """
+        record = decisions is None
+        templates = self.template_selection_service.get_candidate_templates(content_type)
+        decision = self.selection_policy.decide(user_text, content_type, templates, profile, record=record)
+        if not record:
+            decisions.append(decision)
+        
+        if decision.skip_llm:
+            template = next(t for t in templates if t['id'] == decision.top_template_id)
+            if decision.rule == SelectionPolicy.RULE_SINGLE_TEMPLATE:
+                reason = f"{content_type}类型只有一个可用模板"
+                confidence = 1.0
+            else:
+                reason = f"本地相似度排序第一（领先第二名{decision.margin:.2f}）"
+                confidence = decision.top_score
+            return {
+                "templateId": template['id'],
+                "templateName": template.get('name', ''),
+                "confidence": confidence,
+                "reason": reason,
+                "source": "selection_policy"
+            }
+        
+        selection_result = await self.template_selection_service.select(user_text, content_type, profile)
+        self.selection_policy.record_llm_choice(decision, selection_result['templateId'], record=record)
+        return selection_result
+    
+    async def _classify_and_select_fused(
+        self,
+        user_text: str,
+        profile: Optional[TextProfile] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        fast模式：一次LLM调用同时完成类型识别和模板选择
+        
+        Args:
+            user_text: 用户输入的文本
+            profile: 用户文本画像（可选）
+        
+        Returns:
+            Optional[Dict]: {"classification", "selection"}；可本地确定类型（如SWOT）
+                或合并结果校验不通过时返回None，由调用方走两阶段流程
+        """
+        metrics = get_metrics()
+        if self.type_classification_service.detect_local(user_text, profile):
+            metrics.increment("fast.skipped")
+            return None
+        
+        metrics.increment("fast.attempt")
+        try:
+            fused = await self.template_selection_service.classify_and_select(user_text, profile)
+        except Exception as e:
+            metrics.increment("fast.fallback")
+            logger.warning(f"[SmartGenerate] 合并调用失败，回退到两阶段流程: {e}")
+            return None
+        
+        metrics.increment("fast.success")
+        return fused
+    
+    def _start_speculation(
+        self,
+        user_text: str,
+        profile: Optional[TextProfile] = None
+    ) -> Optional["_Speculation"]:
+        """
+        按本地预测的类型启动推测分支（模板选择，及可选的数据提取）
+        
+        Args:
+            user_text: 用户输入的文本
+            profile: 用户文本画像（可选）
+        
+        Returns:
+            Optional[_Speculation]: 推测分支；本地无法预测类型时返回None
+        """
+        metrics = get_metrics()
+        prediction = self.type_classification_service.predict_local(user_text, profile)
+        if prediction is None:
+            metrics.increment("speculation.skipped")
+            logger.info(f"[SmartGenerate] 本地无法预测类型，不进行推测执行")
+            return None
+        
+        predicted_type = prediction["type"]
+        decisions: List[SelectionDecision] = []
+        selection = asyncio.ensure_future(
+            self._select_template(user_text, predicted_type, profile, decisions=decisions)
+        )
+        
+        extraction = None
+        if get_settings().SMART_SPECULATIVE_EXTRACTION:
+            async def extract_after_selection():
+                selection_result = await selection
+                return await self.extract_data(user_text, selection_result['templateId'])
+            extraction = asyncio.ensure_future(extract_after_selection())
+        
+        metrics.increment("speculation.started")
+        logger.info(f"[SmartGenerate] 推测执行 - 预测类型: {predicted_type}, "
+                    f"推测提取: {extraction is not None}")
+        return _Speculation(predicted_type, selection, extraction, decisions)
     
     async def recommend_templates(
         self,
@@ -255,7 +449,7 @@ class GenerateService:
                 extraction_time = round(time.time() - start_time, 2)
                 result['extractionTime'] = extraction_time
                 return result
-                
+            
             except Exception as e:
                 logger.error(f"[ExtractData] Dify工作流调用失败: {e}")
                 
@@ -410,6 +604,99 @@ class GenerateService:
                 'llm_response': extracted_data
             }, f, ensure_ascii=False, indent=2)
         
+        config = self._build_system_llm_config(extracted_data, template_id, template)
+        
+        return {
+            "config": config,
+            "generation_method": "system_llm"
+        }
+    
+    async def extract_data_stream(
+        self,
+        user_text: str,
+        template_id: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式提取结构化数据（系统LLM）
+        LLM输出的 data.items 每闭合一个元素就立即推送，最后推送完整配置
+        
+        Args:
+            user_text: 用户输入的文本
+            template_id: 模板ID
+        
+        Yields:
+            Dict: 事件 {"event": "item" | "done" | "error", "data": {...}}
+                - item: {"index": 元素下标, "item": 元素内容}
+                - done: {"config": 完整配置, "generation_method": "system_llm",
+                         "extractionTime": 提取耗时, "timeToFirstItem": 首个元素耗时}
+                - error: {"message": 错误信息}
+        """
+        start_time = time.time()
+        
+        template = self.template_service.get_template_by_id(template_id)
+        if not template:
+            yield {"event": "error", "data": {"message": f"模板ID不存在: {template_id}"}}
+            return
+        
+        parser = IncrementalArrayParser(("data", "items"))
+        chunks = []
+        item_count = 0
+        time_to_first_item = None
+        
+        try:
+            async for delta in self.llm_client.stream_structured_data(
+                user_text=user_text,
+                template_id=template_id,
+                template_schema=template.get("dataSchema", {})
+            ):
+                chunks.append(delta)
+                for item in parser.feed(delta):
+                    if time_to_first_item is None:
+                        time_to_first_item = round(time.time() - start_time, 2)
+                        logger.info(f"[ExtractStream] 首个元素耗时: {time_to_first_item}s - 模板: {template_id}")
+                    yield {"event": "item", "data": {"index": item_count, "item": item}}
+                    item_count += 1
+            
+            response = "".join(chunks)
+            try:
+                extracted_data = json.loads(response)
+            except json.JSONDecodeError as e:
+                logger.error(f"[ExtractStream] 解析LLM返回的JSON失败: {e}, 原始响应: {response}")
+                raise Exception("AI返回格式错误，请重试")
+            
+            config = self._build_system_llm_config(extracted_data, template_id, template)
+        except Exception as e:
+            logger.error(f"[ExtractStream] 流式数据提取失败: {e}")
+            yield {"event": "error", "data": {"message": str(e)}}
+            return
+        
+        yield {
+            "event": "done",
+            "data": {
+                "config": config,
+                "generation_method": "system_llm",
+                "extractionTime": round(time.time() - start_time, 2),
+                "timeToFirstItem": time_to_first_item
+            }
+        }
+    
+    def _build_system_llm_config(
+        self,
+        extracted_data: Dict[str, Any],
+        template_id: str,
+        template: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        将系统LLM提取的数据转换为完整的AntV Infographic配置
+        
+        Args:
+            extracted_data: LLM返回的数据
+            template_id: 模板ID
+            template: 模板对象
+        
+        Returns:
+            Dict: 完整配置对象
+        """
         # 如果是组织架构树,需要将数据转换为树形结构
         if template_id == 'org-tree':
             extracted_data = self._convert_to_tree_data(extracted_data)
@@ -444,10 +731,7 @@ class GenerateService:
         
         logger.info(f"Generated config for template {template_id}: {config}")
         
-        return {
-            "config": config,
-            "generation_method": "system_llm"
-        }
+        return config
     
     def _convert_structure_type(self, template_design: Dict[str, Any], template_id: str) -> Dict[str, Any]:
         """
@@ -771,6 +1055,72 @@ class GenerateService:
         }
 
 
+class _Speculation:
+    """推测执行分支（按本地预测类型提前启动的模板选择/数据提取任务）"""
+    
+    def __init__(
+        self,
+        predicted_type: str,
+        selection: "asyncio.Future[Dict[str, Any]]",
+        extraction: Optional["asyncio.Future[Dict[str, Any]]"] = None,
+        decisions: Optional[List[SelectionDecision]] = None
+    ):
+        self.predicted_type = predicted_type
+        self.selection = selection
+        self.extraction = extraction
+        # 推测分支的模板选择决策，推测被采用后才记录到选择策略
+        self.decisions = decisions if decisions is not None else []
+        self.hit: Optional[bool] = None
+        for task in self._tasks():
+            # 被放弃的分支可能以异常结束，取走异常避免"never retrieved"警告
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    
+    def _tasks(self) -> List["asyncio.Future[Any]"]:
+        """推测分支中的所有任务"""
+        return [t for t in (self.selection, self.extraction) if t is not None]
+    
+    def commit(self, content_type: str) -> bool:
+        """
+        根据LLM识别出的类型决定是否采用推测分支，不一致时取消
+        
+        Args:
+            content_type: LLM识别出的类型
+        
+        Returns:
+            bool: 是否采用
+        """
+        self.hit = content_type == self.predicted_type
+        metrics = get_metrics()
+        if self.hit:
+            metrics.increment("speculation.hit")
+            logger.info(f"[SmartGenerate] 推测命中 - 类型: {content_type}")
+        else:
+            metrics.increment("speculation.miss")
+            self.cancel()
+            logger.info(f"[SmartGenerate] 推测未命中 - 预测: {self.predicted_type}, 识别: {content_type}，已取消推测分支")
+        return self.hit
+    
+    def record_decisions(self, policy: SelectionPolicy):
+        """推测分支被采用后记录其模板选择决策（在selection完成之后调用）"""
+        for decision in self.decisions:
+            policy.record(decision)
+        self.decisions.clear()
+    
+    def cancel(self):
+        """取消尚未完成的推测任务"""
+        for task in self._tasks():
+            if not task.done():
+                task.cancel()
+    
+    def summary(self) -> Dict[str, Any]:
+        """推测执行结果摘要"""
+        return {
+            "predictedType": self.predicted_type,
+            "hit": self.hit,
+            "extraction": self.extraction is not None
+        }
+
+
 # 全局生成服务实例
 _generate_service = None
 
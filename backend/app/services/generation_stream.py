@@ -0,0 +1,183 @@
+"""
+生成事件流
+智能生成在后台任务中执行，各阶段完成时把事件写入事件流；
+客户端通过SSE订阅，断线后携带Last-Event-ID重连可从断点继续接收，
+生成结束后事件在保留窗口内仍可重放
+"""
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# 事件回调：(事件名称, 事件数据)
+EventEmitter = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class GenerationStream:
+    """一次生成任务的事件流"""
+    
+    def __init__(self, stream_id: str):
+        """
+        初始化事件流
+        
+        Args:
+            stream_id: 事件流ID
+        """
+        self.stream_id = stream_id
+        self.events: List[Dict[str, Any]] = []
+        self.finished = False
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional["asyncio.Task[None]"] = None
+        self._changed = asyncio.Condition()
+    
+    async def emit(self, event: str, data: Dict[str, Any]):
+        """
+        追加一个事件并唤醒所有订阅者
+        
+        Args:
+            event: 事件名称
+            data: 事件数据
+        """
+        async with self._changed:
+            self.events.append({"id": len(self.events) + 1, "event": event, "data": data})
+            self._changed.notify_all()
+    
+    async def finish(self):
+        """标记事件流结束"""
+        async with self._changed:
+            self.finished = True
+            self.finished_at = time.time()
+            self._changed.notify_all()
+    
+    async def subscribe(
+        self,
+        last_event_id: int = 0,
+        heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        订阅事件流，先重放 last_event_id 之后的历史事件，再等待新事件
+        
+        Args:
+            last_event_id: 客户端已收到的最后一个事件ID
+            heartbeat: 空闲多少秒后返回一次None（用于发送心跳），None表示不发送
+        
+        Yields:
+            Optional[Dict]: 事件 {"id", "event", "data"}，或心跳None
+        """
+        position = max(last_event_id, 0)
+        while True:
+            async with self._changed:
+                if position >= len(self.events) and not self.finished:
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), timeout=heartbeat)
+                    except asyncio.TimeoutError:
+                        pass
+                pending = self.events[position:]
+                finished = self.finished
+            
+            if not pending and not finished:
+                yield None
+                continue
+            
+            for event in pending:
+                yield event
+            position += len(pending)
+            
+            if finished and position >= len(self.events):
+                return
+
+
+class GenerationStreamRegistry:
+    """事件流注册表（进程内），结束超过保留窗口的事件流会被清理"""
+    
+    def __init__(self):
+        """初始化注册表"""
+        self._streams: Dict[str, GenerationStream] = {}
+    
+    @property
+    def retention(self) -> float:
+        """事件流结束后的保留时间（秒）"""
+        return get_settings().SMART_STREAM_RETENTION
+    
+    def start(self, run: Callable[[EventEmitter], Awaitable[None]]) -> GenerationStream:
+        """
+        创建事件流并在后台任务中执行生成
+        
+        后台任务不随客户端连接断开而取消，断线重连后仍能拿到后续事件
+        
+        Args:
+            run: 生成函数，接收事件回调；抛出的异常会转换为error事件
+        
+        Returns:
+            GenerationStream: 新建的事件流
+        """
+        self._purge()
+        stream = GenerationStream(uuid.uuid4().hex)
+        self._streams[stream.stream_id] = stream
+        
+        async def runner():
+            try:
+                await stream.emit("start", {"streamId": stream.stream_id})
+                await run(stream.emit)
+            except asyncio.CancelledError:
+                await stream.emit("error", {"message": "生成任务已取消"})
+                raise
+            except Exception as e:
+                logger.error(f"[GenerationStream] 生成失败 - stream: {stream.stream_id}, error: {e}")
+                await stream.emit("error", {"message": str(e)})
+            finally:
+                await stream.finish()
+        
+        stream.task = asyncio.ensure_future(runner())
+        logger.info(f"[GenerationStream] 创建事件流 - stream: {stream.stream_id}, 活跃: {len(self._streams)}")
+        return stream
+    
+    def get(self, stream_id: str) -> Optional[GenerationStream]:
+        """
+        获取事件流
+        
+        Args:
+            stream_id: 事件流ID
+        
+        Returns:
+            Optional[GenerationStream]: 事件流，不存在或已过保留窗口时返回None
+        """
+        self._purge()
+        return self._streams.get(stream_id)
+    
+    def _purge(self):
+        """清理结束超过保留窗口的事件流"""
+        deadline = time.time() - self.retention
+        expired = [
+            stream_id for stream_id, stream in self._streams.items()
+            if stream.finished and stream.finished_at < deadline
+        ]
+        for stream_id in expired:
+            del self._streams[stream_id]
+    
+    async def shutdown(self):
+        """取消所有进行中的生成任务（应用关闭时调用）"""
+        tasks = [s.task for s in self._streams.values() if s.task and not s.task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info(f"[GenerationStream] 已取消{len(tasks)}个进行中的生成任务")
+        self._streams.clear()
+
+
+# 全局注册表实例
+_generation_stream_registry = None
+
+
+def get_generation_stream_registry() -> GenerationStreamRegistry:
+    """获取事件流注册表单例"""
+    global _generation_stream_registry
+    if _generation_stream_registry is None:
+        _generation_stream_registry = GenerationStreamRegistry()
+    return _generation_stream_registry
@@ -0,0 +1,227 @@
+"""
+关键词规则匹配
+所有关键词规则（分类关键词、模板标签、SWOT关键词、本地类型预测关键词）编译为一个Aho-Corasick自动机，
+一次扫描用户文本即可得到全部命中及其位置；自动机按模板目录构建，目录变化时才重新构建
+"""
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from app.utils.keyword_automaton import KeywordAutomaton
+
+logger = logging.getLogger(__name__)
+
+# 分类关键词（模板相似度：关键词维度）
+CATEGORY_KEYWORDS = {
+    'chart': ['数据', '统计', '图表', '增长', '百分比', '比例', '指标', 'KPI'],
+    'comparison': ['对比', '比较', '优劣', 'SWOT', '优势', '劣势', '差异'],
+    'hierarchy': ['层级', '组织', '架构', '分类', '等级', '结构'],
+    'list': ['列表', '步骤', '清单', '要点', '特点', '功能'],
+    'quadrant': ['四象限', '矩阵', '定位', '分布', '维度'],
+    'relation': ['关系', '网络', '关联', '连接', '因果', '流程'],
+    'sequence': ['时间', '流程', '步骤', '阶段', '顺序', '递进']
+}
+
+# SWOT关键词（不区分大小写）
+SWOT_KEYWORDS = (
+    'swot',
+    'strengths',
+    'weaknesses',
+    'opportunities',
+    'threats',
+    '优势',
+    '劣势',
+    '机会',
+    '威胁'
+)
+
+# 本地类型预测关键词（仅用于推测执行，最终类型以LLM识别结果为准）
+LOCAL_TYPE_KEYWORDS = {
+    'chart': ['数据', '统计', '图表', '增长', '百分比', '比例', '指标', 'KPI', '销售额', '营收'],
+    'comparison': ['对比', '比较', '优劣', '优势', '劣势', '差异', 'vs', 'VS', '相比'],
+    'hierarchy': ['层级', '组织', '架构', '分类', '等级', '上级', '下属', '部门'],
+    'list': ['列表', '清单', '要点', '特点', '功能', '包括', '如下'],
+    'quadrant': ['四象限', '象限', '矩阵', '定位', '重要紧急'],
+    'relationship': ['关系', '网络', '关联', '连接', '因果', '相互', '影响'],
+    'sequence': ['时间', '流程', '步骤', '阶段', '顺序', '递进', '首先', '然后', '最后', '第一步', '年']
+}
+
+# 规则分组
+GROUP_SWOT = "swot"
+GROUP_TAG = "tag"
+
+
+def category_group(category: str) -> str:
+    """分类关键词分组名"""
+    return f"category:{category}"
+
+
+def type_group(content_type: str) -> str:
+    """类型预测关键词分组名"""
+    return f"type:{content_type}"
+
+
+def _find_positions(text: str, keyword: str) -> List[int]:
+    """关键词在文本中的所有出现位置（含重叠）"""
+    positions = []
+    start = text.find(keyword)
+    while start != -1:
+        positions.append(start)
+        start = text.find(keyword, start + 1)
+    return positions
+
+
+class KeywordHits:
+    """一段文本的关键词命中结果"""
+    
+    def __init__(self, matcher: "KeywordMatcher", positions: Dict[int, List[int]]):
+        """
+        Args:
+            matcher: 产生该结果的匹配器
+            positions: 关键词条目ID -> 起始位置列表
+        """
+        self.matcher = matcher
+        self.positions = positions
+    
+    def find(self, group: str, keyword: str) -> List[int]:
+        """某条规则的命中位置（未命中时为空列表）"""
+        entry_id = self.matcher.entry_id(group, keyword)
+        return self.positions.get(entry_id, []) if entry_id is not None else []
+    
+    def keywords(self, group: str) -> List[str]:
+        """分组中命中的关键词"""
+        return [keyword for keyword, entry_id in self.matcher.groups.get(group, {}).items() if entry_id in self.positions]
+    
+    def count(self, group: str) -> int:
+        """分组中命中的关键词数量（每个关键词最多计一次）"""
+        return sum(1 for entry_id in self.matcher.groups.get(group, {}).values() if entry_id in self.positions)
+    
+    def by_group(self) -> Dict[str, Dict[str, List[int]]]:
+        """全部命中：分组 -> 关键词 -> 位置"""
+        return {
+            group: {keyword: self.positions[entry_id] for keyword, entry_id in entries.items() if entry_id in self.positions}
+            for group, entries in self.matcher.groups.items()
+            if any(entry_id in self.positions for entry_id in entries.values())
+        }
+
+
+class KeywordMatcher:
+    """关键词规则匹配器（构建后只读）"""
+    
+    def __init__(self, rules: Iterable[Tuple[str, str, bool]]):
+        """
+        编译规则
+        
+        Args:
+            rules: (分组, 关键词, 是否区分大小写)；不区分大小写的关键词按小写登记
+        """
+        self.entries: List[Tuple[str, bool]] = []
+        self.groups: Dict[str, Dict[str, int]] = {}
+        entry_ids: Dict[Tuple[str, bool], int] = {}
+        for group, keyword, case_sensitive in rules:
+            if not keyword:
+                continue
+            if not case_sensitive:
+                keyword = keyword.lower()
+            key = (keyword, case_sensitive)
+            if key not in entry_ids:
+                entry_ids[key] = len(self.entries)
+                self.entries.append(key)
+            self.groups.setdefault(group, {})[keyword] = entry_ids[key]
+        
+        # 自动机统一扫描小写文本，区分大小写的条目命中后再核对原文
+        self.automaton = KeywordAutomaton([keyword.lower() for keyword, _ in self.entries])
+    
+    @property
+    def size(self) -> int:
+        """关键词条目数"""
+        return len(self.entries)
+    
+    def entry_id(self, group: str, keyword: str) -> Optional[int]:
+        """规则对应的关键词条目ID"""
+        return self.groups.get(group, {}).get(keyword)
+    
+    def match(self, text: str, lower: Optional[str] = None) -> KeywordHits:
+        """
+        扫描文本
+        
+        Args:
+            text: 原文
+            lower: 原文的小写形式（可选，已计算时传入）
+        
+        Returns:
+            KeywordHits: 命中结果（位置为原文中的下标）
+        """
+        lower = text.lower() if lower is None else lower
+        # 少数字符转小写后长度会变化，此时小写文本的位置无法对应原文，改为逐个查找
+        aligned = len(lower) == len(text)
+        
+        positions: Dict[int, List[int]] = {}
+        for entry_id, starts in self.automaton.find_all(lower).items():
+            keyword, case_sensitive = self.entries[entry_id]
+            if not aligned:
+                starts = _find_positions(text if case_sensitive else lower, keyword)
+            elif case_sensitive:
+                starts = [start for start in starts if text.startswith(keyword, start)]
+            if starts:
+                positions[entry_id] = starts
+        return KeywordHits(self, positions)
+
+
+def build_keyword_matcher(
+    templates: Sequence[Dict[str, Any]] = (),
+    category_keywords: Optional[Dict[str, List[str]]] = None
+) -> KeywordMatcher:
+    """
+    由全部关键词规则构建匹配器
+    
+    Args:
+        templates: 模板列表（登记其标签）
+        category_keywords: 分类关键词，默认使用 CATEGORY_KEYWORDS
+    """
+    category_keywords = CATEGORY_KEYWORDS if category_keywords is None else category_keywords
+    rules: List[Tuple[str, str, bool]] = [(GROUP_SWOT, keyword, False) for keyword in SWOT_KEYWORDS]
+    for content_type, keywords in LOCAL_TYPE_KEYWORDS.items():
+        rules.extend((type_group(content_type), keyword, True) for keyword in keywords)
+    for category, keywords in category_keywords.items():
+        rules.extend((category_group(category), keyword, True) for keyword in keywords)
+    for template in templates:
+        rules.extend((GROUP_TAG, tag, False) for tag in template.get('tags') or [])
+    return KeywordMatcher(rules)
+
+
+# 按模板目录缓存的匹配器（目录未加载时使用不含模板标签的匹配器）
+_catalog_matcher: Optional[Tuple[Any, KeywordMatcher]] = None
+_static_matcher: Optional[KeywordMatcher] = None
+_matcher_lock = threading.Lock()
+
+
+def get_keyword_matcher(catalog: Any = None) -> KeywordMatcher:
+    """
+    获取模板目录对应的关键词匹配器
+    
+    Args:
+        catalog: 模板目录，默认使用当前已加载的目录
+    """
+    global _catalog_matcher, _static_matcher
+    if catalog is None:
+        from app.services.template_catalog import peek_template_catalog
+        catalog = peek_template_catalog()
+    
+    if catalog is None:
+        if _static_matcher is None:
+            _static_matcher = build_keyword_matcher()
+        return _static_matcher
+    
+    cached = _catalog_matcher
+    if cached is not None and cached[0] is catalog:
+        return cached[1]
+    
+    with _matcher_lock:
+        cached = _catalog_matcher
+        if cached is None or cached[0] is not catalog:
+            matcher = build_keyword_matcher(catalog.templates)
+            cached = (catalog, matcher)
+            _catalog_matcher = cached
+            logger.info(f"[KeywordMatcher] 构建关键词自动机 - 目录版本: {catalog.version}, "
+                        f"关键词: {matcher.size}, 状态数: {matcher.automaton.states}")
+        return cached[1]
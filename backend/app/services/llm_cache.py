@@ -0,0 +1,258 @@
+"""
+LLM响应缓存
+按提示词指纹（model、messages、temperature、response_format等请求参数）缓存LLM响应，
+内存LRU在前、SQLite持久化存储在后，支持TTL过期和按条目数淘汰
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+# 当前请求的缓存命中统计（由generate_smart等入口开启，LLMClient记录）
+_request_stats: ContextVar[Optional[Dict[str, int]]] = ContextVar("llm_cache_request_stats", default=None)
+
+
+def start_request_stats() -> Dict[str, int]:
+    """
+    开启当前请求（协程上下文）的缓存统计
+    
+    Returns:
+        Dict: {"hits": 0, "misses": 0}，之后的LLM调用会累加到该字典
+    """
+    stats = {"hits": 0, "misses": 0}
+    _request_stats.set(stats)
+    return stats
+
+
+def record_request_stat(hit: bool):
+    """记录一次缓存命中/未命中到当前请求的统计中"""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats["hits" if hit else "misses"] += 1
+
+
+def make_cache_key(request_kwargs: Dict[str, Any]) -> str:
+    """
+    计算LLM请求的指纹
+    
+    Args:
+        request_kwargs: 发送给chat.completions.create的参数（model、messages、temperature、response_format等）
+    
+    Returns:
+        str: sha256十六进制摘要
+    """
+    payload = json.dumps(request_kwargs, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """LLM响应缓存（内存LRU + SQLite）"""
+    
+    # 每写入多少次检查一次磁盘容量
+    EVICTION_CHECK_INTERVAL = 50
+    
+    def __init__(
+        self,
+        db_path: str,
+        ttl: int = 86400,
+        max_entries: int = 10000,
+        memory_entries: int = 256
+    ):
+        """
+        初始化缓存
+        
+        Args:
+            db_path: SQLite缓存文件路径
+            ttl: 过期时间（秒），0表示永不过期
+            max_entries: 磁盘最大条目数，超出时淘汰最久未访问的条目
+            memory_entries: 内存LRU最大条目数
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        # 内存LRU与SQLite连接分别加锁，磁盘IO期间不阻塞事件循环中的内存查找
+        self._memory_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._writes = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, "
+            "model TEXT, "
+            "response TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)")
+        self._conn.commit()
+        logger.info(f"[LLMCache] 初始化 - path: {db_path}, ttl: {ttl}s, max_entries: {max_entries}, "
+                    f"memory_entries: {memory_entries}")
+    
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        """判断条目是否过期"""
+        return self.ttl > 0 and created_at + self.ttl < now
+    
+    def _remember(self, key: str, response: str, created_at: float):
+        """写入内存LRU"""
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+    
+    async def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存
+        
+        Args:
+            key: 请求指纹
+        
+        Returns:
+            Optional[str]: 缓存的响应内容，未命中或已过期时返回None
+        """
+        now = time.time()
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                response, created_at = entry
+                if not self._is_expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return response
+                del self._memory[key]
+        
+        row = await asyncio.to_thread(self._disk_get, key, now)
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        
+        response, created_at = row
+        with self._memory_lock:
+            self._remember(key, response, created_at)
+        self.stats["disk_hits"] += 1
+        return response
+    
+    async def set(self, key: str, response: str, model: Optional[str] = None):
+        """
+        写入缓存
+        
+        Args:
+            key: 请求指纹
+            response: LLM响应内容
+            model: 模型名称（便于排查）
+        """
+        now = time.time()
+        with self._memory_lock:
+            self._remember(key, response, now)
+        await asyncio.to_thread(self._disk_set, key, response, model, now)
+    
+    async def invalidate(self, key: str):
+        """
+        删除缓存条目（例如调用方无法解析缓存的响应时）
+        
+        Args:
+            key: 请求指纹
+        """
+        with self._memory_lock:
+            self._memory.pop(key, None)
+        await asyncio.to_thread(self._disk_delete, key)
+    
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        """从SQLite读取条目（在线程池中执行）"""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self._is_expired(row[1], now):
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0], row[1]
+    
+    def _disk_set(self, key: str, response: str, model: Optional[str], now: float):
+        """写入SQLite并按需淘汰（在线程池中执行）"""
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now)
+            )
+            self._conn.commit()
+            self.stats["writes"] += 1
+            self._writes += 1
+            if self._writes % self.EVICTION_CHECK_INTERVAL == 0:
+                self._evict(now)
+    
+    def _disk_delete(self, key: str):
+        """从SQLite删除条目（在线程池中执行）"""
+        with self._db_lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+    
+    def _evict(self, now: float):
+        """删除过期条目，并在超出容量时淘汰最久未访问的条目（调用方持有锁）"""
+        deleted = 0
+        if self.ttl > 0:
+            deleted += self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,)
+            ).rowcount
+        count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            deleted += self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)", (overflow,)
+            ).rowcount
+        self._conn.commit()
+        if deleted:
+            self.stats["evictions"] += deleted
+            logger.info(f"[LLMCache] 淘汰{deleted}个缓存条目")
+    
+    def clear(self):
+        """清空缓存"""
+        with self._memory_lock:
+            self._memory.clear()
+        with self._db_lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+
+# 全局缓存实例（缓存配置变化时重建）
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_options: Optional[Tuple[Any, ...]] = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """获取LLM响应缓存单例，未启用缓存时返回None"""
+    global _llm_cache, _llm_cache_options
+    settings = get_settings()
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    
+    options = (
+        settings.LLM_CACHE_PATH,
+        settings.LLM_CACHE_TTL,
+        settings.LLM_CACHE_MAX_ENTRIES,
+        settings.LLM_CACHE_MEMORY_ENTRIES
+    )
+    if _llm_cache is None or _llm_cache_options != options:
+        _llm_cache = LLMResponseCache(*options)
+        _llm_cache_options = options
+    return _llm_cache
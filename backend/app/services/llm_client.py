@@ -4,25 +4,45 @@ LLM客户端服务
 """
 import json
 import logging
-from typing import List, Dict, Any, Optional
-from openai import OpenAI, APIError, APITimeoutError, RateLimitError
-from app.config import get_settings
+from typing import List, Dict, Any, Optional, AsyncIterator, Callable
+from openai import AsyncOpenAI, APIError, APITimeoutError, RateLimitError
+from app.config import get_config_snapshot
+from app.utils.http_client import get_async_http_client
+from app.services.llm_cache import get_llm_cache, make_cache_key, record_request_stat
+from app.utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# 相同请求的并发LLM调用合并（进程级）
+_completion_flight = SingleFlight("llm")
+
 
 class LLMClient:
     """LLM客户端类"""
     
-    def __init__(self):
-        """初始化LLM客户端"""
-        settings = get_settings()
+    def __init__(self, settings=None):
+        """
+        初始化LLM客户端
+        
+        Args:
+            settings: 配置对象，默认使用当前配置快照
+        """
+        if settings is None:
+            settings = get_config_snapshot().settings
         logger.info(f"[LLMClient] 初始化 - API Key: {settings.AIHUBMIX_API_KEY[:25]}..., Base URL: {settings.AIHUBMIX_BASE_URL}, Model: {settings.AIHUBMIX_MODEL_RECOMMEND}")
-        self.client = OpenAI(
+        # 使用进程级共享连接池，避免每次请求重新建立TLS连接
+        http_client = get_async_http_client(
+            "llm",
+            max_connections=settings.AIHUBMIX_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.AIHUBMIX_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.AIHUBMIX_KEEPALIVE_EXPIRY
+        )
+        self.client = AsyncOpenAI(
             api_key=settings.AIHUBMIX_API_KEY,
             base_url=settings.AIHUBMIX_BASE_URL,
             timeout=settings.AIHUBMIX_TIMEOUT,
-            max_retries=settings.AIHUBMIX_MAX_RETRIES
+            max_retries=settings.AIHUBMIX_MAX_RETRIES,
+            http_client=http_client
         )
         self.recommend_model = settings.AIHUBMIX_MODEL_RECOMMEND
         self.extract_model = settings.AIHUBMIX_MODEL_EXTRACT
@@ -33,17 +53,25 @@ class LLMClient:
         model: Optional[str] = None,
         temperature: float = 0.7,
         response_format: Optional[Dict[str, str]] = None,
-        reasoning_effort: str = "medium"
+        reasoning_effort: str = "medium",
+        use_cache: bool = True,
+        validate: Optional[Callable[[str], Any]] = None
     ) -> str:
         """
         通用聊天补全方法
         
+        相同请求参数（model、messages、temperature、response_format）的响应会被缓存，
+        命中时不再调用LLM；并发的相同请求只向上游发起一次调用。
+        指定validate时只缓存通过校验的响应，缓存中无法通过校验的响应会被删除并重新调用LLM
+        
         Args:
             messages: 消息列表
             model: 模型名称，默认使用recommend模型
             temperature: 温度参数
             response_format: 响应格式，例如 {"type": "json_object"}
             reasoning_effort: 推理强度，支持 none, low, medium, high（默认medium）
+            use_cache: 是否使用响应缓存
+            validate: 响应校验函数（例如调用方的解析函数），抛出异常表示响应不可用，不写入缓存
         
         Returns:
             str: LLM响应内容
@@ -52,44 +80,177 @@ class LLMClient:
             Exception: API调用失败时抛出异常
         """
         try:
-            if model is None:
-                model = self.recommend_model
+            kwargs = self._build_request_kwargs(messages, model, temperature, response_format, reasoning_effort)
+            model = kwargs["model"]
             
-            kwargs = {
-                "model": model,
-                "messages": messages,
-                "temperature": temperature
-            }
+            cache = get_llm_cache() if use_cache else None
+            cache_key = make_cache_key(kwargs)
+            if cache:
+                cached = await self._cache_get_valid(cache, cache_key, validate)
+                record_request_stat(cached is not None)
+                if cached is not None:
+                    logger.info(f"LLM缓存命中，模型: {model}")
+                    return cached
             
-            # 只有 o1/o3 系列推理模型支持reasoning_effort参数
-            # gpt-5.1 和其他模型都不支持此参数
-            if "o1" in model or "o3" in model:
-                kwargs["reasoning_effort"] = reasoning_effort
-                # o1/o3 推理模型不支持response_format，必须通过prompt引导JSON输出
-            elif response_format:
-                # 其他模型添加response_format
-                kwargs["response_format"] = response_format
+            async def call_upstream() -> str:
+                logger.info(f"准备调用LLM: model={model}, kwargs keys={list(kwargs.keys())}")
+                response = await self.client.chat.completions.create(**kwargs)
+                content = response.choices[0].message.content
+                
+                logger.info(f"LLM调用成功，模型: {model}, tokens使用: {response.usage.total_tokens if response.usage else 'N/A'}")
+                
+                if cache and content and self._is_valid(content, validate):
+                    await self._cache_set(cache, cache_key, content, model)
+                return content
+            
+            return await _completion_flight.do(cache_key, call_upstream)
+        
+        except Exception as e:
+            raise self._translate_error(e)
+    
+    async def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        response_format: Optional[Dict[str, str]] = None,
+        reasoning_effort: str = "medium",
+        use_cache: bool = True,
+        validate: Optional[Callable[[str], Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        流式聊天补全方法，逐段返回LLM输出的文本增量
+        
+        缓存命中时一次性返回完整内容；未命中时流式返回，结束后写入缓存（指定validate时只缓存通过校验的响应）
+        
+        Args:
+            messages: 消息列表
+            model: 模型名称，默认使用recommend模型
+            temperature: 温度参数
+            response_format: 响应格式，例如 {"type": "json_object"}
+            reasoning_effort: 推理强度，支持 none, low, medium, high（默认medium）
+            use_cache: 是否使用响应缓存
+            validate: 响应校验函数，抛出异常表示响应不可用，不写入缓存
+        
+        Yields:
+            str: 文本增量
+        
+        Raises:
+            Exception: API调用失败时抛出异常
+        """
+        try:
+            kwargs = self._build_request_kwargs(messages, model, temperature, response_format, reasoning_effort)
+            model = kwargs["model"]
             
-            logger.info(f"准备调用LLM: model={model}, kwargs keys={list(kwargs.keys())}")
-            response = self.client.chat.completions.create(**kwargs)
-            content = response.choices[0].message.content
+            cache = get_llm_cache() if use_cache else None
+            cache_key = make_cache_key(kwargs)
+            if cache:
+                cached = await self._cache_get_valid(cache, cache_key, validate)
+                record_request_stat(cached is not None)
+                if cached is not None:
+                    logger.info(f"LLM缓存命中（流式），模型: {model}")
+                    yield cached
+                    return
             
-            logger.info(f"LLM调用成功，模型: {model}, tokens使用: {response.usage.total_tokens if response.usage else 'N/A'}")
+            logger.info(f"准备流式调用LLM: model={model}, kwargs keys={list(kwargs.keys())}")
+            stream = await self.client.chat.completions.create(stream=True, **kwargs)
+            parts: List[str] = []
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
             
-            return content
+            content = "".join(parts)
+            logger.info(f"LLM流式调用成功，模型: {model}, 响应长度: {len(content)}")
             
-        except APITimeoutError as e:
+            if cache and content and self._is_valid(content, validate):
+                await self._cache_set(cache, cache_key, content, model)
+        
+        except Exception as e:
+            raise self._translate_error(e)
+    
+    def _build_request_kwargs(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str],
+        temperature: float,
+        response_format: Optional[Dict[str, str]],
+        reasoning_effort: str
+    ) -> Dict[str, Any]:
+        """构造chat.completions.create的请求参数"""
+        if model is None:
+            model = self.recommend_model
+        
+        kwargs = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature
+        }
+        
+        # 只有 o1/o3 系列推理模型支持reasoning_effort参数
+        # gpt-5.1 和其他模型都不支持此参数
+        if "o1" in model or "o3" in model:
+            kwargs["reasoning_effort"] = reasoning_effort
+            # o1/o3 推理模型不支持response_format，必须通过prompt引导JSON输出
+        elif response_format:
+            # 其他模型添加response_format
+            kwargs["response_format"] = response_format
+        
+        return kwargs
+    
+    def _translate_error(self, e: Exception) -> Exception:
+        """将SDK异常转换为面向用户的错误信息"""
+        if isinstance(e, APITimeoutError):
             logger.error(f"LLM API请求超时: {e}")
-            raise Exception("AI服务请求超时，请稍后重试")
-        except RateLimitError as e:
+            return Exception("AI服务请求超时，请稍后重试")
+        if isinstance(e, RateLimitError):
             logger.error(f"LLM API配额超限: {e}")
-            raise Exception("AI服务配额已用完，请联系管理员")
-        except APIError as e:
+            return Exception("AI服务配额已用完，请联系管理员")
+        if isinstance(e, APIError):
             logger.error(f"LLM API调用失败: {e}")
-            raise Exception(f"AI服务调用失败: {str(e)}")
+            return Exception(f"AI服务调用失败: {str(e)}")
+        logger.error(f"LLM客户端未知错误: {e}")
+        return Exception(f"AI服务发生错误: {str(e)}")
+    
+    async def _cache_get(self, cache, key: str) -> Optional[str]:
+        """读取响应缓存，缓存异常不影响正常调用"""
+        try:
+            return await cache.get(key)
+        except Exception as e:
+            logger.warning(f"LLM缓存读取失败: {e}")
+            return None
+    
+    def _is_valid(self, content: str, validate: Optional[Callable[[str], Any]]) -> bool:
+        """响应是否通过调用方的校验（未指定校验函数时总是通过）"""
+        if validate is None:
+            return True
+        try:
+            validate(content)
+            return True
+        except Exception as e:
+            logger.warning(f"LLM响应未通过校验，不写入缓存: {e}")
+            return False
+    
+    async def _cache_get_valid(self, cache, key: str, validate: Optional[Callable[[str], Any]]) -> Optional[str]:
+        """读取响应缓存，缓存的响应未通过校验时删除该条目并视为未命中"""
+        cached = await self._cache_get(cache, key)
+        if cached is None or self._is_valid(cached, validate):
+            return cached
+        try:
+            await cache.invalidate(key)
         except Exception as e:
-            logger.error(f"LLM客户端未知错误: {e}")
-            raise Exception(f"AI服务发生错误: {str(e)}")
+            logger.warning(f"LLM缓存删除失败: {e}")
+        return None
+    
+    async def _cache_set(self, cache, key: str, content: str, model: str):
+        """写入响应缓存，缓存异常不影响正常调用"""
+        try:
+            await cache.set(key, content, model)
+        except Exception as e:
+            logger.warning(f"LLM缓存写入失败: {e}")
     
     async def recommend_templates(
         self,
@@ -137,14 +298,14 @@ class LLMClient:
                 logger.info(f"[recommend_templates] o1/o3推理模型，不使用response_format")
             
             logger.info(f"[recommend_templates] 调用LLM，kwargs: {list(kwargs.keys())}")
-            response = await self.chat_completion(**kwargs)
+            response = await self.chat_completion(validate=json.loads, **kwargs)
             
             result = json.loads(response)
             recommendations = result.get("recommendations", [])
             
             logger.info(f"模板推荐成功，返回{len(recommendations)}个推荐")
             return recommendations
-            
+        
         except json.JSONDecodeError as e:
             logger.error(f"解析LLM返回的JSON失败: {e}, 原始响应: {response}")
             raise Exception("AI返回格式错误，请重试")
@@ -169,48 +330,84 @@ class LLMClient:
         Returns:
             Dict: 结构化的配置数据
         """
-        from app.utils.prompts import get_data_extract_prompt
-        
         try:
-            prompt = get_data_extract_prompt(user_text, template_id, template_schema)
-            
-            messages = [
-                {"role": "system", "content": "你是一位专业的数据分析师，擅长从文本中提取关键信息并转换为结构化数据。"},
-                {"role": "user", "content": prompt}
-            ]
-            
-            # 根据模型类型决定是否使用response_format
-            kwargs = {
-                "messages": messages,
-                "model": self.extract_model,
-                "temperature": 0.2
-            }
-            
-            # 只有 o1/o3 系列推理模型不支持response_format
-            # 其他模型(包括 gpt-5.1)使用response_format来确保JSON输出
-            if "o1" not in self.extract_model and "o3" not in self.extract_model:
-                kwargs["response_format"] = {"type": "json_object"}
-            
-            response = await self.chat_completion(**kwargs)
+            kwargs = self._build_extract_kwargs(user_text, template_id, template_schema)
+            response = await self.chat_completion(validate=json.loads, **kwargs)
             
             result = json.loads(response)
             
             logger.info(f"数据提取成功，模板: {template_id}")
             return result
-            
+        
         except json.JSONDecodeError as e:
             logger.error(f"解析LLM返回的JSON失败: {e}, 原始响应: {response}")
             raise Exception("AI返回格式错误，请重试")
         except Exception as e:
             logger.error(f"数据提取失败: {e}")
             raise
+    
+    async def stream_structured_data(
+        self,
+        user_text: str,
+        template_id: str,
+        template_schema: Dict[str, Any]
+    ) -> AsyncIterator[str]:
+        """
+        流式提取结构化数据，逐段返回LLM输出的JSON文本
+        
+        Args:
+            user_text: 用户输入的文本
+            template_id: 模板ID
+            template_schema: 模板数据结构定义
+        
+        Yields:
+            str: JSON文本增量
+        """
+        kwargs = self._build_extract_kwargs(user_text, template_id, template_schema)
+        async for delta in self.chat_completion_stream(validate=json.loads, **kwargs):
+            yield delta
+    
+    def _build_extract_kwargs(
+        self,
+        user_text: str,
+        template_id: str,
+        template_schema: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """构造数据提取请求参数"""
+        from app.utils.prompts import get_data_extract_prompt
+        
+        prompt = get_data_extract_prompt(user_text, template_id, template_schema)
+        
+        messages = [
+            {"role": "system", "content": "你是一位专业的数据分析师，擅长从文本中提取关键信息并转换为结构化数据。"},
+            {"role": "user", "content": prompt}
+        ]
+        
+        # 根据模型类型决定是否使用response_format
+        kwargs = {
+            "messages": messages,
+            "model": self.extract_model,
+            "temperature": 0.2
+        }
+        
+        # 只有 o1/o3 系列推理模型不支持response_format
+        # 其他模型(包括 gpt-5.1)使用response_format来确保JSON输出
+        if "o1" not in self.extract_model and "o3" not in self.extract_model:
+            kwargs["response_format"] = {"type": "json_object"}
+        
+        return kwargs
 
 
-# 全局LLM客户端实例
+# 全局LLM客户端实例（与创建它的配置快照版本绑定）
 _llm_client: Optional[LLMClient] = None
+_llm_client_version: Optional[int] = None
 
 
 def get_llm_client() -> LLMClient:
-    """获取LLM客户端单例 - 每次都重新创建以确保加载最新配置"""
-    # 暂时禁用单例模式，每次都重新创建以加载最新.env配置
-    return LLMClient()
+    """获取LLM客户端单例 - 配置快照更新后自动重建"""
+    global _llm_client, _llm_client_version
+    snapshot = get_config_snapshot()
+    if _llm_client is None or _llm_client_version != snapshot.version:
+        _llm_client = LLMClient(snapshot.settings)
+        _llm_client_version = snapshot.version
+    return _llm_client
@@ -0,0 +1,206 @@
+"""
+本地内容类型分类器
+基于字符n-gram特征的多分类逻辑回归（纯Python实现），离线训练后以JSON保存，
+推理耗时在毫秒级；置信度达到阈值时直接给出类型，否则交给LLM识别
+"""
+import json
+import logging
+import math
+import os
+import random
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from app.config import get_settings
+from app.services.text_profile import TextProfile, char_ngram_features, normalize
+
+logger = logging.getLogger(__name__)
+
+# 模板分类 -> 类型识别使用的类型代码
+CATEGORY_TO_TYPE = {
+    "relation": "relationship"
+}
+
+
+def category_to_type(category: str) -> str:
+    """将模板分类转换为类型识别使用的类型代码"""
+    return CATEGORY_TO_TYPE.get(category, category)
+
+
+def extract_features(text: str, ngram_range: Tuple[int, int] = (1, 3)) -> Dict[str, float]:
+    """
+    提取字符n-gram特征（L2归一化的词频）
+    
+    Args:
+        text: 输入文本
+        ngram_range: n-gram长度范围（含两端）
+    
+    Returns:
+        Dict[str, float]: 特征 -> 权重
+    """
+    return char_ngram_features(normalize(text), ngram_range)
+
+
+def _softmax(scores: Dict[str, float]) -> Dict[str, float]:
+    """将各类别得分转换为概率"""
+    top = max(scores.values())
+    exps = {label: math.exp(score - top) for label, score in scores.items()}
+    total = sum(exps.values())
+    return {label: value / total for label, value in exps.items()}
+
+
+class LocalTypeClassifier:
+    """本地内容类型分类器（推理）"""
+    
+    def __init__(self, model: Dict[str, Any]):
+        """
+        初始化分类器
+        
+        Args:
+            model: train_model 生成的模型字典
+        """
+        self.labels: List[str] = model["labels"]
+        self.ngram_range = tuple(model.get("ngram_range", (1, 3)))
+        self.weights: Dict[str, Dict[str, float]] = model["weights"]
+        self.bias: Dict[str, float] = model["bias"]
+        self.meta = {k: v for k, v in model.items() if k not in ("weights", "bias")}
+    
+    def predict_proba(self, text: Union[str, TextProfile]) -> Dict[str, float]:
+        """
+        计算各类型的概率
+        
+        Args:
+            text: 用户输入的文本，或其文本画像（复用已提取的n-gram特征）
+        
+        Returns:
+            Dict[str, float]: 类型 -> 概率
+        """
+        if isinstance(text, TextProfile):
+            features = text.ngram_features(self.ngram_range)
+        else:
+            features = extract_features(text, self.ngram_range)
+        scores = {}
+        for label in self.labels:
+            label_weights = self.weights.get(label, {})
+            scores[label] = self.bias.get(label, 0.0) + sum(
+                value * label_weights.get(gram, 0.0) for gram, value in features.items()
+            )
+        return _softmax(scores)
+    
+    def predict(self, text: Union[str, TextProfile]) -> Tuple[str, float]:
+        """
+        预测最可能的类型
+        
+        Args:
+            text: 用户输入的文本，或其文本画像
+        
+        Returns:
+            Tuple[str, float]: (类型, 概率)
+        """
+        probs = self.predict_proba(text)
+        label = max(probs, key=probs.get)
+        return label, probs[label]
+
+
+def train_model(
+    samples: Sequence[Tuple[str, str]],
+    ngram_range: Tuple[int, int] = (1, 3),
+    epochs: int = 30,
+    learning_rate: float = 0.5,
+    l2: float = 1e-4,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    训练多分类逻辑回归（随机梯度下降）
+    
+    Args:
+        samples: 训练样本 [(文本, 类型)]
+        ngram_range: n-gram长度范围
+        epochs: 训练轮数
+        learning_rate: 初始学习率（按轮次衰减）
+        l2: L2正则系数
+        seed: 随机种子
+    
+    Returns:
+        Dict: 可JSON序列化的模型
+    """
+    labels = sorted({label for _, label in samples})
+    data = [(extract_features(text, ngram_range), label) for text, label in samples]
+    weights: Dict[str, Dict[str, float]] = {label: {} for label in labels}
+    bias = {label: 0.0 for label in labels}
+    rng = random.Random(seed)
+    
+    for epoch in range(epochs):
+        rng.shuffle(data)
+        rate = learning_rate / (1 + epoch * 0.1)
+        for features, target in data:
+            scores = {
+                label: bias[label] + sum(v * weights[label].get(g, 0.0) for g, v in features.items())
+                for label in labels
+            }
+            probs = _softmax(scores)
+            for label in labels:
+                gradient = probs[label] - (1.0 if label == target else 0.0)
+                if abs(gradient) < 1e-6:
+                    continue
+                label_weights = weights[label]
+                for gram, value in features.items():
+                    w = label_weights.get(gram, 0.0)
+                    label_weights[gram] = w - rate * (gradient * value + l2 * w)
+                bias[label] -= rate * gradient
+    
+    # 去掉接近0的权重以减小模型体积
+    pruned = {
+        label: {g: round(w, 6) for g, w in label_weights.items() if abs(w) >= 1e-4}
+        for label, label_weights in weights.items()
+    }
+    return {
+        "labels": labels,
+        "ngram_range": list(ngram_range),
+        "weights": pruned,
+        "bias": {label: round(b, 6) for label, b in bias.items()},
+        "samples": len(samples),
+        "label_counts": dict(Counter(label for _, label in samples)),
+        "trained_at": datetime.utcnow().isoformat()
+    }
+
+
+# 全局分类器实例（模型文件变化时重新加载）
+_local_classifier: Optional[LocalTypeClassifier] = None
+_local_classifier_key: Optional[Tuple[str, Optional[float]]] = None
+_local_classifier_lock = threading.Lock()
+
+
+def get_local_classifier() -> Optional[LocalTypeClassifier]:
+    """
+    获取本地分类器单例
+    
+    Returns:
+        Optional[LocalTypeClassifier]: 未启用或模型文件不存在时返回None
+    """
+    global _local_classifier, _local_classifier_key
+    settings = get_settings()
+    if not settings.LOCAL_CLASSIFIER_ENABLED:
+        return None
+    
+    path = settings.LOCAL_CLASSIFIER_PATH
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    
+    key = (path, mtime)
+    if _local_classifier_key != key:
+        with _local_classifier_lock:
+            if _local_classifier_key != key:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        _local_classifier = LocalTypeClassifier(json.load(f))
+                    logger.info(f"[LocalClassifier] 加载模型 - path: {path}, "
+                                f"样本数: {_local_classifier.meta.get('samples')}")
+                except Exception as e:
+                    logger.error(f"[LocalClassifier] 加载模型失败: {e}")
+                    _local_classifier = None
+                _local_classifier_key = key
+    return _local_classifier
@@ -0,0 +1,193 @@
+"""
+模板选择策略
+在调用LLM选择模板之前，判断是否可以直接在本地确定模板：
+1. 该分类只有一个启用的模板
+2. 本地相似度排序的第一名领先第二名超过阈值（SELECTION_SKIP_MARGIN）
+每次决策都会记录下来（计数器 + 最近决策列表），LLM选择时同时记录其结果与本地第一名是否一致，
+用于根据真实流量调整阈值。推测执行分支的决策在其结果被采用后才记录，被取消的推测不计入统计
+"""
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Any, Deque, Dict, List, Optional
+from app.config import get_settings
+from app.services.similarity_service import get_similarity_service
+from app.services.text_profile import TextProfile
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SelectionDecision:
+    """一次模板选择决策"""
+    content_type: str
+    candidates: int
+    skip_llm: bool
+    rule: str
+    top_template_id: Optional[str] = None
+    top_score: Optional[float] = None
+    second_template_id: Optional[str] = None
+    second_score: Optional[float] = None
+    margin: Optional[float] = None
+    llm_template_id: Optional[str] = None
+    timestamp: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return asdict(self)
+
+
+class SelectionPolicy:
+    """模板选择策略引擎"""
+    
+    # 决策规则
+    RULE_SINGLE_TEMPLATE = "single_template"
+    RULE_MARGIN = "margin"
+    RULE_LLM = "llm"
+    
+    def __init__(self):
+        """初始化策略引擎"""
+        self.similarity_service = get_similarity_service()
+        self._history: Deque[SelectionDecision] = deque(maxlen=get_settings().SELECTION_DECISION_HISTORY)
+        self._lock = threading.Lock()
+    
+    def decide(
+        self,
+        user_text: str,
+        content_type: str,
+        templates: List[Dict[str, Any]],
+        profile: Optional[TextProfile] = None,
+        record: bool = True
+    ) -> SelectionDecision:
+        """
+        判断是否可以跳过LLM模板选择
+        
+        Args:
+            user_text: 用户输入的文本
+            content_type: 已识别的内容类型
+            templates: 该类型的启用模板
+            profile: 用户文本画像（可选）
+            record: 是否立即记录决策；为False时由调用方在结果被采用后调用record
+        
+        Returns:
+            SelectionDecision: 决策结果（skip_llm为True时top_template_id即为选中的模板）
+        """
+        settings = get_settings()
+        decision = SelectionDecision(
+            content_type=content_type,
+            candidates=len(templates),
+            skip_llm=False,
+            rule=self.RULE_LLM,
+            timestamp=time.time()
+        )
+        
+        # 未启用策略时仍然计算排序并记录决策（影子模式），便于评估阈值
+        if len(templates) == 1:
+            decision.top_template_id = templates[0]['id']
+        elif len(templates) >= 2:
+            ranked = self.similarity_service.calculate_all_templates_similarity(
+                user_text=user_text,
+                templates=templates,
+                content_type=content_type,
+                profile=profile
+            )
+            top, second = ranked[0], ranked[1]
+            decision.top_template_id = top['templateId']
+            decision.top_score = top['similarityScore']
+            decision.second_template_id = second['templateId']
+            decision.second_score = second['similarityScore']
+            decision.margin = round(top['similarityScore'] - second['similarityScore'], 4)
+        
+        if settings.SELECTION_POLICY_ENABLED:
+            if len(templates) == 1:
+                decision.skip_llm = True
+                decision.rule = self.RULE_SINGLE_TEMPLATE
+            elif decision.margin is not None and decision.margin >= settings.SELECTION_SKIP_MARGIN:
+                decision.skip_llm = True
+                decision.rule = self.RULE_MARGIN
+        
+        logger.info(f"[SelectionPolicy] 类型: {content_type}, 候选: {len(templates)}, 决策: {decision.rule}, "
+                    f"第一名: {decision.top_template_id}, 领先: {decision.margin}")
+        
+        if record:
+            self.record(decision)
+        return decision
+    
+    def record(self, decision: SelectionDecision):
+        """
+        记录决策到计数器和最近决策列表（已有LLM选择结果时同时统计一致性）
+        
+        Args:
+            decision: decide(record=False)返回的决策
+        """
+        get_metrics().increment(f"selection_policy.{decision.rule}")
+        if decision.llm_template_id is not None:
+            self._record_agreement(decision)
+        with self._lock:
+            self._history.append(decision)
+    
+    def record_llm_choice(self, decision: SelectionDecision, template_id: str, record: bool = True):
+        """
+        记录LLM最终选择的模板，统计其与本地第一名是否一致
+        
+        Args:
+            decision: decide返回的决策（未跳过LLM）
+            template_id: LLM选择的模板ID
+            record: 是否立即统计；为False时在调用record时统计
+        """
+        decision.llm_template_id = template_id
+        if record:
+            self._record_agreement(decision)
+    
+    def _record_agreement(self, decision: SelectionDecision):
+        """统计LLM选择与本地第一名是否一致"""
+        if decision.top_template_id is None:
+            return
+        agreed = decision.llm_template_id == decision.top_template_id
+        get_metrics().increment(f"selection_policy.llm_{'agree' if agreed else 'disagree'}")
+    
+    def recent_decisions(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        最近的决策记录（新的在前）
+        
+        Args:
+            limit: 返回条数
+        """
+        with self._lock:
+            history = list(self._history)
+        return [d.to_dict() for d in reversed(history[-limit:])]
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        决策统计：跳过率，以及LLM选择与本地第一名的一致率（用于调整阈值）
+        """
+        metrics = get_metrics()
+        single = metrics.get(f"selection_policy.{self.RULE_SINGLE_TEMPLATE}")
+        margin = metrics.get(f"selection_policy.{self.RULE_MARGIN}")
+        llm = metrics.get(f"selection_policy.{self.RULE_LLM}")
+        total = single + margin + llm
+        agree = metrics.get("selection_policy.llm_agree")
+        disagree = metrics.get("selection_policy.llm_disagree")
+        return {
+            "decisions": total,
+            "skipRate": round((single + margin) / total, 4) if total else 0.0,
+            "skipped": {self.RULE_SINGLE_TEMPLATE: single, self.RULE_MARGIN: margin},
+            "llm": llm,
+            "llmAgreementRate": round(agree / (agree + disagree), 4) if agree + disagree else None,
+            "skipMargin": get_settings().SELECTION_SKIP_MARGIN
+        }
+
+
+# 全局策略实例
+_selection_policy = None
+
+
+def get_selection_policy() -> SelectionPolicy:
+    """获取模板选择策略单例"""
+    global _selection_policy
+    if _selection_policy is None:
+        _selection_policy = SelectionPolicy()
+    return _selection_policy
@@ -0,0 +1,222 @@
+"""
+模板语义相似度（字符n-gram TF-IDF）
+中文文本没有空格分词，\\w+ 会把整段中文当作一个词，几乎不会与模板描述重合；
+这里用字符二元/三元组作为词项，对模板的描述、适用场景和关键词建立TF-IDF向量，
+以余弦相似度衡量用户文本与模板的语义接近程度。
+
+IDF由 scripts/build_semantic_idf.py 离线统计（模板元数据+用户作品文本）并以JSON保存；
+文件不存在时按当前模板目录统计。用户文本的向量按文本缓存最近的结果。
+"""
+import json
+import logging
+import math
+import os
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+from app.config import get_settings
+from app.services.text_profile import normalize
+
+logger = logging.getLogger(__name__)
+
+# 字符n-gram长度范围（含两端）
+SEMANTIC_NGRAM_RANGE = (2, 3)
+
+# 余弦相似度放大系数（模板描述较短，与整段用户文本的余弦值集中在0~0.15，开方后再放大）
+SEMANTIC_SCALE = 2.0
+
+
+def template_semantic_text(template: Dict[str, Any]) -> str:
+    """模板参与语义匹配的文本（描述、适用场景、关键词）"""
+    keywords = template.get('keywords') or []
+    if isinstance(keywords, str):
+        keywords = keywords.split(',')
+    return " ".join([template.get('description') or '', template.get('useCases') or '', *keywords])
+
+
+def ngram_counts(text: str, ngram_range: Tuple[int, int] = SEMANTIC_NGRAM_RANGE) -> Counter:
+    """统计字符n-gram词频（不跨越空白）"""
+    normalized = normalize(text)
+    counts: Counter = Counter()
+    min_n, max_n = ngram_range
+    for n in range(min_n, max_n + 1):
+        for i in range(len(normalized) - n + 1):
+            gram = normalized[i:i + n]
+            if " " not in gram:
+                counts[gram] += 1
+    return counts
+
+
+class SemanticIdf:
+    """n-gram逆文档频率表，同时负责把文本转换为TF-IDF向量"""
+    
+    def __init__(
+        self,
+        idf: Dict[str, float],
+        documents: int,
+        ngram_range: Tuple[int, int] = SEMANTIC_NGRAM_RANGE,
+        meta: Optional[Dict[str, Any]] = None,
+        cache_size: int = 512
+    ):
+        """
+        Args:
+            idf: n-gram -> IDF
+            documents: 统计IDF使用的文档数
+            ngram_range: n-gram长度范围
+            meta: 元信息（构建时间、来源等）
+            cache_size: 用户文本向量的LRU缓存条目数
+        """
+        self.idf = idf
+        self.documents = documents
+        self.ngram_range = tuple(ngram_range)
+        self.meta = meta or {}
+        # 未出现过的n-gram按文档频率为0计算（最稀有）
+        self.default_idf = math.log(1 + documents) + 1.0
+        self.cache_size = cache_size
+        self._vectors: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def fit(cls, documents: Iterable[str], ngram_range: Tuple[int, int] = SEMANTIC_NGRAM_RANGE, **kwargs) -> "SemanticIdf":
+        """
+        统计文档集合的IDF（平滑：ln((1+N)/(1+df))+1）
+        
+        Args:
+            documents: 文档文本
+            ngram_range: n-gram长度范围
+        """
+        document_freq: Counter = Counter()
+        total = 0
+        for document in documents:
+            document_freq.update(ngram_counts(document, ngram_range).keys())
+            total += 1
+        idf = {gram: math.log((1 + total) / (1 + df)) + 1.0 for gram, df in document_freq.items()}
+        return cls(idf, total, ngram_range, **kwargs)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], **kwargs) -> "SemanticIdf":
+        """从JSON数据加载"""
+        return cls(data["idf"], data["documents"], tuple(data.get("ngram_range", SEMANTIC_NGRAM_RANGE)), data.get("meta"), **kwargs)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """导出为可JSON序列化的数据"""
+        return {
+            "meta": self.meta,
+            "ngram_range": list(self.ngram_range),
+            "documents": self.documents,
+            "idf": self.idf
+        }
+    
+    def vectorize(self, text: str) -> Dict[str, float]:
+        """
+        文本的TF-IDF向量（次线性词频，L2归一化）
+        
+        Returns:
+            Dict[str, float]: n-gram -> 权重（按n-gram首次出现的顺序）
+        """
+        weights = {
+            gram: (1.0 + math.log(count)) * self.idf.get(gram, self.default_idf)
+            for gram, count in ngram_counts(text, self.ngram_range).items()
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {gram: w / norm for gram, w in weights.items()}
+    
+    def text_vector(self, text: str) -> Dict[str, float]:
+        """用户文本的TF-IDF向量（按文本缓存，调用方只能读取）"""
+        with self._lock:
+            vector = self._vectors.get(text)
+            if vector is not None:
+                self._vectors.move_to_end(text)
+                return vector
+        
+        vector = self.vectorize(text)
+        with self._lock:
+            self._vectors[text] = vector
+            while len(self._vectors) > self.cache_size:
+                self._vectors.popitem(last=False)
+        return vector
+
+
+def cosine(query: Dict[str, float], vector: Dict[str, float]) -> float:
+    """两个L2归一化向量的余弦相似度（按 vector 的顺序累加）"""
+    return sum(weight * query.get(gram, 0.0) for gram, weight in vector.items())
+
+
+def semantic_score(similarity: float) -> float:
+    """余弦相似度 -> 语义相似度得分"""
+    return min(math.sqrt(similarity) * SEMANTIC_SCALE, 1.0)
+
+
+def build_semantic_idf(documents: Iterable[str], meta: Optional[Dict[str, Any]] = None) -> SemanticIdf:
+    """离线构建IDF表（供 scripts/build_semantic_idf.py 使用）"""
+    idf = SemanticIdf.fit(documents)
+    idf.meta = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "documents": idf.documents,
+        "terms": len(idf.idf),
+        **(meta or {})
+    }
+    return idf
+
+
+# IDF单例：离线文件（按mtime热加载）优先，否则按模板目录统计
+_file_idf: Optional[SemanticIdf] = None
+_file_idf_key: Optional[Tuple[str, Optional[float]]] = None
+_catalog_idf: Optional[Tuple[Any, SemanticIdf]] = None
+_uniform_idf: Optional[SemanticIdf] = None
+_idf_lock = threading.Lock()
+
+
+def get_semantic_idf(catalog: Any = None) -> SemanticIdf:
+    """
+    获取语义相似度使用的IDF表
+    
+    Args:
+        catalog: 模板目录（离线IDF文件不存在时用于统计），默认使用当前已加载的目录
+    """
+    global _file_idf, _file_idf_key, _catalog_idf, _uniform_idf
+    settings = get_settings()
+    cache_size = settings.SEMANTIC_VECTOR_CACHE_SIZE
+    path = settings.SEMANTIC_IDF_PATH
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        mtime = None
+    
+    if mtime is not None:
+        key = (path, mtime)
+        if _file_idf_key != key:
+            with _idf_lock:
+                if _file_idf_key != key:
+                    try:
+                        with open(path, "r", encoding="utf-8") as f:
+                            _file_idf = SemanticIdf.from_dict(json.load(f), cache_size=cache_size)
+                        logger.info(f"[SemanticIndex] 加载IDF - path: {path}, 文档数: {_file_idf.documents}, "
+                                    f"词项数: {len(_file_idf.idf)}")
+                    except Exception as e:
+                        logger.error(f"[SemanticIndex] 加载IDF失败: {e}")
+                        _file_idf = None
+                    _file_idf_key = key
+        if _file_idf is not None:
+            return _file_idf
+    
+    if catalog is None:
+        from app.services.template_catalog import peek_template_catalog
+        catalog = peek_template_catalog()
+    
+    if catalog is None:
+        if _uniform_idf is None:
+            _uniform_idf = SemanticIdf({}, 0, cache_size=cache_size)
+        return _uniform_idf
+    
+    cached = _catalog_idf
+    if cached is None or cached[0] is not catalog:
+        with _idf_lock:
+            cached = _catalog_idf
+            if cached is None or cached[0] is not catalog:
+                idf = SemanticIdf.fit((template_semantic_text(t) for t in catalog.templates), cache_size=cache_size)
+                cached = (catalog, idf)
+                _catalog_idf = cached
+                logger.info(f"[SemanticIndex] 按模板目录统计IDF - 目录版本: {catalog.version}, 词项数: {len(idf.idf)}")
+    return cached[1]
@@ -3,8 +3,22 @@
 计算用户文本与模板的匹配度，用于模板排序
 """
 import logging
-from typing import List, Dict, Any
-import re
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+import numpy as np
+from app.services.keyword_matcher import CATEGORY_KEYWORDS, get_keyword_matcher
+from app.services.template_feature_index import (
+    RELATED_TYPES,
+    TemplateFeatureIndex,
+    ideal_item_range
+)
+from app.services.semantic_index import (
+    SemanticIdf,
+    cosine,
+    get_semantic_idf,
+    semantic_score,
+    template_semantic_text
+)
+from app.services.text_profile import TextProfile, get_text_profile
 
 logger = logging.getLogger(__name__)
 
@@ -15,22 +29,17 @@ class SimilarityService:
     def __init__(self):
         """初始化相似度计算服务"""
         # 分类权重映射
-        self.category_keywords = {
-            'chart': ['数据', '统计', '图表', '增长', '百分比', '比例', '指标', 'KPI'],
-            'comparison': ['对比', '比较', '优劣', 'SWOT', '优势', '劣势', '差异'],
-            'hierarchy': ['层级', '组织', '架构', '分类', '等级', '结构'],
-            'list': ['列表', '步骤', '清单', '要点', '特点', '功能'],
-            'quadrant': ['四象限', '矩阵', '定位', '分布', '维度'],
-            'relation': ['关系', '网络', '关联', '连接', '因果', '流程'],
-            'sequence': ['时间', '流程', '步骤', '阶段', '顺序', '递进']
-        }
+        self.category_keywords = CATEGORY_KEYWORDS
+        # 模板目录对应的特征索引（目录版本变化时重建）
+        self._catalog_index: Optional[Tuple[Any, TemplateFeatureIndex]] = None
     
     def calculate_all_templates_similarity(
         self,
         user_text: str,
         templates: List[Dict[str, Any]],
         content_type: str = None,
-        selected_template_id: str = None
+        selected_template_id: str = None,
+        profile: Optional[TextProfile] = None
     ) -> List[Dict[str, Any]]:
         """
         计算所有模板的相似度并排序
@@ -40,13 +49,20 @@ class SimilarityService:
             templates: 模板列表
             content_type: 识别的内容类型（可选）
             selected_template_id: 选中的模板ID（该模板相似度自动设为100%）
+            profile: 用户文本画像（可选，未提供时按文本获取）
         
         Returns:
             List[Dict]: 带相似度的模板列表，按相似度降序排列
         """
         template_scores = []
+        if not templates:
+            return template_scores
         
-        for template in templates:
+        # 一次向量运算为所有模板打分
+        index, rows = self._get_feature_index(templates)
+        scores = index.score(profile or get_text_profile(user_text), content_type)[rows]
+        
+        for template, score in zip(templates, scores.tolist()):
             template_id = template.get('id')
             
             # 选中的模板相似度固定为100%
@@ -54,12 +70,7 @@ class SimilarityService:
                 similarity_score = 1.0
                 reason = "AI推荐模板" if content_type else "用户选择的模板"
             else:
-                # 计算相似度
-                similarity_score = self._calculate_similarity(
-                    user_text=user_text,
-                    template=template,
-                    content_type=content_type
-                )
+                similarity_score = score
                 reason = self._generate_reason(
                     template=template,
                     similarity_score=similarity_score,
@@ -79,14 +90,37 @@ class SimilarityService:
         
         return template_scores
     
+    def _get_feature_index(self, templates: Sequence[Dict[str, Any]]) -> Tuple[TemplateFeatureIndex, np.ndarray]:
+        """
+        获取模板特征索引及模板对应的行号
+        
+        模板来自当前模板目录时复用按目录版本（及IDF表）构建的索引，否则为这批模板临时构建索引
+        """
+        from app.services.template_catalog import peek_template_catalog
+        
+        catalog = peek_template_catalog()
+        idf = get_semantic_idf(catalog)
+        if catalog is not None:
+            cached = self._catalog_index
+            if cached is None or cached[0] is not catalog or cached[1].idf is not idf:
+                matcher = get_keyword_matcher(catalog) if self.category_keywords is CATEGORY_KEYWORDS else None
+                cached = (catalog, TemplateFeatureIndex(catalog.templates, self.category_keywords, matcher, idf))
+                self._catalog_index = cached
+                logger.info(f"[SimilarityService] 构建模板特征索引 - 目录版本: {catalog.version}, 模板数: {len(catalog)}")
+            if cached[1].covers(templates):
+                return cached[1], cached[1].row_indices(templates)
+        
+        return TemplateFeatureIndex(templates, self.category_keywords, idf=idf), np.arange(len(templates))
+    
     def _calculate_similarity(
         self,
         user_text: str,
         template: Dict[str, Any],
-        content_type: str = None
+        content_type: str = None,
+        profile: Optional[TextProfile] = None
     ) -> float:
         """
-        计算单个模板的相似度
+        计算单个模板的相似度（逐模板实现，批量打分见 TemplateFeatureIndex.score）
         
         维度：
         - 类型匹配度：30%
@@ -94,17 +128,19 @@ class SimilarityService:
         - 语义相似度：25%
         - 结构匹配度：20%
         """
+        profile = profile or get_text_profile(user_text)
+        
         # 1. 类型匹配度（30%）
         type_score = self._calculate_type_match(template, content_type)
         
         # 2. 关键词相似度（25%）
-        keyword_score = self._calculate_keyword_similarity(user_text, template)
+        keyword_score = self._calculate_keyword_similarity(profile, template)
         
         # 3. 语义相似度（25%）
-        semantic_score = self._calculate_semantic_similarity(user_text, template)
+        semantic_score = self._calculate_semantic_similarity(profile, template)
         
         # 4. 结构匹配度（20%）
-        structure_score = self._calculate_structure_match(user_text, template)
+        structure_score = self._calculate_structure_match(profile, template)
         
         # 综合得分
         final_score = (
@@ -132,29 +168,17 @@ class SimilarityService:
             return 1.0
         
         # 部分匹配（相关分类）
-        related_types = {
-            'list': ['sequence', 'hierarchy'],
-            'sequence': ['list', 'relation'],
-            'hierarchy': ['list', 'relation'],
-            'comparison': ['quadrant'],
-            'quadrant': ['comparison'],
-            'relation': ['sequence', 'hierarchy'],
-            'chart': []
-        }
-        
-        if template_category in related_types.get(content_type, []):
+        if template_category in RELATED_TYPES.get(content_type, []):
             return 0.6
         
         return 0.3
     
     def _calculate_keyword_similarity(
         self,
-        user_text: str,
+        profile: TextProfile,
         template: Dict[str, Any]
     ) -> float:
         """计算关键词相似度"""
-        user_text_lower = user_text.lower()
-        
         # 模板标签
         template_tags = template.get('tags', [])
         if not template_tags:
@@ -172,72 +196,51 @@ class SimilarityService:
             return 0.5
         
         for tag in template_tags:
-            if tag.lower() in user_text_lower:
+            if tag.lower() in profile.lower:
                 matched_count += 1
         
         for keyword in category_keywords:
-            if keyword in user_text:
+            if keyword in profile.text:
                 matched_count += 1
         
         return min(matched_count / total_keywords, 1.0)
     
     def _calculate_semantic_similarity(
         self,
-        user_text: str,
-        template: Dict[str, Any]
+        profile: TextProfile,
+        template: Dict[str, Any],
+        idf: Optional[SemanticIdf] = None
     ) -> float:
         """
         计算语义相似度
-        基于模板描述和适用场景与用户文本的匹配
+        基于模板描述、适用场景和关键词与用户文本的字符n-gram TF-IDF余弦相似度
         """
-        description = template.get('description', '')
-        use_cases = template.get('useCases', '')
-        
-        # 简单基于关键词重合的语义相似度
-        template_text = f"{description} {use_cases}".lower()
-        user_text_lower = user_text.lower()
+        idf = idf or get_semantic_idf()
+        template_vector = idf.vectorize(template_semantic_text(template))
         
-        # 提取用户文本中的关键词（简单分词）
-        user_words = set(re.findall(r'\w+', user_text_lower))
-        template_words = set(re.findall(r'\w+', template_text))
-        
-        if not template_words:
+        if not template_vector:
             return 0.5
         
-        # 计算交集
-        common_words = user_words & template_words
-        similarity = len(common_words) / max(len(template_words), 1)
-        
-        return min(similarity * 2, 1.0)  # 放大系数
+        # 用户文本的向量按文本缓存
+        return semantic_score(cosine(idf.text_vector(profile.text), template_vector))
     
     def _calculate_structure_match(
         self,
-        user_text: str,
+        profile: TextProfile,
         template: Dict[str, Any]
     ) -> float:
         """
         计算结构匹配度
         基于文本中的数据项数量与模板适合的数据规模
         """
-        # 检测文本中的数据项数量
-        item_count = self._estimate_item_count(user_text)
+        # 文本中的数据项数量（画像中已估计）
+        item_count = profile.item_count
         
         # 根据模板ID判断适合的数据规模
         template_id = template.get('id', '')
         
-        # 定义模板适合的数据项范围
-        if 'row' in template_id or 'column' in template_id:
-            ideal_range = (2, 4)
-        elif 'grid' in template_id:
-            ideal_range = (4, 9)
-        elif 'list' in template_id:
-            ideal_range = (3, 10)
-        elif 'steps' in template_id or 'timeline' in template_id:
-            ideal_range = (3, 7)
-        elif 'pyramid' in template_id or 'hierarchy' in template_id:
-            ideal_range = (3, 6)
-        else:
-            ideal_range = (2, 8)
+        # 模板适合的数据项范围
+        ideal_range = ideal_item_range(template_id)
         
         # 计算匹配度
         min_items, max_items = ideal_range
@@ -249,28 +252,6 @@ class SimilarityService:
         else:
             return 0.5 + (max_items / item_count) * 0.5
     
-    def _estimate_item_count(self, user_text: str) -> int:
-        """估计文本中的数据项数量"""
-        # 检测常见的列表标识符
-        patterns = [
-            r'\d+[.、．]',  # 1. 2. 3. 或 1、2、3、
-            r'[一二三四五六七八九十]+[.、．]',  # 一、二、三、
-            r'第[一二三四五六七八九十\d]+',  # 第一、第二
-            r'[\n；;]+',  # 换行或分号分隔
-        ]
-        
-        max_count = 0
-        for pattern in patterns:
-            matches = re.findall(pattern, user_text)
-            max_count = max(max_count, len(matches))
-        
-        # 如果没有明显的列表标识，按逗号、顿号分割
-        if max_count == 0:
-            separators = user_text.count('、') + user_text.count('，')
-            max_count = max(separators + 1, 3)
-        
-        return min(max_count, 20)  # 限制最大值
-    
     def _generate_reason(
         self,
         template: Dict[str, Any],
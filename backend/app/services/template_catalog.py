@@ -0,0 +1,375 @@
+"""
+进程内模板目录
+一次性加载所有启用的模板并预先序列化为字典，按ID、分类、structure类型建立索引，
+模板查询变为内存字典查找，不再为每个请求打开数据库会话。
+
+失效机制：数据库中的 catalog_version 表保存目录版本号，导入/修复脚本修改模板后调用
+bump_catalog_version() 递增版本号；服务进程中由后台任务每隔 CATALOG_VERSION_CHECK_INTERVAL
+通过异步会话读取版本号，发现变化时重新加载，请求处理中只读取内存中的目录，不访问数据库
+（未启动后台任务时，如脚本中，get() 按间隔节流同步检查）。
+版本表由 init_db 和应用启动时创建（ensure_catalog_version），SQLite下还会在templates表上创建触发器，
+直接用sqlite3修改模板的脚本同样会递增版本号。
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+import orjson
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# templates表上的触发器：任何插入/更新/删除都会递增目录版本号
+_SQLITE_TRIGGERS = {
+    "trg_templates_catalog_insert": "AFTER INSERT",
+    "trg_templates_catalog_update": "AFTER UPDATE",
+    "trg_templates_catalog_delete": "AFTER DELETE",
+}
+
+# 后台检查版本号的最小间隔（秒，CATALOG_VERSION_CHECK_INTERVAL为0时使用）
+_MIN_REFRESH_INTERVAL = 0.5
+
+
+def ensure_catalog_version(db: Session):
+    """
+    确保版本表及其唯一一行存在，SQLite下同时创建templates表的触发器
+    
+    在 init_db、应用启动和递增版本号时调用，读取目录时不再执行DDL
+    """
+    from app.models.catalog_version import CatalogVersion
+    bind = db.get_bind()
+    CatalogVersion.__table__.create(bind=bind, checkfirst=True)
+    if db.execute(text("SELECT 1 FROM catalog_version WHERE id = 1")).first() is None:
+        db.execute(text("INSERT INTO catalog_version (id, version, updated_at) VALUES (1, 0, CURRENT_TIMESTAMP)"))
+    db.commit()
+    
+    if bind.dialect.name == "sqlite":
+        try:
+            for name, timing in _SQLITE_TRIGGERS.items():
+                db.execute(text(
+                    f"CREATE TRIGGER IF NOT EXISTS {name} {timing} ON templates "
+                    f"BEGIN UPDATE catalog_version SET version = version + 1 WHERE id = 1; END"
+                ))
+            db.commit()
+        except Exception as e:
+            # templates表尚未创建时忽略，init_db建表后再创建
+            db.rollback()
+            logger.warning(f"[TemplateCatalog] 创建模板触发器失败: {e}")
+
+
+# 模板字典的全部字段（与 Template.to_dict() 一致），可用于字段投影
+TEMPLATE_FIELDS = (
+    "id", "name", "category", "structureType", "description", "keywords", "useCases", "previewUrl",
+    "dataSchema", "designConfig", "tags", "sortOrder", "isActive", "createdAt", "updatedAt"
+)
+# 摘要视图字段：模板库列表展示所需，不含体积较大的dataSchema和designConfig
+SUMMARY_FIELDS = ("id", "name", "category", "description", "useCases", "tags", "previewUrl")
+
+
+class TemplateCatalog:
+    """
+    不可变的模板目录快照
+    
+    模板字典在所有请求之间共享，调用方只能读取，需要修改时请先复制
+    """
+    
+    def __init__(self, version: int, templates: List[Dict[str, Any]]):
+        """
+        构建目录及索引
+        
+        Args:
+            version: 目录版本号
+            templates: 启用的模板字典（Template.to_dict()），按 sort_order 降序、created_at 降序排列
+        """
+        self.version = version
+        self.loaded_at = time.time()
+        self.templates: Tuple[Dict[str, Any], ...] = tuple(templates)
+        # 内容指纹：各进程加载同一份模板时相同，数据库重建后版本号重新计数也不会与旧内容混淆
+        self.fingerprint = hashlib.blake2b(orjson.dumps(self.templates), digest_size=6).hexdigest()
+        
+        by_category: Dict[str, List[Dict[str, Any]]] = {}
+        by_structure_type: Dict[str, List[Dict[str, Any]]] = {}
+        for template in self.templates:
+            by_category.setdefault(template["category"], []).append(template)
+            if template.get("structureType"):
+                by_structure_type.setdefault(template["structureType"], []).append(template)
+        
+        self.by_id: Mapping[str, Dict[str, Any]] = MappingProxyType({t["id"]: t for t in self.templates})
+        self.by_category: Mapping[str, Tuple[Dict[str, Any], ...]] = MappingProxyType(
+            {category: tuple(items) for category, items in by_category.items()}
+        )
+        self.by_structure_type: Mapping[str, Tuple[Dict[str, Any], ...]] = MappingProxyType(
+            {structure_type: tuple(items) for structure_type, items in by_structure_type.items()}
+        )
+        self.category_counts: Mapping[str, int] = MappingProxyType(
+            {category: len(items) for category, items in by_category.items()}
+        )
+        # 预先构建的摘要视图（同样共享只读）
+        self.summaries: Mapping[str, Dict[str, Any]] = MappingProxyType(
+            {t["id"]: {field: t.get(field) for field in SUMMARY_FIELDS} for t in self.templates}
+        )
+        
+        # 关键词搜索字段（名称、描述、适用场景、关键词、标签），预先转小写
+        self._search_text: Tuple[str, ...] = tuple(
+            "\n".join([
+                *(t.get(field) or "" for field in ("name", "description", "useCases")),
+                *(t.get("keywords") or []),
+                *(t.get("tags") or [])
+            ]).casefold()
+            for t in self.templates
+        )
+    
+    def __len__(self) -> int:
+        return len(self.templates)
+    
+    def get(self, template_id: str) -> Optional[Dict[str, Any]]:
+        """根据ID获取模板，未找到时返回None"""
+        return self.by_id.get(template_id)
+    
+    def project(self, template: Dict[str, Any], fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+        """
+        按字段投影模板
+        
+        Args:
+            template: 模板字典
+            fields: 返回的字段，None表示全部字段；摘要视图（SUMMARY_FIELDS）直接返回预先构建的摘要
+        
+        Returns:
+            Dict: 投影后的模板（可能与目录共享，调用方只能读取）
+        """
+        if fields is None:
+            return template
+        if fields == SUMMARY_FIELDS:
+            summary = self.summaries.get(template.get("id"))
+            if summary is not None:
+                return summary
+        return {field: template.get(field) for field in fields}
+    
+    def filter(self, category: Optional[str] = None, keyword: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        按分类和关键词筛选模板（保持目录顺序）
+        
+        Args:
+            category: 分类筛选
+            keyword: 搜索关键词（匹配名称、描述、适用场景、关键词、标签，不区分大小写）
+        
+        Returns:
+            List[Dict]: 匹配的模板
+        """
+        if not keyword:
+            return list(self.by_category.get(category, ()) if category else self.templates)
+        
+        needle = keyword.casefold()
+        return [
+            template for template, haystack in zip(self.templates, self._search_text)
+            if needle in haystack and (not category or template["category"] == category)
+        ]
+
+
+class TemplateCatalogProvider:
+    """模板目录提供者：负责加载目录、检查版本号并在版本变化时重新加载"""
+    
+    def __init__(self, session_factory: Callable[[], Session]):
+        """
+        初始化提供者
+        
+        Args:
+            session_factory: 数据库会话工厂
+        """
+        self._session_factory = session_factory
+        self._catalog: Optional[TemplateCatalog] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._refresh_task: Optional["asyncio.Task[None]"] = None
+    
+    @property
+    def refreshing(self) -> bool:
+        """后台任务是否正在检查版本号"""
+        return self._refresh_task is not None and not self._refresh_task.done()
+    
+    def get(self) -> TemplateCatalog:
+        """
+        获取当前模板目录
+        
+        后台任务运行时直接返回内存中的目录；否则按 CATALOG_VERSION_CHECK_INTERVAL 节流同步检查版本号
+        （0表示每次都检查），版本变化时重新加载。尚未加载时同步加载
+        """
+        catalog = self._catalog
+        now = time.monotonic()
+        if catalog is not None and (
+            self.refreshing or now - self._last_check < get_settings().CATALOG_VERSION_CHECK_INTERVAL
+        ):
+            return catalog
+        
+        with self._lock:
+            catalog = self._catalog
+            if catalog is not None and now - self._last_check < get_settings().CATALOG_VERSION_CHECK_INTERVAL:
+                return catalog
+            
+            db = self._session_factory()
+            try:
+                version = self._read_version(db)
+                if catalog is None or catalog.version != version:
+                    catalog = self._load(db, version)
+                    self._catalog = catalog
+            finally:
+                db.close()
+            self._last_check = time.monotonic()
+            return catalog
+    
+    async def refresh(self, session_factory: Callable[[], AsyncSession]) -> TemplateCatalog:
+        """
+        通过异步会话检查版本号，版本变化（或尚未加载）时重新加载
+        
+        Args:
+            session_factory: 异步Session工厂
+        
+        Returns:
+            TemplateCatalog: 当前目录
+        """
+        async with session_factory() as db:
+            version = await db.run_sync(self._read_version)
+            catalog = self._catalog
+            if catalog is None or catalog.version != version:
+                catalog = await db.run_sync(self._load, version)
+                self._catalog = catalog
+        self._last_check = time.monotonic()
+        return catalog
+    
+    def start_refresh(self, session_factory: Callable[[], AsyncSession]):
+        """
+        启动后台版本检查任务（需在事件循环中调用）
+        
+        Args:
+            session_factory: 异步Session工厂
+        """
+        if not self.refreshing:
+            self._refresh_task = asyncio.create_task(self._refresh_loop(session_factory))
+    
+    async def stop_refresh(self):
+        """停止后台版本检查任务"""
+        task, self._refresh_task = self._refresh_task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    
+    async def _refresh_loop(self, session_factory: Callable[[], AsyncSession]):
+        """每隔 CATALOG_VERSION_CHECK_INTERVAL 检查一次版本号"""
+        while True:
+            await asyncio.sleep(max(get_settings().CATALOG_VERSION_CHECK_INTERVAL, _MIN_REFRESH_INTERVAL))
+            try:
+                await self.refresh(session_factory)
+            except Exception as e:
+                logger.warning(f"[TemplateCatalog] 检查目录版本号失败: {e}")
+    
+    def peek(self) -> Optional[TemplateCatalog]:
+        """当前已加载的目录（不检查版本号，也不访问数据库），尚未加载时返回None"""
+        return self._catalog
+    
+    def invalidate(self):
+        """丢弃当前目录，下次访问时重新加载"""
+        with self._lock:
+            self._catalog = None
+    
+    def bump(self) -> int:
+        """
+        递增目录版本号（所有进程会在下次版本检查时重新加载），并失效本进程的目录
+        
+        Returns:
+            int: 新的版本号
+        """
+        db = self._session_factory()
+        try:
+            ensure_catalog_version(db)
+            db.execute(text(
+                "UPDATE catalog_version SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1"
+            ))
+            db.commit()
+            version = self._read_version(db)
+        finally:
+            db.close()
+        self.invalidate()
+        logger.info(f"[TemplateCatalog] 目录版本号已递增: {version}")
+        return version
+    
+    def _read_version(self, db: Session) -> int:
+        """读取目录版本号（版本表由 ensure_catalog_version 创建）"""
+        return db.execute(text("SELECT version FROM catalog_version WHERE id = 1")).scalar() or 0
+    
+    def _load(self, db: Session, version: int) -> TemplateCatalog:
+        """从数据库加载所有启用的模板"""
+        from app.models.template import Template
+        
+        start = time.perf_counter()
+        rows = db.query(Template).filter(Template.is_active == True).order_by(
+            Template.sort_order.desc(),
+            Template.created_at.desc()
+        ).all()
+        catalog = TemplateCatalog(version, [row.to_dict() for row in rows])
+        logger.info(f"[TemplateCatalog] 加载模板目录 - 版本: {version}, 模板数: {len(catalog)}, "
+                    f"耗时: {(time.perf_counter() - start) * 1000:.1f}ms")
+        return catalog
+
+
+# 全局目录提供者
+_catalog_provider: Optional[TemplateCatalogProvider] = None
+
+
+def _get_provider() -> TemplateCatalogProvider:
+    """获取目录提供者单例"""
+    global _catalog_provider
+    if _catalog_provider is None:
+        from app.utils.db import SessionLocal
+        _catalog_provider = TemplateCatalogProvider(SessionLocal)
+    return _catalog_provider
+
+
+def get_template_catalog() -> TemplateCatalog:
+    """获取当前模板目录"""
+    return _get_provider().get()
+
+
+def peek_template_catalog() -> Optional[TemplateCatalog]:
+    """当前已加载的模板目录，尚未加载时返回None"""
+    return _get_provider().peek()
+
+
+def invalidate_template_catalog():
+    """失效本进程的模板目录"""
+    _get_provider().invalidate()
+
+
+async def start_catalog_refresh():
+    """加载模板目录并启动后台版本检查（应用启动时调用），加载失败时记录日志，首次访问时再同步加载"""
+    from app.utils.db import get_async_session_factory
+    provider = _get_provider()
+    factory = get_async_session_factory()
+    try:
+        await provider.refresh(factory)
+    except Exception as e:
+        logger.warning(f"[TemplateCatalog] 预加载模板目录失败: {e}")
+    provider.start_refresh(factory)
+
+
+async def stop_catalog_refresh():
+    """停止后台版本检查（应用关闭时调用）"""
+    if _catalog_provider is not None:
+        await _catalog_provider.stop_refresh()
+
+
+def bump_catalog_version() -> int:
+    """
+    递增模板目录版本号
+    
+    修改templates表的脚本在提交后调用，所有运行中的服务进程会在下次版本检查时重新加载目录
+    
+    Returns:
+        int: 新的版本号
+    """
+    return _get_provider().bump()
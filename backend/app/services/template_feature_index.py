@@ -0,0 +1,215 @@
+"""
+模板特征索引
+预先提取每个模板的相似度特征（分类、标签/分类关键词、描述分词、适合的数据项范围），
+以NumPy数组（稀疏部分为COO形式的行/列数组）保存，一次查询用少量向量运算为所有模板打分。
+标签和分类关键词的命中来自关键词匹配器（Aho-Corasick自动机）对用户文本的一次扫描，
+语义相似度为字符n-gram TF-IDF向量的稀疏点积。
+
+评分规则与 SimilarityService 的逐模板实现一致（结果在浮点误差范围内相同）：
+- 类型匹配度 30%、关键词相似度 25%、语义相似度 25%、结构匹配度 20%
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from app.services.keyword_matcher import (
+    CATEGORY_KEYWORDS,
+    GROUP_TAG,
+    KeywordMatcher,
+    build_keyword_matcher,
+    category_group
+)
+from app.services.semantic_index import (
+    SEMANTIC_SCALE,
+    SemanticIdf,
+    get_semantic_idf,
+    template_semantic_text
+)
+from app.services.text_profile import TextProfile
+
+# 相关分类（部分匹配）
+RELATED_TYPES = {
+    'list': ['sequence', 'hierarchy'],
+    'sequence': ['list', 'relation'],
+    'hierarchy': ['list', 'relation'],
+    'comparison': ['quadrant'],
+    'quadrant': ['comparison'],
+    'relation': ['sequence', 'hierarchy'],
+    'chart': []
+}
+
+# 模板ID片段 -> 适合的数据项范围（按顺序匹配第一个）
+IDEAL_RANGE_RULES: List[Tuple[Tuple[str, ...], Tuple[int, int]]] = [
+    (('row', 'column'), (2, 4)),
+    (('grid',), (4, 9)),
+    (('list',), (3, 10)),
+    (('steps', 'timeline'), (3, 7)),
+    (('pyramid', 'hierarchy'), (3, 6)),
+]
+DEFAULT_IDEAL_RANGE = (2, 8)
+
+
+def ideal_item_range(template_id: str) -> Tuple[int, int]:
+    """根据模板ID判断适合的数据项范围"""
+    for fragments, ideal_range in IDEAL_RANGE_RULES:
+        if any(fragment in template_id for fragment in fragments):
+            return ideal_range
+    return DEFAULT_IDEAL_RANGE
+
+
+class TemplateFeatureIndex:
+    """模板特征索引（构建后只读）"""
+    
+    def __init__(
+        self,
+        templates: Sequence[Dict[str, Any]],
+        category_keywords: Optional[Dict[str, List[str]]] = None,
+        matcher: Optional[KeywordMatcher] = None,
+        idf: Optional[SemanticIdf] = None
+    ):
+        """
+        提取模板特征
+        
+        Args:
+            templates: 模板字典列表
+            category_keywords: 分类关键词，默认使用 CATEGORY_KEYWORDS
+            matcher: 包含这批模板标签与分类关键词规则的关键词匹配器，默认为这批模板构建
+            idf: 语义相似度使用的IDF表，默认使用 get_semantic_idf()
+        """
+        category_keywords = CATEGORY_KEYWORDS if category_keywords is None else category_keywords
+        self.matcher = matcher or build_keyword_matcher(templates, category_keywords)
+        self.idf = idf or get_semantic_idf()
+        self.templates = tuple(templates)
+        self.size = len(self.templates)
+        self.rows: Dict[str, int] = {}
+        
+        categories: Dict[str, int] = {}
+        category_codes = []
+        # 关键词：标签不区分大小写，分类关键词区分大小写（保留重复项以保持计数一致），列为匹配器中的关键词条目ID；
+        # 空关键词总是命中，直接计入
+        keyword_rows, keyword_entries = [], []
+        always_matched = []
+        keyword_totals = []
+        # 语义：描述+适用场景+关键词的TF-IDF向量
+        gram_vocab: Dict[str, int] = {}
+        gram_rows, gram_cols, gram_weights = [], [], []
+        gram_counts = []
+        ranges = []
+        
+        for row, template in enumerate(self.templates):
+            template_id = template.get('id', '')
+            self.rows.setdefault(template_id, row)
+            
+            category = template.get('category', '')
+            category_codes.append(categories.setdefault(category, len(categories)))
+            
+            tags = template.get('tags', []) or []
+            keywords = category_keywords.get(category, [])
+            rules = [(GROUP_TAG, tag.lower()) for tag in tags]
+            rules.extend((category_group(category), keyword) for keyword in keywords)
+            for group, keyword in rules:
+                if keyword:
+                    keyword_rows.append(row)
+                    keyword_entries.append(self.matcher.groups[group][keyword])
+            always_matched.append(sum(1 for _, keyword in rules if not keyword))
+            keyword_totals.append(len(rules))
+            
+            vector = self.idf.vectorize(template_semantic_text(template))
+            for gram, weight in vector.items():
+                gram_rows.append(row)
+                gram_cols.append(gram_vocab.setdefault(gram, len(gram_vocab)))
+                gram_weights.append(weight)
+            gram_counts.append(len(vector))
+            
+            ranges.append(ideal_item_range(template_id))
+        
+        self.categories = categories
+        self.category_codes = np.asarray(category_codes, dtype=np.int32)
+        self.related_types = RELATED_TYPES
+        
+        self.keyword_rows = np.asarray(keyword_rows, dtype=np.int32)
+        self.keyword_entries = np.asarray(keyword_entries, dtype=np.int32)
+        self.always_matched = np.asarray(always_matched, dtype=np.float64)
+        self.keyword_totals = np.asarray(keyword_totals, dtype=np.float64)
+        
+        self.gram_vocab = gram_vocab
+        self.gram_rows = np.asarray(gram_rows, dtype=np.int32)
+        self.gram_cols = np.asarray(gram_cols, dtype=np.int32)
+        self.gram_weights = np.asarray(gram_weights, dtype=np.float64)
+        self.gram_counts = np.asarray(gram_counts, dtype=np.int32)
+        
+        range_array = np.asarray(ranges, dtype=np.float64).reshape(-1, 2)
+        self.min_items = range_array[:, 0]
+        self.max_items = range_array[:, 1]
+    
+    def covers(self, templates: Sequence[Dict[str, Any]]) -> bool:
+        """判断模板列表是否都是索引中的同一批模板对象"""
+        for template in templates:
+            row = self.rows.get(template.get('id'))
+            if row is None or self.templates[row] is not template:
+                return False
+        return True
+    
+    def row_indices(self, templates: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """模板列表在索引中的行号"""
+        return np.fromiter((self.rows[t.get('id')] for t in templates), dtype=np.int64, count=len(templates))
+    
+    def type_scores(self, content_type: Optional[str]) -> np.ndarray:
+        """类型匹配度"""
+        if not content_type:
+            return np.full(self.size, 0.5)
+        by_category = np.full(len(self.categories), 0.3)
+        for category, code in self.categories.items():
+            if category == content_type:
+                by_category[code] = 1.0
+            elif category in self.related_types.get(content_type, []):
+                by_category[code] = 0.6
+        return by_category[self.category_codes]
+    
+    def keyword_scores(self, profile: TextProfile) -> np.ndarray:
+        """关键词相似度"""
+        hits = np.zeros(self.matcher.size)
+        hits[list(profile.keyword_hits(self.matcher).positions)] = 1.0
+        
+        matched = np.bincount(self.keyword_rows, weights=hits[self.keyword_entries], minlength=self.size)
+        matched += self.always_matched
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.minimum(matched / self.keyword_totals, 1.0)
+        return np.where(self.keyword_totals == 0, 0.5, scores)
+    
+    def semantic_scores(self, profile: TextProfile) -> np.ndarray:
+        """语义相似度（用户文本与模板TF-IDF向量的余弦相似度）"""
+        query = np.zeros(len(self.gram_vocab))
+        for gram, weight in self.idf.text_vector(profile.text).items():
+            col = self.gram_vocab.get(gram)
+            if col is not None:
+                query[col] = weight
+        
+        similarity = np.bincount(self.gram_rows, weights=self.gram_weights * query[self.gram_cols], minlength=self.size)
+        return np.where(self.gram_counts == 0, 0.5, np.minimum(np.sqrt(similarity) * SEMANTIC_SCALE, 1.0))
+    
+    def structure_scores(self, item_count: int) -> np.ndarray:
+        """结构匹配度（数据项数量与模板适合范围的匹配）"""
+        in_range = (self.min_items <= item_count) & (item_count <= self.max_items)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            below = 0.5 + (item_count / self.min_items) * 0.5
+            above = 0.5 + (self.max_items / item_count) * 0.5
+        return np.where(in_range, 1.0, np.where(item_count < self.min_items, below, above))
+    
+    def score(self, profile: TextProfile, content_type: Optional[str]) -> np.ndarray:
+        """
+        为索引中的所有模板打分
+        
+        Args:
+            profile: 用户文本画像
+            content_type: 识别的内容类型（可选）
+        
+        Returns:
+            np.ndarray: 每个模板的综合得分（与模板顺序一致）
+        """
+        final_scores = (
+            self.type_scores(content_type) * 0.3 +
+            self.keyword_scores(profile) * 0.25 +
+            self.semantic_scores(profile) * 0.25 +
+            self.structure_scores(profile.item_count) * 0.2
+        )
+        return np.minimum(final_scores, 1.0)
@@ -4,30 +4,45 @@
 """
 import json
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from app.services.llm_client import get_llm_client
 from app.utils.prompt_manager import get_prompt_manager
 from app.services.template_service import get_template_service
+from app.services.type_classification_service import get_type_classification_service
+from app.services.text_profile import TextProfile
 
 logger = logging.getLogger(__name__)
 
+# 类型识别结果与模板分类代码不一致时的映射（类型relationship对应模板分类relation）
+TYPE_TO_CATEGORY = {"relationship": "relation"}
+
 
 class TemplateSelectionService:
     """模板选择服务类"""
     
     def __init__(self):
         """初始化服务"""
-        self.llm_client = get_llm_client()
         self.prompt_manager = get_prompt_manager()
         self.template_service = get_template_service()
     
-    async def select(self, user_text: str, content_type: str) -> Dict[str, Any]:
+    @property
+    def llm_client(self):
+        """当前配置快照对应的LLM客户端（配置热更新后自动切换）"""
+        return get_llm_client()
+    
+    async def select(
+        self,
+        user_text: str,
+        content_type: str,
+        profile: Optional[TextProfile] = None
+    ) -> Dict[str, Any]:
         """
         从指定类型的模板中选择最合适的一个
         
         Args:
             user_text: 用户输入的文本
             content_type: 内容类型 (chart/comparison/hierarchy/list/quadrant/relationship/sequence)
+            profile: 用户文本画像（可选）
         
         Returns:
             Dict: {
@@ -44,19 +59,13 @@ class TemplateSelectionService:
             logger.info(f"[TemplateSelection] 开始选择模板 - 类型: {content_type}, 文本长度: {len(user_text)}")
             
             # 获取该类型的所有模板
-            templates = self.template_service.get_templates_by_category(content_type)
-            
-            if not templates:
-                logger.warning(f"[TemplateSelection] 未找到类型为 {content_type} 的模板，使用所有模板")
-                # 如果没有该类型的模板，使用所有模板
-                result = self.template_service.get_all_templates(page=1, page_size=100)
-                templates = result.get("templates", [])
+            templates = self.get_candidate_templates(content_type)
             
             logger.info(f"[TemplateSelection] 找到 {len(templates)} 个候选模板")
             
             # 获取提示词
             system_prompt, user_prompt, temperature, model = \
-                self.prompt_manager.get_template_selection_prompt(user_text, content_type, templates)
+                self.prompt_manager.get_template_selection_prompt(user_text, content_type, templates, profile)
             
             logger.info(f"[TemplateSelection] system_prompt长度: {len(system_prompt)}, "
                        f"user_prompt长度: {len(user_prompt)}, temperature: {temperature}")
@@ -71,7 +80,8 @@ class TemplateSelectionService:
             response = await self.llm_client.chat_completion(
                 messages=messages,
                 model=model,
-                temperature=temperature
+                temperature=temperature,
+                validate=lambda content: self._validate_result(self._parse_response(content), templates)
             )
             
             logger.info(f"[TemplateSelection] LLM原始响应: {response[:200]}...")
@@ -86,7 +96,7 @@ class TemplateSelectionService:
                        f"置信度: {result['confidence']}")
             
             return result
-            
+        
         except json.JSONDecodeError as e:
             logger.error(f"[TemplateSelection] JSON解析失败: {e}, 原始响应: {response}")
             raise Exception("AI返回格式错误，请重试")
@@ -94,6 +104,108 @@ class TemplateSelectionService:
             logger.error(f"[TemplateSelection] 选择失败: {e}")
             raise
     
+    def get_candidate_templates(self, content_type: str) -> List[Dict[str, Any]]:
+        """
+        获取类型对应分类下的候选模板
+        
+        Args:
+            content_type: 内容类型（类型识别结果）
+        
+        Returns:
+            List[Dict]: 候选模板列表，该分类没有模板时为所有模板
+        """
+        category = TYPE_TO_CATEGORY.get(content_type, content_type)
+        templates = self.template_service.get_templates_by_category(category)
+        if not templates:
+            logger.warning(f"[TemplateSelection] 未找到类型为 {content_type} 的模板，使用所有模板")
+            # 如果没有该类型的模板，使用所有模板
+            result = self.template_service.get_all_templates(page=1, page_size=100)
+            templates = result.get("templates", [])
+        return templates
+    
+    async def classify_and_select(self, user_text: str, profile: Optional[TextProfile] = None) -> Dict[str, Any]:
+        """
+        一次LLM调用同时完成类型识别和模板选择（fast模式）
+        
+        结果按严格模式校验，任何字段不合法、或模板不属于识别出的类型时抛出异常，由调用方回退到两阶段流程
+        
+        Args:
+            user_text: 用户输入的文本
+            profile: 用户文本画像（可选）
+        
+        Returns:
+            Dict: {
+                "classification": {"type", "confidence", "reason"},
+                "selection": {"templateId", "templateName", "confidence", "reason"}
+            }
+        
+        Raises:
+            Exception: 调用失败或结果校验不通过时抛出异常
+        """
+        logger.info(f"[TemplateSelection] 合并识别与选择 - 文本长度: {len(user_text)}")
+        
+        templates = self.template_service.get_all_templates(page=1, page_size=100).get("templates", [])
+        
+        system_prompt, user_prompt, temperature, model = \
+            self.prompt_manager.get_fused_selection_prompt(user_text, templates, profile)
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        
+        response = await self.llm_client.chat_completion(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            validate=self._parse_fused_response
+        )
+        
+        logger.info(f"[TemplateSelection] 合并调用LLM原始响应: {response[:200]}...")
+        
+        fused = self._parse_fused_response(response)
+        
+        logger.info(f"[TemplateSelection] 合并调用成功 - 类型: {fused['classification']['type']}, "
+                   f"模板: {fused['selection']['templateId']}")
+        
+        return fused
+    
+    def _parse_fused_response(self, response: str) -> Dict[str, Any]:
+        """
+        解析并严格校验合并调用的响应
+        
+        模板ID必须属于识别出的类型对应分类（与两阶段流程的候选模板相同）
+        
+        Args:
+            response: LLM返回的原始响应
+        
+        Returns:
+            Dict: {"classification", "selection"}
+        
+        Raises:
+            ValueError: 响应无法解析或校验不通过时抛出
+        """
+        try:
+            result = self._parse_response(response)
+        except json.JSONDecodeError:
+            raise ValueError("合并调用返回格式错误")
+        
+        classification = {
+            "type": result.get("type"),
+            "confidence": result.get("typeConfidence"),
+            "reason": result.get("typeReason")
+        }
+        selection = {
+            field: result.get(field)
+            for field in ("templateId", "templateName", "confidence", "reason")
+            if field in result
+        }
+        
+        get_type_classification_service().validate_classification(classification, strict=True)
+        self._validate_result(selection, self.get_candidate_templates(classification["type"]), strict=True)
+        
+        return {"classification": classification, "selection": selection}
+    
     def _parse_response(self, response: str) -> Dict[str, Any]:
         """
         解析LLM响应
@@ -119,13 +231,14 @@ class TemplateSelectionService:
         # 无法解析
         raise json.JSONDecodeError("无法解析JSON响应", response, 0)
     
-    def _validate_result(self, result: Dict[str, Any], templates: List[Dict[str, Any]]):
+    def _validate_result(self, result: Dict[str, Any], templates: List[Dict[str, Any]], strict: bool = False):
         """
         验证选择结果
         
         Args:
             result: 选择结果
             templates: 可选模板列表
+            strict: 严格模式，模板ID不在候选列表中或置信度不合法时直接抛出异常而不是修正为默认值
         
         Raises:
             ValueError: 结果格式不正确时抛出
@@ -139,6 +252,8 @@ class TemplateSelectionService:
         # 验证模板ID是否在候选列表中
         template_ids = [t['id'] for t in templates]
         if result['templateId'] not in template_ids:
+            if strict:
+                raise ValueError(f"选择的模板ID不在候选列表中: {result['templateId']}")
             logger.warning(f"[TemplateSelection] 选择的模板ID不在候选列表中: {result['templateId']}")
             # 使用第一个模板作为默认值
             if templates:
@@ -148,6 +263,8 @@ class TemplateSelectionService:
         
         # 验证置信度
         if not isinstance(result['confidence'], (int, float)) or not (0 <= result['confidence'] <= 1):
+            if strict:
+                raise ValueError(f"置信度异常: {result['confidence']}")
             logger.warning(f"[TemplateSelection] 置信度异常: {result['confidence']}，设置为0.5")
             result['confidence'] = 0.5
         
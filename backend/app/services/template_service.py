@@ -3,7 +3,7 @@
 管理AntV Infographic模板信息
 """
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from app.utils.prompts import TEMPLATE_SCHEMAS
 
 logger = logging.getLogger(__name__)
@@ -180,46 +180,166 @@ TEMPLATE_METADATA = [
 
 
 class TemplateService:
-    """模板服务类(重构为从数据库读取)"""
+    """模板服务类(从进程内模板目录读取，目录版本变化时自动重新加载)"""
     
     def __init__(self):
         """初始化模板服务"""
-        from app.utils.db import get_db_session
-        from app.repositories.template_repo import TemplateRepository
-        self._get_db = get_db_session
-        self._repo_class = TemplateRepository
+        from app.services.template_catalog import get_template_catalog
+        self._get_catalog = get_template_catalog
+    
+    def catalog_tag(self) -> str:
+        """当前模板目录的版本标识（版本号+内容指纹，目录变化时改变，用于响应缓存和ETag）"""
+        catalog = self._get_catalog()
+        return f"{catalog.version}.{catalog.fingerprint}"
     
     def get_all_templates(
         self,
         category: Optional[str] = None,
         keyword: Optional[str] = None,
         page: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        fields: Optional[Tuple[str, ...]] = None
     ) -> Dict[str, Any]:
         """
         获取所有模板(分页)
         
+        有搜索关键词时优先使用全文检索（按相关度排序，模板附带 relevance 和高亮摘要 snippet），
+        关键词过短或全文检索不可用时在模板目录中按子串匹配
+        
         Args:
             category: 分类筛选
             keyword: 搜索关键词
             page: 页码
             page_size: 每页数量
+            fields: 返回的模板字段（见 resolve_fields），None表示全部字段
         
         Returns:
             Dict: 包含模板列表和分页信息
         """
-        db = self._get_db()
-        try:
-            repo = self._repo_class(db)
-            templates, total = repo.get_all(category, keyword, True, page, page_size)
-            return {
-                "templates": [t.to_dict() for t in templates],
-                "total": total,
-                "page": page,
-                "pageSize": page_size
-            }
-        finally:
-            db.close()
+        catalog = self._get_catalog()
+        offset = (page - 1) * page_size
+        result = self._full_text_search(catalog, keyword, category, offset, page_size) if keyword else None
+        return self._build_page(catalog, result, category, keyword, page, page_size, fields)
+    
+    async def get_all_templates_async(
+        self,
+        db: Any,
+        category: Optional[str] = None,
+        keyword: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 20,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, Any]:
+        """
+        获取所有模板(分页，与 get_all_templates 相同)，全文检索使用请求的异步会话
+        
+        Args:
+            db: 异步数据库会话（AsyncSession）
+        """
+        from app.repositories.template_repo import AsyncTemplateRepository
+        
+        catalog = self._get_catalog()
+        offset = (page - 1) * page_size
+        result = None
+        if keyword:
+            search = await AsyncTemplateRepository(db).search(keyword.strip(), category, offset, page_size)
+            result = self._match_catalog(catalog, search)
+        return self._build_page(catalog, result, category, keyword, page, page_size, fields)
+    
+    @staticmethod
+    def _build_page(
+        catalog: Any,
+        result: Optional[Tuple[List[Tuple[Dict[str, Any], Dict[str, Any]]], int]],
+        category: Optional[str],
+        keyword: Optional[str],
+        page: int,
+        page_size: int,
+        fields: Optional[Tuple[str, ...]]
+    ) -> Dict[str, Any]:
+        """由全文检索结果（None时在模板目录中按子串匹配）构建分页结果"""
+        offset = (page - 1) * page_size
+        if result is not None:
+            hits, total = result
+            # 目录中的模板字典是共享只读的，附加检索字段时复制
+            templates = [
+                {**catalog.project(template, fields), "relevance": hit["relevance"], "snippet": hit["snippet"]}
+                for template, hit in hits
+            ]
+        else:
+            matched = catalog.filter(category, keyword)
+            templates = [catalog.project(template, fields) for template in matched[offset:offset + page_size]]
+            total = len(matched)
+        return {
+            "templates": templates,
+            "total": total,
+            "page": page,
+            "pageSize": page_size
+        }
+    
+    @staticmethod
+    def resolve_fields(fields: Optional[str] = None, view: Optional[str] = None) -> Optional[Tuple[str, ...]]:
+        """
+        解析模板列表的字段投影参数
+        
+        Args:
+            fields: 逗号分隔的字段名（优先于view，id总是返回）
+            view: 视图，summary为摘要视图（SUMMARY_FIELDS），full或不传为全部字段
+        
+        Returns:
+            Optional[Tuple[str, ...]]: 返回的字段，None表示全部字段
+        
+        Raises:
+            ValueError: 字段名或视图无效
+        """
+        from app.services.template_catalog import SUMMARY_FIELDS, TEMPLATE_FIELDS
+        
+        if fields:
+            requested = [field.strip() for field in fields.split(",") if field.strip()]
+            unknown = [field for field in requested if field not in TEMPLATE_FIELDS]
+            if unknown:
+                raise ValueError(f"未知的模板字段: {', '.join(unknown)}")
+            resolved = tuple(dict.fromkeys(["id", *requested]))
+            return SUMMARY_FIELDS if set(resolved) == set(SUMMARY_FIELDS) else resolved
+        if view in (None, "", "full"):
+            return None
+        if view == "summary":
+            return SUMMARY_FIELDS
+        raise ValueError(f"未知的视图: {view}")
+    
+    def _full_text_search(
+        self,
+        catalog: Any,
+        keyword: str,
+        category: Optional[str],
+        offset: int,
+        limit: int
+    ) -> Optional[Tuple[List[Tuple[Dict[str, Any], Dict[str, Any]]], int]]:
+        """
+        全文检索模板
+        
+        Returns:
+            Optional[Tuple]: ([(目录中的模板, 检索结果)], 总数)；全文检索不可用或关键词过短时返回None
+        """
+        from app.repositories.template_repo import TemplateRepository
+        from app.utils.db import get_db
+        
+        with get_db() as db:
+            result = TemplateRepository(db).search(keyword.strip(), category, offset, limit)
+        return TemplateService._match_catalog(catalog, result)
+    
+    @staticmethod
+    def _match_catalog(
+        catalog: Any,
+        result: Optional[Tuple[List[Dict[str, Any]], int]]
+    ) -> Optional[Tuple[List[Tuple[Dict[str, Any], Dict[str, Any]]], int]]:
+        """检索结果对应到目录中的模板"""
+        if result is None:
+            return None
+        
+        # 只返回目录中存在的模板（目录在版本检查间隔内可能略滞后于数据库）
+        hits, total = result
+        matched = [(catalog.get(hit["id"]), hit) for hit in hits]
+        return [(template, hit) for template, hit in matched if template is not None], total
     
     def get_template_by_id(self, template_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -231,13 +351,7 @@ class TemplateService:
         Returns:
             Optional[Dict]: 模板信息，未找到时返回None
         """
-        db = self._get_db()
-        try:
-            repo = self._repo_class(db)
-            template = repo.get_by_id(template_id)
-            return template.to_dict() if template else None
-        finally:
-            db.close()
+        return self._get_catalog().get(template_id)
     
     def get_templates_by_category(self, category: str) -> List[Dict[str, Any]]:
         """
@@ -249,13 +363,7 @@ class TemplateService:
         Returns:
             List[Dict]: 模板列表
         """
-        db = self._get_db()
-        try:
-            repo = self._repo_class(db)
-            templates = repo.get_by_category(category)
-            return [t.to_dict() for t in templates]
-        finally:
-            db.close()
+        return list(self._get_catalog().by_category.get(category, ()))
     
     def get_categories(self) -> List[Dict[str, Any]]:
         """
@@ -264,12 +372,17 @@ class TemplateService:
         Returns:
             List[Dict]: 分类列表
         """
-        db = self._get_db()
-        try:
-            repo = self._repo_class(db)
-            return repo.get_categories()
-        finally:
-            db.close()
+        from app.repositories.template_repo import TEMPLATE_CATEGORIES
+        counts = self._get_catalog().category_counts
+        return [
+            {
+                "code": code,
+                "name": info["name"],
+                "description": info["description"],
+                "count": counts.get(code, 0)
+            }
+            for code, info in TEMPLATE_CATEGORIES.items()
+        ]
     
     def search_templates(self, keyword: str) -> List[Dict[str, Any]]:
         """
@@ -281,13 +394,7 @@ class TemplateService:
         Returns:
             List[Dict]: 匹配的模板列表
         """
-        db = self._get_db()
-        try:
-            repo = self._repo_class(db)
-            templates, _ = repo.get_all(keyword=keyword, page=1, page_size=100)
-            return [t.to_dict() for t in templates]
-        finally:
-            db.close()
+        return self.get_all_templates(keyword=keyword, page_size=100)["templates"]
 
 
 # 全局模板服务实例
@@ -0,0 +1,158 @@
+"""
+请求文本画像
+每个请求的用户文本只分析一次（小写/归一化文本、分词、字符n-gram、数据项数量、关键词命中），
+由相似度打分、SWOT检测、本地分类器和提示词构建共享；相同文本按内容缓存最近的画像
+"""
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Mapping, Optional, Tuple
+from app.services.keyword_matcher import (
+    GROUP_SWOT,
+    LOCAL_TYPE_KEYWORDS,
+    KeywordHits,
+    KeywordMatcher,
+    get_keyword_matcher,
+    type_group
+)
+
+# 缓存的画像数量
+TEXT_PROFILE_CACHE_SIZE = 256
+
+# 常见的列表标识符
+_ITEM_PATTERNS = [
+    re.compile(r'\d+[.、．]'),  # 1. 2. 3. 或 1、2、3、
+    re.compile(r'[一二三四五六七八九十]+[.、．]'),  # 一、二、三、
+    re.compile(r'第[一二三四五六七八九十\d]+'),  # 第一、第二
+    re.compile(r'[\n；;]+'),  # 换行或分号分隔
+]
+
+_WORD_PATTERN = re.compile(r'\w+')
+_SPACES = re.compile(r"\s+")
+
+
+def tokenize(text: str) -> FrozenSet[str]:
+    """简单分词（\\w+ 片段集合）"""
+    return frozenset(_WORD_PATTERN.findall(text))
+
+
+def normalize(text: str) -> str:
+    """转小写并合并空白"""
+    return _SPACES.sub(" ", text.lower()).strip()
+
+
+def estimate_item_count(text: str) -> int:
+    """估计文本中的数据项数量"""
+    max_count = 0
+    for pattern in _ITEM_PATTERNS:
+        max_count = max(max_count, len(pattern.findall(text)))
+    
+    # 如果没有明显的列表标识，按逗号、顿号分割
+    if max_count == 0:
+        separators = text.count('、') + text.count('，')
+        max_count = max(separators + 1, 3)
+    
+    return min(max_count, 20)  # 限制最大值
+
+
+def char_ngram_features(normalized: str, ngram_range: Tuple[int, int] = (1, 3)) -> Dict[str, float]:
+    """
+    提取字符n-gram特征（L2归一化的词频）
+    
+    Args:
+        normalized: 归一化后的文本（见 normalize）
+        ngram_range: n-gram长度范围（含两端）
+    
+    Returns:
+        Dict[str, float]: 特征 -> 权重
+    """
+    counts: Counter = Counter()
+    min_n, max_n = ngram_range
+    for n in range(min_n, max_n + 1):
+        for i in range(len(normalized) - n + 1):
+            gram = normalized[i:i + n]
+            if gram.strip():
+                counts[gram] += 1
+    
+    norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+    return {gram: count / norm for gram, count in counts.items()}
+
+
+@dataclass(frozen=True)
+class TextProfile:
+    """用户文本画像（只读，可在请求之间共享）"""
+    text: str
+    lower: str
+    normalized: str
+    tokens: FrozenSet[str]
+    item_count: int
+    _ngram_features: Dict[Tuple[int, int], Dict[str, float]] = field(default_factory=dict, repr=False, compare=False)
+    _keyword_hits: Dict[int, Tuple[KeywordMatcher, KeywordHits]] = field(default_factory=dict, repr=False, compare=False)
+    
+    @classmethod
+    def build(cls, text: str) -> "TextProfile":
+        """
+        分析文本
+        
+        Args:
+            text: 用户输入的文本
+        """
+        lower = text.lower()
+        return cls(
+            text=text,
+            lower=lower,
+            normalized=normalize(text),
+            tokens=tokenize(lower),
+            item_count=estimate_item_count(text)
+        )
+    
+    def ngram_features(self, ngram_range: Tuple[int, int] = (1, 3)) -> Dict[str, float]:
+        """字符n-gram特征（按n-gram范围缓存，调用方只能读取）"""
+        ngram_range = tuple(ngram_range)
+        features = self._ngram_features.get(ngram_range)
+        if features is None:
+            features = char_ngram_features(self.normalized, ngram_range)
+            self._ngram_features[ngram_range] = features
+        return features
+    
+    def keyword_hits(self, matcher: Optional[KeywordMatcher] = None) -> KeywordHits:
+        """
+        关键词规则命中（一次扫描，按匹配器缓存）
+        
+        Args:
+            matcher: 关键词匹配器，默认使用当前模板目录对应的匹配器
+        """
+        matcher = matcher or get_keyword_matcher()
+        cached = self._keyword_hits.get(id(matcher))
+        if cached is None or cached[0] is not matcher:
+            cached = (matcher, matcher.match(self.text, self.lower))
+            self._keyword_hits[id(matcher)] = cached
+        return cached[1]
+    
+    @property
+    def swot_hits(self) -> int:
+        """命中的SWOT关键词数量"""
+        return self.keyword_hits().count(GROUP_SWOT)
+    
+    @property
+    def type_keyword_hits(self) -> Mapping[str, int]:
+        """各类型命中的本地预测关键词数量"""
+        hits = self.keyword_hits()
+        return MappingProxyType({
+            content_type: hits.count(type_group(content_type))
+            for content_type in LOCAL_TYPE_KEYWORDS
+        })
+
+
+@lru_cache(maxsize=TEXT_PROFILE_CACHE_SIZE)
+def get_text_profile(text: str) -> TextProfile:
+    """
+    获取文本画像（相同文本复用缓存的画像）
+    
+    Args:
+        text: 用户输入的文本
+    """
+    return TextProfile.build(text)
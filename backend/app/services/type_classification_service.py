@@ -4,27 +4,45 @@
 """
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.services.llm_client import get_llm_client
+from app.config import get_settings
+from app.services.local_classifier import get_local_classifier
+from app.services.text_profile import TextProfile, get_text_profile
 from app.utils.prompt_manager import get_prompt_manager
+from app.utils.metrics import get_metrics
 
 logger = logging.getLogger(__name__)
 
+# 推测执行时采用本地分类器预测的最低概率
+SPECULATION_MIN_PROBABILITY = 0.5
+
 
 class TypeClassificationService:
     """类型识别服务类"""
     
     def __init__(self):
         """初始化服务"""
-        self.llm_client = get_llm_client()
         self.prompt_manager = get_prompt_manager()
     
-    async def classify(self, user_text: str) -> Dict[str, Any]:
+    @property
+    def llm_client(self):
+        """当前配置快照对应的LLM客户端（配置热更新后自动切换）"""
+        return get_llm_client()
+    
+    async def classify(
+        self,
+        user_text: str,
+        use_local: bool = True,
+        profile: Optional[TextProfile] = None
+    ) -> Dict[str, Any]:
         """
         识别用户文本的内容类型
         
         Args:
             user_text: 用户输入的文本
+            use_local: 是否先尝试本地识别（SWOT规则、本地分类器），False时总是调用LLM
+            profile: 用户文本画像（可选，未提供时按文本获取）
         
         Returns:
             Dict: {
@@ -38,16 +56,18 @@ class TypeClassificationService:
         """
         try:
             logger.info(f"[TypeClassification] 开始识别内容类型 - 文本长度: {len(user_text)}")
+            profile = profile or get_text_profile(user_text)
             
-            # 特殊处理：检测SWOT分析内容
-            swot_result = self._detect_swot_content(user_text)
-            if swot_result:
-                logger.info(f"[TypeClassification] 检测到SWOT内容，直接返回comparison类型")
-                return swot_result
+            # 特殊处理：SWOT分析内容、本地分类器高置信度结果直接返回
+            local_result = self.detect_local(user_text, profile) if use_local else None
+            if local_result:
+                logger.info(f"[TypeClassification] 本地识别 - 类型: {local_result['type']}, "
+                           f"置信度: {local_result['confidence']}")
+                return local_result
             
             # 获取提示词
             system_prompt, user_prompt, temperature, model = \
-                self.prompt_manager.get_type_classification_prompt(user_text)
+                self.prompt_manager.get_type_classification_prompt(user_text, profile)
             
             logger.info(f"[TypeClassification] system_prompt长度: {len(system_prompt)}, "
                        f"user_prompt长度: {len(user_prompt)}, temperature: {temperature}")
@@ -62,7 +82,8 @@ class TypeClassificationService:
             response = await self.llm_client.chat_completion(
                 messages=messages,
                 model=model,
-                temperature=temperature
+                temperature=temperature,
+                validate=lambda content: self.validate_classification(self._parse_response(content))
             )
             
             logger.info(f"[TypeClassification] LLM原始响应: {response[:200]}...")
@@ -71,13 +92,13 @@ class TypeClassificationService:
             result = self._parse_response(response)
             
             # 验证结果
-            self._validate_result(result)
+            self.validate_classification(result)
             
             logger.info(f"[TypeClassification] 识别成功 - 类型: {result['type']}, "
                        f"置信度: {result['confidence']}")
             
             return result
-            
+        
         except json.JSONDecodeError as e:
             logger.error(f"[TypeClassification] JSON解析失败: {e}, 原始响应: {response}")
             raise Exception("AI返回格式错误，请重试")
@@ -85,36 +106,99 @@ class TypeClassificationService:
             logger.error(f"[TypeClassification] 识别失败: {e}")
             raise
     
-    def _detect_swot_content(self, user_text: str) -> Dict[str, Any]:
+    def detect_local(self, user_text: str, profile: Optional[TextProfile] = None) -> Optional[Dict[str, Any]]:
+        """
+        不调用LLM即可确定类型的情况：SWOT内容，或本地分类器置信度达到阈值
+        
+        Args:
+            user_text: 用户输入的文本
+            profile: 用户文本画像（可选）
+        
+        Returns:
+            Optional[Dict]: classification结果，无法本地确定时返回None
+        """
+        profile = profile or get_text_profile(user_text)
+        swot_result = self._detect_swot_content(user_text, profile)
+        if swot_result:
+            return swot_result
+        return self._classify_locally(profile)
+    
+    def _classify_locally(self, profile: TextProfile) -> Optional[Dict[str, Any]]:
+        """
+        使用本地分类器识别类型
+        
+        Args:
+            profile: 用户文本画像
+        
+        Returns:
+            Optional[Dict]: 置信度达到 LOCAL_CLASSIFIER_THRESHOLD 时返回classification结果，
+                否则（或模型未加载）返回None
+        """
+        classifier = get_local_classifier()
+        if classifier is None:
+            return None
+        
+        content_type, probability = classifier.predict(profile)
+        metrics = get_metrics()
+        if probability < get_settings().LOCAL_CLASSIFIER_THRESHOLD:
+            metrics.increment("local_classifier.deferred")
+            logger.info(f"[TypeClassification] 本地分类器置信度不足，交给LLM识别 - "
+                       f"类型: {content_type}, 置信度: {probability:.2f}")
+            return None
+        
+        metrics.increment("local_classifier.answered")
+        return {
+            "type": content_type,
+            "confidence": round(probability, 2),
+            "reason": f"本地分类器根据文本特征判定为{content_type}类型（置信度{probability:.2f}）",
+            "source": "local_classifier"
+        }
+    
+    def predict_local(self, user_text: str, profile: Optional[TextProfile] = None) -> Optional[Dict[str, Any]]:
+        """
+        本地预测最可能的内容类型（不调用LLM），用于推测执行
+        
+        Args:
+            user_text: 用户输入的文本
+            profile: 用户文本画像（可选）
+        
+        Returns:
+            Optional[Dict]: {"type": 预测类型, "score": 分类器概率或命中关键词数}，无明显倾向时返回None
+        """
+        profile = profile or get_text_profile(user_text)
+        swot_result = self._detect_swot_content(user_text, profile)
+        if swot_result:
+            return {"type": swot_result["type"], "score": None}
+        
+        # 有本地分类器时以其最可能的类型作为预测（不要求达到直接采用的阈值），
+        # 分类器没有明显倾向时再使用关键词规则
+        classifier = get_local_classifier()
+        if classifier is not None:
+            content_type, probability = classifier.predict(profile)
+            if probability >= SPECULATION_MIN_PROBABILITY:
+                return {"type": content_type, "score": round(probability, 2)}
+        
+        ranked = sorted(profile.type_keyword_hits.items(), key=lambda kv: kv[1], reverse=True)
+        (best_type, best_score), (_, second_score) = ranked[0], ranked[1]
+        
+        # 没有命中或前两名并列时不做预测
+        if best_score == 0 or best_score == second_score:
+            return None
+        
+        return {"type": best_type, "score": best_score}
+    
+    def _detect_swot_content(self, user_text: str, profile: Optional[TextProfile] = None) -> Dict[str, Any]:
         """
         检测文本是否为SWOT分析内容
         
         Args:
             user_text: 用户输入的文本
+            profile: 用户文本画像（可选，SWOT关键词命中数在画像中已统计）
         
         Returns:
             Dict: 如果是SWOT内容，返回classification结果；否则返回None
         """
-        import re
-        
-        # 转换为小写进行匹配
-        text_lower = user_text.lower()
-        
-        # SWOT关键词匹配
-        swot_keywords = [
-            'swot',
-            'strengths',
-            'weaknesses', 
-            'opportunities',
-            'threats',
-            '优势',
-            '劣势',
-            '机会',
-            '威胁'
-        ]
-        
-        # 计算匹配到的关键词数量
-        matched_count = sum(1 for keyword in swot_keywords if keyword in text_lower)
+        matched_count = (profile or get_text_profile(user_text)).swot_hits
         
         # 如果匹配到3个或以上SWOT相关关键词，认为是SWOT分析
         if matched_count >= 3:
@@ -151,12 +235,13 @@ class TypeClassificationService:
         # 无法解析
         raise json.JSONDecodeError("无法解析JSON响应", response, 0)
     
-    def _validate_result(self, result: Dict[str, Any]):
+    def validate_classification(self, result: Dict[str, Any], strict: bool = False):
         """
-        验证识别结果
+        验证识别结果（fast模式合并调用的识别部分同样使用严格模式校验）
         
         Args:
             result: 识别结果
+            strict: 严格模式，类型或置信度不合法时直接抛出异常而不是修正为默认值
         
         Raises:
             ValueError: 结果格式不正确时抛出
@@ -170,11 +255,15 @@ class TypeClassificationService:
         # 验证类型值
         valid_types = ['chart', 'comparison', 'hierarchy', 'list', 'quadrant', 'relationship', 'sequence']
         if result['type'] not in valid_types:
+            if strict:
+                raise ValueError(f"未知类型: {result['type']}")
             logger.warning(f"[TypeClassification] 未知类型: {result['type']}，使用list作为默认值")
             result['type'] = 'list'
         
         # 验证置信度
         if not isinstance(result['confidence'], (int, float)) or not (0 <= result['confidence'] <= 1):
+            if strict:
+                raise ValueError(f"置信度异常: {result['confidence']}")
             logger.warning(f"[TypeClassification] 置信度异常: {result['confidence']}，设置为0.5")
             result['confidence'] = 0.5
         
@@ -0,0 +1,227 @@
+"""
+作品写入队列（write-behind）
+保存作品时立即分配ID并返回，作品先进入内存队列，由后台任务每隔 WORK_WRITE_BEHIND_INTERVAL_MS 毫秒
+或积累 WORK_WRITE_BEHIND_BATCH_SIZE 个作品时在一个事务中批量写入，SQLite每批只需一次提交（一次fsync）。
+
+ID从 work_id_sequence 表按段预分配（每段 WORK_ID_BLOCK_SIZE 个），入队时无需访问数据库。
+队列中尚未写入的作品可以按ID读取，也会合并到作品列表和总数中；应用关闭时写入全部剩余作品。
+进程异常退出时最多丢失最近一个写入间隔内保存的作品，默认关闭（WORK_WRITE_BEHIND_ENABLED）。
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.models.work import UserWork
+from app.repositories.work_repo import allocate_work_ids
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class WorkWriteQueue:
+    """作品批量写入队列"""
+    
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        interval_ms: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        id_block_size: Optional[int] = None
+    ):
+        """
+        初始化写入队列
+        
+        Args:
+            session_factory: 异步Session工厂（需 expire_on_commit=False），默认使用应用的工厂
+            interval_ms: 批量写入间隔（毫秒），默认 WORK_WRITE_BEHIND_INTERVAL_MS
+            batch_size: 每批最多写入的作品数，积累到该数量时立即写入，默认 WORK_WRITE_BEHIND_BATCH_SIZE
+            id_block_size: 每次预分配的ID数量，默认 WORK_ID_BLOCK_SIZE
+        """
+        settings = get_settings()
+        self._session_factory = session_factory
+        self.interval = (interval_ms if interval_ms is not None else settings.WORK_WRITE_BEHIND_INTERVAL_MS) / 1000
+        self.batch_size = batch_size or settings.WORK_WRITE_BEHIND_BATCH_SIZE
+        self.id_block_size = id_block_size or settings.WORK_ID_BLOCK_SIZE
+        # 尚未写入的作品：ID -> (作品, 配置JSON字节)，按入队顺序
+        self._pending: Dict[int, Tuple[UserWork, bytes]] = {}
+        self._next_id = 0
+        self._end_id = 0
+        self._id_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._closed = False
+    
+    @property
+    def pending_count(self) -> int:
+        """尚未写入的作品数"""
+        return len(self._pending)
+    
+    def _get_session_factory(self) -> Callable[[], AsyncSession]:
+        """异步Session工厂"""
+        if self._session_factory is None:
+            from app.utils.db import get_async_session_factory
+            self._session_factory = get_async_session_factory()
+        return self._session_factory
+    
+    async def _allocate_id(self) -> int:
+        """取一个预分配的ID，当前ID段用完时从数据库再分配一段"""
+        async with self._id_lock:
+            if self._next_id >= self._end_id:
+                async with self._get_session_factory()() as db:
+                    start = await db.run_sync(allocate_work_ids, self.id_block_size)
+                self._next_id, self._end_id = start, start + self.id_block_size
+                logger.info(f"[WorkWriteQueue] 预分配作品ID: {start} - {self._end_id - 1}")
+            work_id = self._next_id
+            self._next_id += 1
+            return work_id
+    
+    async def enqueue(self, work: UserWork, raw_config: bytes) -> UserWork:
+        """
+        作品入队，立即分配ID和创建时间
+        
+        Args:
+            work: 作品对象（infographic_config 为 orjson.Fragment）
+            raw_config: 配置JSON字节（作品写入前按ID读取时返回）
+        
+        Returns:
+            已分配ID的作品
+        
+        Raises:
+            RuntimeError: 队列已关闭
+        """
+        if self._closed:
+            raise RuntimeError("作品写入队列已关闭")
+        work.id = await self._allocate_id()
+        work.created_at = work.updated_at = datetime.utcnow()
+        self._pending[work.id] = (work, raw_config)
+        
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return work
+    
+    def get_pending(self, work_id: int) -> Optional[Tuple[UserWork, bytes]]:
+        """获取尚未写入的作品 (作品, 配置JSON字节)，已写入或不存在时为None"""
+        return self._pending.get(work_id)
+    
+    def list_pending(self, user_id: Optional[str] = None) -> List[UserWork]:
+        """
+        尚未写入的作品（按创建时间倒序，与作品列表的排序相同）
+        
+        Args:
+            user_id: 用户ID筛选(可选)
+        """
+        works = [work for work, _ in self._pending.values() if not user_id or work.user_id == user_id]
+        return sorted(works, key=lambda work: (work.created_at, work.id), reverse=True)
+    
+    @asynccontextmanager
+    async def paused(self) -> AsyncIterator["WorkWriteQueue"]:
+        """
+        暂停写入（等待正在进行的批量写入完成）
+        
+        读取作品列表时在暂停期间同时查询数据库和队列，作品不会在两次读取之间从队列移入数据库，
+        从而既不重复也不遗漏
+        """
+        async with self._flush_lock:
+            yield self
+    
+    async def _run(self):
+        """后台写入：每隔写入间隔或积累满一批时写入"""
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._pending:
+                await self.flush(max_batches=1)
+            if len(self._pending) >= self.batch_size:
+                # 剩余的作品已够一批，不等待下一个间隔
+                self._wakeup.set()
+    
+    async def flush(self, max_batches: Optional[int] = None) -> int:
+        """
+        写入队列中的作品（每批一个事务）
+        
+        Args:
+            max_batches: 最多写入的批数，默认写完为止
+        
+        Returns:
+            int: 写入的作品数
+        """
+        written = 0
+        batches = 0
+        async with self._flush_lock:
+            while self._pending and (max_batches is None or batches < max_batches):
+                batch = [work for work, _ in list(self._pending.values())[:self.batch_size]]
+                written += await self._write_batch(batch)
+                for work in batch:
+                    self._pending.pop(work.id, None)
+                batches += 1
+        return written
+    
+    async def _write_batch(self, batch: List[UserWork]) -> int:
+        """
+        在一个事务中写入一批作品；失败时逐个重试，仍然失败的作品记录日志后丢弃
+        
+        Returns:
+            int: 写入成功的作品数
+        """
+        metrics = get_metrics()
+        factory = self._get_session_factory()
+        try:
+            async with factory() as db:
+                db.add_all(batch)
+                await db.commit()
+            metrics.increment("work_queue.batches")
+            metrics.increment("work_queue.written", len(batch))
+            return len(batch)
+        except Exception as e:
+            logger.error(f"[WorkWriteQueue] 批量写入失败，逐个重试 - 作品数: {len(batch)}, 错误: {e}")
+        
+        written = 0
+        for work in batch:
+            try:
+                async with factory() as db:
+                    db.add(work)
+                    await db.commit()
+                written += 1
+            except Exception as e:
+                metrics.increment("work_queue.dropped")
+                logger.error(f"[WorkWriteQueue] 作品写入失败，已丢弃 - ID: {work.id}, 标题: {work.title}, 错误: {e}")
+        metrics.increment("work_queue.written", written)
+        return written
+    
+    async def shutdown(self):
+        """停止后台写入并写入全部剩余作品（应用关闭时调用）"""
+        self._closed = True
+        if self._task is not None:
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._pending:
+            written = await self.flush()
+            logger.info(f"[WorkWriteQueue] 关闭前写入剩余作品: {written}")
+
+
+# 全局写入队列实例
+_work_write_queue: Optional[WorkWriteQueue] = None
+
+
+def get_work_write_queue() -> WorkWriteQueue:
+    """获取作品写入队列单例"""
+    global _work_write_queue
+    if _work_write_queue is None:
+        _work_write_queue = WorkWriteQueue()
+    return _work_write_queue
+
+
+async def shutdown_work_write_queue():
+    """关闭写入队列（未创建时无操作）"""
+    if _work_write_queue is not None:
+        await _work_write_queue.shutdown()
@@ -2,10 +2,9 @@
 工作流映射管理器
 管理模板ID到Dify工作流的映射关系
 """
-import os
 import logging
 from typing import Dict, Any, Optional
-import yaml
+from app.config import WORKFLOWS_FILE, get_config_snapshot, reload_config_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -15,36 +14,19 @@ class WorkflowMapper:
     
     def __init__(self):
         """初始化映射管理器"""
-        self.config_path = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            'config',
-            'dify_workflows.yaml'
-        )
+        self.config_path = WORKFLOWS_FILE
         logger.info(f"[WorkflowMapper.__init__] 初始化，配置文件路径: {self.config_path}")
-        self.mappings = self._load_config()
         logger.info(f"[WorkflowMapper.__init__] 加载完成，映射数量: {len(self.mappings)}, 模板列表: {list(self.mappings.keys())}")
     
-    def _load_config(self) -> Dict[str, Any]:
+    @property
+    def mappings(self) -> Dict[str, Any]:
         """
-        加载工作流映射配置
+        工作流映射配置（来自当前配置快照，文件变化时自动热更新）
         
         Returns:
             Dict: 映射配置字典
         """
-        try:
-            if not os.path.exists(self.config_path):
-                logger.warning(f"[WorkflowMapper] 配置文件不存在: {self.config_path}")
-                return {}
-            
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f) or {}
-            
-            logger.info(f"[WorkflowMapper] 成功加载配置，共{len(config)}个模板映射")
-            return config
-            
-        except Exception as e:
-            logger.error(f"[WorkflowMapper] 加载配置失败: {e}")
-            return {}
+        return get_config_snapshot().workflows
     
     def get_workflow_config(self, template_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -137,7 +119,7 @@ class WorkflowMapper:
     
     def reload_config(self):
         """重新加载配置（用于热更新）"""
-        self.mappings = self._load_config()
+        reload_config_snapshot()
         logger.info("[WorkflowMapper] 配置已重新加载")
 
 
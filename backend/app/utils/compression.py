@@ -0,0 +1,283 @@
+"""
+作品内容压缩存储
+user_works 的 input_text 和 infographic_config 以压缩字节存储（见 app/models/types.py），
+Infographic配置使用由已有作品训练的zlib预置字典（zdict），短小的配置也能获得较高压缩率。
+
+存储格式：首字节为格式标记
+- 0x00：未压缩（内容过短或压缩后不变小）
+- 0x01：zlib（raw deflate）
+- 0x02：zlib + 预置字典，标记后4字节为字典ID（字典内容的CRC32，大端）
+
+字典按ID保存在数据库的 work_zdicts 表（is_current 标记新写入使用的字典），随数据库一起备份和迁移。
+已压缩的数据依赖对应的字典解压，字典只增不删。
+
+压缩列按读写所用引擎的方言查找字典存储：bind_zdict_store() 为引擎指定存储（测试、脚本的临时数据库），
+未绑定的引擎使用应用数据库上的全局存储。字典在应用启动时预先加载（见 app/main.py），
+之后只在遇到未知字典ID时重新读取一次。
+"""
+import logging
+import re
+import struct
+import threading
+import zlib
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set, Tuple, Union
+from weakref import WeakKeyDictionary
+from sqlalchemy import insert, inspect, select, update
+from sqlalchemy.engine import Dialect, Engine
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+FORMAT_RAW = 0
+FORMAT_ZLIB = 1
+FORMAT_ZLIB_DICT = 2
+
+# zlib预置字典最多使用窗口大小（32KB）
+MAX_DICT_SIZE = 32 * 1024
+_WBITS = -15
+_DICT_ID = struct.Struct(">I")
+
+# 训练字典时提取的JSON片段："键": 值（值为短字符串、数字、布尔、null或容器开头）
+_FRAGMENT = re.compile(
+    rb'"[^"\\]{1,40}"\s*:\s*(?:"[^"\\]{0,40}"|-?\d{1,12}(?:\.\d+)?|true|false|null|\{|\[)?'
+)
+
+
+def train_zdict(samples: Iterable[bytes], size: int = MAX_DICT_SIZE, min_count: int = 2) -> bytes:
+    """
+    由样本训练zlib预置字典
+    
+    统计各JSON片段出现在多少个样本中，按 出现样本数 × 长度 选取收益最高的片段；
+    zlib对距离越近的内容匹配越便宜，收益最高的片段放在字典末尾
+    
+    Args:
+        samples: 样本（JSON字节）
+        size: 字典大小上限（字节，不超过32KB）
+        min_count: 片段至少出现的样本数
+    
+    Returns:
+        字典内容，没有重复片段时为空
+    """
+    counts: Counter = Counter()
+    for sample in samples:
+        counts.update(set(_FRAGMENT.findall(sample)))
+    
+    candidates = sorted(
+        (fragment for fragment, count in counts.items() if count >= min_count),
+        key=lambda fragment: counts[fragment] * len(fragment),
+        reverse=True
+    )
+    chosen, total = [], 0
+    limit = min(size, MAX_DICT_SIZE)
+    for fragment in candidates:
+        if total + len(fragment) > limit:
+            continue
+        chosen.append(fragment)
+        total += len(fragment)
+    return b"".join(reversed(chosen))
+
+
+def dict_id(zdict: bytes) -> int:
+    """字典ID（内容的CRC32）"""
+    return zlib.crc32(zdict) & 0xFFFFFFFF
+
+
+class ZdictStore:
+    """预置字典存储（work_zdicts 表，解压时遇到未知ID会重新读取，每个ID只重新读取一次）"""
+    
+    def __init__(self, engine: Engine, read_engine: Optional[Engine] = None):
+        """
+        Args:
+            engine: 数据库引擎（保存字典）
+            read_engine: 读取字典使用的引擎，默认同engine
+                （SQLite生产模式下写引擎只有一个连接，解压可能发生在持有该连接的查询中）
+        """
+        self.engine = engine
+        self.read_engine = read_engine or engine
+        self._dicts: Dict[int, bytes] = {}
+        self._current: Optional[int] = None
+        # 重新读取后仍不存在的字典ID，不再为其访问数据库
+        self._missing: Set[int] = set()
+        self._loaded = False
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        """读取全部字典（表不存在时为空）"""
+        from app.models.work_zdict import WorkZdict
+        table = WorkZdict.__table__
+        with self.read_engine.connect() as conn:
+            rows = []
+            if inspect(conn).has_table(table.name):
+                rows = conn.execute(select(table.c.id, table.c.content, table.c.is_current)).all()
+        dicts = {row.id: bytes(row.content) for row in rows}
+        current = next((row.id for row in rows if row.is_current), None)
+        self._dicts, self._current, self._loaded = dicts, current, True
+        logger.info(f"[Compression] 加载压缩字典 - 字典数: {len(dicts)}, "
+                    f"当前: {f'{current:08x}' if current is not None else '无'}")
+    
+    def _ensure_loaded(self):
+        """首次使用时加载"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load()
+    
+    def current(self) -> Optional[Tuple[int, bytes]]:
+        """新写入使用的字典 (ID, 内容)，未训练时为None"""
+        self._ensure_loaded()
+        if self._current is None:
+            return None
+        return self._current, self._dicts[self._current]
+    
+    def get(self, zdict_id: int) -> bytes:
+        """
+        按ID获取字典
+        
+        Raises:
+            ValueError: 字典不存在
+        """
+        self._ensure_loaded()
+        zdict = self._dicts.get(zdict_id)
+        if zdict is None:
+            if zdict_id in self._missing:
+                raise ValueError(f"压缩字典不存在: {zdict_id:08x}")
+            with self._lock:
+                # 其他进程可能刚训练了新字典；等待锁期间其他线程可能已经重新读取过
+                if zdict_id not in self._dicts and zdict_id not in self._missing:
+                    self._load()
+                    if zdict_id not in self._dicts:
+                        self._missing.add(zdict_id)
+            zdict = self._dicts.get(zdict_id)
+            if zdict is None:
+                raise ValueError(f"压缩字典不存在: {zdict_id:08x}")
+        return zdict
+    
+    def save(self, zdict: bytes, make_current: bool = True) -> int:
+        """
+        保存字典（同样内容的字典只保存一份，表不存在时创建）
+        
+        Args:
+            zdict: 字典内容
+            make_current: 是否作为新写入使用的字典
+        
+        Returns:
+            字典ID
+        """
+        from app.models.work_zdict import WorkZdict
+        table = WorkZdict.__table__
+        zdict_id = dict_id(zdict)
+        with self._lock:
+            with self.engine.begin() as conn:
+                table.create(conn, checkfirst=True)
+                exists = conn.execute(select(table.c.id).where(table.c.id == zdict_id)).first()
+                if make_current:
+                    conn.execute(update(table).where(table.c.id != zdict_id).values(is_current=False))
+                if exists is None:
+                    conn.execute(insert(table).values(
+                        id=zdict_id, content=zdict, is_current=make_current, created_at=datetime.utcnow()
+                    ))
+                elif make_current:
+                    conn.execute(update(table).where(table.c.id == zdict_id).values(is_current=True))
+            self._load()
+            self._missing.discard(zdict_id)
+        return zdict_id
+
+
+def compress(data: bytes, use_dict: bool = False, store: Optional[ZdictStore] = None) -> bytes:
+    """
+    压缩为存储格式
+    
+    Args:
+        data: 原始字节
+        use_dict: 是否使用预置字典（仅Infographic配置）
+        store: 字典存储，默认使用全局实例
+    """
+    settings = get_settings()
+    if not settings.WORK_COMPRESSION_ENABLED or len(data) < settings.WORK_COMPRESSION_MIN_BYTES:
+        return bytes((FORMAT_RAW,)) + data
+    
+    current = (store or get_zdict_store()).current() if use_dict else None
+    if current is not None:
+        zdict_id, zdict = current
+        compressor = zlib.compressobj(settings.WORK_COMPRESSION_LEVEL, zlib.DEFLATED, _WBITS, zdict=zdict)
+        header = bytes((FORMAT_ZLIB_DICT,)) + _DICT_ID.pack(zdict_id)
+    else:
+        compressor = zlib.compressobj(settings.WORK_COMPRESSION_LEVEL, zlib.DEFLATED, _WBITS)
+        header = bytes((FORMAT_ZLIB,))
+    compressed = compressor.compress(data) + compressor.flush()
+    
+    if len(header) + len(compressed) >= len(data) + 1:
+        return bytes((FORMAT_RAW,)) + data
+    return header + compressed
+
+
+def decompress(value: Union[bytes, memoryview, str], store: Optional[ZdictStore] = None) -> bytes:
+    """
+    从存储格式解压
+    
+    Args:
+        value: 存储的值（压缩前以文本存储的历史数据原样返回其UTF-8字节）
+        store: 字典存储，默认使用全局实例
+    
+    Raises:
+        ValueError: 格式标记无效或字典不存在
+    """
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    value = bytes(value)
+    if not value:
+        return value
+    
+    marker = value[0]
+    if marker == FORMAT_RAW:
+        return value[1:]
+    if marker == FORMAT_ZLIB:
+        return zlib.decompress(value[1:], _WBITS)
+    if marker == FORMAT_ZLIB_DICT:
+        (zdict_id,) = _DICT_ID.unpack_from(value, 1)
+        zdict = (store or get_zdict_store()).get(zdict_id)
+        decompressor = zlib.decompressobj(_WBITS, zdict=zdict)
+        return decompressor.decompress(value[1 + _DICT_ID.size:]) + decompressor.flush()
+    raise ValueError(f"无效的压缩格式标记: {marker}")
+
+
+# 全局字典存储实例（应用数据库）
+_zdict_store: Optional[ZdictStore] = None
+_zdict_store_lock = threading.Lock()
+# 按引擎绑定的字典存储：类型处理器只能拿到方言，每个引擎有各自的方言实例
+_bound_stores: "WeakKeyDictionary[Dialect, ZdictStore]" = WeakKeyDictionary()
+
+
+def bind_zdict_store(store: ZdictStore, *engines: Any):
+    """
+    为引擎指定字典存储，经这些引擎读写的压缩列使用该存储而不是应用数据库上的全局存储
+    
+    Args:
+        store: 字典存储
+        engines: 同步或异步引擎
+    """
+    for engine in engines:
+        _bound_stores[getattr(engine, "sync_engine", engine).dialect] = store
+
+
+def get_zdict_store(dialect: Optional[Dialect] = None) -> ZdictStore:
+    """
+    获取字典存储
+    
+    Args:
+        dialect: 读写所用引擎的方言，绑定了存储时返回绑定的存储，否则返回全局存储（单例，使用应用的数据库）
+    """
+    if dialect is not None:
+        store = _bound_stores.get(dialect)
+        if store is not None:
+            return store
+    
+    global _zdict_store
+    if _zdict_store is None:
+        with _zdict_store_lock:
+            if _zdict_store is None:
+                from app.utils.db import engine, read_engine
+                _zdict_store = ZdictStore(engine, read_engine)
+    return _zdict_store
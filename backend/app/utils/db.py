@@ -1,13 +1,19 @@
 """
 数据库连接和初始化工具
+同步引擎供脚本、模板目录加载等使用；API请求处理使用异步引擎（SQLite为aiosqlite，
+PostgreSQL为asyncpg），通过 Depends(get_async_session) 注入会话，查询不再阻塞事件循环。
+SQLite文件数据库默认启用生产模式（见 app/utils/sqlite_tuning.py）：WAL日志、读连接池、单连接写入。
 """
 import logging
 from contextlib import contextmanager
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 from app.config import get_settings
+from app.utils.sqlite_tuning import RoutingSession, create_sqlite_engines, is_file_sqlite
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +24,14 @@ settings = get_settings()
 # 开发环境使用SQLite,生产环境可切换到PostgreSQL
 DATABASE_URL = getattr(settings, 'DATABASE_URL', 'sqlite:///./infographic.db')
 
+# SQLite生产模式：engine为单连接的写引擎（脚本、建表等直接使用），read_engine为读连接池
+SQLITE_TUNED = settings.SQLITE_TUNED and is_file_sqlite(DATABASE_URL)
+read_engine = None
+
 # SQLite特殊配置
-if DATABASE_URL.startswith('sqlite'):
+if SQLITE_TUNED:
+    engine, read_engine = create_sqlite_engines(DATABASE_URL, create_engine, QueuePool, echo=settings.DEBUG_MODE)
+elif DATABASE_URL.startswith('sqlite'):
     engine = create_engine(
         DATABASE_URL,
         connect_args={"check_same_thread": False},
@@ -35,8 +47,88 @@ else:
         max_overflow=20
     )
 
-# 创建Session工厂
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 创建Session工厂（SQLite生产模式下查询使用读引擎，写入使用写引擎）
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=RoutingSession,
+    reader=read_engine,
+    writer=engine if read_engine is not None else None
+)
+
+# 异步驱动：同步URL未指定驱动时替换为对应的异步驱动
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    将同步数据库URL转换为异步驱动的URL
+    
+    例如 sqlite:///./infographic.db -> sqlite+aiosqlite:///./infographic.db，
+    postgresql://... -> postgresql+asyncpg://...；已指定异步驱动的URL保持不变
+    """
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None or parsed.drivername in ("sqlite+aiosqlite", "postgresql+asyncpg"):
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+
+# 异步引擎按需创建（导入本模块的脚本不需要安装异步驱动）
+_async_engine = None
+_async_read_engine = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    """获取异步数据库引擎（SQLite生产模式下为写引擎）"""
+    global _async_engine, _async_read_engine
+    if _async_engine is None:
+        if settings.SQLITE_TUNED and is_file_sqlite(ASYNC_DATABASE_URL):
+            _async_engine, _async_read_engine = create_sqlite_engines(
+                ASYNC_DATABASE_URL, create_async_engine, AsyncAdaptedQueuePool, echo=settings.DEBUG_MODE
+            )
+        elif ASYNC_DATABASE_URL.startswith('sqlite'):
+            # aiosqlite默认不复用连接（每个会话新建连接和后台线程），文件数据库改用连接池
+            in_memory = make_url(ASYNC_DATABASE_URL).database in (None, "", ":memory:")
+            _async_engine = create_async_engine(
+                ASYNC_DATABASE_URL,
+                echo=settings.DEBUG_MODE,
+                poolclass=StaticPool if in_memory else AsyncAdaptedQueuePool
+            )
+        else:
+            _async_engine = create_async_engine(
+                ASYNC_DATABASE_URL,
+                echo=settings.DEBUG_MODE,
+                pool_pre_ping=True,
+                pool_size=10,
+                max_overflow=20
+            )
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    """获取异步Session工厂（提交后不过期对象，响应序列化时无需再次查询）"""
+    global _async_session_factory
+    if _async_session_factory is None:
+        writer = get_async_engine()
+        reader = _async_read_engine
+        _async_session_factory = async_sessionmaker(
+            writer,
+            class_=AsyncSession,
+            sync_session_class=RoutingSession,
+            reader=reader.sync_engine if reader is not None else None,
+            writer=writer.sync_engine if reader is not None else None,
+            autoflush=False,
+            expire_on_commit=False
+        )
+    return _async_session_factory
 
 
 def init_db():
@@ -45,11 +137,29 @@ def init_db():
     # 导入所有模型确保被注册
     from app.models.template import Template
     from app.models.work import UserWork
+    from app.models.catalog_version import CatalogVersion
+    from app.models.work_zdict import WorkZdict
     
     try:
         # 创建所有表
         Base.metadata.create_all(bind=engine)
         logger.info("数据库表创建成功")
+        
+        # 已有表上补建新增的索引（create_all只为新建的表创建索引）
+        for index in UserWork.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+        
+        # 作品摘录列（已有表补建）、压缩存储列类型（仅PostgreSQL）、模板全文检索索引、作品计数表（仅SQLite）、
+        # 模板目录版本号（SQLite下含templates表触发器）
+        from app.repositories.template_repo import ensure_search_index
+        from app.repositories.work_repo import ensure_binary_columns, ensure_excerpt_column, ensure_work_counts
+        from app.services.template_catalog import ensure_catalog_version
+        with get_db() as db:
+            ensure_excerpt_column(db)
+            ensure_binary_columns(db)
+            ensure_search_index(db)
+            ensure_work_counts(db)
+            ensure_catalog_version(db)
     except Exception as e:
         logger.error(f"数据库表创建失败: {e}")
         raise
@@ -76,6 +186,33 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    获取异步数据库会话(用于FastAPI依赖注入)
+    
+    会话在首次查询时才占用连接，请求结束后自动关闭；未提交的事务在关闭时回滚
+    
+    用法:
+        @router.get("")
+        async def handler(db: AsyncSession = Depends(get_async_session)):
+            repo = AsyncWorkRepository(db)
+    """
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    """释放异步引擎的连接池（应用关闭时调用）"""
+    global _async_engine, _async_read_engine, _async_session_factory
+    if _async_read_engine is not None:
+        await _async_read_engine.dispose()
+        _async_read_engine = None
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
+
 def get_db_session() -> Session:
     """
     获取数据库会话(用于依赖注入)
@@ -0,0 +1,74 @@
+"""
+HTTP连接池管理
+每个进程为每个上游服务维护一个长连接的httpx.AsyncClient（keep-alive、限制最大连接数），
+让并发请求复用连接、重叠等待网络IO，而不是每次请求重新建立TLS连接
+连接池参数变化（例如/admin/reload-config更新了配置）时重新创建连接池，
+旧连接池保留到应用关闭，以免中断仍在进行的请求
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+# 进程级连接池，按上游服务名称区分
+_http_clients: Dict[str, httpx.AsyncClient] = {}
+# 创建各连接池时使用的参数（连接数限制、保活过期时间、超时）
+_http_client_configs: Dict[str, Tuple] = {}
+# 参数变化后被替换的连接池，应用关闭时统一关闭
+_retired_clients: List[httpx.AsyncClient] = []
+
+
+def get_async_http_client(
+    name: str,
+    max_connections: int = 20,
+    max_keepalive_connections: int = 10,
+    keepalive_expiry: float = 60.0,
+    timeout: Optional[float] = None
+) -> httpx.AsyncClient:
+    """
+    获取指定上游服务的共享AsyncClient（首次调用或参数变化时创建）
+    
+    Args:
+        name: 上游服务名称，例如 "llm"、"dify"
+        max_connections: 连接池最大连接数
+        max_keepalive_connections: 最大保活连接数
+        keepalive_expiry: 空闲保活连接的过期时间（秒）
+        timeout: 默认超时时间（秒），调用方也可以按请求覆盖
+    
+    Returns:
+        httpx.AsyncClient: 共享的异步HTTP客户端
+    """
+    config = (max_connections, max_keepalive_connections, keepalive_expiry, timeout)
+    client = _http_clients.get(name)
+    if client is not None and not client.is_closed and _http_client_configs.get(name) != config:
+        logger.info(f"[HttpClient] 连接池参数已变化，重新创建 - name: {name}")
+        _retired_clients.append(client)
+        client = None
+    if client is None or client.is_closed:
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        client = httpx.AsyncClient(limits=limits, timeout=timeout)
+        _http_clients[name] = client
+        _http_client_configs[name] = config
+        logger.info(f"[HttpClient] 创建连接池 - name: {name}, max_connections: {max_connections}, "
+                    f"max_keepalive: {max_keepalive_connections}")
+    return client
+
+
+async def close_async_http_clients():
+    """关闭所有共享连接池（应用关闭时调用）"""
+    for name, client in list(_http_clients.items()):
+        if not client.is_closed:
+            await client.aclose()
+            logger.info(f"[HttpClient] 已关闭连接池 - name: {name}")
+    for client in _retired_clients:
+        if not client.is_closed:
+            await client.aclose()
+    _http_clients.clear()
+    _http_client_configs.clear()
+    _retired_clients.clear()
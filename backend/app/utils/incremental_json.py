@@ -0,0 +1,174 @@
+"""
+增量JSON解析
+在LLM流式输出的过程中扫描JSON文本，指定路径下的数组（默认 data.items）
+每闭合一个元素就立即解析并返回该元素，无需等待完整响应
+"""
+import json
+import logging
+from typing import Any, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = " \t\r\n"
+
+
+class _Container:
+    """扫描栈中的一个容器（对象或数组）"""
+    
+    __slots__ = ("is_array", "name", "key", "expect_key", "index")
+    
+    def __init__(self, is_array: bool, name: Optional[Union[str, int]]):
+        self.is_array = is_array
+        # 该容器在父容器中的键名或下标（根容器为None）
+        self.name = name
+        # 对象：当前正在读取值的键名；是否正在等待键
+        self.key: Optional[str] = None
+        self.expect_key = not is_array
+        # 数组：当前元素下标
+        self.index = 0
+
+
+class IncrementalArrayParser:
+    """
+    流式JSON数组元素解析器
+    
+    用法:
+        parser = IncrementalArrayParser(("data", "items"))
+        for chunk in stream:
+            for item in parser.feed(chunk):
+                ...  # 每个已闭合的 data.items[i]
+    
+    只做结构扫描，不校验整体JSON的合法性；完整结果仍应在流结束后整体解析。
+    第一个 "{" 之前的内容（例如 ```json 代码块标记）会被忽略。
+    """
+    
+    def __init__(self, path: Sequence[Union[str, int]] = ("data", "items")):
+        """
+        初始化解析器
+        
+        Args:
+            path: 目标数组在JSON中的路径
+        """
+        self.path = tuple(path)
+        self.emitted = 0
+        self._text = ""
+        self._pos = 0
+        self._stack: List[_Container] = []
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._in_scalar = False
+        self._item_start: Optional[int] = None
+    
+    @property
+    def done(self) -> bool:
+        """根对象是否已闭合"""
+        return self._done
+    
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        输入一段新文本
+        
+        Args:
+            chunk: 流式返回的文本增量
+        
+        Returns:
+            List: 本次新闭合的目标数组元素（已解析为Python对象）
+        """
+        self._text += chunk
+        items: List[Any] = []
+        text = self._text
+        
+        while self._pos < len(text) and not self._done:
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+            
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._stack.append(_Container(False, None))
+                continue
+            
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    top = self._stack[-1]
+                    if not top.is_array and top.expect_key:
+                        top.key = json.loads(text[self._string_start:i + 1])
+                    else:
+                        self._value_end(i + 1, items)
+                continue
+            
+            if ch == '"':
+                top = self._stack[-1]
+                if top.is_array or not top.expect_key:
+                    self._value_start(i)
+                self._in_string = True
+                self._string_start = i
+            elif ch == "{" or ch == "[":
+                self._value_start(i)
+                top = self._stack[-1]
+                name = top.index if top.is_array else top.key
+                self._stack.append(_Container(ch == "[", name))
+            elif ch == "}" or ch == "]":
+                self._scalar_end(i, items)
+                self._stack.pop()
+                if not self._stack:
+                    self._done = True
+                    break
+                self._value_end(i + 1, items)
+            elif ch == ",":
+                self._scalar_end(i, items)
+                top = self._stack[-1]
+                if top.is_array:
+                    top.index += 1
+                else:
+                    top.key = None
+                    top.expect_key = True
+            elif ch == ":":
+                self._stack[-1].expect_key = False
+            elif ch in _WHITESPACE:
+                self._scalar_end(i, items)
+            elif not self._in_scalar:
+                # 数字、true/false/null 的起始字符
+                self._value_start(i)
+                self._in_scalar = True
+        
+        return items
+    
+    def _is_target(self) -> bool:
+        """栈顶容器是否为目标数组"""
+        top = self._stack[-1]
+        if not top.is_array:
+            return False
+        return tuple(c.name for c in self._stack[1:]) == self.path
+    
+    def _value_start(self, pos: int):
+        """一个值开始：若其父容器是目标数组，记录元素起点"""
+        if self._item_start is None and self._is_target():
+            self._item_start = pos
+    
+    def _scalar_end(self, pos: int, items: List[Any]):
+        """结束正在读取的标量值"""
+        if self._in_scalar:
+            self._in_scalar = False
+            self._value_end(pos, items)
+    
+    def _value_end(self, end: int, items: List[Any]):
+        """一个值结束：若其父容器是目标数组，解析并输出该元素"""
+        if self._item_start is None or not self._is_target():
+            return
+        raw = self._text[self._item_start:end]
+        self._item_start = None
+        try:
+            items.append(json.loads(raw))
+            self.emitted += 1
+        except json.JSONDecodeError as e:
+            logger.warning(f"[IncrementalArrayParser] 元素解析失败，已跳过: {e}")
@@ -0,0 +1,90 @@
+"""
+多模式关键词匹配（Aho-Corasick自动机）
+一次扫描文本即可找出所有模式的全部出现位置（包括重叠的匹配），
+耗时与文本长度和命中数成正比，与模式数量无关
+"""
+from collections import deque
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+class KeywordAutomaton:
+    """Aho-Corasick自动机（构建后只读，可在线程之间共享）"""
+    
+    def __init__(self, patterns: Sequence[str]):
+        """
+        编译模式
+        
+        Args:
+            patterns: 模式列表，模式ID即其下标（空字符串不会被匹配）
+        """
+        self.patterns: Tuple[str, ...] = tuple(patterns)
+        # 每个状态的转移表、失败指针、输出（以该状态结尾的模式ID，含沿失败指针可达的模式）
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        
+        outputs: List[List[int]] = [[]]
+        for pattern_id, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(pattern_id)
+        
+        # 按BFS顺序计算失败指针，并合并失败状态的输出
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                outputs[next_state].extend(outputs[self._fail[next_state]])
+        
+        self._output = [tuple(ids) for ids in outputs]
+    
+    @property
+    def states(self) -> int:
+        """状态数"""
+        return len(self._goto)
+    
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int]]:
+        """
+        扫描文本，依次产出 (起始位置, 模式ID)
+        
+        Args:
+            text: 待匹配文本
+        """
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self.patterns
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in output[state]:
+                yield end - len(patterns[pattern_id]), pattern_id
+    
+    def find_all(self, text: str) -> Dict[int, List[int]]:
+        """
+        找出所有命中的模式及其出现位置
+        
+        Args:
+            text: 待匹配文本
+        
+        Returns:
+            Dict[int, List[int]]: 模式ID -> 起始位置列表（升序）
+        """
+        hits: Dict[int, List[int]] = {}
+        for start, pattern_id in self.iter_matches(text):
+            hits.setdefault(pattern_id, []).append(start)
+        return hits
@@ -0,0 +1,66 @@
+"""
+进程内指标
+简单的计数器注册表，供管理端点查看（推测执行命中率等）
+"""
+import threading
+from collections import defaultdict
+from typing import Dict
+
+
+class Metrics:
+    """计数器注册表"""
+    
+    def __init__(self):
+        """初始化注册表"""
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def increment(self, name: str, value: int = 1):
+        """
+        计数器累加
+        
+        Args:
+            name: 计数器名称，约定以 "." 分组，例如 "speculation.hit"
+            value: 累加值
+        """
+        with self._lock:
+            self._counters[name] += value
+    
+    def get(self, name: str) -> int:
+        """读取计数器当前值"""
+        with self._lock:
+            return self._counters.get(name, 0)
+    
+    def ratio(self, numerator: str, denominator: str) -> float:
+        """
+        计算两个计数器的比值（分母为0时返回0）
+        
+        Args:
+            numerator: 分子计数器名称
+            denominator: 分母计数器名称
+        """
+        with self._lock:
+            total = self._counters.get(denominator, 0)
+            return round(self._counters.get(numerator, 0) / total, 4) if total else 0.0
+    
+    def snapshot(self) -> Dict[str, int]:
+        """所有计数器的当前值"""
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+    
+    def reset(self):
+        """清空所有计数器"""
+        with self._lock:
+            self._counters.clear()
+
+
+# 全局指标实例
+_metrics = None
+
+
+def get_metrics() -> Metrics:
+    """获取指标注册表单例"""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
@@ -7,6 +7,8 @@ import yaml
 import logging
 from typing import Dict, Any, Optional
 from pathlib import Path
+from app.config import PROMPTS_FILE, get_config_snapshot, reload_config_snapshot
+from app.services.text_profile import TextProfile, get_text_profile
 
 logger = logging.getLogger(__name__)
 
@@ -19,48 +21,58 @@ class PromptManager:
         初始化提示词管理器
         
         Args:
-            config_path: 配置文件路径，默认为app/config/llm_prompts.yaml
-        """
-        if config_path is None:
-            # 默认配置文件路径
-            config_path = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)),
-                "config",
-                "llm_prompts.yaml"
-            )
-        
-        self.config_path = config_path
-        self.config = {}
-        self.load_config()
+            config_path: 配置文件路径，默认为app/config/llm_prompts.yaml（由配置快照管理，支持热更新）
+        """
+        # 使用默认配置文件时从配置快照读取，否则自行加载指定文件
+        self._use_snapshot = config_path is None
+        self.config_path = PROMPTS_FILE if config_path is None else config_path
+        self._config = {}
+        if not self._use_snapshot:
+            self.load_config()
+    
+    @property
+    def config(self) -> Dict[str, Any]:
+        """当前提示词配置"""
+        if self._use_snapshot:
+            return get_config_snapshot().prompts or self._get_default_config()
+        return self._config
     
     def load_config(self):
         """加载配置文件"""
+        if self._use_snapshot:
+            reload_config_snapshot()
+            return
         try:
             config_file = Path(self.config_path)
             if not config_file.exists():
                 logger.warning(f"配置文件不存在: {self.config_path}，使用默认配置")
-                self.config = self._get_default_config()
+                self._config = self._get_default_config()
                 return
             
             with open(config_file, 'r', encoding='utf-8') as f:
-                self.config = yaml.safe_load(f)
+                self._config = yaml.safe_load(f)
             
             logger.info(f"成功加载提示词配置: {self.config_path}")
         except Exception as e:
             logger.error(f"加载配置文件失败: {e}，使用默认配置")
-            self.config = self._get_default_config()
+            self._config = self._get_default_config()
     
     def reload_config(self):
         """重新加载配置文件"""
         logger.info("重新加载提示词配置...")
         self.load_config()
     
-    def get_type_classification_prompt(self, user_text: str) -> tuple[str, str, float, Optional[str]]:
+    def get_type_classification_prompt(
+        self,
+        user_text: str,
+        profile: Optional[TextProfile] = None
+    ) -> tuple[str, str, float, Optional[str]]:
         """
         获取类型识别提示词
         
         Args:
             user_text: 用户输入的文本
+            profile: 用户文本画像（可选）
         
         Returns:
             tuple: (system_prompt, user_prompt, temperature, model)
@@ -74,7 +86,7 @@ class PromptManager:
         model = config.get('model')
         
         # 渲染用户提示词模板
-        user_prompt = user_prompt_template.format(user_text=user_text)
+        user_prompt = user_prompt_template.format(user_text=user_text, **self._profile_fields(user_text, profile))
         
         return system_prompt, user_prompt, temperature, model
     
@@ -82,7 +94,8 @@ class PromptManager:
         self,
         user_text: str,
         content_type: str,
-        templates: list[Dict[str, Any]]
+        templates: list[Dict[str, Any]],
+        profile: Optional[TextProfile] = None
     ) -> tuple[str, str, float, Optional[str]]:
         """
         获取模板选择提示词
@@ -91,6 +104,7 @@ class PromptManager:
             user_text: 用户输入的文本
             content_type: 已识别的内容类型
             templates: 模板列表
+            profile: 用户文本画像（可选）
         
         Returns:
             tuple: (system_prompt, user_prompt, temperature, model)
@@ -110,7 +124,42 @@ class PromptManager:
         user_prompt = user_prompt_template.format(
             user_text=user_text,
             content_type=content_type,
-            templates_list=templates_list
+            templates_list=templates_list,
+            **self._profile_fields(user_text, profile)
+        )
+        
+        return system_prompt, user_prompt, temperature, model
+    
+    def get_fused_selection_prompt(
+        self,
+        user_text: str,
+        templates: list[Dict[str, Any]],
+        profile: Optional[TextProfile] = None
+    ) -> tuple[str, str, float, Optional[str]]:
+        """
+        获取类型识别+模板选择合并提示词
+        
+        Args:
+            user_text: 用户输入的文本
+            templates: 全部候选模板
+            profile: 用户文本画像（可选）
+        
+        Returns:
+            tuple: (system_prompt, user_prompt, temperature, model)
+        """
+        config = self.config.get('fused_selection', {})
+        
+        # 从环境变量获取配置（优先级更高）
+        system_prompt = os.getenv('LLM_FUSED_SELECTION_SYSTEM_PROMPT') or config.get('system_prompt', '')
+        user_prompt_template = config.get('user_prompt_template', '')
+        temperature = float(os.getenv('LLM_FUSED_SELECTION_TEMPERATURE', config.get('temperature', 0.3)))
+        model = config.get('model')
+        
+        # 渲染用户提示词模板
+        user_prompt = user_prompt_template.format(
+            user_text=user_text,
+            templates_by_category=self._format_templates_by_category(templates),
+            **self._profile_fields(user_text, profile)
         )
         
         return system_prompt, user_prompt, temperature, model
@@ -119,7 +168,8 @@ class PromptManager:
         self,
         user_text: str,
         template_id: str,
-        schema: Dict[str, Any]
+        schema: Dict[str, Any],
+        profile: Optional[TextProfile] = None
     ) -> tuple[str, str, float, Optional[str]]:
         """
         获取数据提取提示词
@@ -128,6 +178,7 @@ class PromptManager:
             user_text: 用户输入的文本
             template_id: 模板ID
             schema: 数据结构Schema
+            profile: 用户文本画像（可选）
         
         Returns:
             tuple: (system_prompt, user_prompt, temperature, model)
@@ -148,11 +199,21 @@ class PromptManager:
         user_prompt = user_prompt_template.format(
             user_text=user_text,
             template_id=template_id,
-            schema=schema_str
+            schema=schema_str,
+            **self._profile_fields(user_text, profile)
         )
         
         return system_prompt, user_prompt, temperature, model
     
+    def _profile_fields(self, user_text: str, profile: Optional[TextProfile]) -> Dict[str, Any]:
+        """
+        文本画像提供给提示词模板的占位符（模板中可选使用）
+        
+        - {item_count}: 估计的数据项数量
+        """
+        profile = profile or get_text_profile(user_text)
+        return {"item_count": profile.item_count}
+    
     def _format_templates_list(self, templates: list[Dict[str, Any]]) -> str:
         """
         格式化模板列表为字符串
@@ -174,6 +235,36 @@ class PromptManager:
         
         return "\n\n".join(formatted_list)
     
+    def _format_templates_by_category(
+        self,
+        templates: list[Dict[str, Any]],
+        max_description: int = 40
+    ) -> str:
+        """
+        按分类格式化紧凑的模板列表（每个模板一行）
+        
+        Args:
+            templates: 模板列表
+            max_description: 描述的最大字数
+        
+        Returns:
+            str: 格式化的模板列表文本
+        """
+        grouped: Dict[str, list[str]] = {}
+        for tmpl in templates:
+            description = (tmpl.get('description') or '').replace('\n', ' ').strip()
+            if len(description) > max_description:
+                description = description[:max_description] + '…'
+            line = f"- {tmpl['id']}: {tmpl.get('name', '未命名')}"
+            if description:
+                line += f" - {description}"
+            grouped.setdefault(tmpl.get('category') or '未分类', []).append(line)
+        
+        return "\n\n".join(
+            f"### {category}\n" + "\n".join(lines)
+            for category, lines in sorted(grouped.items())
+        )
+    
     def _get_default_config(self) -> Dict[str, Any]:
         """
         获取默认配置（如果配置文件不存在）
@@ -194,6 +285,12 @@ class PromptManager:
                 'temperature': 0.3,
                 'model': None
             },
+            'fused_selection': {
+                'system_prompt': '你是一位专业的信息图设计专家。',
+                'user_prompt_template': '文本: {user_text}\n模板: {templates_by_category}',
+                'temperature': 0.3,
+                'model': None
+            },
             'data_extraction': {
                 'system_prompt': '你是一位专业的数据分析师。',
                 'user_prompt_template': '文本: {user_text}\n模板: {template_id}\nSchema: {schema}',
@@ -0,0 +1,149 @@
+"""
+只读端点的响应缓存
+模板列表、分类、详情只在模板目录变化时改变：响应体按 (目录版本, 端点, 查询参数) 缓存为orjson序列化的字节，
+ETag由目录版本和查询参数计算，客户端携带 If-None-Match 时无需构建响应即可返回304
+"""
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+import orjson
+from fastapi import Request, Response
+from app.utils.metrics import get_metrics
+
+# 缓存的响应条目数
+RESPONSE_CACHE_ENTRIES = 512
+
+
+def make_etag(version: str, key: Hashable) -> str:
+    """由目录版本标识和缓存键计算ETag"""
+    digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=8).hexdigest()
+    return f'"v{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """判断 If-None-Match 请求头是否包含该ETag（弱比较）"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+
+class VersionedResponseCache:
+    """按目录版本失效的响应字节缓存（LRU）"""
+    
+    def __init__(self, max_entries: int = RESPONSE_CACHE_ENTRIES):
+        """
+        Args:
+            max_entries: 最大条目数
+        """
+        self.max_entries = max_entries
+        self._version: Optional[str] = None
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, version: str, key: Hashable) -> Optional[bytes]:
+        """
+        获取缓存的响应体
+        
+        Args:
+            version: 目录版本标识（变化时清空缓存）
+            key: 缓存键（端点及查询参数）
+        
+        Returns:
+            Optional[bytes]: orjson序列化的响应体，未命中时返回None
+        """
+        with self._lock:
+            if self._version != version:
+                self._version = version
+                self._entries.clear()
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                get_metrics().increment("response_cache.hit")
+            else:
+                get_metrics().increment("response_cache.miss")
+            return body
+    
+    def put(self, version: str, key: Hashable, body: bytes):
+        """写入响应体（构建期间目录版本已经变化时不再写入旧版本的响应）"""
+        with self._lock:
+            if self._version == version:
+                self._entries[key] = body
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+    
+    def get_or_build(self, version: str, key: Hashable, build: Callable[[], Any]) -> bytes:
+        """
+        获取缓存的响应体，未命中时构建并序列化
+        
+        Args:
+            version: 目录版本标识（变化时清空缓存）
+            key: 缓存键（端点及查询参数）
+            build: 构建响应内容的函数
+        
+        Returns:
+            bytes: orjson序列化的响应体
+        """
+        body = self.get(version, key)
+        if body is None:
+            body = orjson.dumps(build())
+            self.put(version, key, body)
+        return body
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Tuple[Optional[str], int]:
+        """(当前版本, 条目数)"""
+        with self._lock:
+            return self._version, len(self._entries)
+
+
+async def cached_json_response(
+    request: Request,
+    version: str,
+    key: Hashable,
+    build: Callable[[], Any]
+) -> Response:
+    """
+    返回带ETag的JSON响应，客户端已有相同ETag时返回304
+    
+    Args:
+        request: 当前请求（读取 If-None-Match）
+        version: 目录版本标识
+        key: 缓存键（端点及查询参数）
+        build: 构建响应内容的函数（统一响应格式的字典），可以是协程函数
+    """
+    etag = make_etag(version, key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        get_metrics().increment("response_cache.not_modified")
+        return Response(status_code=304, headers=headers)
+    
+    cache = get_response_cache()
+    body = cache.get(version, key)
+    if body is None:
+        content = build()
+        if inspect.isawaitable(content):
+            content = await content
+        body = orjson.dumps(content)
+        cache.put(version, key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# 全局响应缓存
+_response_cache: Optional[VersionedResponseCache] = None
+
+
+def get_response_cache() -> VersionedResponseCache:
+    """获取响应缓存单例"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = VersionedResponseCache()
+    return _response_cache
@@ -0,0 +1,97 @@
+"""
+请求合并（single-flight）
+相同key的并发调用只向上游发起一次请求：第一个调用方负责发起，后续调用方等待同一个结果
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 所有已创建的合并器（按名称），用于查看运行指标
+_flights: Dict[str, "SingleFlight"] = {}
+
+
+class _Call:
+    """一次进行中的上游调用"""
+    
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    相同key的并发请求合并器
+    
+    上游调用在独立的Task中执行，不隶属于任何一个调用方：
+    - 发起者（owner）断开连接被取消时，其余等待者仍能拿到结果
+    - 只有当所有等待者都已取消时，上游调用才会被取消
+    - 上游调用的异常会传递给所有等待者
+    """
+    
+    def __init__(self, name: str):
+        """
+        初始化合并器
+        
+        Args:
+            name: 名称（用于日志）
+        """
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+        self.stats = {"leaders": 0, "coalesced": 0, "cancelled": 0}
+        _flights[name] = self
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行调用，若相同key的调用正在进行则等待其结果
+        
+        Args:
+            key: 请求标识
+            fn: 无参协程工厂，只在没有进行中的相同调用时执行
+        
+        Returns:
+            上游调用的结果（所有等待者共享同一个对象）
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _task, k=key, c=call: self._forget(k, c))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["coalesced"] += 1
+            logger.info(f"[SingleFlight:{self.name}] 合并相同的进行中请求 - 等待者: {call.waiters + 1}")
+        
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if not call.task.done() and call.waiters == 1:
+                # 最后一个等待者也已取消：取消上游调用，并让后续请求重新发起
+                self.stats["cancelled"] += 1
+                self._forget(key, call)
+                call.task.cancel()
+                logger.info(f"[SingleFlight:{self.name}] 所有等待者已取消，取消上游调用")
+            raise
+        finally:
+            call.waiters -= 1
+    
+    def _forget(self, key: str, call: _Call):
+        """移除已完成（或已放弃）的调用"""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+    
+    def in_flight(self) -> int:
+        """当前进行中的上游调用数量"""
+        return len(self._calls)
+
+
+def get_singleflight_stats() -> Dict[str, Dict[str, int]]:
+    """所有合并器的统计信息（含当前进行中的调用数）"""
+    return {
+        name: {**flight.stats, "in_flight": flight.in_flight()}
+        for name, flight in _flights.items()
+    }
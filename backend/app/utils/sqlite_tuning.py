@@ -0,0 +1,149 @@
+"""
+SQLite生产模式
+WAL日志下读写互不阻塞：连接建立时设置 journal_mode、synchronous、cache_size、mmap_size、busy_timeout，
+读连接池供查询使用（多个连接并发读取），写入经由只有一个连接的写连接池串行执行，
+写事务在连接池中排队而不是在SQLite锁上忙等。RoutingSession按语句类型选择读/写引擎，
+同一事务中发生写入后，后续查询也使用写连接（保证读到本事务的写入）。
+"""
+import logging
+from typing import Any, Callable, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def is_file_sqlite(url: str) -> bool:
+    """是否为SQLite文件数据库（内存数据库无法在多个连接之间共享）"""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def sqlite_pragmas(read_only: bool = False) -> Tuple[str, ...]:
+    """
+    连接建立时执行的PRAGMA语句
+    
+    Args:
+        read_only: 是否为读连接（设置 query_only，误路由到读连接的写入会直接报错）
+    """
+    settings = get_settings()
+    pragmas = (
+        f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size = {int(settings.SQLITE_CACHE_SIZE)}",
+        f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}",
+        f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT)}",
+        "PRAGMA temp_store = MEMORY",
+    )
+    return pragmas + ("PRAGMA query_only = 1",) if read_only else pragmas
+
+
+def install_sqlite_pragmas(engine: Any, read_only: bool = False):
+    """
+    在引擎的每个新连接上执行PRAGMA（同步引擎和异步引擎均可）
+    
+    Args:
+        engine: Engine 或 AsyncEngine
+        read_only: 是否为读连接池
+    """
+    pragmas = sqlite_pragmas(read_only)
+    
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+    
+    event.listen(getattr(engine, "sync_engine", engine), "connect", on_connect)
+
+
+def create_sqlite_engines(
+    url: str,
+    create: Callable[..., Any],
+    poolclass: Any,
+    echo: bool = False
+) -> Tuple[Any, Any]:
+    """
+    创建SQLite写引擎和读引擎
+    
+    Args:
+        url: 数据库URL
+        create: create_engine 或 create_async_engine
+        poolclass: QueuePool 或 AsyncAdaptedQueuePool
+        echo: 是否输出SQL
+    
+    Returns:
+        Tuple: (写引擎（单连接，写入串行执行）, 读引擎（SQLITE_READ_POOL_SIZE个连接）)
+    """
+    settings = get_settings()
+    connect_args = {"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT / 1000}
+    writer = create(
+        url,
+        echo=echo,
+        connect_args=connect_args,
+        poolclass=poolclass,
+        pool_size=1,
+        max_overflow=0
+    )
+    reader = create(
+        url,
+        echo=echo,
+        connect_args=connect_args,
+        poolclass=poolclass,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=settings.SQLITE_READ_POOL_SIZE
+    )
+    install_sqlite_pragmas(writer)
+    install_sqlite_pragmas(reader, read_only=True)
+    return writer, reader
+
+
+def is_read_statement(clause: Any) -> bool:
+    """语句是否只读（SELECT，或以SELECT开头的文本SQL）"""
+    if clause is None:
+        return False
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip().upper().startswith("SELECT")
+    return bool(getattr(clause, "is_select", False))
+
+
+class RoutingSession(Session):
+    """
+    读写分离的Session：查询使用读引擎，flush、DML、DDL使用写引擎
+    
+    未指定读写引擎时与普通Session相同（非SQLite数据库或未启用SQLite生产模式）
+    """
+    
+    def __init__(self, *args, reader: Optional[Any] = None, writer: Optional[Any] = None, **kwargs):
+        """
+        Args:
+            reader: 读引擎（同步Engine）
+            writer: 写引擎（同步Engine）
+        """
+        super().__init__(*args, **kwargs)
+        self.reader = reader
+        self.writer = writer
+        # 当前事务中是否已经写入
+        self._writing = False
+    
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.reader is None or self.writer is None:
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        if self._flushing or (clause is not None and not is_read_statement(clause)):
+            self._writing = True
+            return self.writer
+        if self._writing or clause is None:
+            return self.writer
+        return self.reader
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_writing(session: RoutingSession, transaction):
+    """最外层事务结束后，后续查询重新使用读引擎"""
+    if transaction.parent is None:
+        session._writing = False
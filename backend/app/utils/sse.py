@@ -0,0 +1,32 @@
+"""
+Server-Sent Events 工具
+"""
+import json
+from typing import Any, Optional
+
+# 流式响应头：禁止缓存，并关闭Nginx等反向代理的缓冲
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no"
+}
+
+
+def format_sse(event: str, data: Any, event_id: Optional[str] = None) -> str:
+    """
+    格式化一条SSE消息
+    
+    Args:
+        event: 事件名称
+        data: 事件数据（序列化为单行JSON）
+        event_id: 事件ID（客户端断线重连时通过Last-Event-ID回传）
+    
+    Returns:
+        str: SSE消息文本
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
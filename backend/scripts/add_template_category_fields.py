@@ -12,6 +12,7 @@ sys.path.insert(0, str(backend_dir))
 
 from sqlalchemy import text
 from app.utils.db import get_db_session, engine
+from app.services.template_catalog import bump_catalog_version
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -83,6 +84,7 @@ def add_template_category_fields():
                 raise
         
         db.commit()
+        bump_catalog_version()
         logger.info("数据库迁移完成！")
         
     except Exception as e:
@@ -0,0 +1,74 @@
+"""
+为已有数据库补建作品列表索引和计数表
+- 复合索引 (user_id, created_at, id)、(created_at, id)：作品列表游标分页直接按索引定位
+- user_work_counts 计数表及触发器（仅SQLite）：作品总数增量维护，不再每页COUNT扫描
+
+新建的数据库由 init_db() 自动创建，已有数据库执行一次本脚本即可（重复执行无副作用）。
+
+用法（在backend目录下执行）:
+    python scripts/add_user_works_indexes.py
+"""
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import select, text
+from app.utils.db import engine, get_db
+from app.models.work import UserWork
+from app.repositories.work_repo import _keyset_query, encode_cursor, ensure_work_counts, rebuild_work_counts
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def explain(db, statement) -> str:
+    """SQLite查询计划"""
+    compiled = statement.compile(bind=engine, compile_kwargs={"literal_binds": True})
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return "; ".join(row[-1] for row in rows)
+
+
+def add_user_works_indexes():
+    """创建索引和计数表"""
+    is_sqlite = engine.dialect.name == "sqlite"
+    
+    with get_db() as db:
+        sample = db.scalar(select(UserWork).order_by(UserWork.id.desc()).limit(1))
+        queries = {
+            "全部作品第一页": _keyset_query(None, None, 20)[0],
+            "按用户第一页": _keyset_query("user-1", None, 20)[0],
+        }
+        if sample is not None and sample.created_at is not None:
+            queries["按用户翻页"] = _keyset_query("user-1", encode_cursor(sample), 20)[0]
+        
+        if is_sqlite:
+            for name, query in queries.items():
+                logger.info(f"创建索引前 [{name}]: {explain(db, query)}")
+    
+    for index in UserWork.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+        logger.info(f"✓ 索引已就绪: {index.name}")
+    
+    with get_db() as db:
+        if ensure_work_counts(db):
+            # 计数表已存在时也重新统计一次，修正触发器创建前写入的作品
+            rebuild_work_counts(db)
+            total = db.execute(text("SELECT count FROM user_work_counts WHERE user_key = '*'")).scalar()
+            logger.info(f"✓ 作品计数表已就绪，作品总数: {total}")
+        else:
+            logger.info("非SQLite数据库，作品总数使用COUNT查询")
+        
+        if is_sqlite:
+            db.execute(text("ANALYZE user_works"))
+            for name, query in queries.items():
+                logger.info(f"创建索引后 [{name}]: {explain(db, query)}")
+    
+    logger.info("✅ 作品列表索引迁移完成！")
+
+
+if __name__ == "__main__":
+    add_user_works_indexes()
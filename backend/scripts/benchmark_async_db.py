@@ -0,0 +1,188 @@
+"""
+作品接口并发吞吐基准测试
+对比同步会话（原实现：async def 处理函数中直接调用同步SQLAlchemy会话，查询阻塞事件循环）
+与异步会话（Depends(get_async_session) + AsyncWorkRepository）在并发请求下的吞吐量，
+并在压测期间测量事件循环延迟（定时器的实际唤醒时间比预期晚多少），反映事件循环被阻塞的程度
+
+使用临时SQLite数据库，写入指定数量的作品后压测作品列表和作品详情接口，不影响 infographic.db。
+
+用法（在backend目录下执行）:
+    python scripts/benchmark_async_db.py
+    python scripts/benchmark_async_db.py --works 5000 --requests 1000 --concurrency 50
+"""
+import sys
+import os
+import time
+import random
+import asyncio
+import argparse
+import statistics
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI, HTTPException, Query
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+import app.models  # noqa: F401 (注册全部模型，user_works外键引用templates表)
+from app.api.v1 import works
+from app.models.base import Base
+from app.models.work import UserWork
+from app.repositories.work_repo import WorkRepository
+from app.utils.compression import ZdictStore, bind_zdict_store
+from app.utils.db import get_async_session
+
+SAMPLE_TEXT = "产品上线流程：1. 需求评审 2. 设计开发 3. 测试验收 4. 灰度发布 5. 全量上线"
+
+
+def seed_database(path: str, count: int, seed: int = 42):
+    """创建临时数据库并写入作品"""
+    rng = random.Random(seed)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    bind_zdict_store(ZdictStore(engine), engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all(
+        UserWork(
+            user_id=f"user-{rng.randrange(20)}",
+            title=f"作品{i}",
+            template_id="list-row-simple-horizontal-arrow",
+            input_text=SAMPLE_TEXT * rng.randint(1, 5),
+            infographic_config={
+                "template": "list-row-simple-horizontal-arrow",
+                "data": {"items": [{"label": f"步骤{j}", "desc": SAMPLE_TEXT} for j in range(rng.randint(3, 10))]}
+            }
+        )
+        for i in range(count)
+    )
+    db.commit()
+    db.close()
+    engine.dispose()
+
+
+def build_app(path: str) -> FastAPI:
+    """构建压测应用：/sync 为原同步会话实现，/async 为异步会话实现"""
+    app = FastAPI()
+    sync_engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+    
+    @app.get("/sync/works")
+    async def sync_works(page: int = Query(1), pageSize: int = Query(20)):
+        db = SyncSession()
+        try:
+            items, total = WorkRepository(db).get_all(page=page, page_size=pageSize)
+            return {"works": [w.to_summary_dict() for w in items], "total": total}
+        finally:
+            db.close()
+    
+    @app.get("/sync/works/{work_id}")
+    async def sync_work_detail(work_id: int):
+        db = SyncSession()
+        try:
+            work = WorkRepository(db).get_by_id(work_id)
+            if not work:
+                raise HTTPException(status_code=404)
+            return work.to_dict()
+        finally:
+            db.close()
+    
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=AsyncAdaptedQueuePool)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+    # 压缩字典使用临时数据库
+    bind_zdict_store(ZdictStore(sync_engine), sync_engine, async_engine)
+    
+    async def override_session():
+        async with AsyncSessionLocal() as db:
+            yield db
+    
+    app.include_router(works.router, prefix="/async/works")
+    app.dependency_overrides[get_async_session] = override_session
+    app.state.engines = (sync_engine, async_engine)
+    return app
+
+
+async def run_load(client: httpx.AsyncClient, prefix: str, work_count: int, total: int, concurrency: int) -> dict:
+    """并发发送请求（列表与详情各半），同时每5ms测量一次事件循环延迟"""
+    rng = random.Random(7)
+    paths = [
+        f"{prefix}/works?page={rng.randint(1, 20)}&pageSize=20" if i % 2 == 0
+        else f"{prefix}/works/{rng.randint(1, work_count)}"
+        for i in range(total)
+    ]
+    queue = asyncio.Queue()
+    for path in paths:
+        queue.put_nowait(path)
+    
+    async def worker():
+        while not queue.empty():
+            response = await client.get(queue.get_nowait())
+            assert response.status_code == 200, response.text
+            # 进程内传输没有真实的网络IO，模拟请求之间让出事件循环
+            await asyncio.sleep(0)
+    
+    lags = []
+    done = asyncio.Event()
+    
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append((time.perf_counter() - start - 0.005) * 1000)
+    
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+    
+    lags.sort()
+    return {
+        "rps": total / elapsed,
+        "lag_p50": statistics.median(lags),
+        "lag_max": lags[-1],
+        "samples": len(lags),
+    }
+
+
+async def benchmark(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "benchmark.db")
+        seed_database(path, args.works)
+        app = build_app(path)
+        transport = httpx.ASGITransport(app=app)
+        
+        print(f"\n作品数: {args.works}，请求数: {args.requests}（列表/详情各半），并发: {args.concurrency}")
+        print("=" * 80)
+        print(f"{'实现':<10} {'吞吐(req/s)':>14} {'循环延迟P50(ms)':>16} {'循环延迟最大(ms)':>16} {'采样数':>8}")
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for name, prefix in (("同步会话", "/sync"), ("异步会话", "/async")):
+                # 预热连接池
+                await run_load(client, prefix, args.works, args.concurrency, args.concurrency)
+                result = await run_load(client, prefix, args.works, args.requests, args.concurrency)
+                print(f"{name:<10} {result['rps']:>14.1f} {result['lag_p50']:>16.2f} "
+                      f"{result['lag_max']:>16.2f} {result['samples']:>8}")
+        print("=" * 80)
+        print("注：循环延迟反映事件循环被阻塞的程度，同步会话执行查询期间其他请求（包括生成流的事件推送）都无法处理")
+        
+        sync_engine, async_engine = app.state.engines
+        sync_engine.dispose()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="作品接口并发吞吐基准测试")
+    parser.add_argument("--works", type=int, default=5000, help="写入的作品数量")
+    parser.add_argument("--requests", type=int, default=1000, help="每种实现的请求数")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发请求数")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
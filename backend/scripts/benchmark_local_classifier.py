@@ -0,0 +1,115 @@
+"""
+本地内容类型分类器基准测试
+对比本地分类器与LLM类型识别的准确率和耗时
+
+评测数据默认取自已保存的用户作品（input_text -> 所用模板的分类），
+也可以通过 --data 指定JSONL文件（每行 {"text": "...", "type": "..."}）。
+注意：默认数据同时也是训练数据，准确率会偏高，正式评估请使用独立标注的数据。
+
+用法（在backend目录下执行）:
+    python scripts/benchmark_local_classifier.py
+    python scripts/benchmark_local_classifier.py --data data/labeled.jsonl --llm
+"""
+import sys
+import os
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import get_settings
+from app.utils.db import get_db
+from app.models.template import Template
+from app.models.work import UserWork
+from app.services.local_classifier import get_local_classifier, category_to_type
+
+
+def load_dataset(data_path: str = None) -> list[tuple[str, str]]:
+    """加载评测数据 [(文本, 类型)]"""
+    if data_path:
+        with open(data_path, 'r', encoding='utf-8') as f:
+            return [
+                (record['text'], record['type'])
+                for record in (json.loads(line) for line in f if line.strip())
+            ]
+    
+    with get_db() as db:
+        rows = db.query(UserWork.input_text, Template.category) \
+            .join(Template, Template.id == UserWork.template_id).all()
+    return [(text, category_to_type(category)) for text, category in rows if text and text.strip()]
+
+
+def summarize(name: str, latencies: list[float], correct: int, total: int):
+    """打印一组结果"""
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    p95 = latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * 0.95))]
+    print(f"{name:<24} 准确率: {correct / total:7.2%} ({correct}/{total})   "
+          f"平均耗时: {statistics.mean(latencies_ms):9.2f}ms   P95: {p95:9.2f}ms")
+
+
+def benchmark_local(dataset: list[tuple[str, str]], threshold: float):
+    """评测本地分类器"""
+    classifier = get_local_classifier()
+    if classifier is None:
+        print("❌ 本地分类器未加载，请先运行 scripts/train_local_classifier.py")
+        return
+    
+    latencies, correct, covered, covered_correct = [], 0, 0, 0
+    for text, label in dataset:
+        start = time.perf_counter()
+        predicted, probability = classifier.predict(text)
+        latencies.append(time.perf_counter() - start)
+        correct += predicted == label
+        if probability >= threshold:
+            covered += 1
+            covered_correct += predicted == label
+    
+    summarize("本地分类器（全部）", latencies, correct, len(dataset))
+    print(f"{'':<24} 阈值{threshold}覆盖率: {covered / len(dataset):7.2%} ({covered}/{len(dataset)})   "
+          f"覆盖部分准确率: {(covered_correct / covered) if covered else 0:7.2%}")
+
+
+async def benchmark_llm(dataset: list[tuple[str, str]]):
+    """评测LLM类型识别（跳过本地识别）"""
+    from app.services.type_classification_service import get_type_classification_service
+    
+    service = get_type_classification_service()
+    latencies, correct = [], 0
+    for text, label in dataset:
+        start = time.perf_counter()
+        try:
+            result = await service.classify(text, use_local=False)
+            correct += result['type'] == label
+        except Exception as e:
+            print(f"⚠️ LLM识别失败: {e}")
+        latencies.append(time.perf_counter() - start)
+    
+    summarize("LLM类型识别", latencies, correct, len(dataset))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地内容类型分类器基准测试")
+    parser.add_argument("--data", default=None, help="评测数据（JSONL），默认使用用户作品")
+    parser.add_argument("--threshold", type=float, default=None, help="置信度阈值，默认使用LOCAL_CLASSIFIER_THRESHOLD配置")
+    parser.add_argument("--llm", action="store_true", help="同时评测LLM类型识别（会调用LLM API）")
+    args = parser.parse_args()
+    
+    dataset = load_dataset(args.data)
+    if not dataset:
+        print("❌ 没有评测数据")
+        return
+    
+    threshold = args.threshold if args.threshold is not None else get_settings().LOCAL_CLASSIFIER_THRESHOLD
+    print(f"\n评测样本数: {len(dataset)}\n" + "=" * 100)
+    benchmark_local(dataset, threshold)
+    if args.llm:
+        asyncio.run(benchmark_llm(dataset))
+    print("=" * 100)
+
+
+if __name__ == "__main__":
+    main()
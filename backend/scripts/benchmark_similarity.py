@@ -0,0 +1,115 @@
+"""
+模板相似度打分基准测试
+对比逐模板计算（SimilarityService._calculate_similarity）与特征索引向量化打分
+（TemplateFeatureIndex.score）在不同模板规模下的耗时
+
+模板规模超过数据库中的模板数时，复制现有模板并改写ID、标签和描述来模拟更大的模板库。
+
+用法（在backend目录下执行）:
+    python scripts/benchmark_similarity.py
+    python scripts/benchmark_similarity.py --sizes 100 1000 5000 --repeat 20
+"""
+import sys
+import os
+import time
+import random
+import argparse
+import statistics
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.db import get_db
+from app.models.template import Template
+from app.services.similarity_service import SimilarityService
+from app.services.template_feature_index import TemplateFeatureIndex
+from app.services.text_profile import TextProfile
+
+SAMPLE_TEXTS = [
+    "公司2023年各季度销售数据：第一季度120万，第二季度150万，第三季度180万，第四季度210万，同比增长30%",
+    "SWOT分析：优势是技术领先，劣势是品牌知名度低，机会是市场需求增长，威胁是竞争对手降价",
+    "产品上线流程：1. 需求评审 2. 设计开发 3. 测试验收 4. 灰度发布 5. 全量上线",
+    "公司组织架构：CEO下设技术部、市场部、销售部，技术部包括前端组、后端组和测试组",
+    "项目里程碑：2020年立项，2021年完成原型，2022年发布1.0版本，2023年用户突破百万",
+]
+
+EXTRA_WORDS = ["数据", "分析", "流程", "对比", "层级", "时间线", "关系", "矩阵", "增长", "结构", "步骤", "阶段"]
+
+
+def load_templates() -> list[dict]:
+    """加载数据库中的启用模板"""
+    with get_db() as db:
+        return [t.to_dict() for t in db.query(Template).filter(Template.is_active == True)]
+
+
+def scale_templates(templates: list[dict], size: int, seed: int = 42) -> list[dict]:
+    """复制模板到指定数量（改写ID、标签、描述，使词表随规模增长）"""
+    rng = random.Random(seed)
+    scaled = []
+    for i in range(size):
+        base = templates[i % len(templates)]
+        if i < len(templates):
+            scaled.append(base)
+            continue
+        suffix = f"{i // len(templates)}"
+        scaled.append({
+            **base,
+            "id": f"{base['id']}-{suffix}",
+            "tags": list(base.get("tags") or []) + [f"{rng.choice(EXTRA_WORDS)}{suffix}"],
+            "description": f"{base.get('description') or ''} {rng.choice(EXTRA_WORDS)}{suffix}",
+        })
+    return scaled
+
+
+def timed(func, repeat: int) -> float:
+    """多次执行取中位数耗时（毫秒）"""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模板相似度打分基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000, 5000], help="模板数量")
+    parser.add_argument("--repeat", type=int, default=10, help="每个规模重复次数")
+    args = parser.parse_args()
+    
+    templates = load_templates()
+    if not templates:
+        print("❌ 数据库中没有模板，请先运行 scripts/import_templates.py")
+        return
+    
+    service = SimilarityService()
+    print(f"\n基础模板数: {len(templates)}，每次查询对全部模板打分（{len(SAMPLE_TEXTS)}条文本 x 有/无类型）")
+    print("=" * 100)
+    print(f"{'模板数':>8} {'逐模板(ms)':>14} {'向量化(ms)':>14} {'加速比':>10} {'构建索引(ms)':>14}")
+    
+    for size in args.sizes:
+        scaled = scale_templates(templates, size)
+        queries = [(text, content_type) for text in SAMPLE_TEXTS for content_type in (None, "list")]
+        
+        def run_loop():
+            for text, content_type in queries:
+                for template in scaled:
+                    service._calculate_similarity(text, template, content_type)
+        
+        build_ms = timed(lambda: TemplateFeatureIndex(scaled), max(1, args.repeat // 2))
+        index = TemplateFeatureIndex(scaled)
+        
+        def run_vectorized():
+            for text, content_type in queries:
+                index.score(TextProfile.build(text), content_type)
+        
+        loop_ms = timed(run_loop, args.repeat) / len(queries)
+        vector_ms = timed(run_vectorized, args.repeat) / len(queries)
+        print(f"{size:>8} {loop_ms:>14.3f} {vector_ms:>14.3f} {loop_ms / vector_ms:>9.1f}x {build_ms:>14.1f}")
+    
+    print("=" * 100)
+    print("注：索引按模板目录版本构建一次，之后每次查询只需要向量化打分")
+
+
+if __name__ == "__main__":
+    main()
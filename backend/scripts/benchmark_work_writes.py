@@ -0,0 +1,158 @@
+"""
+作品保存吞吐基准测试
+对比逐个写入（每次保存一个事务：INSERT + COMMIT）与写入队列（write-behind，按间隔/批量大小合并为一个事务）
+在并发保存下的吞吐量和保存延迟。写入队列的"全部写入"吞吐包含关闭时写入剩余作品的时间。
+
+使用临时SQLite数据库（与应用相同的生产模式：WAL、单连接写入），不影响 infographic.db。
+
+用法（在backend目录下执行）:
+    python scripts/benchmark_work_writes.py
+    python scripts/benchmark_work_writes.py --saves 5000 --concurrency 50 --interval-ms 20 --batch-size 200
+"""
+import sys
+import os
+import time
+import asyncio
+import argparse
+import statistics
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+import app.models  # noqa: F401 (注册全部模型，user_works外键引用templates表)
+from app.models.base import Base
+from app.models.work import UserWork
+from app.repositories.work_repo import AsyncWorkRepository
+from app.services.work_write_queue import WorkWriteQueue
+from app.utils.compression import ZdictStore, bind_zdict_store
+from app.utils.sqlite_tuning import RoutingSession, create_sqlite_engines
+
+SAMPLE_TEXT = "产品上线流程：1. 需求评审 2. 设计开发 3. 测试验收 4. 灰度发布 5. 全量上线"
+SAMPLE_CONFIG = orjson.dumps({
+    "template": "list-row-simple-horizontal-arrow",
+    "data": {"items": [{"label": f"步骤{j}", "desc": SAMPLE_TEXT} for j in range(6)]}
+})
+
+
+def make_work(index: int) -> UserWork:
+    """构造作品（与保存作品接口相同，配置为JSON字节）"""
+    return UserWork(
+        user_id=f"user-{index % 20}",
+        title=f"作品{index}",
+        template_id="list-row-simple-horizontal-arrow",
+        input_text=SAMPLE_TEXT,
+        infographic_config=orjson.Fragment(SAMPLE_CONFIG)
+    )
+
+
+def open_database(path: str):
+    """创建临时数据库，返回 (写引擎, 读引擎, 异步Session工厂)"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    writer, reader = create_sqlite_engines(f"sqlite+aiosqlite:///{path}", create_async_engine, AsyncAdaptedQueuePool)
+    # 压缩字典使用临时数据库
+    bind_zdict_store(ZdictStore(engine), writer, reader)
+    factory = async_sessionmaker(
+        writer, class_=AsyncSession, sync_session_class=RoutingSession,
+        reader=reader.sync_engine, writer=writer.sync_engine, autoflush=False, expire_on_commit=False
+    )
+    return writer, reader, factory
+
+
+async def run_savers(save, total: int, concurrency: int) -> dict:
+    """并发保存作品，统计吞吐和每次保存的延迟"""
+    counter = iter(range(total))
+    latencies = []
+    
+    async def saver():
+        for index in counter:
+            start = time.perf_counter()
+            await save(make_work(index))
+            latencies.append((time.perf_counter() - start) * 1000)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(saver() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "elapsed": elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+    }
+
+
+async def benchmark_direct(path: str, args) -> dict:
+    """逐个写入：每次保存一个会话和事务"""
+    writer, reader, factory = open_database(path)
+    
+    async def save(work):
+        async with factory() as db:
+            await AsyncWorkRepository(db).create(work, refresh=False)
+    
+    try:
+        result = await run_savers(save, args.saves, args.concurrency)
+        result["durable"] = result["elapsed"]
+        async with factory() as db:
+            result["rows"] = await db.scalar(select(func.count()).select_from(UserWork))
+        return result
+    finally:
+        await writer.dispose()
+        await reader.dispose()
+
+
+async def benchmark_queue(path: str, args) -> dict:
+    """写入队列：入队后立即返回，批量写入"""
+    writer, reader, factory = open_database(path)
+    queue = WorkWriteQueue(factory, interval_ms=args.interval_ms, batch_size=args.batch_size,
+                           id_block_size=args.id_block_size)
+    
+    async def save(work):
+        await queue.enqueue(work, SAMPLE_CONFIG)
+    
+    try:
+        start = time.perf_counter()
+        result = await run_savers(save, args.saves, args.concurrency)
+        await queue.shutdown()
+        result["durable"] = time.perf_counter() - start
+        async with factory() as db:
+            result["rows"] = await db.scalar(select(func.count()).select_from(UserWork))
+        return result
+    finally:
+        await writer.dispose()
+        await reader.dispose()
+
+
+async def benchmark(args):
+    print(f"\n保存次数: {args.saves}，并发: {args.concurrency}，写入间隔: {args.interval_ms}ms，"
+          f"批量大小: {args.batch_size}，ID段: {args.id_block_size}")
+    print("=" * 88)
+    print(f"{'实现':<10} {'返回吞吐(次/s)':>14} {'全部写入吞吐(次/s)':>18} {'延迟P50(ms)':>12} "
+          f"{'延迟P99(ms)':>12} {'写入行数':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, run in (("逐个写入", benchmark_direct), ("写入队列", benchmark_queue)):
+            result = await run(os.path.join(tmp, f"{run.__name__}.db"), args)
+            print(f"{name:<10} {args.saves / result['elapsed']:>14.1f} {args.saves / result['durable']:>18.1f} "
+                  f"{result['p50']:>12.2f} {result['p99']:>12.2f} {result['rows']:>8}")
+    print("=" * 88)
+    print("注：写入队列的保存在入队后即返回，进程异常退出时最近一个写入间隔内的作品会丢失")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="作品保存吞吐基准测试")
+    parser.add_argument("--saves", type=int, default=3000, help="保存次数")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发保存数")
+    parser.add_argument("--interval-ms", type=int, default=50, help="写入队列的写入间隔（毫秒）")
+    parser.add_argument("--batch-size", type=int, default=200, help="写入队列每批最多写入的作品数")
+    parser.add_argument("--id-block-size", type=int, default=100, help="每次预分配的ID数量")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+构建模板语义相似度的n-gram IDF表
+统计文档：
+1. 启用模板的语义文本（描述、适用场景、关键词），每个模板一篇
+2. 已保存的用户作品输入文本（让用户常写但无区分度的n-gram获得较低权重）
+
+用法（在backend目录下执行）:
+    python scripts/build_semantic_idf.py
+    python scripts/build_semantic_idf.py --no-works --output ./semantic_idf.json
+"""
+import sys
+import os
+import json
+import argparse
+import logging
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import get_settings
+from app.utils.db import get_db
+from app.models.template import Template
+from app.models.work import UserWork
+from app.services.semantic_index import build_semantic_idf, template_semantic_text
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def load_documents(include_works: bool = True) -> tuple[list[str], dict]:
+    """
+    加载统计IDF的文档
+    
+    Args:
+        include_works: 是否包含用户作品的输入文本
+    
+    Returns:
+        tuple: (文档列表, 各来源文档数)
+    """
+    documents = []
+    with get_db() as db:
+        for t in db.query(Template).filter(Template.is_active == True):
+            documents.append(template_semantic_text(t.to_dict()))
+        sources = {"templates": len(documents)}
+        
+        if include_works:
+            works = [text for (text,) in db.query(UserWork.input_text) if text and text.strip()]
+            documents.extend(works)
+            sources["works"] = len(works)
+    
+    logger.info(f"文档来源: {sources}")
+    return documents, sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description="构建模板语义相似度的n-gram IDF表")
+    parser.add_argument("--output", default=None, help="输出路径，默认使用SEMANTIC_IDF_PATH配置")
+    parser.add_argument("--no-works", action="store_true", help="不统计用户作品的输入文本")
+    args = parser.parse_args()
+    
+    output = args.output or get_settings().SEMANTIC_IDF_PATH
+    documents, sources = load_documents(include_works=not args.no_works)
+    if not documents:
+        logger.error("没有可用的文档")
+        return
+    
+    idf = build_semantic_idf(documents, meta={"sources": sources})
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(idf.to_dict(), f, ensure_ascii=False)
+    logger.info(f"IDF已保存: {output}（文档: {idf.documents}, 词项: {len(idf.idf)}, "
+                f"{os.path.getsize(output) / 1024:.0f} KB）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+作品内容压缩迁移
+1. 由已有作品的Infographic配置训练zlib预置字典，保存到数据库的 work_zdicts 表并设为当前字典
+2. 将 user_works 的 input_text、infographic_config 按当前设置重新压缩（未压缩的历史数据、旧字典压缩的数据都会更新）
+3. VACUUM回收空间，输出迁移前后的数据库大小、两列的存储字节数和按ID读取作品的延迟
+
+迁移可重复执行；中断后重新执行即可（每批单独提交）。执行前请先备份数据库。
+PostgreSQL的两列在应用启动（或本脚本执行）时由 ensure_binary_columns 转换为BYTEA。
+此前版本把字典保存在目录中（<ID>.zdict），使用 --import-zdict-dir 导入数据库。
+
+用法（在backend目录下执行）:
+    python scripts/compress_user_works.py
+    python scripts/compress_user_works.py --no-train --batch-size 200
+    python scripts/compress_user_works.py --import-zdict-dir ./zdicts --no-train
+"""
+import sys
+import os
+import time
+import random
+import argparse
+import logging
+import statistics
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+from sqlalchemy import select, text
+from app.utils.db import engine, get_db, init_db
+from app.models.work import UserWork
+from app.utils.compression import compress, decompress, get_zdict_store, train_zdict
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def database_size() -> int:
+    """数据库文件大小（含WAL文件，字节）"""
+    path = engine.url.database
+    if engine.dialect.name != "sqlite" or not path or path == ":memory:":
+        return 0
+    return sum(os.path.getsize(p) for p in (path, f"{path}-wal") if os.path.exists(p))
+
+
+def column_bytes() -> dict:
+    """两列的存储字节数"""
+    with get_db() as db:
+        row = db.execute(text(
+            "SELECT COUNT(*), SUM(LENGTH(CAST(input_text AS BLOB))), SUM(LENGTH(CAST(infographic_config AS BLOB))) "
+            "FROM user_works"
+        )).one()
+    return {"works": row[0], "input_text": row[1] or 0, "infographic_config": row[2] or 0}
+
+
+def read_latency(ids: list, rounds: int = 3) -> dict:
+    """按ID读取作品（解压并解析）的延迟（毫秒）"""
+    timings = []
+    for _ in range(rounds):
+        with get_db() as db:
+            for work_id in ids:
+                start = time.perf_counter()
+                db.get(UserWork, work_id).to_dict()
+                timings.append((time.perf_counter() - start) * 1000)
+            db.expunge_all()
+    if not timings:
+        return {"p50": 0.0, "mean": 0.0}
+    return {"p50": statistics.median(timings), "mean": statistics.fmean(timings)}
+
+
+def report(name: str) -> dict:
+    """统计并输出当前存储情况"""
+    with get_db() as db:
+        ids = list(db.scalars(select(UserWork.id)))
+    stats = {"size": database_size(), **column_bytes(), **read_latency(random.sample(ids, min(len(ids), 200)))}
+    logger.info(
+        f"{name}: 数据库 {stats['size'] / 1024:.1f} KB, 作品 {stats['works']} 个, "
+        f"input_text {stats['input_text'] / 1024:.1f} KB, infographic_config {stats['infographic_config'] / 1024:.1f} KB, "
+        f"按ID读取 p50 {stats['p50']:.3f} ms / 平均 {stats['mean']:.3f} ms"
+    )
+    return stats
+
+
+def load_raw(db, work_id: int):
+    """读取作品两列的存储值（不经过列类型转换）"""
+    return db.execute(
+        text("SELECT input_text, infographic_config FROM user_works WHERE id = :id"), {"id": work_id}
+    ).one()
+
+
+def train(samples: int) -> None:
+    """由已有作品的配置训练预置字典（配置统一为orjson序列化，与新写入的格式一致）"""
+    configs = []
+    with get_db() as db:
+        ids = list(db.scalars(select(UserWork.id)))
+        for work_id in random.sample(ids, min(len(ids), samples)):
+            _, raw_config = load_raw(db, work_id)
+            configs.append(orjson.dumps(orjson.loads(decompress(raw_config))))
+    
+    if len(configs) < 2:
+        logger.info("作品数不足，不训练字典，配置使用普通zlib压缩")
+        return
+    zdict = train_zdict(configs)
+    if not zdict:
+        logger.info("配置中没有重复片段，不训练字典")
+        return
+    zdict_id = get_zdict_store().save(zdict)
+    logger.info(f"✓ 训练压缩字典: {zdict_id:08x}, 大小 {len(zdict)} 字节, 样本 {len(configs)} 个")
+
+
+def import_zdicts(directory: str) -> None:
+    """导入目录中的字典文件（此前版本的字典存储），CURRENT 文件记录的字典设为当前字典"""
+    path = Path(directory)
+    current_file = path / "CURRENT"
+    current = current_file.read_text(encoding="utf-8").strip() if current_file.is_file() else None
+    store = get_zdict_store()
+    for zdict_file in sorted(path.glob("*.zdict")):
+        zdict_id = store.save(zdict_file.read_bytes(), make_current=zdict_file.stem == current)
+        logger.info(f"✓ 导入压缩字典: {zdict_id:08x}")
+
+
+def recompress(batch_size: int) -> int:
+    """
+    按当前设置重新压缩全部作品（直接写入压缩后的字节，不更新updated_at）
+    
+    Returns:
+        int: 更新的作品数
+    """
+    with get_db() as db:
+        ids = list(db.scalars(select(UserWork.id).order_by(UserWork.id)))
+    
+    updated = 0
+    for offset in range(0, len(ids), batch_size):
+        rows = []
+        with get_db() as db:
+            for work_id in ids[offset:offset + batch_size]:
+                raw_text, raw_config = load_raw(db, work_id)
+                input_text = decompress(raw_text)
+                config = orjson.dumps(orjson.loads(decompress(raw_config)))
+                new_text, new_config = compress(input_text), compress(config, use_dict=True)
+                # 写入前校验可以还原
+                if decompress(new_text) != input_text or decompress(new_config) != config:
+                    raise ValueError(f"作品 {work_id} 压缩后无法还原")
+                rows.append({
+                    "id": work_id,
+                    "input_text": new_text,
+                    "infographic_config": new_config,
+                    "input_excerpt": input_text.decode("utf-8")[:UserWork.input_excerpt.type.length],
+                })
+            db.execute(text(
+                "UPDATE user_works SET input_text = :input_text, infographic_config = :infographic_config, "
+                "input_excerpt = :input_excerpt WHERE id = :id"
+            ), rows)
+            db.commit()
+        updated += len(rows)
+        logger.info(f"已压缩 {updated}/{len(ids)}")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="作品内容压缩迁移")
+    parser.add_argument("--no-train", action="store_true", help="不重新训练字典，使用当前字典")
+    parser.add_argument("--train-samples", type=int, default=2000, help="训练字典使用的作品数")
+    parser.add_argument("--batch-size", type=int, default=500, help="每批更新的作品数")
+    parser.add_argument("--no-vacuum", action="store_true", help="迁移后不执行VACUUM")
+    parser.add_argument("--import-zdict-dir", help="先导入该目录中的字典文件（此前版本的字典目录）")
+    args = parser.parse_args()
+    
+    # 确保摘录列等已就绪
+    init_db()
+    random.seed(0)
+    before = report("迁移前")
+    
+    if args.import_zdict_dir:
+        import_zdicts(args.import_zdict_dir)
+    if not args.no_train:
+        train(args.train_samples)
+    updated = recompress(args.batch_size)
+    
+    if engine.dialect.name == "sqlite" and not args.no_vacuum:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+            conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+    
+    random.seed(0)
+    after = report("迁移后")
+    
+    print("\n" + "=" * 72)
+    print(f"{'指标':<24} {'迁移前':>14} {'迁移后':>14} {'变化':>14}")
+    print("-" * 72)
+    for key, label, unit in (
+        ("size", "数据库大小", "KB"),
+        ("input_text", "input_text", "KB"),
+        ("infographic_config", "infographic_config", "KB"),
+        ("p50", "按ID读取 p50", "ms"),
+        ("mean", "按ID读取 平均", "ms"),
+    ):
+        scale = 1024 if unit == "KB" else 1
+        old, new = before[key] / scale, after[key] / scale
+        change = f"{(new / old - 1) * 100:+.1f}%" if old else "-"
+        print(f"{label + f' ({unit})':<24} {old:>14.2f} {new:>14.2f} {change:>14}")
+    print("=" * 72)
+    logger.info(f"✅ 作品内容压缩完成，更新 {updated} 个作品")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.utils.db import get_db_session
+from app.services.template_catalog import bump_catalog_version
 from app.models.template import Template
 import logging
 
@@ -38,6 +39,7 @@ def delete_duplicate_template():
         # 删除模板
         db.delete(template)
         db.commit()
+        bump_catalog_version()
         
         logger.info("✅ 成功删除模板 quadrant-priority-matrix")
         
@@ -10,6 +10,7 @@ import logging
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.utils.db import get_db_session
+from app.services.template_catalog import bump_catalog_version
 from app.models.template import Template
 from sqlalchemy.orm.attributes import flag_modified
 
@@ -67,6 +68,7 @@ def fix_chart_column_templates():
         
         # 提交更改
         db.commit()
+        bump_catalog_version()
         logger.info(f"\n{'='*60}")
         logger.info("✅ 所有修复已提交到数据库")
         logger.info(f"{'='*60}")
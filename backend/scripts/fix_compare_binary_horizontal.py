@@ -10,6 +10,7 @@ import json
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from app.utils.db import get_db_session
+from app.services.template_catalog import bump_catalog_version
 from app.repositories.template_repo import TemplateRepository
 from sqlalchemy import text
 
@@ -50,6 +51,7 @@ def fix_compare_binary_horizontal():
         )
         
         db.commit()
+        bump_catalog_version()
         
         print(f"✅ 已更新 compare-binary-horizontal 模板")
         print(f"   - 设置正确的 designConfig")
@@ -8,6 +8,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.utils.db import get_db_session
+from app.services.template_catalog import bump_catalog_version
 from app.models.template import Template
 from sqlalchemy.orm.attributes import flag_modified
 from datetime import datetime
@@ -110,6 +111,7 @@ def fix_invalid_structures():
         
         # 提交所有更改
         db.commit()
+        bump_catalog_version()
         logger.info(f"✅ 成功修复 {fixed_count} 个模板")
         
     except Exception as e:
@@ -10,6 +10,7 @@ import logging
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.utils.db import get_db
+from app.services.template_catalog import bump_catalog_version
 from app.models.template import Template
 
 logging.basicConfig(
@@ -64,6 +65,7 @@ def fix_template_structure():
             template.updated_at = datetime.utcnow()
             
             db.commit()
+            bump_catalog_version()
             logger.info("✅ 修复成功: chart-bar-vertical -> chart-column (含 items 配置)")
         elif current_type == 'chart-column':
             # 检查是否有 items 配置
@@ -84,6 +86,7 @@ def fix_template_structure():
                 template.updated_at = datetime.utcnow()
                 
                 db.commit()
+                bump_catalog_version()
                 logger.info("✅ 已添加 items 配置")
             else:
                 logger.info("✅ 模板已经是正确的结构类型且包含 items 配置,无需修复")
@@ -12,6 +12,7 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.utils.db import get_db
+from app.services.template_catalog import bump_catalog_version
 from app.models.template import Template
 
 logging.basicConfig(
@@ -129,6 +130,10 @@ def import_templates(json_file: str, skip_existing: bool = True):
                 errors.append(f"{template_id}: {str(e)}")
                 logger.error(f"[{idx}/{len(templates_data)}] ❌ {template_id} - 导入失败: {e}")
     
+    # 通知运行中的服务重新加载模板目录
+    if success_count:
+        bump_catalog_version()
+    
     # 打印导入报告
     logger.info("\n" + "="*60)
     logger.info("导入报告")
@@ -14,6 +14,7 @@ backend_dir = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(backend_dir))
 
 from app.utils.db import get_db_session
+from app.services.template_catalog import bump_catalog_version
 from sqlalchemy import text
 import logging
 
@@ -127,6 +128,7 @@ def update_template_categories():
             logger.info(f"✓ {template_id}: category={category}, structure_type={structure_type}")
         
         db.commit()
+        bump_catalog_version()
         logger.info(f"分类完成！共更新 {updated_count} 个模板")
         
     except Exception as e:
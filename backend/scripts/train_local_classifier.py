@@ -0,0 +1,127 @@
+"""
+训练本地内容类型分类器
+训练样本来源：
+1. 已保存的用户作品（user_works.input_text -> 所用模板的分类）
+2. 模板元数据（名称、描述、关键词、适用场景 -> 模板分类）
+3. 可选的额外标注数据（JSONL，每行 {"text": "...", "type": "..."}）
+
+用法（在backend目录下执行）:
+    python scripts/train_local_classifier.py
+    python scripts/train_local_classifier.py --extra data/labeled.jsonl --output ./local_classifier.json
+"""
+import sys
+import os
+import json
+import argparse
+import logging
+import random
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import get_settings
+from app.utils.db import get_db
+from app.models.template import Template
+from app.models.work import UserWork
+from app.services.local_classifier import LocalTypeClassifier, category_to_type, train_model
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def load_samples(extra_path: str = None) -> list[tuple[str, str]]:
+    """
+    加载训练样本
+    
+    Args:
+        extra_path: 额外标注数据（JSONL）路径
+    
+    Returns:
+        list: [(文本, 类型)]
+    """
+    samples = []
+    with get_db() as db:
+        categories = {t.id: t.category for t in db.query(Template.id, Template.category)}
+        
+        # 用户作品：输入文本 -> 模板分类
+        works = db.query(UserWork.input_text, UserWork.template_id).all()
+        for input_text, template_id in works:
+            category = categories.get(template_id)
+            if category and input_text and input_text.strip():
+                samples.append((input_text, category_to_type(category)))
+        logger.info(f"用户作品样本: {len(samples)}")
+        
+        # 模板元数据：每个字段作为一条样本
+        template_samples = 0
+        for t in db.query(Template).filter(Template.is_active == True):
+            for text in (t.name, t.description, t.keywords, t.use_cases):
+                if text and text.strip():
+                    samples.append((text, category_to_type(t.category)))
+                    template_samples += 1
+        logger.info(f"模板元数据样本: {template_samples}")
+    
+    if extra_path:
+        extra = 0
+        with open(extra_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                samples.append((record['text'], record['type']))
+                extra += 1
+        logger.info(f"额外标注样本: {extra}")
+    
+    return samples
+
+
+def evaluate(model: dict, samples: list[tuple[str, str]]) -> float:
+    """计算样本上的准确率"""
+    if not samples:
+        return 0.0
+    classifier = LocalTypeClassifier(model)
+    correct = sum(1 for text, label in samples if classifier.predict(text)[0] == label)
+    return correct / len(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="训练本地内容类型分类器")
+    parser.add_argument("--output", default=None, help="模型输出路径，默认使用LOCAL_CLASSIFIER_PATH配置")
+    parser.add_argument("--extra", default=None, help="额外标注数据（JSONL）")
+    parser.add_argument("--epochs", type=int, default=30, help="训练轮数")
+    parser.add_argument("--holdout", type=float, default=0.2, help="验证集比例（0表示不划分）")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+    
+    output = args.output or get_settings().LOCAL_CLASSIFIER_PATH
+    samples = load_samples(args.extra)
+    if not samples:
+        logger.error("没有可用的训练样本")
+        return
+    
+    # 划分验证集评估泛化效果，最终模型使用全部样本训练
+    if args.holdout > 0 and len(samples) >= 10:
+        shuffled = samples[:]
+        random.Random(args.seed).shuffle(shuffled)
+        split = max(1, int(len(shuffled) * args.holdout))
+        holdout, train = shuffled[:split], shuffled[split:]
+        model = train_model(train, epochs=args.epochs, seed=args.seed)
+        logger.info(f"验证集准确率: {evaluate(model, holdout):.2%}（训练{len(train)}条，验证{len(holdout)}条）")
+    
+    start = time.time()
+    model = train_model(samples, epochs=args.epochs, seed=args.seed)
+    logger.info(f"训练完成 - 样本: {len(samples)}, 耗时: {time.time() - start:.1f}s, "
+                f"训练集准确率: {evaluate(model, samples):.2%}")
+    logger.info(f"各类型样本数: {model['label_counts']}")
+    
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(model, f, ensure_ascii=False)
+    logger.info(f"模型已保存: {output}（{os.path.getsize(output) / 1024:.0f} KB）")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,7 +23,14 @@ export const templateAPI = {
   /**
    * 获取模板列表
    */
-  async getTemplates(params?: { category?: string; keyword?: string; page?: number; pageSize?: number }): Promise<any> {
+  async getTemplates(params?: {
+    category?: string
+    keyword?: string
+    page?: number
+    pageSize?: number
+    fields?: string
+    view?: 'summary' | 'full'
+  }): Promise<any> {
     return apiClient.get('/templates', { params })
   },
 
@@ -27,6 +27,20 @@ export interface Work {
   updatedAt: string
 }
 
+/**
+ * 作品摘要（作品列表返回，不含原始文本全文和Infographic配置，需要时通过 getWork 获取）
+ */
+export interface WorkSummary {
+  id: number
+  userId: string | null
+  title: string
+  templateId: string
+  excerpt: string
+  thumbnailUrl: string | null
+  createdAt: string
+  updatedAt: string
+}
+
 /**
  * 创建作品
  */
@@ -35,15 +49,17 @@ export async function createWork(data: WorkCreateRequest): Promise<APIResponse<W
 }
 
 /**
- * 获取作品列表
+ * 获取作品列表（摘要）
+ * 传入上一页返回的 nextCursor 作为 cursor 获取下一页（游标分页，忽略page），没有下一页时 nextCursor 为 null
  */
-export async function getWorks(page = 1, pageSize = 20): Promise<APIResponse<{
-  works: Work[]
-  total: number
+export async function getWorks(page = 1, pageSize = 20, cursor?: string | null): Promise<APIResponse<{
+  works: WorkSummary[]
+  total: number | null
   page: number
   pageSize: number
+  nextCursor: string | null
 }>> {
-  return apiClient.get('/works', { params: { page, pageSize } })
+  return apiClient.get('/works', { params: { page, pageSize, cursor: cursor || undefined } })
 }
 
 /**
@@ -13,8 +13,9 @@ export interface Template {
   useCases?: string
   previewUrl?: string
   tags?: string[]
-  dataSchema: any
-  designConfig: any
+  // 列表使用摘要视图时不返回，需要时通过模板详情获取
+  dataSchema?: any
+  designConfig?: any
 }
 
 export interface Category {
@@ -44,7 +45,7 @@ export const useTemplateStore = defineStore('template', () => {
   async function fetchTemplates(category?: string, keyword?: string) {
     loading.value = true
     try {
-      const response = await getTemplates({ category, keyword, page: 1, pageSize: 100 })
+      const response = await getTemplates({ category, keyword, page: 1, pageSize: 100, view: 'summary' })
       if (response.success && response.data) {
         templates.value = response.data.templates
       }
@@ -0,0 +1,90 @@
+"""
+后端测试共享fixture
+提供临时SQLite数据库上的同步/异步会话、作品构造函数，以及数据访问层模块级状态的隔离
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+import app.models  # noqa: F401 (注册全部模型，user_works外键引用templates表)
+from app.models.base import Base
+from app.models.work import UserWork
+from app.repositories import template_repo, work_repo
+from app.utils.compression import ZdictStore, bind_zdict_store, get_zdict_store
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """临时SQLite数据库文件"""
+    return tmp_path / "test.db"
+
+
+@pytest.fixture
+def sync_engine(db_path):
+    """已建表的临时数据库同步引擎（压缩字典同样保存在临时数据库中）"""
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    bind_zdict_store(ZdictStore(engine), engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(sync_engine):
+    """同步Session工厂"""
+    return sessionmaker(bind=sync_engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    """同步会话（测试结束时关闭）"""
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def async_engine(db_path, sync_engine):
+    """同一临时数据库的异步引擎（不使用连接池，每个测试可在各自的事件循环中使用）"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    bind_zdict_store(get_zdict_store(sync_engine.dialect), engine)
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def async_session_factory(async_engine):
+    """异步Session工厂（expire_on_commit=False，与应用相同）"""
+    return async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+def repo_state(monkeypatch):
+    """重置作品计数表和模板检索索引的检查状态，测试结束后恢复"""
+    monkeypatch.setattr(work_repo, "_work_counts_ready", None)
+    monkeypatch.setattr(template_repo, "_search_index_ready", None)
+
+
+@pytest.fixture
+def make_work():
+    """作品构造函数：make_work(序号, user_id=None, **字段)"""
+    def factory(index, user_id=None, **fields):
+        values = {
+            "title": f"作品{index}",
+            "template_id": "t",
+            "input_text": f"文本{index}",
+            "infographic_config": {"index": index},
+        }
+        values.update(fields)
+        return UserWork(user_id=user_id, **values)
+    return factory
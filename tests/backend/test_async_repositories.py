@@ -0,0 +1,90 @@
+"""
+异步数据访问层测试
+验证同步URL到异步驱动URL的转换、AsyncWorkRepository的增删查与分页，
+以及AsyncTemplateRepository的全文检索与同步实现结果一致
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+import pytest
+
+from app.models.template import Template
+from app.repositories import template_repo
+from app.repositories.template_repo import AsyncTemplateRepository, TemplateRepository
+from app.repositories.work_repo import AsyncWorkRepository
+from app.utils.db import to_async_url
+
+
+def test_to_async_url():
+    """未指定驱动的URL替换为异步驱动，已是异步驱动的URL不变"""
+    assert to_async_url("sqlite:///./infographic.db") == "sqlite+aiosqlite:///./infographic.db"
+    assert to_async_url("sqlite+pysqlite:///data.db") == "sqlite+aiosqlite:///data.db"
+    assert to_async_url("sqlite+aiosqlite:///data.db") == "sqlite+aiosqlite:///data.db"
+    assert to_async_url("postgresql://user:pw@db:5432/app") == "postgresql+asyncpg://user:pw@db:5432/app"
+    assert to_async_url("postgresql+psycopg2://user:pw@db/app") == "postgresql+asyncpg://user:pw@db/app"
+    assert to_async_url("mysql+aiomysql://user@db/app") == "mysql+aiomysql://user@db/app"
+
+
+def test_async_work_repository(async_session_factory, repo_state, make_work):
+    """作品的创建、查询、分页和删除"""
+    async def main():
+        async with async_session_factory() as db:
+            repo = AsyncWorkRepository(db)
+            created = [await repo.create(make_work(i, "u1" if i < 3 else "u2")) for i in range(5)]
+            assert [work.id for work in created] == [1, 2, 3, 4, 5]
+            assert created[0].to_dict()["createdAt"] is not None
+
+        async with async_session_factory() as db:
+            repo = AsyncWorkRepository(db)
+            work = await repo.get_by_id(2)
+            assert work.title == "作品1" and work.infographic_config == {"index": 1}
+            assert await repo.get_by_id(99) is None
+
+            works, total = await repo.get_all(page=1, page_size=2)
+            assert total == 5 and len(works) == 2
+            works, total = await repo.get_all(user_id="u1", page=2, page_size=2)
+            assert total == 3 and len(works) == 1
+            assert await repo.get_all(user_id="nobody") == ([], 0)
+
+            assert await repo.delete(5) is True
+            assert await repo.delete(5) is False
+            assert (await repo.get_all())[1] == 4
+
+    asyncio.run(main())
+
+
+def test_async_template_search_matches_sync(db, async_session_factory, repo_state):
+    """异步全文检索与同步实现返回相同结果"""
+    db.add_all([
+        Template(id="steps", name="步骤流程图", category="sequence", description="横向步骤流程图",
+                 data_schema={}, design_config={}, is_active=True),
+        Template(id="flow", name="循环流程图", category="relation", description="循环往复的流程",
+                 data_schema={}, design_config={}, sort_order=3, is_active=True),
+    ])
+    db.commit()
+
+    async def main():
+        async with async_session_factory() as adb:
+            repo = AsyncTemplateRepository(adb)
+            # 首次检索时在异步会话中建立索引
+            hits, total = await repo.search("流程图")
+            assert template_repo._search_index_ready is True
+            assert total == 2 and {hit["id"] for hit in hits} == {"steps", "flow"}
+            assert await repo.search("流程图", category="relation") == TemplateRepository(db).search(
+                "流程图", category="relation")
+            assert await repo.search("流程图", offset=5) == ([], 2)
+            assert await repo.search("流程") is None
+
+            assert (await repo.get_by_id("flow")).name == "循环流程图"
+            assert [t.id for t in await repo.get_by_category("sequence")] == ["steps"]
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
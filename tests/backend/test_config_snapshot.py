@@ -0,0 +1,109 @@
+"""
+配置快照热更新测试
+验证配置文件mtime变化时重新加载并替换快照，以及 .env 或YAML加载失败时保留上一个快照中的配置
+"""
+import os
+import sys
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+import pytest
+
+from app import config
+
+
+@pytest.fixture
+def config_files(tmp_path, monkeypatch):
+    """配置文件指向临时目录，并重置模块级快照"""
+    env_file = tmp_path / ".env"
+    prompts_file = tmp_path / "llm_prompts.yaml"
+    workflows_file = tmp_path / "dify_workflows.yaml"
+    env_file.write_text("APP_NAME=初始名称\nCONFIG_WATCH_INTERVAL=0\n", encoding="utf-8")
+    prompts_file.write_text("classify:\n  system: 初始提示词\n", encoding="utf-8")
+    workflows_file.write_text("list-row: {}\n", encoding="utf-8")
+
+    monkeypatch.setattr(config, "ENV_FILE", str(env_file))
+    monkeypatch.setattr(config, "PROMPTS_FILE", str(prompts_file))
+    monkeypatch.setattr(config, "WORKFLOWS_FILE", str(workflows_file))
+    monkeypatch.setattr(config, "_snapshot", None)
+    monkeypatch.setattr(config, "_last_check", 0.0)
+    for name in ("APP_NAME", "CONFIG_WATCH_INTERVAL", "AIHUBMIX_TIMEOUT"):
+        monkeypatch.delenv(name, raising=False)
+    return env_file, prompts_file
+
+
+def touch_later(path: Path, content: str):
+    """写入新内容，并把mtime推后（避免同一时间戳内的修改检测不到）"""
+    mtime = path.stat().st_mtime
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, (mtime + 10, mtime + 10))
+
+
+def test_reload_on_mtime_change(config_files):
+    """配置文件变化时重新加载，未变化时复用同一个快照"""
+    env_file, prompts_file = config_files
+    first = config.get_config_snapshot()
+    assert first.version == 1 and first.settings.APP_NAME == "初始名称"
+    assert first.prompts["classify"]["system"] == "初始提示词"
+    assert config.get_config_snapshot() is first
+
+    touch_later(env_file, "APP_NAME=新名称\nCONFIG_WATCH_INTERVAL=0\n")
+    second = config.get_config_snapshot()
+    assert second.version == 2 and config.get_settings().APP_NAME == "新名称"
+
+    touch_later(prompts_file, "classify:\n  system: 新提示词\n")
+    third = config.get_config_snapshot()
+    assert third.version == 3 and third.prompts["classify"]["system"] == "新提示词"
+    assert third.settings.APP_NAME == "新名称"
+
+
+def test_watch_interval_throttles_checks(config_files, monkeypatch):
+    """检查间隔内不检测文件变化"""
+    env_file, _ = config_files
+    touch_later(env_file, "APP_NAME=初始名称\nCONFIG_WATCH_INTERVAL=3600\n")
+    first = config.get_config_snapshot()
+    touch_later(env_file, "APP_NAME=新名称\nCONFIG_WATCH_INTERVAL=3600\n")
+    assert config.get_config_snapshot() is first
+    monkeypatch.setattr(config, "_last_check", 0.0)
+    assert config.get_settings().APP_NAME == "新名称"
+
+
+def test_invalid_env_keeps_previous_settings(config_files):
+    """.env 校验失败时保留当前配置，修复后恢复加载"""
+    env_file, _ = config_files
+    first = config.get_config_snapshot()
+
+    touch_later(env_file, "APP_NAME=新名称\nAIHUBMIX_TIMEOUT=不是数字\nCONFIG_WATCH_INTERVAL=0\n")
+    broken = config.get_config_snapshot()
+    assert broken.version == 2 and broken.settings is first.settings
+    assert config.get_settings().APP_NAME == "初始名称"
+    # 同一个有问题的文件不会反复重新加载
+    assert config.get_config_snapshot() is broken
+
+    touch_later(env_file, "APP_NAME=新名称\nAIHUBMIX_TIMEOUT=45\nCONFIG_WATCH_INTERVAL=0\n")
+    fixed = config.get_settings()
+    assert fixed.APP_NAME == "新名称" and fixed.AIHUBMIX_TIMEOUT == 45
+
+
+def test_invalid_yaml_keeps_previous_prompts(config_files):
+    """YAML解析失败时保留当前提示词配置"""
+    _, prompts_file = config_files
+    first = config.get_config_snapshot()
+    touch_later(prompts_file, "classify: [未闭合\n")
+    snapshot = config.get_config_snapshot()
+    assert snapshot.version == 2 and snapshot.prompts == first.prompts
+
+
+def test_initial_invalid_env_raises(config_files):
+    """首次加载时没有可保留的配置，校验失败直接抛出"""
+    env_file, _ = config_files
+    env_file.write_text("AIHUBMIX_TIMEOUT=不是数字\n", encoding="utf-8")
+    with pytest.raises(Exception):
+        config.get_config_snapshot()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
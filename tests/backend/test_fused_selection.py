@@ -0,0 +1,126 @@
+"""
+合并识别与选择（fast模式）测试
+验证紧凑模板列表的格式，以及严格校验在结果不合法、或模板不属于识别出的类型时抛出异常（由调用方回退到两阶段流程）
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.utils.prompt_manager import get_prompt_manager
+from app.services.type_classification_service import get_type_classification_service
+from app.services import template_selection_service
+from app.services.template_selection_service import TemplateSelectionService, get_template_selection_service
+
+TEMPLATES = [
+    {"id": "checklist", "name": "清单", "category": "list", "description": "勾选清单"},
+    {"id": "sequence-steps", "name": "简单步骤", "category": "sequence", "description": "最简单的步骤流程图" * 5},
+    {"id": "relation-network", "name": "关系网络", "category": "relation", "description": "节点与连线"},
+]
+
+
+def make_selection_service():
+    """使用固定模板列表的模板选择服务"""
+    service = TemplateSelectionService()
+    service.template_service = SimpleNamespace(
+        get_templates_by_category=lambda category: [t for t in TEMPLATES if t["category"] == category],
+        get_all_templates=lambda page=1, page_size=100: {"templates": list(TEMPLATES)}
+    )
+    return service
+
+
+def fused_response(content_type, template_id):
+    """合并调用的LLM响应"""
+    return json.dumps({
+        "type": content_type, "typeConfidence": 0.9, "typeReason": "r",
+        "templateId": template_id, "templateName": "x", "confidence": 0.8, "reason": "r"
+    })
+
+
+def test_fused_prompt_groups_templates_by_category():
+    """合并提示词按分类列出模板，每个模板一行，描述被截断"""
+    _, user_prompt, _, _ = get_prompt_manager().get_fused_selection_prompt("测试文本", TEMPLATES)
+    assert "测试文本" in user_prompt
+    assert "### list\n- checklist: 清单 - 勾选清单" in user_prompt
+    assert "### sequence\n- sequence-steps: 简单步骤 - " in user_prompt
+    assert "…" in user_prompt
+
+
+def test_strict_validation_raises():
+    """严格模式下不合法的类型/模板ID抛出异常，非严格模式修正为默认值"""
+    classification = get_type_classification_service()
+    selection = get_template_selection_service()
+
+    lenient = {"type": "unknown", "confidence": 0.9, "reason": "r"}
+    classification.validate_classification(lenient)
+    assert lenient["type"] == "list"
+
+    for bad in ({"type": "unknown", "confidence": 0.9, "reason": "r"},
+                {"type": "list", "confidence": None, "reason": "r"}):
+        try:
+            classification.validate_classification(bad, strict=True)
+            assert False, "应抛出异常"
+        except ValueError:
+            pass
+
+    try:
+        selection._validate_result(
+            {"templateId": "nope", "templateName": "x", "confidence": 0.8, "reason": "r"},
+            TEMPLATES,
+            strict=True
+        )
+        assert False, "应抛出异常"
+    except ValueError:
+        pass
+
+
+def test_candidate_templates_map_types_to_categories():
+    """类型relationship对应模板分类relation，分类没有模板时使用所有模板"""
+    service = make_selection_service()
+    assert [t["id"] for t in service.get_candidate_templates("relationship")] == ["relation-network"]
+    assert [t["id"] for t in service.get_candidate_templates("list")] == ["checklist"]
+    assert len(service.get_candidate_templates("chart")) == len(TEMPLATES)
+
+
+def test_fused_template_must_match_type():
+    """合并结果的模板属于其他类型时抛出异常，同类型（含relationship）通过"""
+    service = make_selection_service()
+    fused = service._parse_fused_response(fused_response("relationship", "relation-network"))
+    assert fused["classification"]["type"] == "relationship"
+    assert fused["selection"]["templateId"] == "relation-network"
+
+    for content_type, template_id in (("list", "sequence-steps"), ("relationship", "checklist")):
+        try:
+            service._parse_fused_response(fused_response(content_type, template_id))
+            assert False, "模板与类型不一致时应抛出异常"
+        except ValueError:
+            pass
+
+    llm = SimpleNamespace(chat_completion=AsyncMock(return_value=fused_response("list", "sequence-steps")))
+    with patch.object(template_selection_service, "get_llm_client", return_value=llm):
+        try:
+            asyncio.run(service.classify_and_select("先做A，再做B"))
+            assert False, "模板与类型不一致时应抛出异常"
+        except ValueError:
+            pass
+        # 不一致的响应不能通过缓存校验
+        validate = llm.chat_completion.await_args.kwargs["validate"]
+        try:
+            validate(fused_response("list", "sequence-steps"))
+            assert False, "不一致的响应不应写入缓存"
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    test_fused_prompt_groups_templates_by_category()
+    test_strict_validation_raises()
+    test_candidate_templates_map_types_to_categories()
+    test_fused_template_must_match_type()
+    print("✓ 合并识别与选择测试全部通过")
@@ -0,0 +1,70 @@
+"""
+生成接口路由测试
+验证请求参数按接口各自的请求模型传给生成服务（传统提取接口没有mode参数，智能生成接口传递mode）
+"""
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import generate
+
+
+def make_client():
+    """挂载生成路由的测试应用"""
+    app = FastAPI()
+    app.include_router(generate.router, prefix="/generate")
+    return TestClient(app)
+
+
+def test_extract_route():
+    """传统提取接口按请求字段调用 extract_data"""
+    service = AsyncMock()
+    service.extract_data.return_value = {"config": {"data": {}}, "extractionTime": 0.1}
+    with patch.object(generate, "get_generate_service", return_value=service):
+        response = make_client().post("/generate/extract", json={"text": "季度销售数据", "templateId": "t"})
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["config"] == {"data": {}}
+    service.extract_data.assert_awaited_once_with(
+        user_text="季度销售数据",
+        template_id="t",
+        force_provider="system",
+        include_all_templates=False
+    )
+
+
+def test_extract_route_errors():
+    """参数错误返回400，其他异常返回500"""
+    service = AsyncMock()
+    client = make_client()
+    with patch.object(generate, "get_generate_service", return_value=service):
+        service.extract_data.side_effect = ValueError("模板ID不存在: t")
+        response = client.post("/generate/extract", json={"text": "文本", "templateId": "t"})
+        assert response.status_code == 400 and response.json()["detail"] == "模板ID不存在: t"
+
+        service.extract_data.side_effect = Exception("AI服务请求超时，请稍后重试")
+        assert client.post("/generate/extract", json={"text": "文本", "templateId": "t"}).status_code == 500
+    assert client.post("/generate/extract", json={"text": "", "templateId": "t"}).status_code == 422
+
+
+def test_smart_route_passes_mode():
+    """智能生成接口把mode传给 generate_smart"""
+    service = AsyncMock()
+    service.generate_smart.return_value = {"config": {}}
+    with patch.object(generate, "get_generate_service", return_value=service):
+        response = make_client().post("/generate/smart", json={"text": "文本", "mode": "speculative"})
+    assert response.status_code == 200
+    assert service.generate_smart.await_args.kwargs["mode"] == "speculative"
+
+
+if __name__ == "__main__":
+    test_extract_route()
+    test_extract_route_errors()
+    test_smart_route_passes_mode()
+    print("✓ 生成接口路由测试全部通过")
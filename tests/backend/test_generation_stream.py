@@ -0,0 +1,84 @@
+"""
+生成事件流测试
+验证阶段事件按序推送、断线后按Last-Event-ID重放、以及异常转换为error事件
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.services.generation_stream import GenerationStreamRegistry
+
+
+async def _collect(stream, last_event_id=0):
+    return [event async for event in stream.subscribe(last_event_id) if event is not None]
+
+
+def test_events_in_order():
+    """事件按阶段顺序推送，id递增"""
+    async def run():
+        registry = GenerationStreamRegistry()
+
+        async def generate(emit):
+            await emit("classification", {"type": "list"})
+            await asyncio.sleep(0.01)
+            await emit("selection", {"templateId": "checklist"})
+            await emit("done", {"ok": True})
+
+        stream = registry.start(generate)
+        events = await _collect(stream)
+        assert [e["event"] for e in events] == ["start", "classification", "selection", "done"]
+        assert [e["id"] for e in events] == [1, 2, 3, 4]
+        assert events[0]["data"]["streamId"] == stream.stream_id
+    asyncio.run(run())
+
+
+def test_reconnect_replays_after_last_event_id():
+    """重连时只重放Last-Event-ID之后的事件，并继续接收新事件"""
+    async def run():
+        registry = GenerationStreamRegistry()
+        release = asyncio.Event()
+
+        async def generate(emit):
+            await emit("classification", {"type": "list"})
+            await release.wait()
+            await emit("done", {"ok": True})
+
+        stream = registry.start(generate)
+        first = []
+        async for event in stream.subscribe():
+            first.append(event)
+            if event["event"] == "classification":
+                break  # 模拟客户端断开
+
+        assert registry.get(stream.stream_id) is stream
+        release.set()
+        resumed = await _collect(stream, last_event_id=first[-1]["id"])
+        assert [e["event"] for e in resumed] == ["done"]
+    asyncio.run(run())
+
+
+def test_errors_become_error_event():
+    """生成异常转换为error事件并结束事件流"""
+    async def run():
+        registry = GenerationStreamRegistry()
+
+        async def generate(emit):
+            raise ValueError("分类失败")
+
+        stream = registry.start(generate)
+        events = await _collect(stream)
+        assert events[-1]["event"] == "error"
+        assert events[-1]["data"]["message"] == "分类失败"
+        assert stream.finished
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_events_in_order()
+    test_reconnect_replays_after_last_event_id()
+    test_errors_become_error_event()
+    print("✓ 生成事件流测试全部通过")
@@ -0,0 +1,77 @@
+"""
+HTTP连接池测试
+验证每个上游服务共享一个AsyncClient（关闭或参数变化后重新创建），LLM客户端使用共享连接池
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+import pytest
+
+from app.config import Settings
+from app.services.llm_client import LLMClient
+from app.utils import http_client
+from app.utils.http_client import close_async_http_clients, get_async_http_client
+
+
+@pytest.fixture(autouse=True)
+def isolated_clients(monkeypatch):
+    """使用独立的连接池注册表，不影响其他测试"""
+    monkeypatch.setattr(http_client, "_http_clients", {})
+    monkeypatch.setattr(http_client, "_http_client_configs", {})
+    monkeypatch.setattr(http_client, "_retired_clients", [])
+
+
+def test_shared_client_per_upstream():
+    """同一上游服务复用同一个客户端，不同服务互相独立"""
+    async def main():
+        llm = get_async_http_client("llm", max_connections=5)
+        assert get_async_http_client("llm", max_connections=5) is llm
+        assert get_async_http_client("dify") is not llm
+
+        await close_async_http_clients()
+        assert llm.is_closed and http_client._http_clients == {}
+        # 关闭后再次获取时重新创建
+        recreated = get_async_http_client("llm")
+        assert recreated is not llm and not recreated.is_closed
+        await close_async_http_clients()
+
+    asyncio.run(main())
+
+
+def test_llm_client_uses_shared_pool():
+    """每个LLM客户端实例都复用进程级连接池"""
+    async def main():
+        settings = Settings(_env_file=None, AIHUBMIX_API_KEY="test-key")
+        first = LLMClient(settings)
+        second = LLMClient(settings)
+        pool = http_client._http_clients["llm"]
+        assert first.client._client is pool and second.client._client is pool
+        await close_async_http_clients()
+
+    asyncio.run(main())
+
+
+def test_pool_recreated_on_config_change():
+    """配置热更新改变连接池参数后，新的LLM客户端使用新连接池，旧连接池在关闭时一并关闭"""
+    async def main():
+        first = LLMClient(Settings(_env_file=None, AIHUBMIX_API_KEY="test-key", AIHUBMIX_MAX_CONNECTIONS=5))
+        old_pool = first.client._client
+        second = LLMClient(Settings(_env_file=None, AIHUBMIX_API_KEY="test-key", AIHUBMIX_MAX_CONNECTIONS=8))
+        new_pool = second.client._client
+        assert new_pool is not old_pool and http_client._http_clients["llm"] is new_pool
+        # 旧连接池保留给仍在进行的请求
+        assert not old_pool.is_closed
+
+        await close_async_http_clients()
+        assert old_pool.is_closed and new_pool.is_closed and http_client._retired_clients == []
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,72 @@
+"""
+增量JSON解析测试
+验证流式输入时 data.items 中的元素逐个闭合即输出，并与整体解析结果一致
+"""
+import sys
+import json
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.utils.incremental_json import IncrementalArrayParser
+from app.utils.sse import format_sse
+
+
+SAMPLE = {
+    "data": {
+        "title": "季度总结 {items}",
+        "meta": {"items": [{"label": "不应输出"}]},
+        "items": [
+            {"label": "第一项", "desc": "含有\"引号\"和\\反斜杠", "value": 12.5},
+            {"label": "第二项", "children": [{"label": "子项"}], "done": True},
+            {"label": "第三项, 含逗号]和括号}", "value": None}
+        ]
+    },
+    "themeConfig": {"palette": "antv"}
+}
+
+
+def test_char_by_char_matches_full_parse():
+    """逐字符输入时输出的元素与整体解析一致"""
+    text = json.dumps(SAMPLE, ensure_ascii=False, indent=2)
+    parser = IncrementalArrayParser(("data", "items"))
+    items = []
+    for ch in text:
+        items.extend(parser.feed(ch))
+    assert items == SAMPLE["data"]["items"]
+    assert parser.emitted == 3
+    assert parser.done
+
+
+def test_items_emitted_before_stream_ends():
+    """每个元素在其闭合时即输出，无需等待整体结束"""
+    text = json.dumps(SAMPLE, ensure_ascii=False)
+    first_end = text.index("反斜杠") + len("反斜杠\", \"value\": 12.5}")
+    parser = IncrementalArrayParser()
+    items = parser.feed(text[:first_end])
+    assert items == [SAMPLE["data"]["items"][0]]
+    assert not parser.done
+    assert parser.feed(text[first_end:]) == SAMPLE["data"]["items"][1:]
+
+
+def test_prefix_before_object_is_ignored():
+    """代码块标记等前缀被忽略"""
+    text = "```json\n" + json.dumps({"data": {"items": [1, "a", [2]]}}) + "\n```"
+    parser = IncrementalArrayParser()
+    assert parser.feed(text) == [1, "a", [2]]
+
+
+def test_format_sse():
+    """SSE消息格式"""
+    message = format_sse("item", {"index": 0, "item": {"label": "中文"}}, event_id="3")
+    assert message == 'id: 3\nevent: item\ndata: {"index": 0, "item": {"label": "中文"}}\n\n'
+
+
+if __name__ == "__main__":
+    test_char_by_char_matches_full_parse()
+    test_items_emitted_before_stream_ends()
+    test_prefix_before_object_is_ignored()
+    test_format_sse()
+    print("✓ 增量JSON解析测试全部通过")
@@ -0,0 +1,116 @@
+"""
+关键词自动机测试
+验证多模式匹配（重叠、位置）、大小写规则、与逐个 in 判断的一致性，以及按模板目录重建匹配器
+"""
+import random
+import sys
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.services import template_catalog
+from app.services.keyword_matcher import (
+    CATEGORY_KEYWORDS,
+    GROUP_SWOT,
+    GROUP_TAG,
+    LOCAL_TYPE_KEYWORDS,
+    SWOT_KEYWORDS,
+    build_keyword_matcher,
+    category_group,
+    get_keyword_matcher,
+    type_group
+)
+from app.services.template_catalog import TemplateCatalog
+from app.services.text_profile import TextProfile
+from app.utils.keyword_automaton import KeywordAutomaton
+
+TEMPLATES = [
+    {"id": "list-row-simple", "category": "list", "tags": ["步骤", "Flow"]},
+    {"id": "compare-swot", "category": "comparison", "tags": ["SWOT", "优势"]},
+]
+
+
+def test_automaton_positions():
+    """重叠匹配与起始位置"""
+    automaton = KeywordAutomaton(["he", "she", "his", "hers", "", "she"])
+    hits = automaton.find_all("ushers")
+    assert hits == {0: [2], 1: [1], 3: [2], 5: [1]}
+    assert automaton.find_all("aaaa") == {}
+    assert KeywordAutomaton(["aa"]).find_all("aaaa") == {0: [0, 1, 2]}
+
+
+def test_automaton_matches_naive_search():
+    """随机模式与文本下与逐个查找结果一致"""
+    rng = random.Random(7)
+    for _ in range(300):
+        patterns = ["".join(rng.choice("ab数据") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 8))]
+        text = "".join(rng.choice("ab数据") for _ in range(rng.randint(0, 30)))
+        expected = {}
+        for pattern_id, pattern in enumerate(patterns):
+            positions = [i for i in range(len(text)) if text.startswith(pattern, i)]
+            if positions:
+                expected[pattern_id] = positions
+        assert KeywordAutomaton(patterns).find_all(text) == expected, (patterns, text)
+
+
+def test_matcher_case_rules():
+    """SWOT与标签不区分大小写，分类与类型关键词区分大小写"""
+    matcher = build_keyword_matcher(TEMPLATES)
+    hits = matcher.match("SWOT：Strengths 与 kpi 对比，flow vs 流程")
+    assert hits.find(GROUP_SWOT, "swot") == [0]
+    assert hits.find(GROUP_TAG, "flow") == [24]
+    assert hits.find(category_group("chart"), "KPI") == []
+    assert hits.find(category_group("comparison"), "SWOT") == [0]
+    assert hits.keywords(type_group("comparison")) == ["对比", "vs"]
+    assert hits.count(GROUP_SWOT) == 2
+    assert set(hits.by_group()) == {GROUP_SWOT, GROUP_TAG, category_group("comparison"),
+                                   category_group("relation"), category_group("sequence"),
+                                   type_group("comparison"), type_group("sequence")}
+
+
+def test_matcher_matches_in_checks():
+    """关键词命中与原有的逐个 in 判断一致"""
+    matcher = build_keyword_matcher(TEMPLATES)
+    texts = ["SWOT分析：优势、劣势、机会、威胁", "首先VS然后 KPI增长", "İstanbul 数据 Flow", ""]
+    for text in texts:
+        profile = TextProfile.build(text)
+        hits = profile.keyword_hits(matcher)
+        assert hits.count(GROUP_SWOT) == sum(1 for k in SWOT_KEYWORDS if k in text.lower())
+        for content_type, keywords in LOCAL_TYPE_KEYWORDS.items():
+            assert hits.count(type_group(content_type)) == len({k for k in keywords if k in text})
+        for category, keywords in CATEGORY_KEYWORDS.items():
+            assert hits.keywords(category_group(category)) == [k for k in keywords if k in text]
+        assert hits.keywords(GROUP_TAG) == [t for t in ("步骤", "flow", "swot", "优势") if t in text.lower()]
+        assert profile.keyword_hits(matcher) is hits
+
+
+def test_matcher_rebuilt_per_catalog():
+    """匹配器按模板目录缓存，目录更换后重建"""
+    provider = template_catalog._get_provider()
+    original = provider._catalog
+    try:
+        provider._catalog = None
+        static = get_keyword_matcher()
+        assert static.entry_id(GROUP_TAG, "flow") is None
+
+        provider._catalog = TemplateCatalog(1, TEMPLATES)
+        matcher = get_keyword_matcher()
+        assert matcher is get_keyword_matcher(provider._catalog)
+        assert matcher.entry_id(GROUP_TAG, "flow") is not None
+
+        provider._catalog = TemplateCatalog(2, TEMPLATES[:1])
+        rebuilt = get_keyword_matcher()
+        assert rebuilt is not matcher and rebuilt.entry_id(GROUP_TAG, "swot") is None
+    finally:
+        provider._catalog = original
+
+
+if __name__ == "__main__":
+    test_automaton_positions()
+    test_automaton_matches_naive_search()
+    test_matcher_case_rules()
+    test_matcher_matches_in_checks()
+    test_matcher_rebuilt_per_catalog()
+    print("✓ 关键词自动机测试全部通过")
@@ -0,0 +1,137 @@
+"""
+LLM响应缓存测试
+验证内存LRU、SQLite持久化、TTL过期和容量淘汰，以及只缓存通过调用方校验的响应
+"""
+import sys
+import os
+import json
+import time
+import asyncio
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.config import Settings
+from app.services import llm_client
+from app.services.llm_cache import LLMResponseCache, make_cache_key
+
+
+def _new_cache(**kwargs) -> LLMResponseCache:
+    db_path = os.path.join(tempfile.mkdtemp(), "llm_cache.db")
+    return LLMResponseCache(db_path, **kwargs)
+
+
+def test_cache_key_is_stable():
+    """相同请求参数生成相同指纹，任一参数变化则指纹不同"""
+    kwargs = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "你好"}], "temperature": 0.3}
+    assert make_cache_key(kwargs) == make_cache_key(dict(reversed(list(kwargs.items()))))
+    assert make_cache_key(kwargs) != make_cache_key({**kwargs, "temperature": 0.2})
+    assert make_cache_key(kwargs) != make_cache_key({**kwargs, "response_format": {"type": "json_object"}})
+
+
+def test_memory_and_disk_hits():
+    """写入后先命中内存，内存淘汰后从SQLite读回"""
+    async def run():
+        cache = _new_cache(memory_entries=1)
+        await cache.set("a", "响应A")
+        await cache.set("b", "响应B")
+        assert await cache.get("b") == "响应B"
+        assert cache.stats["memory_hits"] == 1
+        # a 已被挤出内存LRU，只能从磁盘读取
+        assert await cache.get("a") == "响应A"
+        assert cache.stats["disk_hits"] == 1
+        assert await cache.get("missing") is None
+        assert cache.stats["misses"] == 1
+    asyncio.run(run())
+
+
+def test_ttl_expiry():
+    """过期条目不再返回"""
+    async def run():
+        cache = _new_cache(ttl=1)
+        await cache.set("k", "v")
+        assert await cache.get("k") == "v"
+        time.sleep(1.1)
+        assert await cache.get("k") is None
+    asyncio.run(run())
+
+
+def test_size_bounded_eviction():
+    """超过最大条目数时淘汰最久未访问的条目"""
+    async def run():
+        cache = _new_cache(max_entries=10, memory_entries=1)
+        cache.EVICTION_CHECK_INTERVAL = 1
+        for i in range(15):
+            await cache.set(f"k{i}", f"v{i}")
+        count = cache._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        assert count == 10
+        assert await cache.get("k0") is None
+        assert await cache.get("k14") == "v14"
+    asyncio.run(run())
+
+
+class FakeCompletions:
+    """按顺序返回预设响应的chat.completions"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        content = self.responses[self.calls]
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+def _new_client(responses):
+    client = llm_client.LLMClient(Settings(_env_file=None, AIHUBMIX_API_KEY="test-key"))
+    completions = FakeCompletions(responses)
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return client, completions
+
+
+def test_invalid_response_not_cached():
+    """无法解析的响应不写入缓存，重试时重新调用LLM，通过校验后才缓存"""
+    async def run():
+        cache = _new_cache()
+        client, completions = _new_client(["不是JSON", '{"type": "list"}'])
+        messages = [{"role": "user", "content": "分类"}]
+        with patch.object(llm_client, "get_llm_cache", return_value=cache):
+            assert await client.chat_completion(messages, validate=json.loads) == "不是JSON"
+            assert cache.stats["writes"] == 0
+            assert await client.chat_completion(messages, validate=json.loads) == '{"type": "list"}'
+            assert await client.chat_completion(messages, validate=json.loads) == '{"type": "list"}'
+        assert completions.calls == 2 and cache.stats["writes"] == 1
+    asyncio.run(run())
+
+
+def test_invalid_cached_response_invalidated():
+    """缓存中无法通过校验的响应（校验加入前写入的）被删除并重新调用LLM"""
+    async def run():
+        cache = _new_cache()
+        client, completions = _new_client(['{"type": "list"}'])
+        messages = [{"role": "user", "content": "分类"}]
+        key = make_cache_key(client._build_request_kwargs(messages, None, 0.7, None, "medium"))
+        await cache.set(key, "不是JSON")
+        with patch.object(llm_client, "get_llm_cache", return_value=cache):
+            assert await client.chat_completion(messages, validate=json.loads) == '{"type": "list"}'
+            # 流式调用命中新缓存的合法响应
+            parts = [part async for part in client.chat_completion_stream(messages, validate=json.loads)]
+        assert parts == ['{"type": "list"}'] and completions.calls == 1
+        assert await cache.get(key) == '{"type": "list"}'
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_cache_key_is_stable()
+    test_memory_and_disk_hits()
+    test_ttl_expiry()
+    test_size_bounded_eviction()
+    test_invalid_response_not_cached()
+    test_invalid_cached_response_invalidated()
+    print("✓ LLM响应缓存测试全部通过")
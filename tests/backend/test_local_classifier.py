@@ -0,0 +1,59 @@
+"""
+本地内容类型分类器测试
+验证字符n-gram特征、训练后的预测结果，以及模型JSON序列化后结果一致
+"""
+import sys
+import json
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.services.local_classifier import LocalTypeClassifier, extract_features, train_model, category_to_type
+
+SAMPLES = [
+    ("产品开发流程：需求分析-设计-开发-测试-上线", "sequence"),
+    ("项目分为三个阶段，第一阶段调研，第二阶段实施，第三阶段验收", "sequence"),
+    ("操作步骤：首先登录，然后选择模板，最后导出", "sequence"),
+    ("2023年销售额1000万，同比增长20%，占比35%", "chart"),
+    ("用户数从10万增长到50万，增长率400%", "chart"),
+    ("各渠道收入占比：线上60%，线下40%", "chart"),
+    ("产品A与产品B对比：价格、性能、服务的差异", "comparison"),
+    ("方案一和方案二的优劣势比较", "comparison"),
+    ("自建与外包的区别对比", "comparison"),
+]
+
+
+def test_extract_features():
+    """特征为L2归一化的字符n-gram，忽略大小写和多余空白"""
+    features = extract_features("AB  ab", (1, 2))
+    assert set(features) == {"a", "b", "ab", "b ", " a"}
+    assert abs(sum(v * v for v in features.values()) - 1.0) < 1e-9
+
+
+def test_train_and_predict():
+    """训练后能识别相似文本，且模型序列化为JSON后结果不变"""
+    model = train_model(SAMPLES, epochs=20)
+    classifier = LocalTypeClassifier(json.loads(json.dumps(model, ensure_ascii=False)))
+
+    assert classifier.predict("新员工入职流程：第一步报到，第二步培训，最后上岗")[0] == "sequence"
+    assert classifier.predict("今年营收增长30%，利润占比提升")[0] == "chart"
+    assert classifier.predict("iPhone与华为手机的对比")[0] == "comparison"
+
+    probs = classifier.predict_proba("任意文本")
+    assert set(probs) == {"sequence", "chart", "comparison"}
+    assert abs(sum(probs.values()) - 1.0) < 1e-9
+
+
+def test_category_to_type():
+    """模板分类relation对应类型识别的relationship"""
+    assert category_to_type("relation") == "relationship"
+    assert category_to_type("list") == "list"
+
+
+if __name__ == "__main__":
+    test_extract_features()
+    test_train_and_predict()
+    test_category_to_type()
+    print("✓ 本地分类器测试全部通过")
@@ -0,0 +1,126 @@
+"""
+只读端点响应缓存测试
+验证ETag的计算与匹配、按目录版本失效的字节缓存，以及携带 If-None-Match 时返回304
+"""
+import sys
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+import orjson
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.services.template_catalog import TemplateCatalog
+from app.utils import response_cache
+from app.utils.response_cache import VersionedResponseCache, cached_json_response, etag_matches, make_etag
+
+
+def test_make_etag():
+    """ETag随目录版本和缓存键变化，相同输入结果稳定"""
+    etag = make_etag("3.abc", ("templates", "list", None, 1, 20, None))
+    assert etag == make_etag("3.abc", ("templates", "list", None, 1, 20, None))
+    assert etag.startswith('"v3.abc-') and etag.endswith('"')
+    assert etag != make_etag("4.abc", ("templates", "list", None, 1, 20, None))
+    assert etag != make_etag("3.abc", ("templates", "list", None, 2, 20, None))
+
+
+def test_etag_matches():
+    """If-None-Match 支持多个ETag、弱ETag前缀和 *"""
+    etag = '"v1-abc"'
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"v0-xyz", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"v0-abc"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches("", etag)
+
+
+def test_catalog_fingerprint():
+    """内容指纹只取决于模板内容"""
+    templates = [{"id": "a", "name": "A", "category": "list"}]
+    assert TemplateCatalog(1, templates).fingerprint == TemplateCatalog(7, templates).fingerprint
+    assert TemplateCatalog(1, templates).fingerprint != TemplateCatalog(1, [{**templates[0], "name": "B"}]).fingerprint
+
+
+def test_versioned_cache():
+    """命中时不再构建，版本变化时清空，超出容量时淘汰最久未使用的条目"""
+    cache = VersionedResponseCache(max_entries=2)
+    calls = []
+
+    def build(value):
+        def _build():
+            calls.append(value)
+            return {"value": value}
+        return _build
+
+    assert cache.get_or_build("1", "a", build("a")) == orjson.dumps({"value": "a"})
+    assert cache.get_or_build("1", "a", build("a2")) == orjson.dumps({"value": "a"})
+    assert calls == ["a"]
+
+    cache.get_or_build("1", "b", build("b"))
+    cache.get_or_build("1", "a", build("a3"))
+    cache.get_or_build("1", "c", build("c"))
+    assert cache.stats() == ("1", 2)
+    cache.get_or_build("1", "b", build("b2"))
+    assert calls == ["a", "b", "c", "b2"]
+
+    assert cache.get_or_build("2", "a", build("a4")) == orjson.dumps({"value": "a4"})
+    assert cache.stats() == ("2", 1)
+
+
+def test_cached_json_response():
+    """首次请求返回JSON和ETag，携带相同ETag时返回空的304响应，构建函数可以是协程函数"""
+    response_cache._response_cache = VersionedResponseCache()
+    state = {"version": "1", "builds": 0}
+    app = FastAPI()
+
+    @app.get("/items")
+    async def items(request: Request):
+        def build():
+            state["builds"] += 1
+            return {"success": True, "data": [1, 2]}
+        return await cached_json_response(request, state["version"], ("items",), build)
+
+    @app.get("/async-items")
+    async def async_items(request: Request):
+        async def build():
+            state["builds"] += 1
+            return {"success": True, "data": "async"}
+        return await cached_json_response(request, state["version"], ("async-items",), build)
+
+    client = TestClient(app)
+    response = client.get("/items")
+    etag = response.headers["etag"]
+    assert response.status_code == 200 and response.json() == {"success": True, "data": [1, 2]}
+    assert response.headers["cache-control"] == "no-cache"
+
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 304 and response.content == b""
+    assert response.headers["etag"] == etag
+
+    assert client.get("/items").status_code == 200
+    assert state["builds"] == 1
+
+    # 目录版本变化后旧ETag失效
+    state["version"] = "2"
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag
+    assert state["builds"] == 2
+
+    # 构建函数可以是协程函数
+    assert client.get("/async-items").json()["data"] == "async"
+    assert client.get("/async-items").json()["data"] == "async"
+    assert state["builds"] == 3
+    response_cache._response_cache = None
+
+
+if __name__ == "__main__":
+    test_make_etag()
+    test_etag_matches()
+    test_catalog_fingerprint()
+    test_versioned_cache()
+    test_cached_json_response()
+    print("✓ 只读端点响应缓存测试全部通过")
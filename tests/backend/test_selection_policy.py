@@ -0,0 +1,87 @@
+"""
+模板选择策略测试
+验证单模板分类和领先幅度超过阈值时跳过LLM，以及决策记录与一致率统计（含延迟记录）
+"""
+import sys
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.services.selection_policy import SelectionPolicy
+from app.utils.metrics import get_metrics
+
+
+class StubRanker:
+    """按预设分数排序的相似度服务"""
+
+    def __init__(self, scores):
+        self.scores = scores
+
+    def calculate_all_templates_similarity(self, user_text, templates, content_type=None, profile=None):
+        ranked = [{"templateId": t["id"], "similarityScore": self.scores[t["id"]]} for t in templates]
+        return sorted(ranked, key=lambda x: x["similarityScore"], reverse=True)
+
+
+TEMPLATES = [{"id": "a", "name": "A"}, {"id": "b", "name": "B"}]
+
+
+def test_single_template_skips_llm():
+    """分类只有一个模板时直接选中"""
+    get_metrics().reset()
+    policy = SelectionPolicy()
+    decision = policy.decide("文本", "chart", [{"id": "only", "name": "唯一"}])
+    assert decision.skip_llm
+    assert decision.rule == SelectionPolicy.RULE_SINGLE_TEMPLATE
+    assert decision.top_template_id == "only"
+
+
+def test_margin_threshold():
+    """领先幅度达到阈值时跳过LLM，否则调用LLM并记录一致性"""
+    get_metrics().reset()
+    policy = SelectionPolicy()
+
+    policy.similarity_service = StubRanker({"a": 0.9, "b": 0.5})
+    decision = policy.decide("文本", "list", TEMPLATES)
+    assert decision.skip_llm and decision.rule == SelectionPolicy.RULE_MARGIN
+    assert decision.top_template_id == "a" and decision.margin == 0.4
+
+    policy.similarity_service = StubRanker({"a": 0.56, "b": 0.55})
+    decision = policy.decide("文本", "list", TEMPLATES)
+    assert not decision.skip_llm
+    policy.record_llm_choice(decision, "b")
+
+    summary = policy.summary()
+    assert summary["decisions"] == 2
+    assert summary["skipRate"] == 0.5
+    assert summary["llmAgreementRate"] == 0.0
+
+    recent = policy.recent_decisions()
+    assert recent[0]["llm_template_id"] == "b"
+    assert recent[1]["rule"] == SelectionPolicy.RULE_MARGIN
+
+
+def test_deferred_record():
+    """record=False的决策和LLM选择在调用record之前不计入统计"""
+    get_metrics().reset()
+    policy = SelectionPolicy()
+    policy.similarity_service = StubRanker({"a": 0.56, "b": 0.55})
+
+    decision = policy.decide("文本", "list", TEMPLATES, record=False)
+    policy.record_llm_choice(decision, "a", record=False)
+    assert policy.summary()["decisions"] == 0 and policy.recent_decisions() == []
+    assert get_metrics().get("selection_policy.llm_agree") == 0
+
+    policy.record(decision)
+    summary = policy.summary()
+    assert summary["decisions"] == 1 and summary["llm"] == 1
+    assert summary["llmAgreementRate"] == 1.0
+    assert policy.recent_decisions()[0]["llm_template_id"] == "a"
+
+
+if __name__ == "__main__":
+    test_single_template_skips_llm()
+    test_margin_threshold()
+    test_deferred_record()
+    print("✓ 模板选择策略测试全部通过")
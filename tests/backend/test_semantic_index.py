@@ -0,0 +1,109 @@
+"""
+模板语义相似度测试
+验证字符n-gram切分、IDF统计与保存加载、用户文本向量缓存，以及中文文本能与模板描述匹配
+"""
+import json
+import math
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.services import semantic_index
+from app.services.semantic_index import (
+    SemanticIdf,
+    build_semantic_idf,
+    cosine,
+    get_semantic_idf,
+    ngram_counts,
+    template_semantic_text
+)
+from app.services.similarity_service import SimilarityService
+from app.services.text_profile import get_text_profile
+
+TEMPLATES = [
+    {"id": "timeline", "category": "sequence", "description": "时间线展示项目里程碑", "useCases": "发展历程", "keywords": ["时间轴"]},
+    {"id": "swot", "category": "comparison", "description": "SWOT分析四象限", "useCases": "优势劣势分析", "keywords": "战略,竞争"},
+    {"id": "org", "category": "hierarchy", "description": "组织架构树", "useCases": "部门层级"},
+    {"id": "empty", "category": "list"},
+]
+
+
+def test_ngrams_and_template_text():
+    """n-gram不跨越空白，模板文本包含描述、适用场景和关键词"""
+    counts = ngram_counts("里程碑 AB")
+    assert counts == {"里程": 1, "程碑": 1, "里程碑": 1, "ab": 1}
+    assert template_semantic_text(TEMPLATES[1]) == "SWOT分析四象限 优势劣势分析 战略 竞争"
+    assert ngram_counts(template_semantic_text(TEMPLATES[3])) == {}
+
+
+def test_idf_fit_and_round_trip():
+    """IDF统计、向量归一化与JSON保存加载"""
+    idf = build_semantic_idf([template_semantic_text(t) for t in TEMPLATES], meta={"sources": {"templates": 4}})
+    assert idf.documents == 4 and idf.meta["sources"] == {"templates": 4}
+    assert idf.idf["里程"] == math.log(5 / 2) + 1.0
+    common = SemanticIdf.fit(["数据分析", "分析报告", "里程碑"])
+    assert common.idf["分析"] < common.idf["里程"]
+    assert idf.default_idf == math.log(5) + 1.0
+
+    vector = idf.vectorize("项目里程碑")
+    assert abs(sum(w * w for w in vector.values()) - 1.0) < 1e-12
+    assert idf.vectorize("") == {}
+
+    loaded = SemanticIdf.from_dict(json.loads(json.dumps(idf.to_dict())))
+    assert loaded.idf == idf.idf and loaded.ngram_range == (2, 3)
+    assert loaded.vectorize("项目里程碑") == vector
+
+
+def test_text_vector_lru():
+    """用户文本向量按文本缓存，超出容量时淘汰最久未用的"""
+    idf = SemanticIdf({}, 0, cache_size=2)
+    first = idf.text_vector("第一段")
+    assert idf.text_vector("第一段") is first
+    idf.text_vector("第二段")
+    idf.text_vector("第一段")
+    idf.text_vector("第三段")
+    assert list(idf._vectors) == ["第一段", "第三段"]
+
+
+def test_chinese_text_matches_description():
+    """中文文本能与模板描述匹配（\\w+ 分词时整段中文无法重合）"""
+    idf = SemanticIdf.fit(template_semantic_text(t) for t in TEMPLATES)
+    query = idf.text_vector("公司发展历程：2020年成立，2022年达成第一个里程碑")
+    scores = {t["id"]: cosine(query, idf.vectorize(template_semantic_text(t))) for t in TEMPLATES}
+    assert max(scores, key=scores.get) == "timeline"
+    assert scores["org"] == 0.0
+
+    service = SimilarityService()
+    profile = get_text_profile("公司发展历程与里程碑")
+    assert service._calculate_semantic_similarity(profile, TEMPLATES[0], idf) > 0.5
+    assert service._calculate_semantic_similarity(profile, TEMPLATES[3], idf) == 0.5
+
+
+def test_idf_file_preferred():
+    """存在离线IDF文件时优先使用，文件更新后重新加载"""
+    settings = semantic_index.get_settings()
+    original = settings.SEMANTIC_IDF_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "semantic_idf.json"
+        try:
+            settings.SEMANTIC_IDF_PATH = str(path)
+            assert get_semantic_idf().documents != 3
+
+            path.write_text(json.dumps(SemanticIdf.fit(["甲乙", "乙丙", "丙丁"]).to_dict()), encoding="utf-8")
+            loaded = get_semantic_idf()
+            assert loaded.documents == 3 and get_semantic_idf() is loaded
+        finally:
+            settings.SEMANTIC_IDF_PATH = original
+
+
+if __name__ == "__main__":
+    test_ngrams_and_template_text()
+    test_idf_fit_and_round_trip()
+    test_text_vector_lru()
+    test_chinese_text_matches_description()
+    test_idf_file_preferred()
+    print("✓ 模板语义相似度测试全部通过")
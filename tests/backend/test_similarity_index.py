@@ -0,0 +1,89 @@
+"""
+模板特征索引测试
+验证向量化打分与逐模板计算结果完全一致，以及按模板目录复用索引
+"""
+import sys
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.services import template_catalog
+from app.services.similarity_service import SimilarityService
+from app.services.template_catalog import TemplateCatalog
+from app.services.template_feature_index import TemplateFeatureIndex
+from app.services.text_profile import get_text_profile
+
+TEMPLATES = [
+    {"id": "list-row-simple", "category": "list", "tags": ["步骤", "Flow"], "description": "横向步骤列表", "useCases": "流程展示"},
+    {"id": "chart-column", "category": "chart", "tags": [], "description": "柱状图 KPI", "useCases": None},
+    {"id": "compare-swot", "category": "comparison", "tags": ["SWOT"], "description": "SWOT分析", "useCases": "优势 劣势"},
+    {"id": "hierarchy-tree", "category": "hierarchy", "tags": None, "description": "", "useCases": ""},
+    {"id": "sequence-timeline", "category": "sequence", "description": "时间线", "useCases": "里程碑"},
+    {"id": "misc", "category": "", "tags": ["Flow", "flow"]},
+]
+
+TEXTS = [
+    "1. 注册 2. 登录 3. 下单",
+    "SWOT分析：优势、劣势、机会、威胁",
+    "公司KPI数据增长30%；利润率提升；成本下降",
+    "flow of work",
+    "",
+]
+
+
+def test_vectorized_matches_scalar():
+    """向量化打分与逐模板计算完全一致"""
+    service = SimilarityService()
+    index = TemplateFeatureIndex(TEMPLATES)
+    for text in TEXTS:
+        for content_type in (None, "list", "comparison", "relation", "unknown"):
+            scores = index.score(get_text_profile(text), content_type).tolist()
+            expected = [service._calculate_similarity(text, t, content_type) for t in TEMPLATES]
+            assert scores == expected, (text, content_type)
+
+
+def test_ranking_and_selected_template():
+    """排序结果与选中模板"""
+    service = SimilarityService()
+    ranked = service.calculate_all_templates_similarity(
+        "SWOT分析：优势、劣势", TEMPLATES, content_type="comparison", selected_template_id="misc"
+    )
+    assert len(ranked) == len(TEMPLATES)
+    assert ranked[0]["templateId"] == "misc" and ranked[0]["similarityScore"] == 1.0
+    assert ranked[1]["templateId"] == "compare-swot"
+    scores = [r["similarityScore"] for r in ranked]
+    assert scores == sorted(scores, reverse=True)
+    assert service.calculate_all_templates_similarity("文本", []) == []
+
+
+def test_catalog_index_reused():
+    """模板来自当前目录时复用目录索引，目录更换后重建"""
+    provider = template_catalog._get_provider()
+    original = provider._catalog
+    try:
+        service = SimilarityService()
+        provider._catalog = TemplateCatalog(1, TEMPLATES)
+        subset = list(provider._catalog.by_category["list"])
+
+        index, rows = service._get_feature_index(subset)
+        assert index.size == len(TEMPLATES) and rows.tolist() == [0]
+        assert service._get_feature_index(TEMPLATES)[0] is index
+
+        # 不属于目录的模板对象使用临时索引
+        copied = [dict(t) for t in subset]
+        temp_index, _ = service._get_feature_index(copied)
+        assert temp_index is not index and temp_index.size == 1
+
+        provider._catalog = TemplateCatalog(2, TEMPLATES)
+        assert service._get_feature_index(TEMPLATES)[0] is not index
+    finally:
+        provider._catalog = original
+
+
+if __name__ == "__main__":
+    test_vectorized_matches_scalar()
+    test_ranking_and_selected_template()
+    test_catalog_index_reused()
+    print("✓ 模板特征索引测试全部通过")
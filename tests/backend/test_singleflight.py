@@ -0,0 +1,98 @@
+"""
+请求合并（single-flight）测试
+验证并发相同请求只调用一次上游，以及发起者取消时的行为
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_are_coalesced():
+    """N个并发相同请求只触发一次上游调用"""
+    async def run():
+        flight = SingleFlight("test")
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "结果"
+
+        results = await asyncio.gather(*[flight.do("k", upstream) for _ in range(5)])
+        assert results == ["结果"] * 5
+        assert calls == 1
+        assert flight.stats["coalesced"] == 4
+        assert flight.in_flight() == 0
+    asyncio.run(run())
+
+
+def test_owner_cancellation_does_not_fail_followers():
+    """发起者断开后，等待中的其他调用方仍拿到结果"""
+    async def run():
+        flight = SingleFlight("test")
+
+        async def upstream():
+            await asyncio.sleep(0.05)
+            return 42
+
+        owner = asyncio.ensure_future(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        owner.cancel()
+        assert await follower == 42
+        assert owner.cancelled()
+    asyncio.run(run())
+
+
+def test_upstream_cancelled_when_all_waiters_leave():
+    """所有调用方都取消后，上游调用被取消，新请求重新发起"""
+    async def run():
+        flight = SingleFlight("test")
+        started = 0
+        finished = 0
+
+        async def upstream():
+            nonlocal started, finished
+            started += 1
+            await asyncio.sleep(0.05)
+            finished += 1
+            return started
+
+        waiter = asyncio.ensure_future(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0.01)
+        assert flight.in_flight() == 0
+        assert await flight.do("k", upstream) == 2
+        assert finished == 1
+    asyncio.run(run())
+
+
+def test_errors_propagate_to_all_waiters():
+    """上游异常传递给所有等待者"""
+    async def run():
+        flight = SingleFlight("test")
+
+        async def upstream():
+            await asyncio.sleep(0.01)
+            raise ValueError("上游失败")
+
+        results = await asyncio.gather(*[flight.do("k", upstream) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_are_coalesced()
+    test_owner_cancellation_does_not_fail_followers()
+    test_upstream_cancelled_when_all_waiters_leave()
+    test_errors_propagate_to_all_waiters()
+    print("✓ 请求合并测试全部通过")
@@ -0,0 +1,89 @@
+"""
+推测执行测试
+验证本地类型预测，推测分支在命中时被采用、未命中时被取消，以及只有被采用的推测分支记录模板选择决策
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.services.type_classification_service import get_type_classification_service
+from app.services.generate_service import _Speculation
+from app.services.selection_policy import SelectionPolicy
+from app.utils.metrics import get_metrics
+
+
+def test_predict_local():
+    """SWOT内容和有明显关键词倾向的文本可以本地预测，无倾向时不预测"""
+    service = get_type_classification_service()
+    assert service.predict_local("SWOT分析：优势是技术，劣势是成本，机会在海外")["type"] == "comparison"
+    assert service.predict_local("项目流程：首先立项，然后开发，最后上线")["type"] == "sequence"
+    assert service.predict_local("你好") is None
+
+
+def test_speculation_hit_and_miss():
+    """预测一致时采用推测结果，不一致时取消推测任务"""
+    async def run():
+        metrics = get_metrics()
+        metrics.reset()
+
+        async def select():
+            await asyncio.sleep(0.05)
+            return {"templateId": "checklist"}
+
+        hit = _Speculation("list", asyncio.ensure_future(select()))
+        assert hit.commit("list")
+        assert (await hit.selection)["templateId"] == "checklist"
+
+        miss = _Speculation("list", asyncio.ensure_future(select()))
+        assert not miss.commit("sequence")
+        await asyncio.sleep(0)
+        assert miss.selection.cancelled()
+        assert miss.summary() == {"predictedType": "list", "hit": False, "extraction": False}
+
+        assert metrics.get("speculation.hit") == 1
+        assert metrics.get("speculation.miss") == 1
+    asyncio.run(run())
+
+
+def test_speculation_records_decisions_only_when_used():
+    """被取消的推测分支不计入模板选择策略统计，被采用的在结果使用后记录"""
+    async def run():
+        get_metrics().reset()
+        policy = SelectionPolicy()
+
+        def start():
+            decisions = []
+
+            async def select():
+                decisions.append(policy.decide("文本", "list", [{"id": "checklist"}], record=False))
+                await asyncio.sleep(0.05)
+                return {"templateId": "checklist"}
+
+            return _Speculation("list", asyncio.ensure_future(select()), decisions=decisions)
+
+        miss = start()
+        await asyncio.sleep(0)
+        assert not miss.commit("sequence")
+        await asyncio.sleep(0)
+        assert miss.selection.cancelled() and len(miss.decisions) == 1
+        assert policy.summary()["decisions"] == 0
+
+        hit = start()
+        assert hit.commit("list")
+        await hit.selection
+        assert policy.summary()["decisions"] == 0
+        hit.record_decisions(policy)
+        assert policy.summary()["skipped"][SelectionPolicy.RULE_SINGLE_TEMPLATE] == 1
+        assert policy.summary()["decisions"] == 1 and hit.decisions == []
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_predict_local()
+    test_speculation_hit_and_miss()
+    test_speculation_records_decisions_only_when_used()
+    print("✓ 推测执行测试全部通过")
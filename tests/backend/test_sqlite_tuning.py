@@ -0,0 +1,146 @@
+"""
+SQLite生产模式测试
+验证连接PRAGMA、RoutingSession的读写路由（写入后同一事务的查询使用写连接），
+以及写事务未提交时并发查询不被阻塞
+"""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.models.work import UserWork
+from app.utils.sqlite_tuning import RoutingSession, create_sqlite_engines, is_file_sqlite, is_read_statement
+
+
+@pytest.fixture
+def engines(db_path, sync_engine):
+    """临时数据库的读写引擎，返回 (写引擎, 读引擎, RoutingSession工厂)"""
+    writer, reader = create_sqlite_engines(f"sqlite:///{db_path}", create_engine, QueuePool)
+    yield writer, reader, sessionmaker(class_=RoutingSession, bind=writer, reader=reader, writer=writer, autoflush=False)
+    writer.dispose()
+    reader.dispose()
+
+
+def test_is_file_sqlite():
+    """只有SQLite文件数据库启用生产模式"""
+    assert is_file_sqlite("sqlite:///./infographic.db")
+    assert is_file_sqlite("sqlite+aiosqlite:////tmp/app.db")
+    assert not is_file_sqlite("sqlite://")
+    assert not is_file_sqlite("sqlite:///:memory:")
+    assert not is_file_sqlite("postgresql://user@db/app")
+
+
+def test_is_read_statement():
+    """SELECT语句只读，DML、DDL和无语句时使用写引擎"""
+    assert is_read_statement(select(UserWork))
+    assert is_read_statement(text("  select 1"))
+    assert not is_read_statement(text("UPDATE user_works SET title = 'x'"))
+    assert not is_read_statement(text("CREATE TABLE x (id INTEGER)"))
+    assert not is_read_statement(UserWork.__table__.delete())
+    assert not is_read_statement(None)
+
+
+def test_pragmas_and_routing(engines, make_work):
+    """连接PRAGMA生效；查询走读连接，写入后本事务内的查询走写连接，提交后恢复"""
+    writer, reader, Session = engines
+    with writer.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert conn.execute(text("PRAGMA query_only")).scalar() == 0
+    with reader.connect() as conn:
+        assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text("DELETE FROM user_works"))
+
+    db = Session()
+    query = select(func.count()).select_from(UserWork)
+    assert db.get_bind(clause=query) is reader
+    assert db.get_bind() is writer
+
+    db.add(make_work(1))
+    db.flush()
+    assert db.get_bind(clause=query) is writer
+    assert db.scalar(query) == 1
+    db.commit()
+    assert db.get_bind(clause=query) is reader
+    assert db.scalar(query) == 1
+
+    db.execute(text("UPDATE user_works SET title = '改名'"))
+    assert db.get_bind(clause=query) is writer
+    db.rollback()
+    assert db.get_bind(clause=query) is reader
+    assert db.scalar(select(UserWork.title)) == "作品1"
+    db.close()
+
+
+def test_reads_not_blocked_by_open_write(engines, make_work):
+    """写事务未提交时，其他线程的查询立即返回已提交的数据"""
+    _, _, Session = engines
+    with Session() as db:
+        db.add(make_work(1))
+        db.commit()
+
+    write_db = Session()
+    write_db.add(make_work(2))
+    write_db.flush()
+
+    results = []
+
+    def read():
+        start = time.perf_counter()
+        with Session() as db:
+            results.append((db.scalar(select(func.count()).select_from(UserWork)), time.perf_counter() - start))
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [count for count, _ in results] == [1, 1, 1, 1]
+    assert max(elapsed for _, elapsed in results) < 1.0
+
+    write_db.commit()
+    write_db.close()
+    with Session() as db:
+        assert db.scalar(select(func.count()).select_from(UserWork)) == 2
+
+
+def test_async_routing_session(db_path, sync_engine, make_work):
+    """异步会话同样按语句类型路由"""
+    writer, reader = create_sqlite_engines(f"sqlite+aiosqlite:///{db_path}", create_async_engine, AsyncAdaptedQueuePool)
+    Session = async_sessionmaker(
+        writer, class_=AsyncSession, sync_session_class=RoutingSession,
+        reader=reader.sync_engine, writer=writer.sync_engine, expire_on_commit=False
+    )
+
+    async def main():
+        try:
+            async with Session() as db:
+                db.add(make_work(1))
+                await db.commit()
+                query = select(func.count()).select_from(UserWork)
+                assert db.sync_session.get_bind(clause=query) is reader.sync_engine
+                assert await db.scalar(query) == 1
+                assert await db.scalar(text("PRAGMA query_only")) == 0
+        finally:
+            await writer.dispose()
+            await reader.dispose()
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
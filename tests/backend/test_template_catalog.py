@@ -0,0 +1,192 @@
+"""
+进程内模板目录测试
+验证目录索引、筛选分页，版本号递增（脚本调用或SQLite触发器）后自动重新加载，
+以及后台任务通过异步会话检查版本号（读取目录时不访问数据库）
+"""
+import asyncio
+import sys
+import sqlite3
+import tempfile
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.models.base import Base
+from app.models.template import Template
+from app.services.template_catalog import TemplateCatalog, TemplateCatalogProvider, ensure_catalog_version
+
+
+def make_template(template_id, category, sort_order=0, structure_type=None, is_active=True, description=None):
+    """构造模板行"""
+    return Template(
+        id=template_id,
+        name=template_id,
+        category=category,
+        structure_type=structure_type,
+        description=description,
+        data_schema={},
+        design_config={},
+        sort_order=sort_order,
+        is_active=is_active
+    )
+
+
+def make_provider(db_path):
+    """创建使用临时数据库的目录提供者（与 init_db 相同，建表后创建版本表和触发器）"""
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.add_all([
+            make_template("list-a", "list", 10, "list-row", description="步骤说明"),
+            make_template("list-b", "list", 20, "list-column"),
+            make_template("chart-a", "chart", 5, "chart-column", description="Sales Chart"),
+            make_template("hidden", "list", 99, is_active=False),
+        ])
+        db.commit()
+        ensure_catalog_version(db)
+    return TemplateCatalogProvider(session_factory)
+
+
+def test_catalog_indexes():
+    """目录按ID、分类、structure类型建立索引，只包含启用的模板"""
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = make_provider(Path(tmp) / "catalog.db").get()
+
+        assert len(catalog) == 3
+        assert catalog.get("hidden") is None
+        assert catalog.get("list-a")["structureType"] == "list-row"
+        assert [t["id"] for t in catalog.by_category["list"]] == ["list-b", "list-a"]
+        assert [t["id"] for t in catalog.by_structure_type["chart-column"]] == ["chart-a"]
+        assert dict(catalog.category_counts) == {"list": 2, "chart": 1}
+
+        # 关键词筛选不区分大小写，保持目录顺序
+        assert [t["id"] for t in catalog.filter(keyword="sales")] == ["chart-a"]
+        assert [t["id"] for t in catalog.filter(category="list", keyword="步骤")] == ["list-a"]
+        assert [t["id"] for t in catalog.filter()] == ["list-b", "list-a", "chart-a"]
+
+        try:
+            catalog.by_id["x"] = {}
+            assert False, "索引应为只读"
+        except TypeError:
+            pass
+
+
+def test_version_bump_reloads():
+    """版本号递增后重新加载，版本号不变时复用同一目录"""
+    settings = get_settings()
+    original_interval = settings.CATALOG_VERSION_CHECK_INTERVAL
+    settings.CATALOG_VERSION_CHECK_INTERVAL = 0
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "catalog.db"
+            provider = make_provider(db_path)
+            first = provider.get()
+            assert provider.get() is first
+
+            # 脚本显式递增版本号
+            version = provider.bump()
+            assert version == first.version + 1
+            second = provider.get()
+            assert second is not first and second.version == version
+
+            # 直接用sqlite3修改模板，由触发器递增版本号
+            conn = sqlite3.connect(db_path)
+            conn.execute("UPDATE templates SET is_active = 0 WHERE id = 'list-a'")
+            conn.commit()
+            conn.close()
+            third = provider.get()
+            assert third.version > second.version
+            assert third.get("list-a") is None
+            assert dict(third.category_counts) == {"list": 1, "chart": 1}
+    finally:
+        settings.CATALOG_VERSION_CHECK_INTERVAL = original_interval
+
+
+def test_check_interval_throttles():
+    """检查间隔内不读取版本号"""
+    settings = get_settings()
+    original_interval = settings.CATALOG_VERSION_CHECK_INTERVAL
+    settings.CATALOG_VERSION_CHECK_INTERVAL = 3600
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "catalog.db"
+            provider = make_provider(db_path)
+            first = provider.get()
+
+            conn = sqlite3.connect(db_path)
+            conn.execute("DELETE FROM templates WHERE id = 'chart-a'")
+            conn.commit()
+            conn.close()
+            assert provider.get() is first
+
+            provider.invalidate()
+            assert provider.get().get("chart-a") is None
+    finally:
+        settings.CATALOG_VERSION_CHECK_INTERVAL = original_interval
+
+
+def test_background_refresh():
+    """后台任务通过异步会话检查版本号；任务运行时读取目录不打开同步会话"""
+    def no_sync_session():
+        raise AssertionError("后台检查运行时不应打开同步会话")
+
+    settings = get_settings()
+    original_interval = settings.CATALOG_VERSION_CHECK_INTERVAL
+    settings.CATALOG_VERSION_CHECK_INTERVAL = 0
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "catalog.db"
+            provider = make_provider(db_path)
+            engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+            factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+            async def main():
+                try:
+                    first = await provider.refresh(factory)
+                    assert len(first) == 3 and await provider.refresh(factory) is first
+                    provider._session_factory = no_sync_session
+                    provider.start_refresh(factory)
+                    assert provider.refreshing and provider.get() is first
+
+                    conn = sqlite3.connect(db_path)
+                    conn.execute("DELETE FROM templates WHERE id = 'chart-a'")
+                    conn.commit()
+                    conn.close()
+                    for _ in range(40):
+                        if provider.get() is not first:
+                            break
+                        await asyncio.sleep(0.05)
+                    assert provider.get().get("chart-a") is None
+                finally:
+                    await provider.stop_refresh()
+                    await engine.dispose()
+                assert not provider.refreshing
+
+            asyncio.run(main())
+    finally:
+        settings.CATALOG_VERSION_CHECK_INTERVAL = original_interval
+
+
+def test_catalog_from_dicts():
+    """目录也可以直接由模板字典构建"""
+    catalog = TemplateCatalog(7, [{"id": "a", "category": "list", "name": "A"}])
+    assert catalog.version == 7
+    assert catalog.filter(category="chart") == []
+    assert catalog.by_structure_type == {}
+
+
+if __name__ == "__main__":
+    test_catalog_indexes()
+    test_version_bump_reloads()
+    test_check_interval_throttles()
+    test_background_refresh()
+    test_catalog_from_dicts()
+    print("✓ 模板目录测试全部通过")
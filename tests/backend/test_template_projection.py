@@ -0,0 +1,73 @@
+"""
+模板列表字段投影测试
+验证 fields/view 参数解析、摘要视图复用预先构建的摘要，以及列表只返回所需字段
+"""
+import sys
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.services.template_catalog import SUMMARY_FIELDS, TemplateCatalog
+from app.services.template_service import TemplateService
+
+TEMPLATES = [
+    {"id": "list-a", "name": "列表A", "category": "list", "description": "步骤", "useCases": "清单",
+     "tags": ["步骤"], "previewUrl": "", "dataSchema": {"items": "array"}, "designConfig": {"template": "list-a"}},
+    {"id": "chart-a", "name": "图表A", "category": "chart", "tags": None,
+     "dataSchema": {"values": "array"}, "designConfig": {"template": "chart-a"}},
+]
+
+
+def make_service():
+    """使用固定目录的模板服务"""
+    service = TemplateService()
+    catalog = TemplateCatalog(1, TEMPLATES)
+    service._get_catalog = lambda: catalog
+    return service, catalog
+
+
+def test_resolve_fields():
+    """参数解析：fields优先于view，id总是返回，未知字段或视图报错"""
+    assert TemplateService.resolve_fields() is None
+    assert TemplateService.resolve_fields(view="full") is None
+    assert TemplateService.resolve_fields(view="summary") == SUMMARY_FIELDS
+    assert TemplateService.resolve_fields(fields="name, tags", view="summary") == ("id", "name", "tags")
+    assert TemplateService.resolve_fields(fields="tags,id,tags") == ("id", "tags")
+    assert TemplateService.resolve_fields(fields=",".join(reversed(SUMMARY_FIELDS))) == SUMMARY_FIELDS
+
+    for kwargs in ({"fields": "id,dataSchemas"}, {"view": "compact"}):
+        try:
+            TemplateService.resolve_fields(**kwargs)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(kwargs)
+
+
+def test_summary_view_shared():
+    """摘要视图直接返回目录中预先构建的摘要"""
+    service, catalog = make_service()
+    result = service.get_all_templates(fields=SUMMARY_FIELDS)
+    assert result["total"] == 2
+    first = result["templates"][0]
+    assert first is catalog.summaries["list-a"]
+    assert tuple(first) == SUMMARY_FIELDS and "dataSchema" not in first
+    assert result["templates"][1]["tags"] is None
+
+
+def test_fields_projection():
+    """自定义字段投影，不影响目录中的模板"""
+    service, catalog = make_service()
+    result = service.get_all_templates(category="chart", fields=("id", "designConfig"))
+    assert result["templates"] == [{"id": "chart-a", "designConfig": {"template": "chart-a"}}]
+    assert service.get_all_templates(page_size=1)["templates"][0] is catalog.get("list-a")
+    assert "dataSchema" in catalog.get("list-a")
+
+
+if __name__ == "__main__":
+    test_resolve_fields()
+    test_summary_view_shared()
+    test_fields_projection()
+    print("✓ 模板列表字段投影测试全部通过")
@@ -0,0 +1,154 @@
+"""
+模板全文检索测试
+验证FTS5索引的建立与触发器同步、BM25排序与高亮摘要、总数随结果返回，以及短关键词回退到子串匹配
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.template import Template
+from app.repositories import template_repo
+from app.repositories.template_repo import TemplateRepository, build_match_query, ensure_search_index
+from app.services.template_catalog import TemplateCatalog
+
+
+def make_template(template_id, category, name, description=None, keywords=None, tags=None, sort_order=0, is_active=True):
+    """构造模板行"""
+    return Template(
+        id=template_id,
+        name=name,
+        category=category,
+        description=description,
+        keywords=keywords,
+        tags=tags,
+        data_schema={},
+        design_config={},
+        sort_order=sort_order,
+        is_active=is_active
+    )
+
+
+def make_session(db_path):
+    """创建临时数据库（已有模板在建立索引前写入）"""
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        make_template("steps", "sequence", "步骤流程图", description="横向步骤流程图", tags=["流程", "步骤"]),
+        make_template("timeline", "sequence", "时间轴", description="项目里程碑时间轴", keywords="里程碑,发展历程", sort_order=5),
+        make_template("swot", "comparison", "SWOT分析", description="优势劣势机会威胁", tags=["战略分析工具"]),
+        make_template("hidden", "sequence", "隐藏的流程图", is_active=False),
+    ])
+    db.commit()
+    template_repo._search_index_ready = None
+    assert ensure_search_index(db)
+    return db
+
+
+def search_ids(repo, keyword, **kwargs):
+    """检索结果中的模板ID"""
+    hits, _ = repo.search(keyword, **kwargs)
+    return [hit["id"] for hit in hits]
+
+
+def test_match_query():
+    """关键词按空白拆分为短语，过短时不使用全文检索"""
+    assert build_match_query("流程图") == '"流程图"'
+    assert build_match_query(' 时间轴  say"hi" ') == '"时间轴" AND "say""hi"""'
+    assert build_match_query("流程") is None
+    assert build_match_query("流程图 ab") is None
+    assert build_match_query("   ") is None
+
+
+def test_search_ranking_and_snippet():
+    """BM25排序、高亮摘要、总数与分页"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_session(Path(tmp) / "search.db")
+        try:
+            repo = TemplateRepository(db)
+            hits, total = repo.search("流程图")
+            assert total == 1 and hits[0]["id"] == "steps"
+            assert "<mark>流程图</mark>" in hits[0]["snippet"] and hits[0]["relevance"] >= 0
+
+            # 覆盖关键词和标签字段（标签为转义的JSON数组）
+            assert search_ids(repo, "发展历程") == ["timeline"]
+            assert search_ids(repo, "战略分析") == ["swot"]
+            assert search_ids(repo, "swot") == ["swot"]
+
+            # 名称命中排在描述命中之前
+            db.add(make_template("milestone", "sequence", "里程碑", description="展示发展历程中的时间轴节点", sort_order=99))
+            db.commit()
+            assert search_ids(repo, "时间轴") == ["timeline", "milestone"]
+            assert search_ids(repo, "时间轴", category="comparison") == []
+
+            hits, total = repo.search("时间轴", offset=1, limit=1)
+            assert [hit["id"] for hit in hits] == ["milestone"] and total == 2
+            assert repo.search("时间轴", offset=5, limit=1) == ([], 2)
+            assert repo.search("流程") is None
+        finally:
+            db.close()
+
+
+def test_triggers_keep_index_in_sync():
+    """模板的插入、更新、删除同步到索引"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_session(Path(tmp) / "sync.db")
+        try:
+            repo = TemplateRepository(db)
+            template = db.get(Template, "swot")
+            template.name = "竞争矩阵"
+            template.tags = ["四象限定位"]
+            db.commit()
+            assert search_ids(repo, "SWOT") == []
+            assert search_ids(repo, "竞争矩阵") == ["swot"]
+            assert search_ids(repo, "象限定位") == ["swot"]
+
+            db.delete(template)
+            db.commit()
+            assert search_ids(repo, "竞争矩阵") == []
+
+            # 停用的模板不出现在结果中
+            assert search_ids(repo, "隐藏的") == []
+        finally:
+            db.close()
+
+
+def test_repository_list_total():
+    """列表查询的总数随结果一并返回"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_session(Path(tmp) / "list.db")
+        try:
+            repo = TemplateRepository(db)
+            templates, total = repo.get_all(category="sequence", page_size=1)
+            assert [t.id for t in templates] == ["timeline"] and total == 2
+            assert repo.get_all(keyword="里程碑")[1] == 1
+            assert repo.get_all(page=9) == ([], 3)
+        finally:
+            db.close()
+
+
+def test_catalog_filter_covers_keywords_and_tags():
+    """短关键词在模板目录中匹配，同样覆盖关键词和标签"""
+    catalog = TemplateCatalog(1, [
+        {"id": "a", "name": "A", "category": "list", "keywords": ["清单"], "tags": ["Todo"]},
+        {"id": "b", "name": "B", "category": "list", "keywords": [], "tags": None},
+    ])
+    assert [t["id"] for t in catalog.filter(keyword="清单")] == ["a"]
+    assert [t["id"] for t in catalog.filter(keyword="todo")] == ["a"]
+
+
+if __name__ == "__main__":
+    test_match_query()
+    test_search_ranking_and_snippet()
+    test_triggers_keep_index_in_sync()
+    test_repository_list_total()
+    test_catalog_filter_covers_keywords_and_tags()
+    print("✓ 模板全文检索测试全部通过")
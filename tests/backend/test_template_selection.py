@@ -0,0 +1,78 @@
+"""
+模板选择服务测试（两阶段流程）
+验证类型relationship只在模板分类relation中选择，分类没有模板的类型仍在所有模板中选择
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.services import template_selection_service
+from app.services.template_selection_service import TemplateSelectionService
+
+TEMPLATES = [
+    {"id": "checklist", "name": "清单", "category": "list", "description": "勾选清单"},
+    {"id": "relation-network", "name": "关系网络", "category": "relation", "description": "节点与连线"},
+    {"id": "relation-circle", "name": "关系环", "category": "relation", "description": "环形关系"},
+]
+
+
+def make_service():
+    """使用固定模板列表的模板选择服务，记录传给提示词的候选模板"""
+    service = TemplateSelectionService()
+    service.template_service = SimpleNamespace(
+        get_templates_by_category=lambda category: [t for t in TEMPLATES if t["category"] == category],
+        get_all_templates=lambda page=1, page_size=100: {"templates": list(TEMPLATES)}
+    )
+    service.candidates = []
+
+    def get_template_selection_prompt(user_text, content_type, templates, profile=None):
+        service.candidates.append([t["id"] for t in templates])
+        return "system", "user", 0.3, None
+
+    service.prompt_manager = SimpleNamespace(get_template_selection_prompt=get_template_selection_prompt)
+    return service
+
+
+def selection_response(template_id):
+    """模板选择的LLM响应"""
+    return json.dumps({"templateId": template_id, "templateName": "x", "confidence": 0.8, "reason": "r"})
+
+
+def run_select(service, content_type, template_id):
+    """以固定LLM响应执行两阶段流程的模板选择"""
+    llm = SimpleNamespace(chat_completion=AsyncMock(return_value=selection_response(template_id)))
+    with patch.object(template_selection_service, "get_llm_client", return_value=llm):
+        return asyncio.run(service.select("A和B相互影响", content_type))
+
+
+def test_relationship_selects_from_relation_category():
+    """类型relationship的候选模板为relation分类，不再回退到所有模板"""
+    service = make_service()
+    result = run_select(service, "relationship", "relation-circle")
+    assert service.candidates == [["relation-network", "relation-circle"]]
+    assert result["templateId"] == "relation-circle"
+
+    # 其他分类的模板不在候选列表中，修正为relation分类的第一个模板
+    result = run_select(service, "relationship", "checklist")
+    assert result["templateId"] == "relation-network"
+
+
+def test_empty_category_falls_back_to_all_templates():
+    """分类没有模板的类型仍在所有模板中选择"""
+    service = make_service()
+    result = run_select(service, "chart", "checklist")
+    assert service.candidates == [[t["id"] for t in TEMPLATES]]
+    assert result["templateId"] == "checklist"
+
+
+if __name__ == "__main__":
+    test_relationship_selects_from_relation_category()
+    test_empty_category_falls_back_to_all_templates()
+    print("✓ 模板选择服务测试全部通过")
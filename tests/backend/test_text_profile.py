@@ -0,0 +1,66 @@
+"""
+文本画像测试
+验证画像字段、按文本缓存，以及SWOT检测、本地预测和提示词构建复用画像
+"""
+import sys
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.services.local_classifier import extract_features
+from app.services.text_profile import TextProfile, estimate_item_count, get_text_profile
+from app.services.type_classification_service import TypeClassificationService
+from app.utils.prompt_manager import PromptManager
+
+
+def test_profile_fields():
+    """画像字段"""
+    profile = TextProfile.build("SWOT分析：优势 Strengths；劣势；机会")
+    assert profile.lower == "swot分析：优势 strengths；劣势；机会"
+    assert "strengths" in profile.tokens
+    assert profile.swot_hits == 5
+    assert profile.item_count == estimate_item_count(profile.text) == 2
+    assert profile.type_keyword_hits["comparison"] == 2
+
+    # n-gram特征与分类器的特征提取一致，并按范围缓存
+    features = profile.ngram_features((1, 2))
+    assert features == extract_features(profile.text, (1, 2))
+    assert profile.ngram_features((1, 2)) is features
+
+
+def test_profile_memoized_by_text():
+    """相同文本复用同一画像"""
+    text = "1. 注册 2. 登录 3. 下单"
+    assert get_text_profile(text) is get_text_profile(text)
+    assert get_text_profile(text) is not get_text_profile(text + " ")
+
+
+def test_swot_and_prediction_use_profile():
+    """SWOT检测与本地关键词预测读取画像中的命中数"""
+    service = TypeClassificationService()
+    swot = TextProfile.build("优势、劣势、机会、威胁")
+    assert service._detect_swot_content(swot.text, swot)["type"] == "comparison"
+    assert service._detect_swot_content("普通文本") is None
+
+    profile = TextProfile.build("首先准备材料，然后开始，最后收尾")
+    assert profile.type_keyword_hits["sequence"] == 3
+
+
+def test_prompt_item_count_placeholder():
+    """提示词模板可以使用 {item_count} 占位符"""
+    manager = PromptManager(config_path="/nonexistent/llm_prompts.yaml")
+    manager._config = {
+        "type_classification": {"system_prompt": "s", "user_prompt_template": "{user_text}|{item_count}"}
+    }
+    _, user_prompt, _, _ = manager.get_type_classification_prompt("一、甲 二、乙 三、丙 四、丁")
+    assert user_prompt == "一、甲 二、乙 三、丙 四、丁|4"
+
+
+if __name__ == "__main__":
+    test_profile_fields()
+    test_profile_memoized_by_text()
+    test_swot_and_prediction_use_profile()
+    test_prompt_item_count_placeholder()
+    print("✓ 文本画像测试全部通过")
@@ -0,0 +1,197 @@
+"""
+作品内容压缩存储测试
+验证存储格式的压缩与还原、预置字典的训练和按ID查找（保存在数据库中）、压缩列类型的读写
+（兼容压缩前以文本存储的历史数据），以及已有表补建原始文本摘录列
+"""
+import sys
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+import orjson
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models.work import EXCERPT_LENGTH, UserWork
+from app.repositories.work_repo import WorkRepository, ensure_binary_columns, ensure_excerpt_column
+from app.utils import compression
+from app.utils.compression import (
+    FORMAT_RAW, FORMAT_ZLIB, FORMAT_ZLIB_DICT, ZdictStore, compress, decompress, get_zdict_store, train_zdict
+)
+
+
+def make_config(index):
+    """构造Infographic配置"""
+    return {
+        "design": {"structure": {"type": "list-row"}, "item": {"type": "badge-card"}},
+        "data": {
+            "title": f"标题{index}",
+            "items": [{"label": f"步骤{i}", "desc": f"第{index}个作品的说明{i}", "value": i * index} for i in range(4)],
+        },
+        "themeConfig": {"palette": ["#3b82f6", "#10b981", "#f59e0b"]},
+    }
+
+
+def make_store(db_path):
+    """使用临时数据库的字典存储"""
+    return ZdictStore(create_engine(f"sqlite:///{db_path}"))
+
+
+def test_compress_roundtrip(tmp_path):
+    """短内容不压缩，长内容zlib压缩，历史文本原样读取"""
+    store = make_store(tmp_path / "zdicts.db")
+    short = b'{"a":1}'
+    assert compress(short, store=store) == bytes((FORMAT_RAW,)) + short
+    assert decompress(compress(short, store=store), store=store) == short
+
+    data = "重复的原始文本。".encode("utf-8") * 50
+    blob = compress(data, use_dict=True, store=store)
+    assert blob[0] == FORMAT_ZLIB and len(blob) < len(data) // 5
+    assert decompress(blob, store=store) == data
+    assert decompress(memoryview(blob), store=store) == data
+
+    assert decompress('{"legacy": "文本"}') == '{"legacy": "文本"}'.encode("utf-8")
+    with pytest.raises(ValueError):
+        decompress(b"\x09abc")
+
+
+def test_zdict_training_and_store(tmp_path):
+    """训练的字典提高小配置的压缩率，按ID保存和查找，未知字典报错"""
+    samples = [orjson.dumps(make_config(i)) for i in range(50)]
+    zdict = train_zdict(samples)
+    assert 0 < len(zdict) <= compression.MAX_DICT_SIZE
+    assert b'"type":"badge-card"' in zdict
+    assert train_zdict([b'{"only":"one"}']) == b""
+
+    store = make_store(tmp_path / "zdicts.db")
+    assert store.current() is None
+    zdict_id = store.save(zdict)
+    assert store.current() == (zdict_id, zdict)
+    with store.engine.connect() as conn:
+        rows = conn.execute(text("SELECT id, content, is_current FROM work_zdicts")).all()
+    assert [tuple(row) for row in rows] == [(zdict_id, zdict, 1)]
+
+    # 新字典成为当前字典，旧字典保留
+    newer = zdict + b'"extra":true'
+    newer_id = store.save(newer)
+    assert store.current() == (newer_id, newer) and store.get(zdict_id) == zdict
+    store.save(zdict)
+    assert store.current() == (zdict_id, zdict)
+
+    sample = orjson.dumps(make_config(999))
+    with_dict = compress(sample, use_dict=True, store=store)
+    without_dict = compress(sample, store=store)
+    assert with_dict[0] == FORMAT_ZLIB_DICT and len(with_dict) < len(without_dict)
+    assert decompress(with_dict, store=store) == sample
+
+    # 另一个进程（新的存储实例）从数据库读取字典
+    assert decompress(with_dict, store=make_store(tmp_path / "zdicts.db")) == sample
+    with pytest.raises(ValueError):
+        decompress(with_dict, store=make_store(tmp_path / "empty.db"))
+
+
+def test_unknown_zdict_reloaded_once(tmp_path, monkeypatch):
+    """未知字典ID只重新读取一次数据库；保存该字典后可以正常解压"""
+    zdict = train_zdict([orjson.dumps(make_config(i)) for i in range(20)])
+    trained = make_store(tmp_path / "trained.db")
+    trained.save(zdict)
+    sample = orjson.dumps(make_config(7))
+    blob = compress(sample, use_dict=True, store=trained)
+
+    store = make_store(tmp_path / "zdicts.db")
+    loads = []
+    load = store._load
+    monkeypatch.setattr(store, "_load", lambda: (loads.append(1), load())[1])
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            decompress(blob, store=store)
+    # 首次加载，以及遇到未知ID时重新读取一次
+    assert len(loads) == 2
+
+    store.save(zdict)
+    assert decompress(blob, store=store) == sample
+
+
+def test_bound_store(sync_engine, tmp_path):
+    """绑定了存储的引擎使用绑定的存储，其他引擎使用全局存储"""
+    other = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    bound = get_zdict_store(sync_engine.dialect)
+    assert bound.engine is sync_engine
+    assert get_zdict_store(other.dialect) is get_zdict_store() is not bound
+    other.dispose()
+
+
+def test_compressed_columns(db, sync_engine):
+    """新作品以压缩字节存储并同步摘录，历史文本数据可以直接读取"""
+    get_zdict_store(sync_engine.dialect).save(train_zdict([orjson.dumps(make_config(i)) for i in range(20)]))
+    input_text = "用户输入的原始文本" * 30
+    work = WorkRepository(db).create(UserWork(
+        title="作品", template_id="t", input_text=input_text, infographic_config=make_config(1)
+    ))
+    assert work.input_excerpt == input_text[:EXCERPT_LENGTH + 1]
+    work_id = work.id
+
+    raw_text, raw_config = db.execute(
+        text("SELECT input_text, infographic_config FROM user_works WHERE id = :id"), {"id": work_id}
+    ).one()
+    assert isinstance(raw_text, bytes) and raw_text[0] == FORMAT_ZLIB
+    assert raw_config[0] == FORMAT_ZLIB_DICT
+    assert len(raw_text) < len(input_text.encode("utf-8")) // 5
+
+    # 压缩前以文本存储的历史数据
+    db.execute(text(
+        "INSERT INTO user_works (title, template_id, input_text, infographic_config) "
+        "VALUES ('历史作品', 't', '历史文本', :config)"
+    ), {"config": '{"data": {"title": "\\u5386\\u53f2"}}'})
+    db.commit()
+    db.expunge_all()
+
+    repo = WorkRepository(db)
+    assert repo.get_by_id(work_id).to_dict()["infographicConfig"] == make_config(1)
+    assert repo.get_by_id(work_id).input_text == input_text
+    legacy = repo.get_by_id(2)
+    assert legacy.input_text == "历史文本" and legacy.infographic_config == {"data": {"title": "历史"}}
+
+
+def test_ensure_excerpt_column(db_path):
+    """已有的表补建摘录列并由原始文本回填"""
+    engine = create_engine(f"sqlite:///{db_path}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE user_works (id INTEGER PRIMARY KEY, user_id VARCHAR(100), title VARCHAR(200), "
+            "template_id VARCHAR(100), input_text TEXT, infographic_config JSON, thumbnail_url VARCHAR(500), "
+            "created_at DATETIME, updated_at DATETIME)"
+        ))
+        conn.execute(text(
+            "INSERT INTO user_works (template_id, input_text, infographic_config) VALUES ('t', :text, '{}')"
+        ), {"text": "长" * 150})
+    db = sessionmaker(bind=engine)()
+    try:
+        ensure_excerpt_column(db)
+        ensure_excerpt_column(db)
+        ensure_binary_columns(db)
+        work = db.get(UserWork, 1)
+        assert work.input_excerpt == "长" * (EXCERPT_LENGTH + 1)
+        assert work.to_summary_dict()["excerpt"] == "长" * EXCERPT_LENGTH + "..."
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def test_ensure_columns_on_empty_database(db_path):
+    """空数据库（尚未建表）上补建列不报错"""
+    engine = create_engine(f"sqlite:///{db_path}")
+    db = sessionmaker(bind=engine)()
+    try:
+        ensure_excerpt_column(db)
+        ensure_binary_columns(db)
+    finally:
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,113 @@
+"""
+作品列表游标分页测试
+验证游标的编码与解析、按 (created_at, id) 翻页不重复不遗漏（包括创建时间相同和为空的作品），
+以及作品计数表由触发器增量维护
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+import pytest
+from sqlalchemy import text
+
+from app.models.work import UserWork
+from app.repositories import work_repo
+from app.repositories.work_repo import AsyncWorkRepository, WorkRepository, decode_cursor, encode_cursor
+
+BASE_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def seeded_db(db, repo_state, make_work):
+    """写入10个作品：两两创建时间相同，最早的两个创建时间为空"""
+    assert work_repo.ensure_work_counts(db)
+    for i in range(10):
+        db.add(make_work(i, "u1" if i % 3 else "u2", input_text="文本", infographic_config={},
+                         created_at=BASE_TIME + timedelta(minutes=i // 2)))
+    db.commit()
+    db.execute(text("UPDATE user_works SET created_at = NULL WHERE id <= 2"))
+    db.commit()
+    return db
+
+
+def collect_pages(repo, page_size, user_id=None):
+    """按游标依次取完所有页"""
+    ids, cursor = [], None
+    while True:
+        works, cursor = repo.get_page(user_id=user_id, cursor=cursor, page_size=page_size)
+        ids.extend(work.id for work in works)
+        if cursor is None:
+            return ids
+
+
+def test_cursor_roundtrip():
+    """游标编码后可以还原，无效游标报错"""
+    work = UserWork(id=42, created_at=datetime(2024, 5, 6, 7, 8, 9, 123456))
+    assert decode_cursor(encode_cursor(work)) == (work.created_at, 42)
+    assert decode_cursor(encode_cursor(UserWork(id=3, created_at=None))) == (None, 3)
+    for cursor in ("zzz", encode_cursor(work)[:-4]):
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(cursor)
+
+
+def test_keyset_pages(seeded_db):
+    """翻页结果与按 (created_at, id) 降序的完整列表一致，创建时间为空的作品排在最后"""
+    repo = WorkRepository(seeded_db)
+    expected = [10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+    for page_size in (1, 3, 4, 8, 10, 20):
+        assert collect_pages(repo, page_size) == expected, page_size
+    assert collect_pages(repo, 2, user_id="u2") == [10, 7, 4, 1]
+    assert repo.get_page(user_id="nobody") == ([], None)
+
+    # 按页码跳页与游标分页顺序一致
+    works, total = repo.get_all(page=2, page_size=3)
+    assert [work.id for work in works] == [7, 6, 5] and total == 10
+
+
+def test_work_counts_maintained_by_triggers(seeded_db, make_work):
+    """作品的插入、删除、改变用户都同步到计数表"""
+    db = seeded_db
+    repo = WorkRepository(db)
+    assert (repo.count(), repo.count("u1"), repo.count("u2")) == (10, 6, 4)
+
+    db.add(make_work(10, title="匿名"))
+    db.commit()
+    assert repo.count() == 11
+
+    db.execute(text("UPDATE user_works SET user_id = 'u2' WHERE id = 2"))
+    db.commit()
+    assert (repo.count("u1"), repo.count("u2")) == (5, 5)
+
+    assert repo.delete(3)
+    assert (repo.count(), repo.count("u2")) == (10, 5)
+    assert repo.count("nobody") == 0
+
+
+def test_async_keyset_pages(seeded_db, async_session_factory):
+    """异步Repository的游标分页与同步实现一致"""
+    async def main():
+        async with async_session_factory() as db:
+            repo = AsyncWorkRepository(db)
+            ids, cursor = [], None
+            while True:
+                works, cursor = await repo.get_page(cursor=cursor, page_size=3)
+                ids.extend(work.id for work in works)
+                if cursor is None:
+                    break
+            assert ids == [10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+            assert await repo.count("u2") == 4
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
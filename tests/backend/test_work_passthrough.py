@@ -0,0 +1,117 @@
+"""
+作品配置原样存取测试
+验证保存作品时只校验配置以外的字段（校验失败返回与Pydantic相同格式的422），
+配置以JSON字节存储，获取作品时配置只解压不解析、原样嵌入响应
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import InvalidRequestError
+
+from app.api.v1 import works
+from app.repositories.work_repo import AsyncWorkRepository
+from app.utils.compression import decompress
+from app.utils.db import get_async_session
+
+CONFIG = {
+    "design": {"structure": {"type": "list-row"}, "title": "default"},
+    "data": {"title": "季度总结", "items": [{"label": f"项目{i}", "value": i / 3} for i in range(200)]},
+    "themeConfig": {"palette": ["#3b82f6", "#10b981"]},
+}
+
+
+@pytest.fixture
+def client(async_session_factory, repo_state):
+    """挂载作品路由的测试应用，会话使用临时数据库"""
+    async def override():
+        async with async_session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(works.router, prefix="/works")
+    app.dependency_overrides[get_async_session] = override
+    return TestClient(app)
+
+
+def make_body(**fields):
+    """保存作品的请求体"""
+    body = {"title": "作品", "templateId": "t", "inputText": "原始文本", "infographicConfig": CONFIG}
+    body.update(fields)
+    return {key: value for key, value in body.items() if value is not None}
+
+
+def test_create_and_get_passthrough(client, sync_engine):
+    """保存后配置以JSON字节存储，获取时原样返回"""
+    response = client.post("/works", json=make_body())
+    assert response.status_code == 200
+    created = response.json()
+    assert created["success"] is True and created["message"] == "作品保存成功"
+    data = created["data"]
+    assert data["infographicConfig"] == CONFIG and data["inputText"] == "原始文本"
+    assert data["id"] == 1 and data["createdAt"] is not None
+
+    with sync_engine.connect() as conn:
+        raw = conn.execute(text("SELECT infographic_config FROM user_works WHERE id = 1")).scalar()
+    assert decompress(raw) == orjson.dumps(CONFIG)
+
+    detail = client.get("/works/1")
+    assert detail.status_code == 200 and detail.headers["content-type"] == "application/json"
+    body = detail.json()
+    assert body["data"]["infographicConfig"] == CONFIG
+    assert list(body["data"]["infographicConfig"]) == list(CONFIG)
+    assert orjson.dumps(CONFIG) in detail.content
+
+    assert client.get("/works/99").status_code == 404
+
+
+def test_create_validation(client):
+    """只校验配置以外的字段；配置必须是对象"""
+    cases = [
+        (make_body(inputText=""), ("body", "inputText")),
+        (make_body(templateId=None), ("body", "templateId")),
+        (make_body(infographicConfig=None), ("body", "infographicConfig")),
+        (make_body(infographicConfig=[1, 2]), ("body", "infographicConfig")),
+    ]
+    for body, loc in cases:
+        response = client.post("/works", json=body)
+        assert response.status_code == 422, body
+        assert [tuple(error["loc"]) for error in response.json()["detail"]] == [loc]
+
+    response = client.post("/works", content=b'{"title": ', headers={"content-type": "application/json"})
+    assert response.status_code == 422 and response.json()["detail"][0]["type"] == "json_invalid"
+    assert client.post("/works", json=[1]).status_code == 422
+
+
+def test_raw_config_repository(client, sync_engine, async_session_factory):
+    """按ID获取的配置为JSON字节，作品对象上不加载配置；历史文本数据同样原样返回"""
+    with sync_engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO user_works (title, template_id, input_text, infographic_config) "
+            "VALUES ('历史作品', 't', '历史文本', '{\"data\": {\"title\": \"\\u5386\\u53f2\"}}')"
+        ))
+
+    async def main():
+        async with async_session_factory() as db:
+            work, config = await AsyncWorkRepository(db).get_with_raw_config(1)
+            assert isinstance(config, bytes) and orjson.loads(config) == {"data": {"title": "历史"}}
+            assert work.input_text == "历史文本"
+            with pytest.raises(InvalidRequestError):
+                work.infographic_config
+            assert await AsyncWorkRepository(db).get_with_raw_config(2) is None
+
+    asyncio.run(main())
+    assert client.get("/works/1").json()["data"]["infographicConfig"] == {"data": {"title": "历史"}}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
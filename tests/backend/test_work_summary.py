@@ -0,0 +1,107 @@
+"""
+作品列表摘要视图测试
+验证列表查询只加载摘要列（原始文本全文和配置不加载，访问时报错）、文本摘录的截断，
+以及按ID获取作品时仍返回完整内容
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+
+from app.models.work import EXCERPT_LENGTH, UserWork
+from app.repositories.work_repo import AsyncWorkRepository, WorkRepository
+
+LONG_TEXT = "长" * (EXCERPT_LENGTH + 20)
+SUMMARY_KEYS = {"id", "userId", "title", "templateId", "excerpt", "thumbnailUrl", "createdAt", "updatedAt"}
+
+
+@pytest.fixture
+def seeded_db(db, repo_state):
+    """写入一个长文本作品和一个短文本作品"""
+    db.add_all([
+        UserWork(user_id="u1", title="长文本", template_id="t", input_text=LONG_TEXT,
+                 infographic_config={"data": list(range(100))}),
+        UserWork(user_id="u1", title="短文本", template_id="t", input_text="短", infographic_config={"data": []}),
+    ])
+    db.commit()
+    db.expunge_all()
+    return db
+
+
+def assert_summary_only(work):
+    """摘要对象不能访问原始文本和配置"""
+    for name in ("input_text", "infographic_config"):
+        try:
+            getattr(work, name)
+        except InvalidRequestError:
+            pass
+        else:
+            raise AssertionError(f"摘要查询不应加载 {name}")
+
+
+def test_list_loads_summary_columns(seeded_db, sync_engine):
+    """列表查询的SQL不包含原始文本全文和配置列，摘录超长时截断"""
+    statements = []
+    event.listen(sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    repo = WorkRepository(seeded_db)
+    works, _ = repo.get_page(page_size=10)
+    select_sql = next(s for s in statements if s.lstrip().upper().startswith("SELECT") and "user_works" in s)
+    assert "infographic_config" not in select_sql and "input_text" not in select_sql
+
+    summaries = {work.title: work.to_summary_dict() for work in works}
+    assert set(summaries["长文本"]) == SUMMARY_KEYS
+    assert summaries["长文本"]["excerpt"] == "长" * EXCERPT_LENGTH + "..."
+    assert summaries["短文本"]["excerpt"] == "短"
+    for work in works:
+        assert_summary_only(work)
+
+    seeded_db.expunge_all()
+    works, total = repo.get_all(page=1, page_size=10)
+    assert total == 2
+    for work in works:
+        assert_summary_only(work)
+
+
+def test_detail_and_new_work_are_complete(seeded_db):
+    """按ID获取返回完整内容；刚创建的作品也可以直接转换为摘要"""
+    repo = WorkRepository(seeded_db)
+    work = repo.get_by_id(1)
+    assert work.input_text == LONG_TEXT and work.infographic_config == {"data": list(range(100))}
+    assert work.to_summary_dict()["excerpt"] == "长" * EXCERPT_LENGTH + "..."
+
+    created = repo.create(UserWork(title="新作品", template_id="t", input_text="新文本", infographic_config={}))
+    assert created.to_summary_dict()["excerpt"] == "新文本"
+
+    assert repo.delete(created.id) is True
+    assert repo.delete(created.id) is False
+
+
+def test_async_summary(seeded_db, async_session_factory):
+    """异步Repository的列表同样只加载摘要列"""
+    async def main():
+        async with async_session_factory() as db:
+            repo = AsyncWorkRepository(db)
+            works, cursor = await repo.get_page(page_size=1)
+            assert cursor is not None and works[0].to_summary_dict()["excerpt"] == "短"
+            assert_summary_only(works[0])
+            works, _ = await repo.get_all(page=2, page_size=1)
+            assert works[0].to_summary_dict()["excerpt"].endswith("...")
+
+        async with async_session_factory() as db:
+            work = await AsyncWorkRepository(db).get_by_id(1)
+            assert work.to_dict()["infographicConfig"] == {"data": list(range(100))}
+            assert await AsyncWorkRepository(db).delete(2) is True
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,164 @@
+"""
+作品写入队列测试
+验证作品ID按段预分配（多段互不重叠，跳过直接写入已占用的ID，启用队列时直接写入也从序列分配ID）、
+按间隔和批量大小批量写入、写入前可按ID读取和出现在作品列表中、关闭时写入剩余作品，以及批量写入失败时逐个重试
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加backend目录到路径
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, text
+
+from app.api.v1 import works
+from app.config import Settings
+from app.models.work import UserWork
+from app.repositories import work_repo
+from app.repositories.work_repo import allocate_work_ids
+from app.services.work_write_queue import WorkWriteQueue
+from app.utils.db import get_async_session
+
+# 启用写入队列的配置
+QUEUE_SETTINGS = Settings(_env_file=None, AIHUBMIX_API_KEY="test-key", WORK_WRITE_BEHIND_ENABLED=True)
+
+
+@pytest.fixture
+def make_queued_work(make_work):
+    """构造入队的作品，返回 (作品, 配置JSON字节)"""
+    def factory(index):
+        config = orjson.dumps({"data": {"title": f"作品{index}"}})
+        return make_work(index, infographic_config=orjson.Fragment(config)), config
+    return factory
+
+
+def test_allocate_work_ids(db):
+    """ID段互不重叠，直接写入的作品占用的ID会被跳过"""
+    assert allocate_work_ids(db, 10) == 1
+    assert allocate_work_ids(db, 5) == 11
+    db.add(UserWork(id=40, title="直接写入", template_id="t", input_text="文本", infographic_config={}))
+    db.commit()
+    assert allocate_work_ids(db, 10) == 41
+    assert allocate_work_ids(db, 1) == 51
+
+
+def test_direct_create_uses_sequence(db, make_work, monkeypatch):
+    """启用写入队列时直接写入的作品从ID序列分配ID，不占用队列已预分配的ID段"""
+    assert allocate_work_ids(db, 10) == 1
+    with monkeypatch.context() as patched:
+        patched.setattr(work_repo, "get_settings", lambda: QUEUE_SETTINGS)
+        assert work_repo.WorkRepository(db).create(make_work(0)).id == 11
+    assert allocate_work_ids(db, 10) == 12
+    # 未启用写入队列时使用数据库自增ID
+    assert work_repo.WorkRepository(db).create(make_work(1)).id == 12
+
+
+def test_pending_works_listed(async_session_factory, repo_state, monkeypatch):
+    """尚未写入的作品出现在作品列表和总数中，游标翻页不重复、不遗漏"""
+    queue = WorkWriteQueue(async_session_factory, interval_ms=60000, batch_size=100, id_block_size=10)
+    monkeypatch.setattr(works, "get_settings", lambda: QUEUE_SETTINGS)
+    monkeypatch.setattr(works, "get_work_write_queue", lambda: queue)
+
+    async def override_session():
+        async with async_session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(works.router, prefix="/works")
+    app.dependency_overrides[get_async_session] = override_session
+    body = {"templateId": "t", "inputText": "文本", "infographicConfig": {"data": {}}}
+    with TestClient(app) as client:
+        try:
+            for i in range(3):
+                client.post("/works", json={**body, "title": f"作品{i}", "userId": "u1"})
+            client.portal.call(queue.flush)
+            for i in range(3, 5):
+                client.post("/works", json={**body, "title": f"作品{i}", "userId": "u1" if i == 3 else "u2"})
+            assert queue.pending_count == 2
+
+            ids, cursor = [], None
+            while True:
+                params = {"pageSize": 2, **({"cursor": cursor} if cursor else {})}
+                data = client.get("/works", params=params).json()["data"]
+                assert data["total"] == 5
+                ids += [work["id"] for work in data["works"]]
+                cursor = data["nextCursor"]
+                if cursor is None:
+                    break
+            assert ids == [5, 4, 3, 2, 1]
+
+            data = client.get("/works", params={"userId": "u1", "pageSize": 10}).json()["data"]
+            assert [work["id"] for work in data["works"]] == [4, 3, 2, 1] and data["total"] == 4
+            assert data["nextCursor"] is None
+
+            # 按页码跳页时先写入队列
+            data = client.get("/works", params={"page": 2, "pageSize": 3}).json()["data"]
+            assert [work["id"] for work in data["works"]] == [2, 1] and data["total"] == 5
+            assert queue.pending_count == 0
+        finally:
+            client.portal.call(queue.shutdown)
+
+
+def test_batched_writes(db, async_session_factory, repo_state, make_queued_work):
+    """按批量大小和间隔写入，写入前可按ID读取"""
+    async def main():
+        queue = WorkWriteQueue(async_session_factory, interval_ms=20, batch_size=100, id_block_size=64)
+        try:
+            saved = []
+            for i in range(250):
+                saved.append(await queue.enqueue(*make_queued_work(i)))
+            assert [work.id for work in saved] == list(range(1, 251))
+            assert saved[0].created_at is not None
+
+            pending = queue.get_pending(250)
+            assert pending is not None and orjson.loads(pending[1]) == {"data": {"title": "作品249"}}
+
+            for _ in range(100):
+                if queue.pending_count == 0:
+                    break
+                await asyncio.sleep(0.02)
+            assert queue.pending_count == 0 and queue.get_pending(250) is None
+        finally:
+            await queue.shutdown()
+
+    asyncio.run(main())
+    assert db.scalar(select(func.count()).select_from(UserWork)) == 250
+    work = db.get(UserWork, 137)
+    assert work.infographic_config == {"data": {"title": "作品136"}} and work.input_excerpt == "文本136"
+    assert work_repo.ensure_work_counts(db) and work_repo.WorkRepository(db).count() == 250
+
+
+def test_shutdown_flushes_and_retries(db, async_session_factory, make_queued_work):
+    """关闭时写入剩余作品；批量写入失败时逐个重试，冲突的作品被丢弃"""
+    async def main():
+        queue = WorkWriteQueue(async_session_factory, interval_ms=60000, batch_size=100, id_block_size=10)
+        try:
+            for i in range(5):
+                await queue.enqueue(*make_queued_work(i))
+            # 队列分配ID之后，另一个写入方占用了其中一个ID
+            async with async_session_factory() as adb:
+                await adb.execute(text(
+                    "INSERT INTO user_works (id, template_id, input_text, infographic_config) "
+                    "VALUES (3, 't', '冲突', '{}')"
+                ))
+                await adb.commit()
+            assert queue.pending_count == 5
+        finally:
+            await queue.shutdown()
+        assert queue.pending_count == 0
+        with pytest.raises(RuntimeError):
+            await queue.enqueue(*make_queued_work(9))
+
+    asyncio.run(main())
+    titles = dict(db.execute(select(UserWork.id, UserWork.title)).all())
+    assert titles == {1: "作品0", 2: "作品1", 3: None, 4: "作品3", 5: "作品4"}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))